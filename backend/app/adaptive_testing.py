@@ -15,13 +15,13 @@ Strategy:
 Author: SELVE Team
 """
 
-import json
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Optional, Tuple, Set
 from dataclasses import dataclass
 import statistics
-from pathlib import Path
 
-from app.scoring import SelveScorer, SelveProfile
+from app.item_pool import get_item_pool, scale_range_for_code
+from app.scoring import SelveScorer, SelveProfile, get_scorer, normalize_raw_score
+from app.score_state import ScoreState
 
 
 @dataclass
@@ -33,6 +33,9 @@ class DimensionUncertainty:
     variance: float
     needs_more_items: bool
     recommended_additional_items: int
+    normalized_score: float = 0.0  # 0-100 dimension score
+    midpoint_component: float = 0.0  # 0-1, proximity of score to 50
+    sample_component: float = 1.0  # 0-1, shortfall from minimum confident item count
 
 
 class AdaptiveTester:
@@ -43,23 +46,22 @@ class AdaptiveTester:
     selecting which questions to ask based on response patterns.
     """
     
-    def __init__(self, item_pool_path: str = None):
+    def __init__(self, item_pool_path: str = None, scorer: SelveScorer = None):
         """
         Initialize adaptive tester.
         
         Args:
             item_pool_path: Path to item pool JSON file
+            scorer: Existing scorer to share (default: one built for item_pool_path)
         """
-        if item_pool_path is None:
-            # Default to expanded item pool in app/data
-            item_pool_path = str(Path(__file__).parent / 'data' / 'selve_item_pool_expanded.json')
+        if scorer is None:
+            scorer = SelveScorer(item_pool_path)
         
-        self.scorer = SelveScorer(item_pool_path)
-        self.item_pool_path = item_pool_path
+        self.scorer = scorer
+        self.item_pool_path = str(scorer.item_pool_path)
         
-        # Load item pool for adaptive selection
-        with open(item_pool_path, 'r') as f:
-            self.item_pool = json.load(f)
+        # Base item pool (without scenarios), shared read-only across the process
+        self.item_pool = get_item_pool(scorer.item_pool_path, include_scenarios=False).dimension_items
         
         # Adaptive testing parameters
         self.UNCERTAINTY_THRESHOLD = 0.5  # Above this = needs more items (lowered from 0.6)
@@ -87,30 +89,114 @@ class AdaptiveTester:
         """
         Calculate uncertainty for a specific dimension.
         
+        Convenience wrapper over calculate_uncertainties(). Callers that need
+        several dimensions should call calculate_uncertainties() once instead.
+        
+        Args:
+            responses: Dict of item_code -> response value
+            dimension: Dimension name (e.g., 'LUMEN')
+        
+        Returns:
+            DimensionUncertainty object with metrics
+        """
+        return self.calculate_uncertainties(responses)[dimension]
+    
+    def calculate_uncertainties(
+        self,
+        responses: Dict[str, int]
+    ) -> Dict[str, DimensionUncertainty]:
+        """
+        Calculate uncertainty for every dimension in a single pass.
+        
         Uncertainty is based on:
         1. Response variance (contradictory answers = high uncertainty)
         2. Score proximity to midpoint (scores near 50 = uncertain)
         3. Number of items answered (fewer items = higher uncertainty)
         
+        Responses are validated once and reduced to a ScoreState in one
+        vectorized pass over the compiled item index. Compute this once per
+        request and pass it to select_next_items_excluding() and
+        should_continue_testing(); sessions that keep a ScoreState can call
+        uncertainties_from_state() directly.
+        
         Args:
             responses: Dict of item_code -> response value
-            dimension: Dimension name (e.g., 'LUMEN')
         
         Returns:
-            DimensionUncertainty object with metrics
+            Dict of dimension name -> DimensionUncertainty, in pool order
+            
+        Raises:
+            ValueError: If responses are invalid
         """
-        # Get dimension items
-        dim_items = self.scorer.get_items_by_dimension(dimension)
-        dim_item_codes = [item['item'] for item in dim_items]
-        
-        # Get responses for this dimension
-        dim_responses = {
-            code: val for code, val in responses.items() 
-            if code in dim_item_codes
+        self.scorer._validate_responses(responses)
+        return self.uncertainties_from_state(
+            ScoreState.from_responses(self.scorer.compiled, responses)
+        )
+    
+    def uncertainties_from_state(self, state: ScoreState) -> Dict[str, DimensionUncertainty]:
+        """
+        Calculate uncertainty for every dimension from a session's score state.
+        
+        O(number of dimensions): reads the running count, score sum and
+        variance sums kept by ScoreState instead of the response dict.
+        
+        Args:
+            state: ScoreState built against this tester's scorer pool
+        
+        Returns:
+            Dict of dimension name -> DimensionUncertainty, in pool order
+        """
+        return {
+            dimension: self._build_uncertainty(
+                dimension,
+                int(state.counts[dim_id]),
+                float(state.sums[dim_id]),
+                state.unit_variance(dim_id),
+            )
+            for dim_id, dimension in enumerate(state.compiled.dimensions)
         }
+    
+    def calculate_session_uncertainties(
+        self,
+        responses: Dict[str, int],
+        state: Optional[ScoreState] = None
+    ) -> Dict[str, DimensionUncertainty]:
+        """
+        Uncertainties for a live session, using its score state when there is one.
         
-        n_answered = len(dim_responses)
+        Engines whose uncertainty can't be read off ScoreState override this
+        (see IRTAdaptiveTester), so routes don't need to know which engine runs.
+        
+        Args:
+            responses: Session responses (item_code -> value)
+            state: The session's ScoreState, kept in step with responses
         
+        Returns:
+            Dict of dimension name -> DimensionUncertainty, in pool order
+        """
+        if state is None:
+            return self.calculate_uncertainties(responses)
+        return self.uncertainties_from_state(state)
+    
+    def _build_uncertainty(
+        self,
+        dimension: str,
+        n_answered: int,
+        scored_sum: float,
+        variance: float
+    ) -> DimensionUncertainty:
+        """
+        Build a DimensionUncertainty from per-dimension sufficient statistics.
+        
+        Args:
+            dimension: Dimension name
+            n_answered: Number of answered items in the dimension
+            scored_sum: Sum of reverse-scored responses (raw scale)
+            variance: Sample variance of the 0-1 normalized scored responses
+        
+        Returns:
+            DimensionUncertainty object with metrics
+        """
         if n_answered == 0:
             # No items answered - maximum uncertainty
             return DimensionUncertainty(
@@ -122,36 +208,8 @@ class AdaptiveTester:
                 recommended_additional_items=self.MIN_ITEMS_PER_DIMENSION
             )
         
-        # Score current responses
-        profile = self.scorer.score_responses(responses, validate=True)
-        dim_score = getattr(profile, dimension.lower())
-        
-        # Calculate response variance (contradictory answers)
-        # First, normalize all responses to same scale
-        normalized_responses = []
-        for item_code, response in dim_responses.items():
-            # Get item details
-            item_detail = next((i for i in dim_items if i['item'] == item_code), None)
-            if not item_detail:
-                continue
-            
-            # Detect scale
-            scale_min, scale_max = self.scorer._get_scale_range(item_code)
-            
-            # Normalize to 0-1
-            normalized = (response - scale_min) / (scale_max - scale_min)
-            
-            # Apply reverse scoring if needed
-            if item_detail.get('reversed', False):
-                normalized = 1 - normalized
-            
-            normalized_responses.append(normalized)
-        
-        # Calculate variance
-        if len(normalized_responses) > 1:
-            variance = statistics.variance(normalized_responses)
-        else:
-            variance = 0.0
+        # Same rounding as SelveScorer, so thresholds match the profile score
+        normalized_score = round(normalize_raw_score(scored_sum / n_answered), 2)
         
         # Calculate uncertainty components
         
@@ -161,7 +219,7 @@ class AdaptiveTester:
         
         # 2. Midpoint proximity component (0-1 scale)
         # Scores near 50 (40-60 range) = uncertain
-        distance_from_50 = abs(dim_score.normalized_score - 50)
+        distance_from_50 = abs(normalized_score - 50)
         midpoint_component = max(0, (20 - distance_from_50) / 20)
         
         # 3. Sample size component (0-1 scale)
@@ -201,7 +259,10 @@ class AdaptiveTester:
             n_items_answered=n_answered,
             variance=variance,
             needs_more_items=needs_more,
-            recommended_additional_items=recommended_additional
+            recommended_additional_items=recommended_additional,
+            normalized_score=normalized_score,
+            midpoint_component=midpoint_component,
+            sample_component=sample_component
         )
     
     def select_next_items(
@@ -228,7 +289,8 @@ class AdaptiveTester:
         self,
         responses: Dict[str, int],
         exclude_items: Set[str],
-        max_items: int = 10
+        max_items: int = 10,
+        uncertainties: Optional[Dict[str, DimensionUncertainty]] = None
     ) -> List[Dict]:
         """
         Select next items to ask, excluding specific item codes.
@@ -240,35 +302,24 @@ class AdaptiveTester:
             responses: Dict of item_code -> response value
             exclude_items: Set of item codes to exclude (answered + pending)
             max_items: Maximum number of items to return
+            uncertainties: Precomputed calculate_uncertainties(responses) result
         
         Returns:
             List of item dicts to ask next
         """
-        # Calculate uncertainty for all dimensions
-        dimensions = ['LUMEN', 'AETHER', 'ORPHEUS', 'ORIN', 'LYRA', 'VARA', 'CHRONOS', 'KAEL']
-        uncertainties = []
-        
-        for dim in dimensions:
-            uncertainty = self.calculate_dimension_uncertainty(responses, dim)
-            if uncertainty.needs_more_items:
-                uncertainties.append(uncertainty)
+        # Calculate uncertainty for all dimensions (once)
+        if uncertainties is None:
+            uncertainties = self.calculate_uncertainties(responses)
         
-        # Sort by uncertainty score (highest first)
-        uncertainties.sort(key=lambda u: u.uncertainty_score, reverse=True)
+        uncertain_dims = self._uncertain_dimensions_by_priority(uncertainties)
         
         # Select items for uncertain dimensions
         next_items = []
         
         # Get recently answered items to avoid confirmation bias
-        # We want to space out reversed pairs by at least 10-15 questions
-        recent_window = 15  # Look back 15 items
-        recent_items = []
-        if len(responses) > 0:
-            # Get the last N answered item codes
-            answered_codes = list(responses.keys())
-            recent_items = answered_codes[-recent_window:]
-        
-        for uncertainty in uncertainties:
+        recent_items = self._recent_items(responses)
+        
+        for uncertainty in uncertain_dims:
             if len(next_items) >= max_items:
                 break
             
@@ -287,15 +338,9 @@ class AdaptiveTester:
             
             # CONFIRMATION SPACING: Avoid selecting reversed items if we recently
             # answered a non-reversed item (or vice versa) for this dimension
-            recently_answered_dim_items = [
-                item for item in dim_items
-                if item['item'] in recent_items
-            ]
+            recent_polarities = self._recent_polarities(dim_items, recent_items)
             
-            if recently_answered_dim_items:
-                # Check the polarity (reversed/not-reversed) of recent items
-                recent_polarities = {item['reversed'] for item in recently_answered_dim_items}
-                
+            if recent_polarities:
                 # If we recently answered items of one polarity, prefer the SAME polarity
                 # to avoid confirmation bias (don't immediately ask opposite questions)
                 if len(recent_polarities) == 1:  # All recent items have same polarity
@@ -328,9 +373,62 @@ class AdaptiveTester:
         
         return next_items[:max_items]
     
+    @staticmethod
+    def _uncertain_dimensions_by_priority(
+        uncertainties: Dict[str, DimensionUncertainty]
+    ) -> List[DimensionUncertainty]:
+        """Dimensions needing items, most uncertain first (ties keep dimension order)."""
+        dimensions = ['LUMEN', 'AETHER', 'ORPHEUS', 'ORIN', 'LYRA', 'VARA', 'CHRONOS', 'KAEL']
+        uncertain_dims = [
+            uncertainties[dim] for dim in dimensions
+            if uncertainties[dim].needs_more_items
+        ]
+        uncertain_dims.sort(key=lambda u: u.uncertainty_score, reverse=True)
+        return uncertain_dims
+    
+    @staticmethod
+    def _recent_items(responses: Dict[str, int], recent_window: int = 15) -> Set[str]:
+        """
+        Last answered item codes (response dicts keep answer order).
+        
+        We want to space out reversed pairs by at least 10-15 questions.
+        """
+        return set(list(responses.keys())[-recent_window:])
+    
+    @staticmethod
+    def _recent_polarities(dim_items: List[Dict], recent_items: Set[str]) -> Set[bool]:
+        """Polarities (reversed or not) of a dimension's recently answered items."""
+        return {item['reversed'] for item in dim_items if item['item'] in recent_items}
+    
+    def selection_key(
+        self,
+        responses: Dict[str, int],
+        uncertainties: Dict[str, DimensionUncertainty]
+    ) -> Tuple:
+        """
+        Canonical form of everything select_next_items_excluding() reads
+        besides the exclusion set.
+        
+        Two states with equal keys (and equal exclusions) select exactly the
+        same items, so selections can be memoized across sessions.
+        
+        Returns:
+            Hashable tuple: (dimension, recommended items, preferred polarity)
+            per uncertain dimension, in selection priority order
+        """
+        recent_items = self._recent_items(responses)
+        key = []
+        for u in self._uncertain_dimensions_by_priority(uncertainties):
+            polarities = self._recent_polarities(self.scorer.get_items_by_dimension(u.dimension), recent_items)
+            # Ordering only changes when every recent item had the same polarity
+            preferred = next(iter(polarities)) if len(polarities) == 1 else None
+            key.append((u.dimension, u.recommended_additional_items, preferred))
+        return tuple(key)
+    
     def should_continue_testing(
         self,
-        responses: Dict[str, int]
+        responses: Dict[str, int],
+        uncertainties: Optional[Dict[str, DimensionUncertainty]] = None
     ) -> Tuple[bool, str]:
         """
         Determine if testing should continue or stop.
@@ -342,6 +440,7 @@ class AdaptiveTester:
         
         Args:
             responses: Dict of item_code -> response value
+            uncertainties: Precomputed calculate_uncertainties(responses) result
         
         Returns:
             Tuple of (should_continue, reason)
@@ -352,15 +451,15 @@ class AdaptiveTester:
         if n_responses >= self.MAX_TOTAL_ITEMS:
             return False, f"Maximum items reached ({self.MAX_TOTAL_ITEMS})"
         
-        # Calculate uncertainties
+        # Calculate uncertainties (once)
+        if uncertainties is None:
+            uncertainties = self.calculate_uncertainties(responses)
+        
         dimensions = ['LUMEN', 'AETHER', 'ORPHEUS', 'ORIN', 'LYRA', 'VARA', 'CHRONOS', 'KAEL']
-        uncertainties = [
-            self.calculate_dimension_uncertainty(responses, dim)
-            for dim in dimensions
-        ]
+        dimension_uncertainties = [uncertainties[dim] for dim in dimensions]
         
         # Check if any dimension needs more items
-        uncertain_dims = [u for u in uncertainties if u.needs_more_items]
+        uncertain_dims = [u for u in dimension_uncertainties if u.needs_more_items]
         
         if not uncertain_dims:
             return False, "All dimensions have sufficient confidence"
@@ -383,7 +482,7 @@ class AdaptiveTester:
             return False, "No more available items for uncertain dimensions"
         
         # Continue testing
-        avg_uncertainty = statistics.mean(u.uncertainty_score for u in uncertainties)
+        avg_uncertainty = statistics.mean(u.uncertainty_score for u in dimension_uncertainties)
         return True, f"{len(uncertain_dims)} dimensions uncertain (avg uncertainty: {avg_uncertainty:.2f})"
     
     def run_adaptive_assessment(
@@ -467,9 +566,10 @@ class AdaptiveTester:
         
         if verbose:
             # Print summary
+            uncertainties = self.calculate_uncertainties(responses)
             for dim in ['LUMEN', 'AETHER', 'ORPHEUS', 'ORIN', 'LYRA', 'VARA', 'CHRONOS', 'KAEL']:
                 dim_score = getattr(profile, dim.lower())
-                uncertainty = self.calculate_dimension_uncertainty(responses, dim)
+                uncertainty = uncertainties[dim]
                 
                 emoji = {
                     'LUMEN': '✨', 'AETHER': '🌫️', 'ORPHEUS': '🎵', 'ORIN': '🧭',
@@ -484,6 +584,25 @@ class AdaptiveTester:
         return profile
 
 
+
+# ============================================================================
+# Shared Instance
+# ============================================================================
+
+_adaptive_tester: Optional[AdaptiveTester] = None
+
+
+def get_adaptive_tester() -> AdaptiveTester:
+    """
+    Get the process-wide AdaptiveTester (shares the default scorer).
+
+    The tester holds no per-user state, so every session shares it.
+    """
+    global _adaptive_tester
+    if _adaptive_tester is None:
+        _adaptive_tester = AdaptiveTester(scorer=get_scorer())
+    return _adaptive_tester
+
 def simulate_responses(items: List[Dict]) -> Dict[str, int]:
     """
     Simulate user responses for testing.
@@ -503,8 +622,7 @@ def simulate_responses(items: List[Dict]) -> Dict[str, int]:
     for item in items:
         # Simulate somewhat consistent responses
         # (real users would have patterns, not pure randomness)
-        scale_max = 7 if item['item'][0] in 'HXA' and len(item['item']) > 2 else 5
-        responses[item['item']] = random.randint(1, scale_max)
+        responses[item['item']] = random.randint(*scale_range_for_code(item['item']))
     
     return responses
 
@@ -0,0 +1,455 @@
+"""
+SELVE IRT Adaptive Testing
+==========================
+Computerized adaptive testing with Samejima's graded response model (GRM).
+
+Alternative to the heuristic AdaptiveTester: same public contract
+(calculate_uncertainties / select_next_items_excluding /
+should_continue_testing), so QuestionEngine can run either one.
+
+Each dimension is treated as a unidimensional trait theta ~ N(0, 1).
+Everything that depends only on item parameters is precomputed once per
+item pool over a fixed theta grid:
+- log category probabilities: (n_items, n_grid, n_categories)
+- Fisher information:         (n_items, n_grid)
+
+so per request the engine only gathers rows for the answered items:
+- EAP theta and posterior SD (standard error) for all 8 dimensions come from
+  one (8 x n_answered) @ (n_answered x n_grid) product
+- item selection is maximum expected information under each dimension's
+  posterior, one (n_items x n_grid) reduction
+- stopping is based on SE instead of item counts
+
+Item parameters:
+    The pool has item-total correlations, not calibrated IRT parameters.
+    Until calibrated values exist (optional 'discrimination' and
+    'thresholds' keys on an item override these), items use the standard
+    normal-ogive approximation that treats the correlation as a factor loading:
+        a   = 1.7 * r / sqrt(1 - r^2)
+        b_k = Phi^-1(k / m) / r      for k = 1..m-1  (m categories)
+
+Usage:
+    tester = get_irt_tester()
+    uncertainties = tester.calculate_uncertainties(responses)
+    next_items = tester.select_next_items_excluding(responses, exclude, max_items=3)
+"""
+
+import math
+from statistics import NormalDist
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.adaptive_testing import AdaptiveTester, DimensionUncertainty
+from app.scoring import SelveScorer, get_scorer
+from app.score_state import ScoreState
+
+
+# Theta grid for quadrature and information tables
+THETA_GRID = np.linspace(-4.0, 4.0, 81)
+
+# Logistic scaling constant (approximates the normal ogive)
+LOGISTIC_D = 1.7
+
+# Correlations are clipped to this range before conversion to GRM parameters
+MIN_LOADING = 0.05
+MAX_LOADING = 0.95
+
+
+class GRMItemBank:
+    """
+    GRM parameters and precomputed probability/information tables for an item pool.
+
+    Arrays are indexed like CompiledItemPool (item index = compiled item order).
+
+    Attributes:
+        discrimination: (n_items,) GRM slope a
+        thresholds: (n_items, max_categories - 1) ordered b_k, padded with +inf
+        n_categories: (n_items,) number of response categories
+        log_prob: (n_items, n_grid, max_categories) log P(category | theta)
+        information: (n_items, n_grid) Fisher information
+    """
+
+    def __init__(self, scorer: SelveScorer, theta_grid: np.ndarray = THETA_GRID):
+        compiled = scorer.compiled
+        self.compiled = compiled
+        self.theta_grid = theta_grid
+
+        # Look up optional calibrated parameters from the item dicts
+        items_by_code = {
+            item['item']: item
+            for items in scorer.dimension_items.values()
+            for item in items
+        }
+
+        n_items = compiled.n_items
+        n_categories = compiled.scale_max.astype(np.intp)
+        max_categories = int(n_categories.max()) if n_items else 2
+
+        discrimination = np.empty(n_items)
+        thresholds = np.full((n_items, max_categories - 1), np.inf)
+        normal = NormalDist()
+
+        for index, code in enumerate(compiled.item_codes):
+            item = items_by_code[code]
+            m = int(n_categories[index])
+            loading = min(max(float(compiled.correlation[index]), MIN_LOADING), MAX_LOADING)
+
+            if 'discrimination' in item and 'thresholds' in item:
+                discrimination[index] = float(item['discrimination'])
+                thresholds[index, :m - 1] = sorted(float(b) for b in item['thresholds'])
+            else:
+                discrimination[index] = LOGISTIC_D * loading / math.sqrt(1 - loading * loading)
+                thresholds[index, :m - 1] = [normal.inv_cdf(k / m) / loading for k in range(1, m)]
+
+        self.discrimination = discrimination
+        self.thresholds = thresholds
+        self.n_categories = n_categories
+
+        p_star = self._boundary_curves(np.broadcast_to(theta_grid, (n_items, len(theta_grid))))
+        prob = np.clip(p_star[:, :, :-1] - p_star[:, :, 1:], 1e-12, 1.0)
+
+        # Information: sum_k (P*_k' - P*_{k+1}')^2 / P_k, with P*' = a P* (1 - P*)
+        d_star = discrimination[:, None, None] * p_star * (1.0 - p_star)
+        d_prob = d_star[:, :, :-1] - d_star[:, :, 1:]
+        valid = np.arange(max_categories)[None, None, :] < n_categories[:, None, None]
+        information = np.where(valid, d_prob * d_prob / prob, 0.0).sum(axis=2)
+
+        self.log_prob = np.log(prob)
+        self.information = information
+        self.log_prior = -0.5 * theta_grid * theta_grid
+
+        for array in (self.discrimination, self.thresholds, self.log_prob, self.information):
+            array.setflags(write=False)
+
+    def _boundary_curves(self, theta: np.ndarray) -> np.ndarray:
+        """
+        Boundary curves P*_k(theta) = P(X >= k), with P*_0 = 1 and P*_m = 0.
+
+        Args:
+            theta: (n_items, k) theta values, one row per item
+
+        Returns:
+            (n_items, k, max_categories + 1) array
+        """
+        a = self.discrimination[:, None, None]
+        b = self.thresholds[:, None, :]
+        inner = 1.0 / (1.0 + np.exp(-a * (theta[:, :, None] - b)))  # +inf thresholds -> 0
+        ones = np.ones(theta.shape + (1,))
+        zeros = np.zeros(theta.shape + (1,))
+        return np.concatenate([ones, inner, zeros], axis=2)
+
+    def sample_responses(self, theta: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """
+        Draw one response to every item from the GRM (used for simulation).
+
+        Args:
+            theta: (n_dimensions,) true trait values of a respondent
+            rng: NumPy random generator
+
+        Returns:
+            (n_items,) raw response values, reverse keying applied
+        """
+        compiled = self.compiled
+        p_star = self._boundary_curves(theta[compiled.dimension_ids][:, None])[:, 0, :]
+        # Category = number of boundaries passed: P*_k >= u for k = 1..m-1
+        u = rng.random(compiled.n_items)
+        scored = 1 + (p_star[:, 1:-1] >= u[:, None]).sum(axis=1)
+        return np.where(compiled.reversed, compiled.scale_max + 1 - scored, scored).astype(np.intp)
+
+    def posterior(self, responses: Dict[str, float]) -> np.ndarray:
+        """
+        Normalized posterior weights over the theta grid for every dimension.
+
+        Returns:
+            (n_dimensions, n_grid) array, rows sum to 1
+        """
+        compiled = self.compiled
+        indices, values = compiled.encode_responses(responses)
+        categories = np.rint(compiled.reverse_score(indices, values) - 1).astype(np.intp)
+        dims = compiled.dimension_ids[indices]
+
+        # (n_answered, n_grid) log-likelihood rows, summed per dimension
+        rows = self.log_prob[indices, :, categories]
+        one_hot = np.zeros((compiled.n_dimensions, len(indices)))
+        one_hot[dims, np.arange(len(indices))] = 1.0
+        log_post = one_hot @ rows + self.log_prior
+
+        log_post -= log_post.max(axis=1, keepdims=True)
+        weights = np.exp(log_post)
+        return weights / weights.sum(axis=1, keepdims=True)
+
+    def eap(self, weights: np.ndarray) -> tuple:
+        """EAP theta and posterior SD for each row of posterior weights."""
+        theta = weights @ self.theta_grid
+        variance = weights @ (self.theta_grid * self.theta_grid) - theta * theta
+        return theta, np.sqrt(np.maximum(variance, 0.0))
+
+    def expected_information(self, weights: np.ndarray) -> np.ndarray:
+        """Posterior-weighted information of every item under its own dimension's posterior."""
+        return (self.information * weights[self.compiled.dimension_ids]).sum(axis=1)
+
+
+class PosteriorUncertainties(dict):
+    """
+    calculate_uncertainties() result that keeps the posterior it came from.
+
+    Handing it back to select_next_items_excluding() lets selection reuse
+    the posterior instead of recomputing it for the same responses.
+    """
+
+    def __init__(self, uncertainties: Dict[str, DimensionUncertainty], posterior: np.ndarray):
+        super().__init__(uncertainties)
+        self.posterior = posterior
+
+
+class IRTAdaptiveTester(AdaptiveTester):
+    """
+    GRM-based computerized adaptive tester.
+
+    Same contract as AdaptiveTester; uncertainty is the posterior SD of
+    theta (standard error) and items are chosen by maximum information.
+    """
+
+    def __init__(self, item_pool_path: str = None, scorer: SelveScorer = None):
+        """
+        Initialize IRT tester.
+
+        Args:
+            item_pool_path: Path to item pool JSON file
+            scorer: Existing scorer to share (default: one built for item_pool_path)
+        """
+        super().__init__(item_pool_path=item_pool_path, scorer=scorer)
+        self.bank = GRMItemBank(self.scorer)
+
+        # Item dicts in compiled index order
+        self._items = [
+            item
+            for dimension in self.scorer.compiled.dimensions
+            for item in self.scorer.dimension_items[dimension]
+        ]
+
+        # CAT parameters
+        self.SE_TARGET = 0.5  # Stop a dimension once SE(theta) <= this (reliability ~0.75)
+        self.UNCERTAINTY_THRESHOLD = self.SE_TARGET
+        self.MIN_ITEMS_PER_DIMENSION = 3
+        self.MAX_ITEMS_PER_DIMENSION = 12
+        self.TARGET_TOTAL_ITEMS = 40
+        self.MAX_TOTAL_ITEMS = 96
+
+        # Memoized selection (see selection_key) treats posteriors this close as equal
+        self.SELECTION_KEY_SCORE_STEP = 1.0  # theta percentile points
+        self.SELECTION_KEY_SE_STEP = 0.01
+
+    def calculate_uncertainties(
+        self,
+        responses: Dict[str, int]
+    ) -> Dict[str, DimensionUncertainty]:
+        """
+        EAP theta and standard error for every dimension.
+
+        uncertainty_score is the posterior SD of theta (prior SD = 1), so the
+        0-1 range and "higher = more uncertain" meaning match AdaptiveTester.
+
+        Args:
+            responses: Dict of item_code -> response value
+
+        Returns:
+            Dict of dimension name -> DimensionUncertainty, in pool order
+
+        Raises:
+            ValueError: If responses are invalid
+        """
+        self.scorer._validate_responses(responses)
+        return self._uncertainties_from_posterior(responses, self.bank.posterior(responses))
+
+    def calculate_session_uncertainties(
+        self,
+        responses: Dict[str, int],
+        state: Optional[ScoreState] = None
+    ) -> Dict[str, DimensionUncertainty]:
+        """The GRM posterior needs per-item likelihoods, so the score state isn't used."""
+        return self.calculate_uncertainties(responses)
+
+    def _uncertainties_from_posterior(
+        self,
+        responses: Dict[str, int],
+        weights: np.ndarray
+    ) -> PosteriorUncertainties:
+        compiled = self.scorer.compiled
+        theta, se = self.bank.eap(weights)
+        counts = np.bincount(
+            compiled.dimension_ids[compiled.encode_responses(responses)[0]],
+            minlength=compiled.n_dimensions,
+        )
+        best_info = self._best_available_information(weights, set(responses))
+        normal = NormalDist()
+
+        uncertainties = PosteriorUncertainties({}, weights)
+        for dim_id, dimension in enumerate(compiled.dimensions):
+            n_answered = int(counts[dim_id])
+            dim_se = float(se[dim_id])
+            needs_more = (
+                (dim_se > self.SE_TARGET or n_answered < self.MIN_ITEMS_PER_DIMENSION) and
+                n_answered < self.MAX_ITEMS_PER_DIMENSION
+            )
+
+            recommended = 0
+            if needs_more:
+                # Information still needed to reach SE_TARGET, over the best item's information
+                needed = 1.0 / (self.SE_TARGET ** 2) - 1.0 / (dim_se ** 2)
+                per_item = max(float(best_info[dim_id]), 1e-6)
+                recommended = max(
+                    math.ceil(needed / per_item) if needed > 0 else 0,
+                    self.MIN_ITEMS_PER_DIMENSION - n_answered,
+                    1,
+                )
+                recommended = min(recommended, self.MAX_ITEMS_PER_DIMENSION - n_answered)
+
+            uncertainties[dimension] = DimensionUncertainty(
+                dimension=dimension,
+                uncertainty_score=min(dim_se, 1.0),
+                n_items_answered=n_answered,
+                variance=dim_se * dim_se,
+                needs_more_items=needs_more,
+                recommended_additional_items=recommended,
+                # Theta as a population percentile (0-100)
+                normalized_score=round(normal.cdf(float(theta[dim_id])) * 100, 2),
+            )
+        return uncertainties
+
+    def selection_key(
+        self,
+        responses: Dict[str, int],
+        uncertainties: Dict[str, DimensionUncertainty]
+    ) -> Tuple:
+        """
+        Quantized per-dimension posterior summary for memoized selection.
+
+        Unlike the heuristic engine's key this is approximate: states whose
+        EAP percentile and SE fall in the same buckets (and with the same
+        item counts) share one selection.
+
+        Returns:
+            Hashable tuple, one entry per dimension in pool order
+        """
+        return tuple(
+            (
+                dimension,
+                u.needs_more_items,
+                u.recommended_additional_items,
+                u.n_items_answered,
+                round(u.normalized_score / self.SELECTION_KEY_SCORE_STEP),
+                round(u.uncertainty_score / self.SELECTION_KEY_SE_STEP),
+            )
+            for dimension, u in uncertainties.items()
+        )
+
+    def _best_available_information(self, weights: np.ndarray, exclude_items: Set[str]) -> np.ndarray:
+        """Highest expected information among non-excluded items, per dimension."""
+        compiled = self.scorer.compiled
+        info = self._masked_information(weights, exclude_items)
+        best = np.zeros(compiled.n_dimensions)
+        np.maximum.at(best, compiled.dimension_ids, np.where(np.isfinite(info), info, 0.0))
+        return best
+
+    def _masked_information(self, weights: np.ndarray, exclude_items: Set[str]) -> np.ndarray:
+        """Expected information per item, -inf for excluded items."""
+        info = self.bank.expected_information(weights)
+        code_to_index = self.scorer.compiled.code_to_index
+        excluded = [code_to_index[code] for code in exclude_items if code in code_to_index]
+        if excluded:
+            info[excluded] = -np.inf
+        return info
+
+    def select_next_items_excluding(
+        self,
+        responses: Dict[str, int],
+        exclude_items: Set[str],
+        max_items: int = 10,
+        uncertainties: Optional[Dict[str, DimensionUncertainty]] = None
+    ) -> List[Dict]:
+        """
+        Maximum-information item selection.
+
+        Greedy batch fill: repeatedly take the dimension with the largest
+        (projected) SE that still needs items, give it its most informative
+        remaining item, and shrink its projected SE by that item's information.
+
+        Args:
+            responses: Dict of item_code -> response value
+            exclude_items: Set of item codes to exclude (answered + pending)
+            max_items: Maximum number of items to return
+            uncertainties: Precomputed calculate_uncertainties(responses) result
+                (its posterior is reused when present)
+
+        Returns:
+            List of item dicts to ask next
+        """
+        compiled = self.scorer.compiled
+        weights = getattr(uncertainties, 'posterior', None)
+        if weights is None:
+            weights = self.bank.posterior(responses)
+            if uncertainties is None:
+                uncertainties = self._uncertainties_from_posterior(responses, weights)
+
+        info = self._masked_information(weights, exclude_items | set(responses))
+
+        # Per-dimension candidate lists, most informative first
+        order = np.argsort(-info, kind='stable')
+        candidates: Dict[int, List[int]] = {dim_id: [] for dim_id in range(compiled.n_dimensions)}
+        for index in order:
+            if not np.isfinite(info[index]):
+                break
+            candidates[int(compiled.dimension_ids[index])].append(int(index))
+
+        projected_precision = {}
+        budget = {}
+        for dim_id, dimension in enumerate(compiled.dimensions):
+            uncertainty = uncertainties[dimension]
+            if uncertainty.needs_more_items and candidates[dim_id]:
+                projected_precision[dim_id] = 1.0 / max(uncertainty.variance, 1e-12)
+                budget[dim_id] = uncertainty.recommended_additional_items
+
+        next_items = []
+        added = dict.fromkeys(projected_precision, 0)
+        target_precision = 1.0 / (self.SE_TARGET ** 2)
+        while len(next_items) < max_items and projected_precision:
+            # Least precise dimension first (ties -> pool order)
+            dim_id = min(projected_precision, key=lambda d: (projected_precision[d], d))
+            dimension = compiled.dimensions[dim_id]
+            index = candidates[dim_id].pop(0)
+
+            item = dict(self._items[index])
+            item['dimension'] = dimension
+            next_items.append(item)
+
+            projected_precision[dim_id] += float(info[index])
+            added[dim_id] += 1
+            reached_target = (
+                projected_precision[dim_id] >= target_precision and
+                uncertainties[dimension].n_items_answered + added[dim_id] >= self.MIN_ITEMS_PER_DIMENSION
+            )
+            if (
+                reached_target or
+                not candidates[dim_id] or
+                added[dim_id] >= budget[dim_id]
+            ):
+                del projected_precision[dim_id]
+
+        return next_items
+
+
+# ============================================================================
+# Shared Instance
+# ============================================================================
+
+_irt_tester: Optional[IRTAdaptiveTester] = None
+
+
+def get_irt_tester() -> IRTAdaptiveTester:
+    """Get the process-wide IRTAdaptiveTester (shares the scorer's item pool)."""
+    global _irt_tester
+    if _irt_tester is None:
+        _irt_tester = IRTAdaptiveTester(scorer=get_scorer())
+    return _irt_tester
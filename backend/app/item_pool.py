@@ -0,0 +1,294 @@
+"""
+SELVE Item Pool Index
+=====================
+Compiled, array-backed view of a SELVE item pool.
+
+The JSON item pool is a dict of dimension -> list of item dicts. That shape is
+convenient to author, but scoring against it means walking every item dict of
+every dimension and re-parsing item codes to find the response scale.
+
+CompiledItemPool flattens the pool once at load time into:
+- a global item-code -> integer index
+- NumPy arrays for dimension id, reversed flag, scale max and correlation
+
+so a full 8-dimension profile can be computed with a handful of vectorized
+operations instead of one Python loop per dimension.
+
+Item pools are loaded through a process-wide registry: each (path, scenarios)
+combination is read and compiled once, and every scorer/tester shares the
+same read-only ItemPool by reference.
+
+Usage:
+    pool = get_item_pool()
+    counts, sums = pool.compiled.dimension_sums({'E1': 4, 'N6': 2})
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent / "data"
+DEFAULT_ITEM_POOL_PATH = DATA_DIR / "selve_item_pool_expanded.json"
+SCENARIOS_FILENAME = "selve_scenarios.json"
+
+
+# Big Five (E, N, A, C, O) and 16PF Dominance (D) item prefixes use a 1-5 scale
+FIVE_POINT_PREFIXES = ('E', 'N', 'A', 'C', 'O', 'D')
+
+
+def scale_range_for_code(item_code: str) -> Tuple[int, int]:
+    """
+    Determine scale range from an item code.
+
+    - 16PF Dominance items (D + digits): 1-5
+    - Big Five items (E, N, A, C, O + digits): 1-5
+    - HEXACO and scenario items (everything else): 1-7
+
+    Returns:
+        (min_value, max_value) tuple
+    """
+    if len(item_code) >= 2 and item_code[0] in FIVE_POINT_PREFIXES and item_code[1:].isdigit():
+        return (1, 5)
+    return (1, 7)
+
+
+class CompiledItemPool:
+    """
+    Immutable, array-backed index over an item pool.
+
+    Attributes:
+        dimensions: Dimension names, in pool order (array position = dimension id)
+        item_codes: Item codes, in pool order (array position = item index)
+        code_to_index: Item code -> integer item index
+        dimension_ids: int array, dimension id of each item
+        reversed: bool array, whether each item is reverse-scored
+        scale_max: float array, maximum response value of each item
+        correlation: float array, item-total correlation of each item
+    """
+
+    def __init__(
+        self,
+        dimensions: List[str],
+        item_codes: List[str],
+        dimension_ids: np.ndarray,
+        reversed_flags: np.ndarray,
+        scale_max: np.ndarray,
+        correlation: np.ndarray,
+    ):
+        self.dimensions: Tuple[str, ...] = tuple(dimensions)
+        self.dimension_index: Dict[str, int] = {dim: i for i, dim in enumerate(self.dimensions)}
+        self.item_codes: Tuple[str, ...] = tuple(item_codes)
+        self.code_to_index: Dict[str, int] = {code: i for i, code in enumerate(self.item_codes)}
+
+        self.dimension_ids = dimension_ids
+        self.reversed = reversed_flags
+        self.scale_max = scale_max
+        self.correlation = correlation
+
+        # Arrays are shared between scorers - make accidental writes fail loudly
+        for array in (self.dimension_ids, self.reversed, self.scale_max, self.correlation):
+            array.setflags(write=False)
+
+        # Identity of everything that affects scoring (codes, dimensions, keys, scales)
+        digest = hashlib.sha1()
+        for code, dim_id, rev, top in zip(self.item_codes, dimension_ids, reversed_flags, scale_max):
+            digest.update(f"{code}:{self.dimensions[dim_id]}:{int(rev)}:{int(top)};".encode())
+        self.fingerprint: str = digest.hexdigest()[:16]
+
+    @classmethod
+    def from_dimension_items(cls, dimension_items: Mapping[str, List[Dict]]) -> "CompiledItemPool":
+        """
+        Compile a dimension -> items mapping (as loaded from JSON).
+
+        Args:
+            dimension_items: Dict mapping dimension name to list of item dicts
+
+        Returns:
+            CompiledItemPool
+        """
+        dimensions = list(dimension_items.keys())
+        item_codes: List[str] = []
+        dimension_ids: List[int] = []
+        reversed_flags: List[bool] = []
+        scale_max: List[int] = []
+        correlation: List[float] = []
+
+        for dim_id, dimension in enumerate(dimensions):
+            for item in dimension_items[dimension]:
+                code = item['item']
+                item_codes.append(code)
+                dimension_ids.append(dim_id)
+                reversed_flags.append(bool(item.get('reversed', False)))
+                scale_max.append(scale_range_for_code(code)[1])
+                correlation.append(float(item.get('correlation', 0.0)))
+
+        return cls(
+            dimensions=dimensions,
+            item_codes=item_codes,
+            dimension_ids=np.asarray(dimension_ids, dtype=np.intp),
+            reversed_flags=np.asarray(reversed_flags, dtype=bool),
+            scale_max=np.asarray(scale_max, dtype=np.float64),
+            correlation=np.asarray(correlation, dtype=np.float64),
+        )
+
+    @property
+    def n_items(self) -> int:
+        return len(self.item_codes)
+
+    @property
+    def n_dimensions(self) -> int:
+        return len(self.dimensions)
+
+    def scale_range(self, item_code: str) -> Tuple[int, int]:
+        """Scale range for an item, using the compiled table when the item is known."""
+        index = self.code_to_index.get(item_code)
+        if index is None:
+            return scale_range_for_code(item_code)
+        return (1, int(self.scale_max[index]))
+
+    def encode_responses(self, responses: Mapping[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convert a response dict into parallel (item index, value) arrays.
+
+        Item codes that are not in the pool are dropped, matching the
+        dict-walking scorer which only looked at responses for pool items.
+        """
+        code_to_index = self.code_to_index
+        indices: List[int] = []
+        values: List[float] = []
+        for code, value in responses.items():
+            index = code_to_index.get(code)
+            if index is not None:
+                indices.append(index)
+                values.append(value)
+        return np.asarray(indices, dtype=np.intp), np.asarray(values, dtype=np.float64)
+
+    def reverse_score(self, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Apply reverse scoring: reversed items map v -> (scale_max + 1) - v."""
+        return np.where(self.reversed[indices], self.scale_max[indices] + 1 - values, values)
+
+    def dimension_sums(self, responses: Mapping[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-dimension item count and sum of reverse-scored responses.
+
+        Returns:
+            (counts, sums) arrays of length n_dimensions, in dimension-id order
+        """
+        indices, values = self.encode_responses(responses)
+        scored = self.reverse_score(indices, values)
+        dims = self.dimension_ids[indices]
+        counts = np.bincount(dims, minlength=self.n_dimensions)
+        sums = np.bincount(dims, weights=scored, minlength=self.n_dimensions)
+        return counts, sums
+
+    def dimension_of(self, item_code: str) -> Optional[str]:
+        """Dimension name for an item code, or None if not in the pool."""
+        index = self.code_to_index.get(item_code)
+        if index is None:
+            return None
+        return self.dimensions[self.dimension_ids[index]]
+
+
+class ItemPool:
+    """
+    Read-only item pool shared by every engine in the process.
+
+    Attributes:
+        path: Resolved path of the base item pool JSON
+        include_scenarios: Whether scenario items were merged in
+        dimension_items: Read-only mapping of dimension -> tuple of item dicts
+        compiled: CompiledItemPool index over dimension_items
+    """
+
+    def __init__(self, path: Path, include_scenarios: bool, dimension_items: Dict[str, List[Dict]]):
+        self.path = path
+        self.include_scenarios = include_scenarios
+        self.dimension_items: Mapping[str, Tuple[Dict, ...]] = MappingProxyType({
+            dimension: tuple(items) for dimension, items in dimension_items.items()
+        })
+        self.compiled = CompiledItemPool.from_dimension_items(self.dimension_items)
+
+    def __repr__(self) -> str:
+        return (
+            f"ItemPool(path={self.path.name!r}, include_scenarios={self.include_scenarios}, "
+            f"n_items={self.compiled.n_items})"
+        )
+
+
+def load_item_pool_file(path: Path, include_scenarios: bool = True) -> Dict[str, List[Dict]]:
+    """
+    Read an item pool JSON file and optionally merge scenario items.
+
+    Scenario items are read from selve_scenarios.json next to the pool file.
+
+    Returns:
+        Dict mapping dimension name to list of item dicts
+    """
+    with open(path, 'r') as f:
+        base_pool = json.load(f)
+
+    if include_scenarios:
+        scenarios_path = path.parent / SCENARIOS_FILENAME
+        if scenarios_path.exists():
+            with open(scenarios_path, 'r') as f:
+                scenarios = json.load(f)
+
+            for dimension, scenario_items in scenarios.items():
+                if dimension in base_pool:
+                    base_pool[dimension].extend(scenario_items)
+                else:
+                    base_pool[dimension] = scenario_items
+
+    return base_pool
+
+
+# ============================================================================
+# Process-wide Registry
+# ============================================================================
+
+_item_pools: Dict[Tuple[str, bool], ItemPool] = {}
+_item_pools_lock = threading.Lock()
+
+
+def get_item_pool(
+    item_pool_path: Optional[Union[str, Path]] = None,
+    include_scenarios: bool = True,
+) -> ItemPool:
+    """
+    Get the shared ItemPool for a pool file, loading it on first use.
+
+    Args:
+        item_pool_path: Path to the item pool JSON (default: expanded pool)
+        include_scenarios: Whether to merge LaHaye-style scenario items
+
+    Returns:
+        Shared, read-only ItemPool
+    """
+    path = Path(item_pool_path or DEFAULT_ITEM_POOL_PATH).resolve()
+    key = (str(path), include_scenarios)
+
+    pool = _item_pools.get(key)
+    if pool is not None:
+        return pool
+
+    with _item_pools_lock:
+        pool = _item_pools.get(key)
+        if pool is None:
+            pool = ItemPool(path, include_scenarios, load_item_pool_file(path, include_scenarios))
+            _item_pools[key] = pool
+            logger.info(f"Loaded item pool {path.name} (scenarios={include_scenarios}): {pool.compiled.n_items} items")
+        return pool
+
+
+def preload_item_pools() -> None:
+    """Load the default item pools up front (called at app startup)."""
+    get_item_pool(include_scenarios=True)
+    get_item_pool(include_scenarios=False)
@@ -14,6 +14,15 @@ import sentry_sdk
 from sentry_sdk.integrations.fastapi import FastApiIntegration
 from sentry_sdk.integrations.logging import LoggingIntegration
 from app.db import prisma
+from app.item_pool import preload_item_pools
+from app.routes.assessment.dependencies import get_tester
+from app.routes.assessment.session_manager import get_session_manager
+from app.routes.assessment.results_job import register_results_job
+from app.services.norms_service import get_norms_service
+from app.services.redis_service import close_async_redis_session_store, get_async_redis_session_store
+from app.services.session_persister import get_session_persister
+from app.services.job_events import get_job_events
+from app.services.job_runner import get_job_runner
 from app.routes.assessment import router as assessment_router
 from app.api.routes import invites, notifications, testimonials, newsletter, stats
 from app.api.routes.users import router as users_router, webhooks_router
@@ -199,10 +208,42 @@ async def lifespan(app: FastAPI):
                 print(f"❌ Failed to connect after {max_retries} attempts")
                 raise
 
+    # Load the shared item pool once per process so session restores never touch disk
+    preload_item_pools()
+    get_tester()
+    print("✅ Item pool loaded")
+
+    # Session store connection pool (falls back to memory if Redis is down)
+    await get_async_redis_session_store().connect()
+
+    # Keep every worker's in-memory sessions in step with the others' writes
+    session_manager = get_session_manager()
+    session_manager.start_coherence()
+
+    # Write-behind session persistence (also flushes what a crashed worker buffered)
+    session_persister = get_session_persister()
+    session_persister.start()
+
+    # Background jobs (results generation): bounded worker pool, retries, idempotent enqueue
+    job_runner = get_job_runner()
+    register_results_job(job_runner)
+    job_runner.start()
+
+    # Percentile norms: load the Redis snapshot, then refresh incrementally in the background
+    norms_service = get_norms_service()
+    await norms_service.load_snapshot()
+    norms_refresh_task = asyncio.create_task(norms_service.run_periodic_refresh())
+
     yield
 
     # Shutdown
     print("🛑 Shutting down SELVE Backend...")
+    norms_refresh_task.cancel()
+    await job_runner.stop()
+    await get_job_events().stop()
+    await session_persister.stop()
+    await session_manager.stop_coherence()
+    await close_async_redis_session_store()
     await prisma.disconnect()
     print("✅ Disconnected from database")
 
@@ -3,6 +3,9 @@ Friend Insights Narrative Generator
 
 Generates warm, conversational AI narratives explaining what friends see differently.
 Uses behavioral descriptions (NOT dimension names) to keep language accessible.
+
+Friend insights are regenerated as friend feedback arrives, so their LLM
+calls are admitted at background priority, behind users waiting on results.
 """
 import logging
 from typing import Dict, List, Optional, Any
@@ -11,6 +14,7 @@ from app.constants import (
     DIMENSION_BEHAVIORS,
     validate_narrative_content,
 )
+from app.narratives.llm_admission import Priority
 from app.narratives.openai_generator import get_openai_generator, OpenAIGenerator
 from app.narratives.openai_config import OpenAIConfig
 
@@ -177,12 +181,13 @@ class FriendInsightsGenerator:
         except Exception as e:
             logger.error(f"Failed to initialize OpenAI for friend insights: {e}")
     
-    def generate(
+    async def generate(
         self,
         self_scores: Dict[str, float],
         friend_scores: Dict[str, float],
         blind_spots: List[Dict],
-        friend_count: int
+        friend_count: int,
+        priority: Priority = Priority.BACKGROUND
     ) -> Dict[str, Any]:
         """
         Generate a friend insights narrative.
@@ -192,6 +197,7 @@ class FriendInsightsGenerator:
             friend_scores: Aggregated friend scores
             blind_spots: List of blind spots
             friend_count: Number of friends
+            priority: LLM admission priority
             
         Returns:
             Dict with:
@@ -230,10 +236,11 @@ class FriendInsightsGenerator:
         
         try:
             # Generate with reasonable token limit for 220-350 words
-            result = self.llm.generate(
+            result = await self.llm.generate_async(
                 prompt=prompt,
                 system_message=system_message,
-                max_output_tokens=600  # ~350 words with buffer
+                max_output_tokens=600,  # ~350 words with buffer
+                priority=priority
             )
             
             narrative = result["text"]
@@ -270,7 +277,7 @@ class FriendInsightsGenerator:
 
 
 # Convenience function
-def generate_friend_insights_narrative(
+async def generate_friend_insights_narrative(
     self_scores: Dict[str, float],
     friend_scores: Dict[str, float],
     blind_spots: List[Dict],
@@ -291,7 +298,7 @@ def generate_friend_insights_narrative(
         Generation result dict
     """
     generator = FriendInsightsGenerator(config)
-    return generator.generate(
+    return await generator.generate(
         self_scores=self_scores,
         friend_scores=friend_scores,
         blind_spots=blind_spots,
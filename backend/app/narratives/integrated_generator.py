@@ -5,12 +5,15 @@ Combines rule-based analysis with OpenAI-generated prose.
 Optimized with parallel API calls for significant speed improvement.
 """
 import asyncio
-from typing import Dict, Any, Optional, List, Callable, Awaitable
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Tuple
 import logging
 import re
 from .synthesizer import PersonalityAnalyzer, NarrativePromptBuilder
+from .llm_admission import Priority
 from .openai_generator import get_openai_generator, OpenAIGenerator
 from .openai_config import OpenAIConfig
+from .narrative_bank import get_narrative_bank
+from .section_cache import get_section_cache, quantize_scores
 from .dimensions import DIMENSION_TEMPLATES
 from .archetypes import match_archetype
 
@@ -90,6 +93,44 @@ SYSTEM_MESSAGE = (
 )
 
 
+def build_section_requests(prompt_builder: NarrativePromptBuilder) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    One generate_batch_async request per section.
+    
+    Args:
+        prompt_builder: Prompt builder for the profile
+        
+    Returns:
+        (section names, requests), in SECTION_CONFIG order
+    """
+    requests: List[Dict[str, Any]] = []
+    for section_name, config in SECTION_CONFIG.items():
+        prompt_method = getattr(prompt_builder, config['prompt_builder'])
+        requests.append({
+            'prompt': prompt_method(),
+            'system_message': SYSTEM_MESSAGE,
+            'max_output_tokens': config['max_tokens'],
+            'name': section_name  # For progress tracking
+        })
+    return list(SECTION_CONFIG), requests
+
+
+async def _report_served(
+    sections: Dict[str, str],
+    on_section_complete: Optional[Callable[[str, int], Awaitable[None]]],
+    on_section_text: Optional[Callable[[str, str], Awaitable[None]]] = None,
+) -> None:
+    """Text and progress callbacks for sections served without generation."""
+    for completed, (name, text) in enumerate(sections.items(), 1):
+        try:
+            if on_section_text:
+                await on_section_text(name, text)
+            if on_section_complete:
+                await on_section_complete(name, completed)
+        except Exception as e:
+            logger.warning(f"Progress callback error: {e}")
+
+
 class IntegratedNarrativeGenerator:
     """
     Generates integrated personality narratives using hybrid approach.
@@ -146,17 +187,29 @@ class IntegratedNarrativeGenerator:
     async def generate_narrative_async(
         self, 
         scores: Dict[str, int],
-        on_section_complete: Optional[Callable[[str, int], Awaitable[None]]] = None
+        on_section_complete: Optional[Callable[[str, int], Awaitable[None]]] = None,
+        on_section_text: Optional[Callable[[str, str], Awaitable[None]]] = None,
+        on_section_delta: Optional[Callable[[str, str], Awaitable[None]]] = None,
+        priority: Priority = Priority.INTERACTIVE
     ) -> Dict[str, Any]:
         """
         Generate complete integrated narrative asynchronously.
         
-        Uses parallel API calls for all sections simultaneously.
+        Uses parallel API calls for all sections simultaneously. Common
+        profiles are served whole from the precomputed narrative bank, and
+        sections whose prompt was generated before come from the narrative
+        section cache; only the rest go to the LLM.
         
         Args:
             scores: Dictionary of dimension scores
             on_section_complete: Optional async callback called when each section completes.
                                  Receives (section_name, completed_count) as arguments.
+            on_section_text: Optional async callback receiving (section_name, final_text)
+                             as soon as each section's text is known, before on_section_complete.
+            on_section_delta: Optional async callback; when given, sections are streamed
+                              from the LLM and it receives (section_name, raw_text_delta).
+                              Deltas aren't post-processed: on_section_text has the final text.
+            priority: LLM admission priority (BACKGROUND when no user is waiting)
             
         Returns:
             Dictionary with narrative sections
@@ -164,8 +217,9 @@ class IntegratedNarrativeGenerator:
         logger.info("Starting parallel narrative generation")
         logger.info(f"Scores: {scores}")
         
-        # Step 1: Rule-based analysis (fast, sync)
-        analyzer = PersonalityAnalyzer(scores, DIMENSION_TEMPLATES)
+        # Step 1: Rule-based analysis (fast, sync), on optionally quantized
+        # scores so near-identical profiles build identical prompts
+        analyzer = PersonalityAnalyzer(quantize_scores(scores), DIMENSION_TEMPLATES)
         prompt_builder = NarrativePromptBuilder(analyzer)
         
         # Match user to personality archetype
@@ -220,48 +274,95 @@ class IntegratedNarrativeGenerator:
         }
         
         # Step 3: Generate sections
-        if self.use_llm and self.llm:
+        cached_sections: List[str] = []
+        bank = get_narrative_bank() if self.use_llm and self.llm else None
+        banked = await bank.lookup(scores, self.llm.config.model) if bank else None
+        
+        if banked is not None:
+            logger.info("Serving narrative from the precomputed bank")
+            narrative['sections'] = dict(banked['sections'])
+            cached_sections = list(narrative['sections'])
+            await _report_served(narrative['sections'], on_section_complete, on_section_text)
+            
+        elif self.use_llm and self.llm:
             logger.info("Generating all sections in PARALLEL with OpenAI...")
             
             # Build all requests upfront with section names for progress tracking
-            requests: List[Dict[str, Any]] = []
-            section_names: List[str] = []
+            section_names, requests = build_section_requests(prompt_builder)
+            
+            # Sections generated before for the same prompt are served from the cache
+            cache = get_section_cache()
+            keys = [
+                cache.make_key(
+                    name, req['prompt'], req['system_message'], req['max_output_tokens'], self.llm.config.model
+                ) if cache else None
+                for name, req in zip(section_names, requests)
+            ]
+            cached = await cache.get_many(keys) if cache else {}
+            results: List[Optional[Dict[str, Any]]] = [cached.get(key) for key in keys]
+            cached_sections = [name for name, result in zip(section_names, results) if result is not None]
+            
+            await _report_served(
+                {
+                    name: strip_markdown_headers(result['text'])
+                    for name, result in zip(section_names, results) if result is not None
+                },
+                on_section_complete,
+                on_section_text,
+            )
+            
+            missing = [i for i, result in enumerate(results) if result is None]
+            n_cached = len(cached_sections)
+            if n_cached:
+                logger.info(f"{n_cached}/{len(requests)} sections served from the narrative cache")
             
-            for section_name, config in SECTION_CONFIG.items():
-                prompt_method = getattr(prompt_builder, config['prompt_builder'])
-                requests.append({
-                    'prompt': prompt_method(),
-                    'system_message': SYSTEM_MESSAGE,
-                    'max_output_tokens': config['max_tokens'],
-                    'name': section_name  # For progress tracking
-                })
-                section_names.append(section_name)
+            async def on_generated(name: str, completed_count: int) -> None:
+                if on_section_complete:
+                    await on_section_complete(name, n_cached + completed_count)
             
-            # Execute all requests in parallel with progress callback
+            async def on_result(name: str, result: Dict[str, Any]) -> None:
+                if on_section_text and result.get('text'):
+                    await on_section_text(name, strip_markdown_headers(result['text']))
+            
+            # Execute the remaining requests in parallel with progress callback
             import time
             start_time = time.time()
             
-            results = await self.llm.generate_batch_async(
-                requests, 
-                max_concurrent=5,  # Limit to avoid rate limits
-                on_complete=on_section_complete  # Pass progress callback
-            )
+            if missing:
+                generated = await self.llm.generate_batch_async(
+                    [requests[i] for i in missing],
+                    on_complete=on_generated,  # Pass progress callback
+                    on_result=on_result,
+                    on_delta=on_section_delta,
+                    priority=priority
+                )
+                for i, result in zip(missing, generated):
+                    results[i] = result
             
             elapsed = time.time() - start_time
             logger.info(f"Parallel generation completed in {elapsed:.2f}s")
             
-            # Process results
+            # Process results (cost counts only what was generated now)
             total_cost = 0.0
-            for section_name, result in zip(section_names, results):
+            for i, (section_name, result) in enumerate(zip(section_names, results)):
                 if 'error' in result and result.get('text', '') == '':
                     # Generation failed for this section - use fallback
                     logger.warning(f"Section {section_name} failed, using fallback")
                     narrative['sections'][section_name] = self._get_section_fallback(
                         section_name, analyzer
                     )
-                else:
-                    narrative['sections'][section_name] = strip_markdown_headers(result['text'])
+                    if on_section_text:
+                        try:
+                            await on_section_text(section_name, narrative['sections'][section_name])
+                        except Exception as e:
+                            logger.warning(f"Section text callback error: {e}")
+                    continue
+                
+                narrative['sections'][section_name] = strip_markdown_headers(result['text'])
+                if i in missing:
                     total_cost += result.get('cost', 0.0)
+                    if cache and result['text']:
+                        await cache.set(keys[i], result['text'], result.get('cost', 0.0))
             
             narrative['generation_cost'] = total_cost
             logger.info(f"Total generation cost: ${total_cost:.4f}")
@@ -283,7 +384,10 @@ class IntegratedNarrativeGenerator:
                 }
                 for c in conflicts
             ],
-            'generation_method': 'openai_parallel' if self.use_llm else 'template',
+            'generation_method': (
+                'narrative_bank' if banked is not None else 'openai_parallel' if self.use_llm else 'template'
+            ),
+            'cached_sections': cached_sections,
             'model': self.llm.config.model if self.llm else None
         }
         
@@ -393,7 +497,9 @@ async def generate_integrated_narrative_async(
     scores: Dict[str, int],
     use_llm: bool = True,
     config: Optional[OpenAIConfig] = None,
-    on_section_complete: Optional[Callable[[str, int], Awaitable[None]]] = None
+    on_section_complete: Optional[Callable[[str, int], Awaitable[None]]] = None,
+    on_section_text: Optional[Callable[[str, str], Awaitable[None]]] = None,
+    on_section_delta: Optional[Callable[[str, str], Awaitable[None]]] = None
 ) -> Dict[str, Any]:
     """
     Generate integrated narrative from scores (async version).
@@ -406,12 +512,20 @@ async def generate_integrated_narrative_async(
         config: OpenAI configuration
         on_section_complete: Optional async callback called when each section completes.
                              Receives (section_name, completed_count) as arguments.
+        on_section_text: Optional async callback receiving (section_name, final_text)
+        on_section_delta: Optional async callback receiving (section_name, raw_text_delta);
+                          streams the LLM responses
         
     Returns:
         Complete narrative dictionary
     """
     generator = IntegratedNarrativeGenerator(use_llm=use_llm, config=config)
-    return await generator.generate_narrative_async(scores, on_section_complete=on_section_complete)
+    return await generator.generate_narrative_async(
+        scores,
+        on_section_complete=on_section_complete,
+        on_section_text=on_section_text,
+        on_section_delta=on_section_delta,
+    )
 
 
 __all__ = [
@@ -0,0 +1,345 @@
+"""
+LLM Admission Control - one process-wide gate in front of every LLM call
+
+Each narrative batch used to bound itself with its own semaphore, blind to
+every other user generating at the same time, so peaks ran into provider
+429s and users got template narratives. Every async LLM call now waits
+here for admission:
+
+- Rate budgets: token buckets on requests per minute and tokens per minute
+  (estimated up front from the prompt and output limit, corrected with
+  the usage the response reports). Budgets are per process: set them to
+  the provider's limits divided by the number of API processes.
+- Adaptive concurrency (AIMD): the in-flight limit grows by 1/limit per
+  successful call and halves on a 429 or timeout (at most once per
+  cooldown, so one burst of errors counts once).
+- Priorities: INTERACTIVE calls (a user waiting on results) are always
+  admitted before BACKGROUND ones (friend-insight regeneration, bank
+  builds), and background calls never hold more than
+  LLM_BACKGROUND_SHARE of the limit, leaving room for interactive ones.
+- Metrics: admissions, queue time (mean, p95, max) per priority, throttle
+  signals and the current limit, from stats().
+
+Usage:
+    controller = get_admission_controller()
+    async with controller.admit(Priority.INTERACTIVE, estimated_tokens=1500) as admission:
+        result = await call_llm()
+        admission.record_usage(result["usage"]["total_tokens"])
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", 500))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", 200_000))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 16))
+LLM_INITIAL_CONCURRENCY = 8
+LLM_MIN_CONCURRENCY = 1
+LLM_BACKGROUND_SHARE = 0.5
+
+AIMD_DECREASE_FACTOR = 0.5
+AIMD_COOLDOWN_SECONDS = 5.0
+
+# Queue times kept per priority for percentiles; waits above this are logged
+QUEUE_TIME_SAMPLES = 500
+SLOW_ADMISSION_SECONDS = 5.0
+
+
+class Priority(IntEnum):
+    """Admission order: lower values go first."""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """Whether an LLM call failed because the provider is overloaded (429 or timeout)."""
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, asyncio.TimeoutError)):
+        return True
+    return getattr(error, "status_code", None) == 429
+
+
+def estimate_tokens(prompt: str, system_message: Optional[str], max_output_tokens: int) -> int:
+    """Tokens a call may use: prompt (~4 characters per token) plus the output limit."""
+    return (len(prompt) + len(system_message or "")) // 4 + max_output_tokens
+
+
+class TokenBucket:
+    """
+    Refilling budget of `per_minute` units.
+
+    The balance may go negative when a call used more than estimated; later
+    calls then wait for the refill.
+    """
+
+    def __init__(self, per_minute: float, clock=time.monotonic):
+        self.capacity = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+
+    @property
+    def level(self) -> float:
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self._rate)
+        self._updated = now
+        return self._level
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` (capped at capacity) is available."""
+        missing = min(amount, self.capacity) - self.level
+        return missing / self._rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        """Spend `amount` (negative refunds)."""
+        self._level = min(self.capacity, self.level - amount)
+
+
+@dataclass
+class Admission:
+    """
+    A granted LLM call.
+
+    Attributes:
+        priority: Priority it was admitted at
+        estimated_tokens: Tokens charged at admission
+        queued_seconds: Time spent waiting for admission
+        used_tokens: Actual usage, once record_usage() is called
+    """
+    priority: Priority
+    estimated_tokens: int
+    queued_seconds: float = 0.0
+    used_tokens: Optional[int] = None
+
+    def record_usage(self, total_tokens: int) -> None:
+        """Report the call's actual token usage (corrects the tokens-per-minute budget)."""
+        self.used_tokens = total_tokens
+
+
+@dataclass
+class _Waiter:
+    priority: Priority
+    estimated_tokens: int
+    enqueued_at: float
+    future: "asyncio.Future[Admission]" = field(repr=False)
+
+
+class LLMAdmissionController:
+    """
+    Rate budgets, AIMD concurrency limit and priority queue for LLM calls.
+
+    Attributes:
+        limit: Current concurrency limit (fractional; floor() calls run at once)
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        initial_concurrency: int = LLM_INITIAL_CONCURRENCY,
+        min_concurrency: int = LLM_MIN_CONCURRENCY,
+        background_share: float = LLM_BACKGROUND_SHARE,
+        clock=time.monotonic,
+    ):
+        self._clock = clock
+        self._requests = TokenBucket(requests_per_minute, clock)
+        self._tokens = TokenBucket(tokens_per_minute, clock)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(min(initial_concurrency, max_concurrency))
+        self.background_share = background_share
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._waiters: List[Tuple[int, int, _Waiter]] = []
+        self._order = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._last_decrease = -math.inf
+
+        self._admitted: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._queue_times: Dict[Priority, Deque[float]] = {p: deque(maxlen=QUEUE_TIME_SAMPLES) for p in Priority}
+        self._max_queue_time: Dict[Priority, float] = {p: 0.0 for p in Priority}
+        self._throttles = 0
+        self._decreases = 0
+        self._errors = 0
+        self._unmanaged = 0
+
+    # ========================================================================
+    # Admission
+    # ========================================================================
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        priority: Priority = Priority.INTERACTIVE,
+        estimated_tokens: int = 0,
+    ) -> AsyncIterator[Admission]:
+        """
+        Wait for admission, run the block, then release the slot.
+
+        A 429 or timeout raised from the block shrinks the concurrency
+        limit; a clean exit grows it.
+
+        Args:
+            priority: INTERACTIVE or BACKGROUND
+            estimated_tokens: Tokens the call may use (see estimate_tokens)
+        """
+        if not self._bind(asyncio.get_running_loop()):
+            # Sync wrappers run generation on their own event loop in a worker
+            # thread; those calls can't join this loop's queue
+            self._unmanaged += 1
+            yield Admission(priority, estimated_tokens)
+            return
+        admission = await self._acquire(priority, estimated_tokens)
+        try:
+            yield admission
+        except BaseException as e:
+            self._release(admission, "throttled" if is_throttle_error(e) else "error")
+            raise
+        self._release(admission, "ok")
+
+    def _bind(self, loop: asyncio.AbstractEventLoop) -> bool:
+        """Whether calls on `loop` are queued here (the first loop used, until it closes)."""
+        if self._loop is not loop and (self._loop is None or self._loop.is_closed()):
+            self._loop = loop
+            self._waiters = []
+            self._timer = None
+            self._in_flight = {p: 0 for p in Priority}
+        return self._loop is loop
+
+    async def _acquire(self, priority: Priority, estimated_tokens: int) -> Admission:
+        waiter = _Waiter(priority, estimated_tokens, self._clock(), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, (priority, next(self._order), waiter))
+        self._dispatch()
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(waiter.future.result(), "error")  # granted as we were cancelled
+            else:
+                waiter.future.cancel()
+                self._dispatch()
+            raise
+
+    def _has_slot(self, priority: Priority) -> bool:
+        limit = max(self.min_concurrency, math.floor(self.limit))
+        if sum(self._in_flight.values()) >= limit:
+            return False
+        if priority == Priority.BACKGROUND:
+            return self._in_flight[priority] < max(1, math.floor(limit * self.background_share))
+        return True
+
+    def _dispatch(self) -> None:
+        """Admit waiters in priority order while slots and budgets allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            priority, _, waiter = self._waiters[0]
+            if waiter.future.done():
+                heapq.heappop(self._waiters)  # cancelled while queued
+                continue
+            if not self._has_slot(priority):
+                return  # a release dispatches again
+            wait = max(self._requests.wait_time(1), self._tokens.wait_time(waiter.estimated_tokens))
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._requests.take(1)
+            self._tokens.take(waiter.estimated_tokens)
+            self._in_flight[priority] += 1
+            queued = self._clock() - waiter.enqueued_at
+            self._record_admission(priority, queued)
+            waiter.future.set_result(Admission(priority, waiter.estimated_tokens, queued))
+
+    def _release(self, admission: Admission, outcome: str) -> None:
+        """Free a slot, settle the token estimate and adjust the limit (outcome: ok, throttled or error)."""
+        self._in_flight[admission.priority] -= 1
+        if admission.used_tokens is not None:
+            self._tokens.take(admission.used_tokens - admission.estimated_tokens)
+
+        if outcome == "ok":
+            self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+        elif outcome == "throttled":
+            self._throttles += 1
+            now = self._clock()
+            if now - self._last_decrease >= AIMD_COOLDOWN_SECONDS:
+                self._last_decrease = now
+                self._decreases += 1
+                self.limit = max(float(self.min_concurrency), self.limit * AIMD_DECREASE_FACTOR)
+                logger.warning(f"⚠️ LLM throttled, concurrency limit lowered to {self.limit:.1f}")
+        else:
+            self._errors += 1
+        self._dispatch()
+
+    # ========================================================================
+    # Diagnostics
+    # ========================================================================
+
+    def _record_admission(self, priority: Priority, queued: float) -> None:
+        self._admitted[priority] += 1
+        self._queue_times[priority].append(queued)
+        self._max_queue_time[priority] = max(self._max_queue_time[priority], queued)
+        if queued >= SLOW_ADMISSION_SECONDS:
+            logger.warning(f"⚠️ {priority.name.lower()} LLM call queued {queued:.1f}s for admission")
+
+    def stats(self) -> Dict[str, Any]:
+        """Limit, budgets, throttle signals and queue times per priority."""
+        waiting = {p: 0 for p in Priority}
+        for priority, _, waiter in self._waiters:
+            if not waiter.future.done():
+                waiting[priority] += 1
+
+        queues = {}
+        for priority in Priority:
+            samples = sorted(self._queue_times[priority])
+            queues[priority.name.lower()] = {
+                "admitted": self._admitted[priority],
+                "in_flight": self._in_flight[priority],
+                "waiting": waiting[priority],
+                "mean_queue_ms": round(sum(samples) / len(samples) * 1000, 1) if samples else 0,
+                "p95_queue_ms": round(samples[int(0.95 * (len(samples) - 1))] * 1000, 1) if samples else 0,
+                "max_queue_ms": round(self._max_queue_time[priority] * 1000, 1),
+            }
+        return {
+            "concurrency_limit": round(self.limit, 2),
+            "requests_available": int(self._requests.level),
+            "tokens_available": int(self._tokens.level),
+            "throttles": self._throttles,
+            "limit_decreases": self._decreases,
+            "errors": self._errors,
+            "unmanaged_calls": self._unmanaged,
+            "priorities": queues,
+        }
+
+
+# ============================================================================
+# Shared Instance
+# ============================================================================
+
+_admission_controller: Optional[LLMAdmissionController] = None
+
+
+def get_admission_controller() -> LLMAdmissionController:
+    """Get or create the process-wide LLMAdmissionController."""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = LLMAdmissionController()
+    return _admission_controller
@@ -0,0 +1,320 @@
+"""
+Narrative Bank - precomputed narratives for common profile patterns
+
+Section prompts are driven by each dimension's level (very_low..very_high)
+and the detected conflicts, so the space of distinct prompt contexts is
+finite and heavily skewed: a few hundred signatures cover most users.
+
+An offline job (scripts/build_narrative_bank.py) mines AssessmentResult for
+the most frequent signatures, generates every section for a representative
+profile of each, and stores them in the bank. At results time a bank hit
+is served without calling the LLM; only rare profiles go live.
+
+The bank is versioned by generator version and model: a prompt change or
+a different OPENAI_MODEL starts an empty bank, and old ones expire.
+
+Redis layout:
+- narrative:bank:{version}        hash, signature -> entry JSON
+                                  (sections, scores, results, generated_at)
+- narrative:bank:{version}:meta   JSON: built_at, results mined, results
+                                  whose signature is banked
+
+Usage:
+    bank = get_narrative_bank()
+    entry = await bank.lookup(scores, model)   # None on a miss
+    await bank.report(model)                   # coverage and freshness
+"""
+
+import json
+import logging
+import os
+import statistics
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.redis_service import get_async_redis_session_store
+
+from .dimensions import DIMENSION_TEMPLATES
+from .llm_admission import Priority
+from .section_cache import NARRATIVE_GENERATOR_VERSION
+from .synthesizer import PersonalityAnalyzer
+
+logger = logging.getLogger(__name__)
+
+
+NARRATIVE_BANK_ENABLED = os.getenv("NARRATIVE_BANK", "true").lower() in ("1", "true", "yes")
+NARRATIVE_BANK_KEY_PREFIX = "narrative:bank:"
+NARRATIVE_BANK_TTL_SECONDS = int(os.getenv("NARRATIVE_BANK_TTL", 90 * 24 * 3600))
+
+# Signatures generated per build, and sections in flight while building
+NARRATIVE_BANK_SIZE = 200
+NARRATIVE_BANK_CONCURRENCY = 5
+
+
+def bank_version(model: str) -> str:
+    """Bank a generator version and model read and write."""
+    return f"v{NARRATIVE_GENERATOR_VERSION}:{model}"
+
+
+def profile_signature(scores: Dict[str, float]) -> str:
+    """
+    What a profile's prompts are built from: each dimension's level and the
+    detected conflicts.
+
+    Args:
+        scores: Dimension scores (0-100)
+
+    Returns:
+        Signature string, e.g. "AETHER:low,...|ORPHEUS>AETHER,..."
+    """
+    analyzer = PersonalityAnalyzer({dim: int(score) for dim, score in scores.items()}, DIMENSION_TEMPLATES)
+    levels = ",".join(f"{d.name}:{d.level}" for d in sorted(analyzer.dimensions, key=lambda d: d.name))
+    conflicts = ",".join(sorted(f"{c.dim1.name}>{c.dim2.name}" for c in analyzer.detect_conflicts()))
+    return f"{levels}|{conflicts}"
+
+
+def mine_signatures(
+    score_rows: Iterable[Dict[str, float]],
+    top_n: int = NARRATIVE_BANK_SIZE,
+    min_count: int = 2,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Most frequent signatures among stored results.
+
+    Each signature's representative is the member closest to the
+    per-dimension median, so it has the signature by construction.
+
+    Args:
+        score_rows: Dimension scores of stored results
+        top_n: Signatures to keep
+        min_count: Results a signature needs to be banked
+
+    Returns:
+        ([{"signature", "count", "scores"}, ...] most frequent first, results mined)
+    """
+    members: Dict[str, List[Dict[str, int]]] = defaultdict(list)
+    total = 0
+    for row in score_rows:
+        scores = {dim: int(score) for dim, score in row.items()}
+        members[profile_signature(scores)].append(scores)
+        total += 1
+
+    common = sorted(members.items(), key=lambda item: len(item[1]), reverse=True)
+    mined = []
+    for signature, rows in common[:top_n]:
+        if len(rows) < min_count:
+            break
+        median = {dim: statistics.median(row[dim] for row in rows) for dim in rows[0]}
+        representative = min(rows, key=lambda row: sum(abs(row[dim] - median[dim]) for dim in median))
+        mined.append({"signature": signature, "count": len(rows), "scores": representative})
+    return mined, total
+
+
+class NarrativeBank:
+    """
+    Versioned store of pregenerated narrative sections, keyed by signature.
+    """
+
+    def __init__(self, store=None):
+        self._store = store
+        self._hits = 0
+        self._misses = 0
+
+    def _redis_store(self):
+        store = self._store or get_async_redis_session_store()
+        return store if store.redis_available else None
+
+    @staticmethod
+    def _key(version: str) -> str:
+        return NARRATIVE_BANK_KEY_PREFIX + version
+
+    # ========================================================================
+    # Lookup
+    # ========================================================================
+
+    async def lookup(self, scores: Dict[str, float], model: str) -> Optional[Dict[str, Any]]:
+        """
+        Banked narrative for a profile's signature (one HGET).
+
+        Returns:
+            Entry dict with "sections" and the "scores" it was generated
+            for, or None if the signature isn't banked
+        """
+        store = self._redis_store()
+        if store is None:
+            return None
+        try:
+            entry = await store.client.hget(self._key(bank_version(model)), profile_signature(scores))
+        except Exception as e:
+            logger.debug(f"Narrative bank read failed: {e}")
+            return None
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return json.loads(entry)
+
+    # ========================================================================
+    # Building
+    # ========================================================================
+
+    async def save(self, model: str, entries: Dict[str, Dict[str, Any]], meta: Dict[str, Any]) -> None:
+        """
+        Store a build: entries (signature -> entry) and its metadata.
+
+        Entries from earlier builds of the same version stay until replaced.
+        """
+        store = self._redis_store()
+        if store is None:
+            raise RuntimeError("Redis unavailable, narrative bank not saved")
+        key = self._key(bank_version(model))
+        async with store.client.pipeline(transaction=True) as pipe:
+            if entries:
+                pipe.hset(key, mapping={sig: json.dumps(entry) for sig, entry in entries.items()})
+            pipe.expire(key, NARRATIVE_BANK_TTL_SECONDS)
+            pipe.set(f"{key}:meta", json.dumps(meta), ex=NARRATIVE_BANK_TTL_SECONDS)
+            await pipe.execute()
+
+    async def report(self, model: str) -> Dict[str, Any]:
+        """
+        Coverage and freshness of the current bank.
+
+        Returns:
+            Dict with:
+                - version, signatures: Bank version and banked signatures
+                - coverage_percent: Share of mined results whose signature is banked
+                - built_at, age_hours: Last build and how long ago it ran
+                - oldest_entry_hours: Age of the oldest banked narrative
+                - hit_rate_percent: Lookups served by the bank in this process
+        """
+        lookups = self._hits + self._misses
+        report: Dict[str, Any] = {
+            "version": bank_version(model),
+            "signatures": 0,
+            "coverage_percent": 0,
+            "built_at": None,
+            "age_hours": None,
+            "oldest_entry_hours": None,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate_percent": round(self._hits / lookups * 100, 2) if lookups else 0,
+        }
+        store = self._redis_store()
+        if store is None:
+            return report
+
+        key = self._key(bank_version(model))
+        meta = await store.client.get(f"{key}:meta")
+        entries = await store.client.hvals(key)
+        now = time.time()
+        report["signatures"] = len(entries)
+        if entries:
+            oldest = min(json.loads(entry)["generated_at"] for entry in entries)
+            report["oldest_entry_hours"] = round((now - oldest) / 3600, 1)
+        if meta:
+            meta = json.loads(meta)
+            report["built_at"] = datetime.fromtimestamp(meta["built_at"]).isoformat()
+            report["age_hours"] = round((now - meta["built_at"]) / 3600, 1)
+            if meta["results_mined"]:
+                report["coverage_percent"] = round(meta["results_covered"] / meta["results_mined"] * 100, 2)
+        return report
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup counters for this process."""
+        lookups = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate_percent": round(self._hits / lookups * 100, 2) if lookups else 0,
+        }
+
+
+async def build_narrative_bank(
+    score_rows: Iterable[Dict[str, float]],
+    llm,
+    bank: NarrativeBank,
+    top_n: int = NARRATIVE_BANK_SIZE,
+    min_count: int = 2,
+    max_concurrent: int = NARRATIVE_BANK_CONCURRENCY,
+) -> Dict[str, Any]:
+    """
+    Mine the most frequent signatures and generate their narratives.
+
+    Every section of every signature goes through one
+    llm.generate_batch_async call, so max_concurrent bounds the whole build;
+    its calls are admitted at background priority, behind interactive ones.
+    Signatures with a failed section aren't banked (they stay live).
+
+    Args:
+        score_rows: Dimension scores of stored results
+        llm: OpenAIGenerator
+        bank: Bank to save into
+        top_n: Signatures to generate
+        min_count: Results a signature needs to be banked
+        max_concurrent: LLM requests in flight
+
+    Returns:
+        Build summary: signatures generated/failed, results mined/covered, cost
+    """
+    from .integrated_generator import build_section_requests, strip_markdown_headers
+    from .synthesizer import NarrativePromptBuilder
+
+    mined, total = mine_signatures(score_rows, top_n, min_count)
+    requests: List[Dict[str, Any]] = []
+    spans = []
+    for profile in mined:
+        analyzer = PersonalityAnalyzer(profile["scores"], DIMENSION_TEMPLATES)
+        names, section_requests = build_section_requests(NarrativePromptBuilder(analyzer))
+        spans.append((profile, names, len(requests)))
+        requests.extend(section_requests)
+
+    logger.info(f"Generating {len(requests)} sections for {len(mined)} signatures ({total} results mined)")
+    results = await llm.generate_batch_async(
+        requests, max_concurrent=max_concurrent, priority=Priority.BACKGROUND
+    ) if requests else []
+
+    entries: Dict[str, Dict[str, Any]] = {}
+    cost = 0.0
+    for profile, names, start in spans:
+        section_results = results[start:start + len(names)]
+        cost += sum(result.get("cost", 0.0) for result in section_results)
+        if any(result.get("error") or not result.get("text") for result in section_results):
+            logger.warning(f"Signature {profile['signature']} had failed sections, not banked")
+            continue
+        entries[profile["signature"]] = {
+            "sections": {
+                name: strip_markdown_headers(result["text"]) for name, result in zip(names, section_results)
+            },
+            "scores": profile["scores"],
+            "results": profile["count"],
+            "generated_at": time.time(),
+        }
+
+    covered = sum(profile["count"] for profile in mined if profile["signature"] in entries)
+    meta = {"built_at": time.time(), "results_mined": total, "results_covered": covered}
+    await bank.save(llm.config.model, entries, meta)
+
+    return {
+        "signatures": len(entries),
+        "failed": len(mined) - len(entries),
+        "results_mined": total,
+        "results_covered": covered,
+        "cost": round(cost, 4),
+    }
+
+
+# ============================================================================
+# Shared Instance
+# ============================================================================
+
+_narrative_bank: Optional[NarrativeBank] = None
+
+
+def get_narrative_bank() -> Optional[NarrativeBank]:
+    """Get the process-wide NarrativeBank (None when NARRATIVE_BANK=false)."""
+    global _narrative_bank
+    if _narrative_bank is None and NARRATIVE_BANK_ENABLED:
+        _narrative_bank = NarrativeBank()
+    return _narrative_bank
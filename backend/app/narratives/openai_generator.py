@@ -6,24 +6,16 @@ with async support for parallel generation.
 import asyncio
 import logging
 from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
-from concurrent.futures import ThreadPoolExecutor
+import openai
 from openai import OpenAI, AsyncOpenAI
 from openai.types.chat import ChatCompletion
+from .llm_admission import Priority, estimate_tokens, get_admission_controller, is_throttle_error
 from .openai_config import OpenAIConfig, estimate_cost
 
 logger = logging.getLogger(__name__)
 
-# Thread pool for running sync OpenAI calls concurrently
-_executor: Optional[ThreadPoolExecutor] = None
-
-
-def get_executor() -> ThreadPoolExecutor:
-    """Get or create the thread pool executor."""
-    global _executor
-    if _executor is None:
-        # Limit concurrent OpenAI requests to avoid rate limits
-        _executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="openai_")
-    return _executor
+# Backoff before retrying a throttled or failed async call (doubles per attempt)
+RETRY_BASE_SECONDS = 1.0
 
 
 class OpenAIGenerator:
@@ -49,10 +41,11 @@ class OpenAIGenerator:
             max_retries=self.config.max_retries,
             timeout=self.config.timeout
         )
-        # Async client for parallel requests
+        # Async client for parallel requests. generate_async retries itself,
+        # so every attempt (and every 429) goes through the admission controller
         self.async_client = AsyncOpenAI(
             api_key=self.config.api_key,
-            max_retries=self.config.max_retries,
+            max_retries=0,
             timeout=self.config.timeout
         )
         
@@ -89,19 +82,58 @@ class OpenAIGenerator:
         self,
         prompt: str,
         system_message: Optional[str] = None,
-        max_output_tokens: Optional[int] = None
+        max_output_tokens: Optional[int] = None,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+        priority: Priority = Priority.INTERACTIVE
     ) -> Dict[str, Any]:
         """
         Generate text asynchronously for parallel execution.
         
+        Each attempt waits for the process-wide LLM admission controller
+        (rate budgets, adaptive concurrency); 429s, timeouts and server
+        errors are retried up to config.max_retries times with backoff.
+        
         Args:
             prompt: User prompt/input
             system_message: System instruction
             max_output_tokens: Override default max output tokens
+            on_delta: Optional async callback; when given, the response is
+                      streamed and each text delta is passed to it as it arrives
+            priority: INTERACTIVE (a user is waiting) or BACKGROUND
             
         Returns:
             Dict with text, model, usage, and cost
         """
+        controller = get_admission_controller()
+        estimated = estimate_tokens(prompt, system_message, max_output_tokens or self.config.max_output_tokens)
+        for attempt in range(self.config.max_retries + 1):
+            try:
+                async with controller.admit(priority, estimated) as admission:
+                    result = await self._generate_once_async(prompt, system_message, max_output_tokens, on_delta)
+                    admission.record_usage(result["usage"]["total_tokens"])
+                    return result
+            except (openai.APIConnectionError, openai.InternalServerError, openai.RateLimitError) as e:
+                if attempt == self.config.max_retries:
+                    raise
+                delay = RETRY_BASE_SECONDS * 2 ** attempt
+                logger.warning(
+                    f"{'Throttled' if is_throttle_error(e) else 'Failed'} ({e.__class__.__name__}), "
+                    f"retrying in {delay:.0f}s (attempt {attempt + 1}/{self.config.max_retries})"
+                )
+                await asyncio.sleep(delay)
+    
+    async def _generate_once_async(
+        self,
+        prompt: str,
+        system_message: Optional[str],
+        max_output_tokens: Optional[int],
+        on_delta: Optional[Callable[[str], Awaitable[None]]]
+    ) -> Dict[str, Any]:
+        """One async API call, streamed when on_delta is given"""
+        if on_delta is not None:
+            if self.config.is_gpt5:
+                return await self._stream_gpt5_async(prompt, system_message, max_output_tokens, on_delta)
+            return await self._stream_gpt4_async(prompt, system_message, max_output_tokens, on_delta)
         if self.config.is_gpt5:
             return await self._generate_gpt5_async(prompt, system_message, max_output_tokens)
         else:
@@ -110,39 +142,58 @@ class OpenAIGenerator:
     async def generate_batch_async(
         self,
         requests: List[Dict[str, Any]],
-        max_concurrent: int = 5,
-        on_complete: Optional[Callable[[str, int], Awaitable[None]]] = None
+        max_concurrent: Optional[int] = None,
+        on_complete: Optional[Callable[[str, int], Awaitable[None]]] = None,
+        on_result: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+        on_delta: Optional[Callable[[str, str], Awaitable[None]]] = None,
+        priority: Priority = Priority.INTERACTIVE
     ) -> List[Dict[str, Any]]:
         """
-        Generate multiple texts in parallel with concurrency control.
+        Generate multiple texts in parallel.
+        
+        Concurrency and rate limits are enforced process-wide by the LLM
+        admission controller, across every batch in flight.
         
         Args:
             requests: List of dicts with 'prompt', 'system_message', 'max_output_tokens', 'name' (optional)
-            max_concurrent: Maximum concurrent requests (default 5 to avoid rate limits)
+            max_concurrent: Optional extra cap on this batch's concurrent requests
+                            (None = only the admission controller's limit)
             on_complete: Optional async callback called when each request completes.
                          Receives (request_name, completed_count) as arguments.
+            on_result: Optional async callback called with (request_name, result)
+                       as each request succeeds, before on_complete.
+            on_delta: Optional async callback; when given, responses are streamed
+                      and it receives (request_name, text_delta) as text arrives.
+            priority: Admission priority for every request in the batch
             
         Returns:
             List of results in same order as requests
         """
-        semaphore = asyncio.Semaphore(max_concurrent)
+        semaphore = asyncio.Semaphore(max_concurrent or len(requests) or 1)
         completed_count = 0
         completed_lock = asyncio.Lock()
         
         async def generate_with_semaphore(req: Dict[str, Any], index: int) -> Tuple[int, Dict[str, Any]]:
             nonlocal completed_count
             async with semaphore:
+                request_name = req.get('name', f'request_{index}')
                 try:
                     result = await self.generate_async(
                         prompt=req.get('prompt', ''),
                         system_message=req.get('system_message'),
-                        max_output_tokens=req.get('max_output_tokens')
+                        max_output_tokens=req.get('max_output_tokens'),
+                        on_delta=(lambda delta: on_delta(request_name, delta)) if on_delta else None,
+                        priority=priority
                     )
+                    if on_result:
+                        try:
+                            await on_result(request_name, result)
+                        except Exception as e:
+                            logger.warning(f"Result callback error: {e}")
                     # Track completion and call callback
                     async with completed_lock:
                         completed_count += 1
                         if on_complete:
-                            request_name = req.get('name', f'request_{index}')
                             try:
                                 await on_complete(request_name, completed_count)
                             except Exception as e:
@@ -154,7 +205,6 @@ class OpenAIGenerator:
                     async with completed_lock:
                         completed_count += 1
                         if on_complete:
-                            request_name = req.get('name', f'request_{index}')
                             try:
                                 await on_complete(request_name, completed_count)
                             except Exception as cb_error:
@@ -421,6 +471,118 @@ class OpenAIGenerator:
             logger.error(f"Error generating with GPT-4 async: {e}")
             raise
     
+    async def _stream_gpt5_async(
+        self,
+        prompt: str,
+        system_message: Optional[str],
+        max_output_tokens: Optional[int],
+        on_delta: Callable[[str], Awaitable[None]]
+    ) -> Dict[str, Any]:
+        """Generate using GPT-5 Responses API (async, streamed)"""
+        logger.info(f"Streaming with GPT-5 async ({self.config.model})...")
+        
+        if system_message:
+            full_input = f"{system_message}\n\n{prompt}"
+        else:
+            full_input = prompt
+        
+        try:
+            stream = await self.async_client.responses.create(
+                model=self.config.model,
+                input=full_input,
+                reasoning={
+                    "effort": self.config.reasoning_effort
+                },
+                text={
+                    "verbosity": self.config.text_verbosity
+                },
+                max_output_tokens=max_output_tokens or self.config.max_output_tokens,
+                stream=True
+            )
+            
+            parts: List[str] = []
+            input_tokens = output_tokens = 0
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    parts.append(event.delta)
+                    await _send_delta(on_delta, event.delta)
+                elif event.type == "response.completed" and event.response.usage:
+                    input_tokens = event.response.usage.input_tokens
+                    output_tokens = event.response.usage.output_tokens
+            
+            return self._streamed_result("".join(parts), input_tokens, output_tokens)
+            
+        except Exception as e:
+            logger.error(f"Error streaming with GPT-5 async: {e}")
+            raise
+    
+    async def _stream_gpt4_async(
+        self,
+        prompt: str,
+        system_message: Optional[str],
+        max_output_tokens: Optional[int],
+        on_delta: Callable[[str], Awaitable[None]]
+    ) -> Dict[str, Any]:
+        """Generate using GPT-4 Chat Completions API (async, streamed)"""
+        logger.info(f"Streaming with GPT-4 async ({self.config.model})...")
+        
+        messages = []
+        if system_message:
+            messages.append({"role": "system", "content": system_message})
+        messages.append({"role": "user", "content": prompt})
+        
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.config.model,
+                messages=messages,
+                temperature=self.config.temperature,
+                top_p=self.config.top_p,
+                max_tokens=max_output_tokens or self.config.max_output_tokens,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            
+            parts: List[str] = []
+            input_tokens = output_tokens = 0
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    await _send_delta(on_delta, chunk.choices[0].delta.content)
+                if chunk.usage:
+                    input_tokens = chunk.usage.prompt_tokens
+                    output_tokens = chunk.usage.completion_tokens
+            
+            return self._streamed_result("".join(parts), input_tokens, output_tokens)
+            
+        except Exception as e:
+            logger.error(f"Error streaming with GPT-4 async: {e}")
+            raise
+    
+    def _streamed_result(self, generated_text: str, input_tokens: int, output_tokens: int) -> Dict[str, Any]:
+        """Result dict for a streamed response (same shape as the non-streamed ones)"""
+        cost = estimate_cost(
+            model=self.config.model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens
+        )
+        
+        logger.info(
+            f"Streamed {len(generated_text)} characters | "
+            f"Tokens: {input_tokens} in + {output_tokens} out | "
+            f"Cost: ${cost:.4f}"
+        )
+        
+        return {
+            "text": generated_text,
+            "model": self.config.model,
+            "usage": {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens
+            },
+            "cost": cost
+        }
+    
     def generate_section(
         self,
         section_name: str,
@@ -465,6 +627,14 @@ class OpenAIGenerator:
         return result["text"]
 
 
+async def _send_delta(on_delta: Callable[[str], Awaitable[None]], delta: str) -> None:
+    """Pass a delta on; a failing callback never interrupts the generation."""
+    try:
+        await on_delta(delta)
+    except Exception as e:
+        logger.debug(f"Delta callback error: {e}")
+
+
 # Singleton instance for reuse
 _generator_instance: Optional[OpenAIGenerator] = None
 
@@ -0,0 +1,228 @@
+"""
+Narrative Section Cache - content-addressed cache of generated section text
+
+Section prompts are built from integer scores, their levels and the
+detected conflicts, so users with the same profile send the same prompts
+and pay full LLM latency and cost for text that was already generated.
+
+Keys are a hash of everything that determines a section's text:
+- section name and generator version (bump NARRATIVE_GENERATOR_VERSION
+  when prompts or post-processing change)
+- model
+- the normalized prompt (whitespace collapsed), system message and token limit
+
+Values are the generated text and what it cost. Two tiers: an in-process
+LRU with TTL, then Redis (shared by all workers, SETEX). A hit is also
+credited with the cost of the generation it replaced.
+
+NARRATIVE_SCORE_QUANTUM rounds scores before the prompts are built (see
+quantize_scores), trading a few points of precision for hit rate; the
+default of 1 keeps prompts exact. Set NARRATIVE_CACHE=false to disable.
+
+Usage:
+    cache = get_section_cache()
+    key = cache.make_key('core_identity', prompt, SYSTEM_MESSAGE, 1200, model)
+    cached = await cache.get_many([key])  # {key: {"text": ..., "cost": ...}}
+    await cache.set(key, result["text"], result["cost"])
+    cache.stats()  # memory/redis hits, misses, dollars saved
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.redis_service import get_async_redis_session_store
+
+logger = logging.getLogger(__name__)
+
+
+NARRATIVE_CACHE_ENABLED = os.getenv("NARRATIVE_CACHE", "true").lower() in ("1", "true", "yes")
+NARRATIVE_SCORE_QUANTUM = max(int(os.getenv("NARRATIVE_SCORE_QUANTUM", 1)), 1)
+NARRATIVE_CACHE_MAX_ENTRIES = 2000
+NARRATIVE_CACHE_TTL_SECONDS = 3600
+NARRATIVE_CACHE_REDIS_TTL_SECONDS = int(os.getenv("NARRATIVE_CACHE_TTL", 30 * 24 * 3600))
+NARRATIVE_CACHE_KEY_PREFIX = "narrative:section:"
+
+# Part of every key: bump when prompts or text post-processing change
+NARRATIVE_GENERATOR_VERSION = "1"
+
+# Score ranges within which every PersonalityAnalyzer threshold (levels,
+# is_high/is_low/is_extreme, conflict and growth rules) gives the same answer
+_SCORE_BANDS = ((0, 20), (21, 30), (31, 39), (40, 40), (41, 59), (60, 60), (61, 79), (80, 80), (81, 100))
+
+
+def quantize_scores(scores: Dict[str, int], quantum: int = NARRATIVE_SCORE_QUANTUM) -> Dict[str, int]:
+    """
+    Round scores to multiples of quantum, without crossing an analyzer threshold.
+
+    Every score keeps its level and the same high/low/extreme and conflict
+    outcomes, so the templates and conflicts a prompt is built from don't
+    change; only the numbers shown in it do.
+
+    Args:
+        scores: Dimension scores (0-100)
+        quantum: Rounding step (1 = unchanged)
+
+    Returns:
+        Quantized scores
+    """
+    if quantum <= 1:
+        return dict(scores)
+    quantized = {}
+    for dim, score in scores.items():
+        low, high = next(((lo, hi) for lo, hi in _SCORE_BANDS if score <= hi), _SCORE_BANDS[-1])
+        quantized[dim] = min(max(int(round(score / quantum)) * quantum, low), high)
+    return quantized
+
+
+class NarrativeSectionCache:
+    """
+    Two-tier (memory LRU + Redis) cache of generated narrative sections.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = NARRATIVE_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = NARRATIVE_CACHE_TTL_SECONDS,
+        redis_ttl_seconds: int = NARRATIVE_CACHE_REDIS_TTL_SECONDS,
+        use_redis: bool = True,
+    ):
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._redis_ttl = redis_ttl_seconds
+        self._use_redis = use_redis
+        self._memory_hits = 0
+        self._redis_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._dollars_saved = 0.0
+
+    @staticmethod
+    def make_key(
+        section: str,
+        prompt: str,
+        system_message: Optional[str],
+        max_output_tokens: Optional[int],
+        model: str,
+    ) -> str:
+        """Content address of a section request."""
+        normalized = re.sub(r"\s+", " ", prompt).strip()
+        parts = [NARRATIVE_GENERATOR_VERSION, section, model, max_output_tokens, system_message, normalized]
+        return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+    def _redis_store(self):
+        if not self._use_redis:
+            return None
+        store = get_async_redis_session_store()
+        return store if store.redis_available else None
+
+    # ========================================================================
+    # Lookup
+    # ========================================================================
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Cached sections for keys (memory first, then one MGET for the rest).
+
+        Redis hits are copied into the memory tier.
+
+        Returns:
+            key -> {"text": str, "cost": float} for every hit
+        """
+        now = time.monotonic()
+        found: Dict[str, Dict[str, Any]] = {}
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            expires_at, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self._memory_hits += 1
+                found[key] = value
+            else:
+                del self._entries[key]
+
+        remaining = [key for key in keys if key not in found]
+        for key, value in (await self._get_from_redis(remaining)).items():
+            self._redis_hits += 1
+            self._set_memory(key, value)
+            found[key] = value
+
+        self._misses += len(keys) - len(found)
+        self._dollars_saved += sum(value.get("cost", 0.0) for value in found.values())
+        return found
+
+    async def set(self, key: str, text: str, cost: float) -> None:
+        """Store a generated section in both tiers."""
+        value = {"text": text, "cost": cost}
+        self._set_memory(key, value)
+        store = self._redis_store()
+        if store is None:
+            return
+        try:
+            await store.client.set(NARRATIVE_CACHE_KEY_PREFIX + key, json.dumps(value), ex=self._redis_ttl)
+        except Exception as e:
+            logger.debug(f"Narrative cache Redis write failed: {e}")
+
+    def _set_memory(self, key: str, value: Dict[str, Any]) -> None:
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    async def _get_from_redis(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        store = self._redis_store()
+        if store is None or not keys:
+            return {}
+        try:
+            values = await store.client.mget([NARRATIVE_CACHE_KEY_PREFIX + key for key in keys])
+        except Exception as e:
+            logger.debug(f"Narrative cache Redis read failed: {e}")
+            return {}
+        return {key: json.loads(value) for key, value in zip(keys, values) if value}
+
+    def clear(self) -> None:
+        """Drop the memory tier (Redis entries expire on their own)."""
+        self._entries.clear()
+
+    # ========================================================================
+    # Diagnostics
+    # ========================================================================
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters: every hit is one LLM call (and its cost) avoided."""
+        hits = self._memory_hits + self._redis_hits
+        total = hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self._max_entries,
+            "memory_hits": self._memory_hits,
+            "redis_hits": self._redis_hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_rate_percent": round(hits / total * 100, 2) if total else 0,
+            "dollars_saved": round(self._dollars_saved, 4),
+        }
+
+
+# ============================================================================
+# Shared Instance
+# ============================================================================
+
+_section_cache: Optional[NarrativeSectionCache] = None
+
+
+def get_section_cache() -> Optional[NarrativeSectionCache]:
+    """Get the process-wide NarrativeSectionCache (None when NARRATIVE_CACHE=false)."""
+    global _section_cache
+    if _section_cache is None and NARRATIVE_CACHE_ENABLED:
+        _section_cache = NarrativeSectionCache()
+    return _section_cache
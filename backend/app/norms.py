@@ -0,0 +1,305 @@
+"""
+SELVE Percentile Norms
+======================
+Population norms for SELVE dimension scores.
+
+For each stratum ("all", plus optional demographic strata such as
+"gender:female" or "age:25-34") and each dimension, the norms hold the
+empirical CDF of stored AssessmentResult scores as a sorted float32 array.
+A percentile lookup is two binary searches on that array - microseconds,
+no database round trip - so it can run inline while scoring results.
+
+New results are merged in incrementally (sorted-merge of a small batch into
+the existing array); see app.services.norms_service for the database/Redis
+refresh that feeds them.
+
+Usage:
+    norms = get_norms()
+    norms.add_scores({'LUMEN': 62.5, ...}, strata=strata_for_demographics(demographics))
+    norms.apply(profile)                      # fills DimensionScore.percentile
+    norms.percentile('LUMEN', 62.5)           # -> 48.3
+    norms.stratum_percentiles(profile.dimension_scores, ['age:25-34'])
+"""
+
+import base64
+import logging
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+POPULATION_STRATUM = "all"
+
+# Fewer stored results than this and a percentile isn't meaningful
+MIN_NORM_SAMPLE = 50
+
+# Age bands used for "age:<band>" strata (lower bound inclusive)
+AGE_BANDS: Tuple[Tuple[int, str], ...] = (
+    (55, "55+"),
+    (45, "45-54"),
+    (35, "35-44"),
+    (25, "25-34"),
+    (18, "18-24"),
+    (0, "under-18"),
+)
+
+# Gender values that get their own stratum (see DEMOGRAPHIC_QUESTIONS['demo_gender'])
+GENDER_STRATA = ("male", "female", "non_binary")
+
+
+def age_band(dob: Any, today: Optional[date] = None) -> Optional[str]:
+    """
+    Age band for a date of birth (ISO string or date), or None if unparseable.
+    """
+    if not dob:
+        return None
+    try:
+        born = dob if isinstance(dob, date) else datetime.fromisoformat(str(dob)[:10]).date()
+    except ValueError:
+        return None
+
+    today = today or date.today()
+    age = today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+    for lower, band in AGE_BANDS:
+        if age >= lower:
+            return band
+    return None
+
+
+def strata_for_demographics(demographics: Optional[Mapping[str, Any]]) -> List[str]:
+    """
+    Demographic strata a respondent belongs to (population stratum excluded).
+
+    Args:
+        demographics: Session demographics dict (demo_dob, demo_gender, ...)
+
+    Returns:
+        List of stratum keys, e.g. ['age:25-34', 'gender:female']
+    """
+    if not demographics:
+        return []
+
+    strata = []
+    band = age_band(demographics.get("demo_dob"))
+    if band:
+        strata.append(f"age:{band}")
+    gender = demographics.get("demo_gender")
+    if gender in GENDER_STRATA:
+        strata.append(f"gender:{gender}")
+    return strata
+
+
+class NormTable:
+    """
+    Empirical CDF of one dimension's scores within one stratum.
+
+    Scores are kept as a sorted float32 array. New scores are buffered and
+    merged in on the next lookup, so a burst of inserts costs one merge.
+    """
+
+    __slots__ = ("_sorted", "_pending")
+
+    def __init__(self, scores: Optional[np.ndarray] = None):
+        self._sorted = np.sort(np.asarray(scores if scores is not None else [], dtype=np.float32))
+        self._pending: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._pending)
+
+    def add(self, score: float) -> None:
+        self._pending.append(score)
+
+    def extend(self, scores: Iterable[float]) -> None:
+        self._pending.extend(scores)
+
+    def _merge(self) -> np.ndarray:
+        if self._pending:
+            new = np.sort(np.asarray(self._pending, dtype=np.float32))
+            self._pending = []
+            self._sorted = np.insert(self._sorted, np.searchsorted(self._sorted, new), new)
+        return self._sorted
+
+    def percentile(self, score: float) -> float:
+        """
+        Mid-rank percentile of a score: % below plus half the % equal.
+
+        Returns:
+            Percentile on 0-100
+        """
+        scores = self._merge()
+        n = len(scores)
+        if n == 0:
+            return 50.0
+        value = np.float32(score)
+        below = int(np.searchsorted(scores, value, side="left"))
+        at_or_below = int(np.searchsorted(scores, value, side="right"))
+        return 100.0 * (below + 0.5 * (at_or_below - below)) / n
+
+    @property
+    def sorted_scores(self) -> np.ndarray:
+        return self._merge()
+
+    def to_b64(self) -> str:
+        """Compact serialization: base64 of the sorted little-endian float32 array."""
+        return base64.b64encode(self._merge().astype("<f4").tobytes()).decode("ascii")
+
+    @classmethod
+    def from_b64(cls, data: str) -> "NormTable":
+        table = cls()
+        table._sorted = np.frombuffer(base64.b64decode(data), dtype="<f4").astype(np.float32)
+        return table
+
+
+class PercentileNorms:
+    """
+    Per-stratum, per-dimension norm tables.
+
+    Thread-safe for the app's usage pattern: inserts and lookups take a lock
+    only around the table dict, and each lookup is a binary search.
+
+    Attributes:
+        watermark: createdAt of the newest AssessmentResult folded into the
+            tables (drives incremental refresh), or None if never loaded
+    """
+
+    def __init__(self, min_sample: int = MIN_NORM_SAMPLE):
+        self.min_sample = min_sample
+        self.watermark: Optional[datetime] = None
+        self._tables: Dict[str, Dict[str, NormTable]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of results in the population stratum."""
+        population = self._tables.get(POPULATION_STRATUM, {})
+        return max((len(table) for table in population.values()), default=0)
+
+    def add_scores(self, scores: Mapping[str, float], strata: Iterable[str] = ()) -> None:
+        """
+        Add one result's dimension scores to the population and its strata.
+
+        Args:
+            scores: Dimension -> normalized score (0-100)
+            strata: Demographic strata keys (see strata_for_demographics)
+        """
+        with self._lock:
+            for stratum in (POPULATION_STRATUM, *strata):
+                tables = self._tables.setdefault(stratum, {})
+                for dimension, score in scores.items():
+                    if score is None:
+                        continue
+                    table = tables.get(dimension)
+                    if table is None:
+                        table = tables[dimension] = NormTable()
+                    table.add(float(score))
+
+    def percentile(
+        self,
+        dimension: str,
+        score: float,
+        stratum: str = POPULATION_STRATUM
+    ) -> Optional[float]:
+        """
+        Percentile of a score within a stratum.
+
+        Returns:
+            Percentile (0-100, 1 dp), or None if the stratum has too few results
+        """
+        with self._lock:
+            table = self._tables.get(stratum, {}).get(dimension)
+            if table is None or len(table) < self.min_sample:
+                return None
+            return round(table.percentile(score), 1)
+
+    def percentiles(
+        self,
+        scores: Mapping[str, float],
+        stratum: str = POPULATION_STRATUM
+    ) -> Dict[str, Optional[float]]:
+        """Percentile for every dimension in a scores dict."""
+        return {
+            dimension: self.percentile(dimension, score, stratum)
+            for dimension, score in scores.items()
+        }
+
+    def stratum_percentiles(
+        self,
+        scores: Mapping[str, float],
+        strata: Iterable[str]
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Percentiles within each demographic norm group a respondent belongs to.
+
+        Args:
+            scores: Dimension -> normalized score
+            strata: Stratum keys (see strata_for_demographics)
+
+        Returns:
+            Stratum -> (dimension -> percentile or None)
+        """
+        return {stratum: self.percentiles(scores, stratum) for stratum in strata}
+
+    def apply(self, profile: Any, stratum: str = POPULATION_STRATUM) -> Any:
+        """
+        Fill DimensionScore.percentile on a SelveProfile in place.
+
+        Args:
+            profile: SelveProfile
+            stratum: Norm group to compare against
+
+        Returns:
+            The same profile
+        """
+        for dimension, score in profile.dimension_scores.items():
+            getattr(profile, dimension.lower()).percentile = self.percentile(dimension, score, stratum)
+        return profile
+
+    # ========================================================================
+    # Serialization
+    # ========================================================================
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact snapshot: base64 float32 sorted arrays plus the refresh watermark."""
+        with self._lock:
+            return {
+                "watermark": self.watermark.isoformat() if self.watermark else None,
+                "tables": {
+                    stratum: {dimension: table.to_b64() for dimension, table in tables.items()}
+                    for stratum, tables in self._tables.items()
+                },
+            }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], min_sample: int = MIN_NORM_SAMPLE) -> "PercentileNorms":
+        norms = cls(min_sample=min_sample)
+        watermark = data.get("watermark")
+        norms.watermark = datetime.fromisoformat(watermark) if watermark else None
+        norms._tables = {
+            stratum: {dimension: NormTable.from_b64(encoded) for dimension, encoded in tables.items()}
+            for stratum, tables in data.get("tables", {}).items()
+        }
+        return norms
+
+    def replace_with(self, other: "PercentileNorms") -> None:
+        """Swap in another instance's tables (e.g. a snapshot loaded at startup)."""
+        with self._lock:
+            self._tables = other._tables
+            self.watermark = other.watermark
+
+
+# ============================================================================
+# Shared Instance
+# ============================================================================
+
+_norms: Optional[PercentileNorms] = None
+
+
+def get_norms() -> PercentileNorms:
+    """Get the process-wide norms tables (empty until refreshed)."""
+    global _norms
+    if _norms is None:
+        _norms = PercentileNorms()
+    return _norms
@@ -237,3 +237,15 @@ class ResponseValidator:
             "flags": validation["flags"],
             "details": validation["details"]
         }
+
+
+# Shared instance - the validator keeps no per-session state
+_response_validator: Optional[ResponseValidator] = None
+
+
+def get_response_validator() -> ResponseValidator:
+    """Get the process-wide ResponseValidator."""
+    global _response_validator
+    if _response_validator is None:
+        _response_validator = ResponseValidator()
+    return _response_validator
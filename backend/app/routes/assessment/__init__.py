@@ -57,6 +57,7 @@ from .exceptions import (
     SessionNotFoundError,
     SessionExpiredError,
     SessionAlreadyExistsError,
+    SessionConflictError,
     SessionOwnershipError,
     InvalidResponseError,
     QuestionNotFoundError,
@@ -104,6 +105,7 @@ __all__ = [
     "SessionNotFoundError",
     "SessionExpiredError",
     "SessionAlreadyExistsError",
+    "SessionConflictError",
     "SessionOwnershipError",
     "InvalidResponseError",
     "QuestionNotFoundError",
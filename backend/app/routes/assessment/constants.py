@@ -23,7 +23,8 @@ class AssessmentConfig:
     """Core assessment configuration values."""
     
     # Session limits
-    MAX_MEMORY_SESSIONS: Final[int] = 1000  # Max sessions in memory cache
+    MEMORY_CACHE_MAX_BYTES: Final[int] = 64 * 1024 * 1024  # Packed sessions kept in memory (approx.)
+    MEMORY_CACHE_TTL_SECONDS: Final[int] = 30 * 60  # Idle sessions fall back to Redis
     SESSION_TTL_HOURS: Final[int] = 24  # Redis session TTL
     
     # Question counts
@@ -45,9 +46,16 @@ class AssessmentConfig:
     # Batch sizes
     DEFAULT_BATCH_SIZE: Final[int] = 3  # Questions per batch
     EMERGENCY_BATCH_SIZE: Final[int] = 2  # Questions in emergency mode
+    SPECULATIVE_MAX_ITEMS: Final[int] = 3  # Pending items whose answers are precomputed
+    
+    # Session lookups
+    MISSING_SESSION_TTL_SECONDS: Final[int] = 30  # Unknown ids answered from memory
+    
+    # Optimistic session updates
+    SESSION_UPDATE_ATTEMPTS: Final[int] = 5  # Re-read and re-apply after a concurrent write
     
     # Timeouts (seconds)
-    NARRATIVE_GENERATION_TIMEOUT: Final[int] = 180  # 3 minutes
+    RESULTS_LOCK_LEASE: Final[int] = 30  # Renewed while generating; frees fast if a worker dies
     LOCK_BLOCKING_TIMEOUT: Final[int] = 200  # 3.5 minutes
     
     # Age restrictions
@@ -11,14 +11,19 @@ Benefits:
 """
 
 import logging
+import os
 from typing import Optional, Dict, Any, Tuple
 from fastapi import Depends, HTTPException, Request
 
 from app.auth import get_current_user
+from app.adaptive_testing import AdaptiveTester, get_adaptive_tester
+from app.irt_testing import get_irt_tester
+from app.scoring import get_scorer
 from app.services.assessment_service import AssessmentService
 
 from .session_manager import get_session_manager, SessionManager
 from .question_engine import QuestionEngine
+from .selection_cache import get_selection_cache
 from .exceptions import (
     SessionNotFoundError,
     AuthenticationRequiredError,
@@ -136,19 +141,36 @@ async def get_session_with_ownership_check(
 # Question Engine Dependency
 # ============================================================================
 
-def get_question_engine_from_session(session: Dict[str, Any]) -> QuestionEngine:
+# Adaptive engine: "heuristic" (uncertainty heuristics) or "irt" (GRM CAT)
+ADAPTIVE_ENGINE = os.getenv("ADAPTIVE_ENGINE", "heuristic").lower()
+
+
+def get_tester() -> AdaptiveTester:
     """
-    Create QuestionEngine from session's tester and scorer.
+    Get the process-wide tester selected by ADAPTIVE_ENGINE.
+    
+    Returns:
+        IRTAdaptiveTester for "irt", otherwise the heuristic AdaptiveTester
+    """
+    if ADAPTIVE_ENGINE == "irt":
+        return get_irt_tester()
+    return get_adaptive_tester()
+
+
+def get_question_engine() -> QuestionEngine:
+    """
+    Create QuestionEngine over the process-wide tester and scorer.
+    
+    Sessions carry only data; the engines share one read-only item pool
+    and one selection cache.
     
-    Args:
-        session: Session dict with tester and scorer
-        
     Returns:
         Configured QuestionEngine
     """
     return QuestionEngine(
-        tester=session["tester"],
-        scorer=session["scorer"],
+        tester=get_tester(),
+        scorer=get_scorer(),
+        selection_cache=get_selection_cache(),
     )
 
 
@@ -92,6 +92,19 @@ class SessionAlreadyExistsError(AssessmentError):
         )
 
 
+class SessionConflictError(AssessmentError):
+    """Concurrent updates kept changing the session; the update was not applied."""
+    
+    status_code = 409
+    error_code = "SESSION_CONFLICT"
+    
+    def __init__(self, session_id: str, attempts: int):
+        super().__init__(
+            message="Your session was updated elsewhere. Please try again.",
+            details={"session_id": session_id, "attempts": attempts},
+        )
+
+
 class SessionOwnershipError(AssessmentError):
     """User doesn't own this session."""
     
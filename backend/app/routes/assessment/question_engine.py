@@ -15,7 +15,7 @@ import logging
 from typing import Dict, List, Optional, Any, Tuple, Set
 from datetime import datetime
 
-from app.adaptive_testing import AdaptiveTester
+from app.adaptive_testing import AdaptiveTester, DimensionUncertainty
 from app.scoring import SelveScorer
 
 from .constants import (
@@ -29,6 +29,7 @@ from .constants import (
     DeduplicationRules,
 )
 from .schemas import QuestionResponse
+from .selection_cache import SelectionCache
 
 logger = logging.getLogger(__name__)
 
@@ -43,11 +44,18 @@ class QuestionEngine:
     - Apply deduplication rules
     - Handle emergency coverage for zero-item dimensions
     - Inject consistency check questions
+    - Memoize selections by canonical state (optional SelectionCache)
     """
     
-    def __init__(self, tester: AdaptiveTester, scorer: SelveScorer):
+    def __init__(
+        self,
+        tester: AdaptiveTester,
+        scorer: SelveScorer,
+        selection_cache: Optional[SelectionCache] = None,
+    ):
         self.tester = tester
         self.scorer = scorer
+        self.selection_cache = selection_cache
     
     # ========================================================================
     # Question Type Detection
@@ -148,6 +156,7 @@ class QuestionEngine:
         demographics: Dict[str, Any],
         pending_questions: Set[str],
         max_items: int = AssessmentConfig.DEFAULT_BATCH_SIZE,
+        uncertainties: Optional[Dict[str, DimensionUncertainty]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Select the next batch of questions using adaptive algorithm.
@@ -158,15 +167,114 @@ class QuestionEngine:
         - Zero-item dimension emergency coverage
         - Consistency check injection
         
+        Synchronous callers (speculation, simulation) share the selection
+        cache's memory tier only; the request path uses
+        select_next_questions_async.
+        
         Args:
             responses: Already answered questions
             demographics: User's demographic responses
             pending_questions: Questions sent but not yet answered
             max_items: Maximum questions to return
+            uncertainties: Precomputed tester.calculate_uncertainties(responses)
             
         Returns:
             List of item dicts for next questions
         """
+        if self.selection_cache is None:
+            return self._select_next_questions(
+                responses, demographics, pending_questions, max_items, uncertainties
+            )
+        
+        if uncertainties is None:
+            uncertainties = self.tester.calculate_uncertainties(responses)
+        key = self._selection_key(responses, demographics, pending_questions, max_items, uncertainties)
+        
+        items = self._items_for_codes(self.selection_cache.get_local(key))
+        if items is not None:
+            return items
+        
+        items = self._select_next_questions(
+            responses, demographics, pending_questions, max_items, uncertainties
+        )
+        self.selection_cache.set_local(key, [item['item'] for item in items])
+        return items
+    
+    async def select_next_questions_async(
+        self,
+        responses: Dict[str, Any],
+        demographics: Dict[str, Any],
+        pending_questions: Set[str],
+        max_items: int = AssessmentConfig.DEFAULT_BATCH_SIZE,
+        uncertainties: Optional[Dict[str, DimensionUncertainty]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        select_next_questions, sharing memoized selections with other workers.
+        
+        Looks the selection up in both cache tiers (the Redis one through
+        the async store) and stores a fresh one in both.
+        """
+        if self.selection_cache is None:
+            return self._select_next_questions(
+                responses, demographics, pending_questions, max_items, uncertainties
+            )
+        
+        if uncertainties is None:
+            uncertainties = self.tester.calculate_uncertainties(responses)
+        key = self._selection_key(responses, demographics, pending_questions, max_items, uncertainties)
+        
+        items = self._items_for_codes(await self.selection_cache.get(key))
+        if items is not None:
+            return items
+        
+        items = self._select_next_questions(
+            responses, demographics, pending_questions, max_items, uncertainties
+        )
+        await self.selection_cache.set(key, [item['item'] for item in items])
+        return items
+    
+    def _items_for_codes(self, codes: Optional[List[str]]) -> Optional[List[Dict[str, Any]]]:
+        """Item dicts for cached codes, or None if any is missing from the pool."""
+        if codes is None:
+            return None
+        items = [self._find_item_by_id(code) for code in codes]
+        return items if all(items) else None
+    
+    def _selection_key(
+        self,
+        responses: Dict[str, Any],
+        demographics: Dict[str, Any],
+        pending_questions: Set[str],
+        max_items: int,
+        uncertainties: Dict[str, DimensionUncertainty],
+    ) -> str:
+        """
+        Canonical hash of every input _select_next_questions() reads.
+        
+        Exclusions, zero-dimension checks and consistency injection only see
+        answered + pending codes together, plus whether the consistency
+        response threshold was reached.
+        """
+        seen = set(responses.keys()) | pending_questions
+        return SelectionCache.make_key(
+            self.scorer.compiled.fingerprint,
+            type(self.tester).__name__,
+            max_items,
+            sorted(seen),
+            min(len(responses), AssessmentConfig.CONSISTENCY_CHECK_MIN_RESPONSES),
+            sorted(ContextExclusions.get_exclusions_for_demographics(demographics)),
+            self.tester.selection_key(responses, uncertainties),
+        )
+    
+    def _select_next_questions(
+        self,
+        responses: Dict[str, Any],
+        demographics: Dict[str, Any],
+        pending_questions: Set[str],
+        max_items: int,
+        uncertainties: Optional[Dict[str, DimensionUncertainty]],
+    ) -> List[Dict[str, Any]]:
+        """Uncached selection (see select_next_questions)."""
         # Build exclusion list
         all_seen = set(responses.keys()) | pending_questions
         context_exclusions = ContextExclusions.get_exclusions_for_demographics(demographics)
@@ -212,7 +320,8 @@ class QuestionEngine:
         items = self.tester.select_next_items_excluding(
             responses, 
             all_exclusions, 
-            max_items=max_items
+            max_items=max_items,
+            uncertainties=uncertainties
         )
         
         # Final filter (in case items were selected before demographics complete)
@@ -246,21 +355,28 @@ class QuestionEngine:
         Returns:
             List of dimension names with zero coverage
         """
-        zero_dims = []
-        
         # Combine answered + pending to check total coverage
         all_sent = set(responses.keys()) | pending_questions
+        coverage = self._coverage_by_dimension(all_sent)
         
-        for dim in DIMENSIONS:
-            dim_items = self.scorer.get_items_by_dimension(dim)
-            coverage = [
-                code for code in all_sent
-                if any(item['item'] == code for item in dim_items)
-            ]
-            if len(coverage) == 0:
-                zero_dims.append(dim)
+        return [dim for dim in DIMENSIONS if not coverage[dim]]
+    
+    def _coverage_by_dimension(self, item_codes: Set[str]) -> Dict[str, List[str]]:
+        """
+        Group item codes by dimension using the compiled item index.
         
-        return zero_dims
+        Codes outside the item pool (e.g. demographics) are ignored.
+        
+        Returns:
+            Dict mapping every dimension to the item codes that belong to it
+        """
+        coverage: Dict[str, List[str]] = {dim: [] for dim in DIMENSIONS}
+        dimension_of = self.scorer.compiled.dimension_of
+        for code in item_codes:
+            dim = dimension_of(code)
+            if dim in coverage:
+                coverage[dim].append(code)
+        return coverage
     
     def _get_emergency_items(
         self,
@@ -344,8 +460,9 @@ class QuestionEngine:
                 available.sort(key=lambda x: x.get('correlation', 0), reverse=True)
                 
                 for item in available[:AssessmentConfig.EMERGENCY_BATCH_SIZE]:
-                    if 'dimension' not in item:
-                        item['dimension'] = dim
+                    # Copy - pool item dicts are shared across sessions
+                    item = item.copy()
+                    item.setdefault('dimension', dim)
                     emergency_items.append(item)
                     
                 logger.debug(f"Added {len(available[:2])} emergency items for {dim}")
@@ -398,8 +515,8 @@ class QuestionEngine:
             return items
         
         # Get validator's recommendation
-        from app.response_validator import ResponseValidator
-        validator = ResponseValidator()
+        from app.response_validator import get_response_validator
+        validator = get_response_validator()
         
         consistency_item_id = validator.should_show_consistency_question(
             responses, 
@@ -421,14 +538,15 @@ class QuestionEngine:
     
     def _find_item_by_id(self, item_id: str) -> Optional[Dict[str, Any]]:
         """Find item object by ID from scorer's item pool."""
-        for dim in DIMENSIONS:
-            dim_items = self.scorer.get_items_by_dimension(dim)
-            for item in dim_items:
-                if item['item'] == item_id:
-                    result = item.copy()
-                    if 'dimension' not in result:
-                        result['dimension'] = dim
-                    return result
+        dim = self.scorer.compiled.dimension_of(item_id)
+        if dim is None:
+            return None
+        for item in self.scorer.dimension_items[dim]:
+            if item['item'] == item_id:
+                result = item.copy()
+                if 'dimension' not in result:
+                    result['dimension'] = dim
+                return result
         return None
     
     # ========================================================================
@@ -438,11 +556,17 @@ class QuestionEngine:
     def should_continue_testing(
         self, 
         responses: Dict[str, Any],
-        pending_questions: Set[str]
+        pending_questions: Set[str],
+        uncertainties: Optional[Dict[str, DimensionUncertainty]] = None
     ) -> Tuple[bool, str]:
         """
         Check if testing should continue.
         
+        Args:
+            responses: Already answered questions
+            pending_questions: Questions sent but not yet answered
+            uncertainties: Precomputed tester.calculate_uncertainties(responses)
+        
         Returns:
             Tuple of (should_continue, reason)
         """
@@ -452,10 +576,10 @@ class QuestionEngine:
         is_covered, incomplete_dims = self.check_minimum_coverage(responses, pending_questions)
         if not is_covered:
             logger.info(f"Enforcing minimum coverage: {incomplete_dims} need more items")
-            return True, f"Need minimum {AssessmentConfig.MIN_ITEMS_PER_DIMENSION} items for: {', '.join(incomplete_dims)}"
+            return True, f"Need minimum {self.tester.MIN_ITEMS_PER_DIMENSION} items for: {', '.join(incomplete_dims)}"
         
         # Let adaptive tester make the decision
-        should_continue, reason = self.tester.should_continue_testing(responses)
+        should_continue, reason = self.tester.should_continue_testing(responses, uncertainties)
         
         # Override if any dimension has 0 items (checking both answered and pending)
         if not should_continue:
@@ -485,21 +609,21 @@ class QuestionEngine:
             Tuple of (is_valid, incomplete_dimensions)
         """
         incomplete = []
+        # The engine's own floor (heuristic: AssessmentConfig value; IRT stops on SE)
+        min_items = self.tester.MIN_ITEMS_PER_DIMENSION
         all_sent = set(responses.keys()) | pending_questions
         
-        logger.info(f"Coverage check: {len(responses)} answered, {len(pending_questions)} pending, MIN_ITEMS={AssessmentConfig.MIN_ITEMS_PER_DIMENSION}")
+        logger.info(f"Coverage check: {len(responses)} answered, {len(pending_questions)} pending, MIN_ITEMS={min_items}")
+        
+        coverage_by_dim = self._coverage_by_dimension(all_sent)
         
         for dim in DIMENSIONS:
-            dim_items = self.scorer.get_items_by_dimension(dim)
-            coverage = [
-                code for code in all_sent
-                if any(item['item'] == code for item in dim_items)
-            ]
-            if len(coverage) < AssessmentConfig.MIN_ITEMS_PER_DIMENSION:
+            coverage = coverage_by_dim[dim]
+            if len(coverage) < min_items:
                 incomplete.append(dim)
-                logger.info(f"  {dim}: {len(coverage)}/{AssessmentConfig.MIN_ITEMS_PER_DIMENSION} ❌ {coverage}")
+                logger.info(f"  {dim}: {len(coverage)}/{min_items} ❌ {coverage}")
             else:
-                logger.info(f"  {dim}: {len(coverage)}/{AssessmentConfig.MIN_ITEMS_PER_DIMENSION} ✅")
+                logger.info(f"  {dim}: {len(coverage)}/{min_items} ✅")
         
         return len(incomplete) == 0, incomplete
     
@@ -0,0 +1,279 @@
+"""
+Assessment Module - Results Generation Job
+
+Generating results takes several LLM calls and can run for minutes, longer
+than a proxy waits on a request. /assessment/{id}/results therefore only
+enqueues a "results" job (idempotency key results:{session_id}, so repeated
+requests share one job) and returns 202; a JobRunner worker scores the
+session, generates and saves the narrative, and the client follows along
+on /results/status until the saved result can be fetched.
+
+As sections finish, the job publishes them as job events ("section",
+plus coalesced "delta" text when NARRATIVE_STREAM_DELTAS is on, then
+"done" or "error"), which /results/stream relays to the client over SSE.
+
+The job still takes the session's results lock, so a generation started by
+an older release of the endpoint (or a job re-queued after its worker died)
+never runs twice, and only the newest lock holder saves.
+
+Usage:
+    register_results_job(get_job_runner())          # application startup
+    job = await get_job_runner().enqueue(
+        RESULTS_JOB, {"session_id": sid}, idempotency_key=results_job_key(sid)
+    )
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from app.narratives import generate_narrative
+from app.narratives.integrated_generator import generate_integrated_narrative_async
+from app.norms import get_norms
+from app.response_validator import get_response_validator
+from app.scoring import get_scorer
+from app.services.assessment_service import AssessmentService
+from app.services.job_events import get_job_events
+from app.services.job_runner import Job, JobFailed, JobRunner
+from app.services.norms_service import get_norms_service
+
+from .constants import AssessmentConfig
+from .dependencies import get_question_engine
+from .exceptions import ResultsGenerationInProgressError
+from .session_manager import get_session_manager
+from .utils import build_fallback_narrative, personalize_narrative
+
+logger = logging.getLogger(__name__)
+
+
+RESULTS_JOB = "results"
+
+# Human-readable section names for progress display
+SECTION_DISPLAY_NAMES = {
+    'core_identity': 'Core Identity',
+    'motivations': 'Motivations',
+    'conflicts': 'Inner Conflicts',
+    'strengths': 'Strengths',
+    'growth_areas': 'Growth Areas',
+    'relationships': 'Relationships',
+    'work_style': 'Work Style',
+}
+
+# Stream LLM text deltas to clients (sections are always streamed)
+NARRATIVE_STREAM_DELTAS = os.getenv("NARRATIVE_STREAM_DELTAS", "false").lower() in ("1", "true", "yes")
+
+# Deltas are published in batches of at least this many characters, or this often
+DELTA_FLUSH_CHARS = 200
+DELTA_FLUSH_SECONDS = 0.25
+
+
+class SectionPublisher:
+    """
+    Publishes a results job's section events, coalescing text deltas.
+
+    Args:
+        job_id: Job whose event stream to publish on
+        total: Sections in the narrative
+    """
+
+    def __init__(self, job_id: str, total: int):
+        self._events = get_job_events()
+        self._job_id = job_id
+        self._total = total
+        self._completed = 0
+        self._pending: Dict[str, List[str]] = {}
+        self._flushed_at: Dict[str, float] = {}
+
+    async def delta(self, section_name: str, text: str) -> None:
+        """Buffer a delta; publish the buffer once it is large or old enough."""
+        pending = self._pending.setdefault(section_name, [])
+        pending.append(text)
+        now = time.monotonic()
+        if (
+            sum(len(part) for part in pending) >= DELTA_FLUSH_CHARS
+            or now - self._flushed_at.get(section_name, 0.0) >= DELTA_FLUSH_SECONDS
+        ):
+            self._pending[section_name] = []
+            self._flushed_at[section_name] = now
+            await self._events.publish(self._job_id, "delta", {"section": section_name, "text": "".join(pending)})
+
+    async def section(self, section_name: str, text: str) -> None:
+        """Publish a finished section (its final text supersedes the deltas)."""
+        self._pending.pop(section_name, None)
+        self._completed += 1
+        await self._events.publish(self._job_id, "section", {
+            "section": section_name,
+            "title": SECTION_DISPLAY_NAMES.get(section_name, section_name),
+            "text": text,
+            "completed": self._completed,
+            "total": self._total,
+        })
+
+
+def results_job_key(session_id: str) -> str:
+    """Idempotency key of a session's results job."""
+    return f"results:{session_id}"
+
+
+def incomplete_dimensions(session: Dict[str, Any]) -> Optional[List[str]]:
+    """
+    Dimensions still short of minimum coverage (pending questions included).
+
+    Returns:
+        Dimension names, or None if the session can be scored
+    """
+    responses = session["responses"]
+    is_valid, incomplete_dims = get_question_engine().check_minimum_coverage(
+        responses, session.get("pending_questions", set())
+    )
+    if not is_valid and len(responses) < AssessmentConfig.QUICK_SCREEN_ITEMS:
+        return incomplete_dims
+    return None
+
+
+async def generate_results(
+    session_id: str,
+    service: Optional[AssessmentService] = None,
+    job_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Score a session, generate its narrative and save the result.
+
+    Args:
+        session_id: Session to generate results for
+        service: Database operations (default: AssessmentService())
+        job_id: Job to publish section events on (None = don't publish)
+
+    Returns:
+        {"session_id", "generated": False if a result was already saved, "cost"}
+
+    Raises:
+        JobFailed: Session missing or incomplete (retrying won't help)
+        ResultsGenerationInProgressError: Another generation holds the lock (retried)
+    """
+    service = service or AssessmentService()
+    session_mgr = get_session_manager()
+
+    lock_token = await session_mgr.acquire_results_lock(session_id)
+    try:
+        if await service.get_result(session_id):
+            return {"session_id": session_id, "generated": False, "cost": 0.0}
+
+        session = await session_mgr.get_session_with_db_fallback(session_id, raise_if_missing=False)
+        if not session:
+            raise JobFailed("Session not found")
+        incomplete = incomplete_dimensions(session)
+        if incomplete:
+            raise JobFailed(f"Assessment incomplete. Need more responses for: {', '.join(incomplete)}")
+
+        responses = session["responses"]
+        demographics = session.get("demographics", {})
+        validator = get_response_validator()
+
+        # Score responses (percentiles are an in-memory binary search per dimension)
+        profile = get_norms().apply(get_scorer().score_responses(responses))
+        validation_result = validator.validate_responses(responses) if validator else None
+
+        section_names = list(SECTION_DISPLAY_NAMES.keys())
+        await session_mgr._redis.init_generation_progress(
+            session_id=session_id,
+            total_steps=len(section_names),
+            step_names=list(SECTION_DISPLAY_NAMES.values()),
+        )
+
+        async def on_section_complete(section_name: str, completed_count: int):
+            """Update progress when a section completes."""
+            next_step = None
+            if completed_count < len(section_names):
+                next_step = f"Generating section {completed_count + 1} of {len(section_names)}..."
+            await session_mgr._redis.update_generation_progress(
+                session_id=session_id,
+                completed_step=SECTION_DISPLAY_NAMES.get(section_name, section_name),
+                next_step=next_step,
+            )
+
+        publisher = SectionPublisher(job_id, len(section_names)) if job_id else None
+
+        int_scores = {dim: int(score) for dim, score in profile.dimension_scores.items()}
+        try:
+            integrated_narrative = await generate_integrated_narrative_async(
+                int_scores,
+                use_llm=True,
+                on_section_complete=on_section_complete,
+                on_section_text=publisher.section if publisher else None,
+                on_section_delta=publisher.delta if publisher and NARRATIVE_STREAM_DELTAS else None,
+            )
+            narrative_dict = {
+                'profile_pattern': integrated_narrative['profile_pattern'],
+                'sections': integrated_narrative['sections'],
+                'scores': integrated_narrative['scores'],
+                'generation_cost': integrated_narrative.get('generation_cost', 0.0),
+                'metadata': integrated_narrative.get('metadata', {}),
+            }
+            logger.info(
+                f"Generated narrative with OpenAI. "
+                f"Cost: ${integrated_narrative.get('generation_cost', 0):.4f}"
+            )
+        except Exception as e:
+            logger.warning(f"OpenAI narrative failed, using fallback: {e}")
+            narrative_dict = build_fallback_narrative(profile, generate_narrative(profile.dimension_scores))
+
+        narrative_dict = personalize_narrative(narrative_dict, demographics)
+
+        archetype_name = None
+        profile_pattern = None
+        if 'sections' in narrative_dict and 'archetype' in narrative_dict['sections']:
+            archetype_name = narrative_dict['sections']['archetype'].get('name')
+        if 'profile_pattern' in narrative_dict:
+            profile_pattern = narrative_dict['profile_pattern'].get('pattern')
+
+        # Our lease may have lapsed (e.g. a stalled worker) and another
+        # generation may have taken over; only the newest lock holder saves
+        if not await session_mgr.results_lock_valid(lock_token):
+            raise ResultsGenerationInProgressError(session_id, wait_time=30)
+
+        saved_result = await service.save_result(
+            session_id=session_id,
+            scores=profile.dimension_scores,
+            narrative=narrative_dict,
+            archetype=archetype_name,
+            profile_pattern=profile_pattern,
+            consistency_score=validation_result.get('consistency_score') if validation_result else None,
+            attention_score=validation_result.get('attention_score') if validation_result else None,
+            validation_flags=validation_result.get('flags', []) if validation_result else None,
+            generation_cost=narrative_dict.get('generation_cost', 0.0),
+            generation_model=narrative_dict.get('metadata', {}).get('model'),
+        )
+        logger.info(f"Results saved to database for session {session_id[:8]}...")
+
+        # Fold the new result into this worker's norms (others pick it up on refresh)
+        get_norms_service().record_result(saved_result, demographics)
+
+        return {
+            "session_id": session_id,
+            "generated": True,
+            "cost": narrative_dict.get('generation_cost', 0.0),
+        }
+
+    finally:
+        await session_mgr._redis.complete_generation_progress(session_id)
+        await session_mgr.release_results_lock(session_id, lock_token)
+
+
+async def run_results_job(job: Job) -> Dict[str, Any]:
+    """JobRunner handler for RESULTS_JOB: generates, then publishes "done" (or "error")."""
+    session_id = job.payload["session_id"]
+    events = get_job_events()
+    try:
+        result = await generate_results(session_id, job_id=job.id)
+    except JobFailed as e:
+        await events.publish(job.id, "error", {"message": str(e)})
+        raise
+    await events.publish(job.id, "done", {"status": "ready", "session_id": session_id})
+    return result
+
+
+def register_results_job(runner: JobRunner) -> None:
+    """Register the results handler on a runner."""
+    runner.register(RESULTS_JOB, run_results_job, max_attempts=3)
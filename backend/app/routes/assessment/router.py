@@ -11,26 +11,36 @@ This file contains the endpoint definitions. Business logic is delegated to:
 """
 
 import os
+import json
 import logging
+import time
+from contextlib import aclosing
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from html import escape
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.auth import get_current_user
-from app.scoring import SelveScorer
-from app.narratives import generate_narrative
-from app.narratives.integrated_generator import (
-    generate_integrated_narrative,
-    generate_integrated_narrative_async,
-)
-from app.response_validator import ResponseValidator
+from app.scoring import get_scorer
+from app.norms import get_norms, strata_for_demographics
+from app.response_validator import ResponseValidator, get_response_validator
 from app.services.assessment_service import (
     AssessmentService, 
     session_to_state_dict,
-    update_session_from_state,
+)
+from app.services.session_persister import get_session_persister
+from app.services.job_events import get_job_events
+from app.services.job_runner import (
+    Job,
+    get_job_runner,
+    CANCELLED as JOB_CANCELLED,
+    FAILED as JOB_FAILED,
+    QUEUED as JOB_QUEUED,
+    RUNNING as JOB_RUNNING,
+    SUCCEEDED as JOB_SUCCEEDED,
 )
 from app.db import prisma
 
@@ -47,9 +57,11 @@ from .schemas import (
     ValidationResult,
 )
 from .session_manager import get_session_manager, SessionManager
-from .question_engine import QuestionEngine
+from .speculation import get_speculative_cache
+from .results_job import RESULTS_JOB, incomplete_dimensions, results_job_key
 from .dependencies import (
     get_assessment_service,
+    get_question_engine,
     get_optional_user,
     get_required_user,
     get_clerk_user_id,
@@ -65,13 +77,11 @@ from .constants import (
 )
 from .utils import (
     calculate_progress,
-    get_dimension_counts,
-    analyze_back_navigation,
+    get_score_state,
+    store_score_state,
     log_back_navigation,
     build_validation_response,
     should_run_validation_check,
-    personalize_narrative,
-    build_fallback_narrative,
     generate_share_id,
     sanitize_demographics_for_sharing,
     build_share_url,
@@ -81,6 +91,7 @@ from .utils import (
 )
 from .exceptions import (
     AssessmentError,
+    SessionConflictError,
     SessionNotFoundError,
     SessionOwnershipError,
     AuthenticationRequiredError,
@@ -147,7 +158,7 @@ async def start_assessment(
         )
         
         # Save to storage
-        session_mgr.save_session(session_id, session)
+        await session_mgr.save_session(session_id, session)
         
         # Get demographic questions
         demographic_questions = [
@@ -195,9 +206,19 @@ def sanitize_text_input(text: str, max_length: int = 500) -> str:
     return text.strip()
 
 
+@dataclass
+class _AnswerOutcome:
+    """What submit_answer does once its session update is committed."""
+    session: Dict
+    response: SubmitAnswerResponse
+    persist: Optional[str] = None  # "dirty" (write-behind) or "flush" (assessment completed)
+    precompute: Optional[tuple] = None  # speculation.precompute() args
+
+
 @router.post("/assessment/answer", response_model=SubmitAnswerResponse)
 async def submit_answer(
     request: SubmitAnswerRequest,
+    background_tasks: BackgroundTasks,
     service: AssessmentService = Depends(get_assessment_service),
 ):
     """
@@ -213,41 +234,31 @@ async def submit_answer(
     - is_complete: Whether assessment is finished
     - progress: Current progress (0.0 - 1.0)
 
-    Race condition protection:
-    - Uses distributed locking to prevent concurrent modifications
-    - Ensures consistency when multiple requests arrive simultaneously
+    Concurrent submits (double taps, client retries):
+    - No lock: the answer is applied to the session as read and committed
+      with a compare-and-set; after a concurrent write it is re-applied to
+      the newer session, so answers to different items both land
+    - Repeating a stored answer is acknowledged without changes
+
+    Speculative selection (SPECULATIVE_SELECTION=on|ab):
+    - After the response is sent, the next step for every possible answer
+      to the pending items is precomputed; the next submit is a lookup
     """
     session_id = validate_session_id(request.session_id)
     session_mgr = get_session_manager()
 
-    # Acquire distributed lock for this session to prevent race conditions
-    lock_token = None
-    try:
-        lock_token = session_mgr._redis.acquire_lock(
-            lock_name=f"answer:{session_id}",
-            lock_timeout=30,  # 30s max for answer processing
-            blocking=True,
-            blocking_timeout=35
-        )
-
-        if lock_token is None:
-            raise HTTPException(
-                status_code=503,
-                detail="Answer submission in progress. Please wait and try again."
-            )
-
-        # Get session with database fallback
-        session = await session_mgr.get_session_with_db_fallback(session_id, raise_if_missing=False)
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
+    # Speculative arm: the step may already be precomputed for this exact state
+    speculation = get_speculative_cache()
+    speculate = speculation.enabled_for(session_id)
 
+    async def apply_answer(session: Dict) -> _AnswerOutcome:
+        """Record the answer in session and pick the next step (re-run after a concurrent write)."""
         # Extract session components
-        tester = session["tester"]
         responses: Dict = session["responses"]
         demographics: Dict = session["demographics"]
         pending_questions: set = session["pending_questions"]
         answer_history: List = session.get("answer_history", [])
-        validator = session.get("validator")
+        validator = get_response_validator()
 
         question_id = request.question_id
         is_demographic = question_id.startswith("demo_")
@@ -280,16 +291,15 @@ async def submit_answer(
             if not all_demographics_complete:
                 # Still collecting demographics
                 progress = calculate_progress(len(demographics), 0)
-                session_mgr.save_session(session_id, session)
 
-                return SubmitAnswerResponse(
+                return _AnswerOutcome(session, SubmitAnswerResponse(
                     next_questions=None,
                     is_complete=False,
                     progress=progress,
                     questions_answered=len(demographics),
                     total_questions=AssessmentConfig.ESTIMATED_TOTAL_QUESTIONS,
                     can_go_back=len(answer_history) > 0,
-                )
+                ))
 
             # Demographics complete - check if we already have personality questions
             if responses or pending_questions:
@@ -307,8 +317,23 @@ async def submit_answer(
             already_answered = question_id in responses
             was_pending = question_id in pending_questions
             
+            if already_answered and not request.is_going_back and responses[question_id] == response_value:
+                # Double tap or client retry of a stored answer: acknowledge, change nothing.
+                # The first request already sent the next questions.
+                logger.info(f"Repeated answer {question_id} acknowledged for session {session_id[:8]}")
+                is_complete = not pending_questions
+                answered = len(demographics) + len(responses)
+                return _AnswerOutcome(session, SubmitAnswerResponse(
+                    next_questions=None if is_complete else [],
+                    is_complete=is_complete,
+                    progress=1.0 if is_complete else calculate_progress(len(demographics), len(responses)),
+                    questions_answered=answered,
+                    total_questions=answered if is_complete else AssessmentConfig.ESTIMATED_TOTAL_QUESTIONS,
+                    can_go_back=True,
+                ))
+
             if already_answered and not request.is_going_back:
-                # Duplicate submission - reject unless user is re-answering after back navigation
+                # Conflicting duplicate - reject unless user is re-answering after back navigation
                 logger.warning(
                     f"Duplicate answer rejected: {question_id} already in responses. "
                     f"Answer history: {answer_history[-5:]}"
@@ -325,8 +350,16 @@ async def submit_answer(
                     }
                 )
             
-            # Accept the answer - either new or re-answer after back navigation
+            # Accept the answer - either new or re-answer after back navigation.
+            # The score state is updated in O(1): subtract the old value (if any), add the new one.
+            score_state = get_score_state(session, get_scorer())
+            try:
+                score_state.record(question_id, responses.get(question_id), response_value)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            
             responses[question_id] = response_value
+            store_score_state(session, score_state)
             logger.debug(f"✓ Stored response: {question_id} = {response_value}")
             
             # Log if question wasn't in pending (stale pending set after restore)
@@ -353,11 +386,26 @@ async def submit_answer(
                     f"attention={validation_result['attention_score']:.1f}%"
                 )
 
-        # Create question engine
-        question_engine = QuestionEngine(tester, session["scorer"])
+        # Shared question engine (engines are process-wide, sessions carry only data)
+        question_engine = get_question_engine()
+        score_state = get_score_state(session, get_scorer())
 
-        # Check if we should continue testing
-        should_continue, reason = question_engine.should_continue_testing(responses, pending_questions)
+        step = (
+            speculation.lookup(session_id, score_state, demographics, pending_questions)
+            if speculate else None
+        )
+
+        if step is not None:
+            should_continue, reason = step.should_continue, step.reason
+        else:
+            # Read every dimension's uncertainty from the session score state once;
+            # the stop check and next-batch selection both use the same vector
+            uncertainties = question_engine.tester.calculate_session_uncertainties(responses, score_state)
+
+            # Check if we should continue testing
+            should_continue, reason = question_engine.should_continue_testing(
+                responses, pending_questions, uncertainties=uncertainties
+            )
         log_adaptive_decision(len(responses), should_continue, reason)
 
         if not should_continue:
@@ -366,28 +414,29 @@ async def submit_answer(
 
             # FIX: Clear pending questions on completion
             pending_questions.clear()
+            session["completion_reason"] = reason
 
-            session_mgr.save_session(session_id, session)
-
-            # Persist to database
-            await update_session_from_state(service, session_id, session)
-
-            return SubmitAnswerResponse(
+            # Persisted to the database right away (in-progress answers are write-behind)
+            return _AnswerOutcome(session, SubmitAnswerResponse(
                 next_questions=None,
                 is_complete=True,
                 progress=1.0,
                 questions_answered=len(demographics) + len(responses),
                 total_questions=len(demographics) + len(responses),
                 can_go_back=True,
-            )
+            ), persist="flush")
 
         # Get next questions
-        next_items = question_engine.select_next_questions(
-            responses=responses,
-            demographics=demographics,
-            pending_questions=pending_questions,
-            max_items=AssessmentConfig.DEFAULT_BATCH_SIZE,
-        )
+        if step is not None:
+            next_items = step.items
+        else:
+            next_items = await question_engine.select_next_questions_async(
+                responses=responses,
+                demographics=demographics,
+                pending_questions=pending_questions,
+                max_items=AssessmentConfig.DEFAULT_BATCH_SIZE,
+                uncertainties=uncertainties,
+            )
 
         # Only complete if we have NO new items AND NO pending items.
         # If we have pending items, the user still has work to do
@@ -398,18 +447,16 @@ async def submit_answer(
 
             # FIX: Clear pending questions
             pending_questions.clear()
+            session["completion_reason"] = "No more questions available"
 
-            session_mgr.save_session(session_id, session)
-            await update_session_from_state(service, session_id, session)
-
-            return SubmitAnswerResponse(
+            return _AnswerOutcome(session, SubmitAnswerResponse(
                 next_questions=None,
                 is_complete=True,
                 progress=1.0,
                 questions_answered=len(demographics) + len(responses),
                 total_questions=len(demographics) + len(responses),
                 can_go_back=True,
-            )
+            ), persist="flush")
         
         # If next_items is empty but pending_questions is NOT empty,
         # we fall through here. next_questions will be empty list [],
@@ -437,23 +484,50 @@ async def submit_answer(
         questions_answered = len(demographics) + len(responses)
         progress = calculate_progress(len(demographics), len(responses))
 
-        # Save session
-        session_mgr.save_session(session_id, session)
-        await update_session_from_state(service, session_id, session)
+        precompute = None
+        if speculate:
+            # Snapshots: the session dict keeps changing under later requests
+            precompute = (
+                session_id,
+                question_engine,
+                dict(responses),
+                dict(demographics),
+                set(pending_questions),
+                score_state.copy(),
+                [
+                    code
+                    for entry in session["batch_history"]
+                    for code in entry.get("batch", [])
+                    if code in pending_questions
+                ],
+            )
 
-        return SubmitAnswerResponse(
+        return _AnswerOutcome(session, SubmitAnswerResponse(
             next_questions=next_questions,
             is_complete=False,
             progress=progress,
             questions_answered=questions_answered,
             total_questions=AssessmentConfig.ESTIMATED_TOTAL_QUESTIONS,
             can_go_back=len(responses) > 0,
-        )
+        ), persist="dirty", precompute=precompute)
+
+    # Optimistic update: no lock; a concurrent write makes apply_answer re-run on the newer session
+    try:
+        outcome = await session_mgr.update_session(session_id, apply_answer)
+    except SessionNotFoundError:
+        raise HTTPException(status_code=404, detail="Session not found")
+    except SessionConflictError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
 
-    finally:
-        # Always release lock, even if error occurred
-        if lock_token:
-            session_mgr._redis.release_lock(f"answer:{session_id}", lock_token)
+    if outcome.persist == "flush":
+        await get_session_persister().flush_session(session_id, outcome.session)
+    elif outcome.persist == "dirty":
+        await get_session_persister().mark_dirty(session_id, outcome.session)
+
+    if outcome.precompute is not None:
+        background_tasks.add_task(speculation.precompute, *outcome.precompute)
+
+    return outcome.response
 
 
 @router.post("/assessment/can-go-back", response_model=GetPreviousQuestionResponse)
@@ -464,30 +538,16 @@ async def check_can_go_back(request: GetPreviousQuestionRequest):
     Users can edit their last 10 answers to prevent disrupting adaptive flow.
     
     Security features:
-    - Distributed locking to prevent race conditions
+    - Read-only: no lock needed
     - Input validation and type checking
     - Edge case handling for empty/invalid state
     - Proper error handling and logging
     """
-    lock_token = None
     try:
         # Validate and normalize session_id
         session_id = validate_session_id(request.session_id)
         session_mgr = get_session_manager()
         
-        # Acquire distributed lock to prevent concurrent modifications
-        lock_token = session_mgr.acquire_back_navigation_lock(
-            session_id,
-            timeout=5,  # Short timeout for quick read operation
-            blocking_timeout=10,
-        )
-        
-        if not lock_token:
-            raise HTTPException(
-                status_code=409,
-                detail="Another navigation operation is in progress. Please try again."
-            )
-        
         # Get session with proper error handling
         session = await session_mgr.get_session_with_db_fallback(session_id, raise_if_missing=False)
         if not session:
@@ -552,13 +612,6 @@ async def check_can_go_back(request: GetPreviousQuestionRequest):
     except Exception as e:
         logger.error(f"Error checking back navigation for session {session_id[:8] if 'session_id' in locals() else 'unknown'}: {e}")
         raise HTTPException(status_code=500, detail="Failed to check navigation state")
-    finally:
-        # Always release lock if acquired
-        if lock_token and 'session_id' in locals():
-            try:
-                session_mgr.release_back_navigation_lock(session_id, lock_token)
-            except Exception as e:
-                logger.error(f"Failed to release back navigation lock for {session_id[:8]}: {e}")
 
 
 @router.post("/assessment/back", response_model=GetPreviousQuestionResponse)
@@ -569,7 +622,7 @@ async def go_back(request: GetPreviousQuestionRequest):
     Allows users to review and edit their most recent answer (up to last 10).
     
     Security features:
-    - Distributed locking for atomic answer_history modification
+    - Optimistic update (compare-and-set) for atomic answer_history modification
     - Input validation and type checking
     - Defensive state handling
     - Proper error recovery
@@ -577,30 +630,11 @@ async def go_back(request: GetPreviousQuestionRequest):
     Note: back_navigation_count is tracked separately when user re-submits
     an answer with is_going_back=True flag. This endpoint only handles navigation.
     """
-    lock_token = None
-    try:
-        # Validate and normalize session_id
-        session_id = validate_session_id(request.session_id)
-        session_mgr = get_session_manager()
-        
-        # Acquire distributed lock to prevent race conditions on answer_history modifications
-        lock_token = session_mgr.acquire_back_navigation_lock(
-            session_id,
-            timeout=5,
-            blocking_timeout=10,
-        )
-        
-        if not lock_token:
-            raise HTTPException(
-                status_code=409,
-                detail="Another navigation operation is in progress. Please try again."
-            )
-        
-        # Get session with proper error handling
-        session = await session_mgr.get_session_with_db_fallback(session_id, raise_if_missing=False)
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
+    # Validate and normalize session_id
+    session_id = validate_session_id(request.session_id)
+    
+    def rewind(session: Dict) -> GetPreviousQuestionResponse:
+        """Step the session back one answer (re-run after a concurrent write)."""
         # Extract state with defensive defaults
         responses: Dict = session.get("responses", {})
         demographics: Dict = session.get("demographics", {})
@@ -684,11 +718,18 @@ async def go_back(request: GetPreviousQuestionRequest):
         else:
             if last_question_id in responses:
                 old_value = responses[last_question_id]
+                score_state = get_score_state(session, get_scorer())
                 del responses[last_question_id]
+                score_state.discard(last_question_id, old_value)
+                store_score_state(session, score_state)
                 logger.debug(f"✓ Removed response {last_question_id} (was: {old_value})")
         
         # Remove from history atomically (will be re-added on submit)
         answer_history.pop()
+        session["completion_reason"] = None
+        
+        # Precomputed next batches assumed the state we just rewound
+        get_speculative_cache().invalidate(session_id)
         
         logger.info(
             f"Back navigation to {last_question_id}: "
@@ -696,12 +737,9 @@ async def go_back(request: GetPreviousQuestionRequest):
         )
         
         # Get question details
-        question_engine = QuestionEngine(session["tester"], session["scorer"])
+        question_engine = get_question_engine()
         question = question_engine.get_question_for_back_navigation(last_question_id)
         
-        # Save session (atomic write)
-        session_mgr.save_session(session_id, session)
-        
         logger.info(f"Back navigation to question {last_question_id} for session {session_id[:8]}")
         
         return GetPreviousQuestionResponse(
@@ -712,18 +750,18 @@ async def go_back(request: GetPreviousQuestionRequest):
             pending_questions_cleared=True,  # Always true - we always clear pending on back
         )
     
+    try:
+        # Optimistic update (atomic write): a concurrent write makes rewind re-run on the newer session
+        return await get_session_manager().update_session(session_id, rewind)
+    except SessionNotFoundError:
+        raise HTTPException(status_code=404, detail="Session not found")
+    except SessionConflictError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error during back navigation for session {session_id[:8] if 'session_id' in locals() else 'unknown'}: {e}")
+        logger.error(f"Error during back navigation for session {session_id[:8]}: {e}")
         raise HTTPException(status_code=500, detail="Failed to navigate back")
-    finally:
-        # Always release lock if acquired
-        if lock_token and 'session_id' in locals():
-            try:
-                session_mgr.release_back_navigation_lock(session_id, lock_token)
-            except Exception as e:
-                logger.error(f"Failed to release back navigation lock for {session_id[:8]}: {e}")
 
 
 # ============================================================================
@@ -739,205 +777,171 @@ async def get_results(
     Get complete assessment results with narrative.
     
     Results are cached in database:
-    - First request: Generates narrative with OpenAI (~$0.002) → Saves to database
-    - Subsequent requests: Fetches from database (FREE, instant!)
+    - Saved results are returned at once (FREE, instant!)
+    - Otherwise a background job is queued to generate the narrative with
+      OpenAI (~$0.002) and save it, and the response is 202 with the job id;
+      follow /results/stream (or poll /results/status) and fetch again once ready
     
-    Uses distributed lock to prevent duplicate OpenAI calls on concurrent requests.
+    Requests for the same session share one job (idempotency key per session).
     """
     session_id = validate_session_id(session_id)
-    session_mgr = get_session_manager()
 
-    # FIX: Acquire lock FIRST to prevent TOCTOU race condition
-    lock_token = None
-    try:
-        lock_token = session_mgr.acquire_results_lock(session_id)
+    existing_result = await service.get_result(session_id)
+    if existing_result:
+        logger.info(f"Returning cached results for session {session_id[:8]}...")
+        return await _saved_results_response(session_id, existing_result, service)
 
-        # NOW check for existing results (inside lock)
-        existing_result = await service.get_result(session_id)
+    job = await _enqueue_results_job(session_id)
 
+    # The job may have finished between the lookup and the enqueue
+    if job.status == JOB_SUCCEEDED:
+        existing_result = await service.get_result(session_id)
         if existing_result:
-            logger.info(f"Returning cached results for session {session_id[:8]}...")
+            return await _saved_results_response(session_id, existing_result, service)
 
-            db_session = await service.get_session(session_id)
-            demographics = db_session.demographics if db_session else {}
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "generating",
+            "session_id": session_id,
+            "job_id": job.id,
+            "message": "Generating your personality narrative. Follow /results/stream for progress.",
+        },
+    )
 
-            validation_data = None
-            if existing_result.consistencyScore is not None:
-                validation_data = ValidationResult(
-                    consistency_score=existing_result.consistencyScore,
-                    attention_score=existing_result.attentionScore or 0,
-                    flags=existing_result.validationFlags or [],
-                )
 
-            return GetResultsResponse(
-                session_id=session_id,
-                scores={
-                    "LUMEN": existing_result.scoreLumen,
-                    "AETHER": existing_result.scoreAether,
-                    "ORPHEUS": existing_result.scoreOrpheus,
-                    "ORIN": existing_result.scoreOrin,
-                    "LYRA": existing_result.scoreLyra,
-                    "VARA": existing_result.scoreVara,
-                    "CHRONOS": existing_result.scoreChronos,
-                    "KAEL": existing_result.scoreKael,
-                },
-                narrative=existing_result.narrative,
-                completed_at=existing_result.createdAt.isoformat(),
-                demographics=demographics,
-                validation=validation_data,
-            )
+async def _enqueue_results_job(session_id: str) -> Job:
+    """
+    Queue a session's results generation (or get the job already queued).
 
-        # Get session
-        session = await session_mgr.get_session_with_db_fallback(session_id, raise_if_missing=False)
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        responses = session["responses"]
-        demographics = session.get("demographics", {})
-        pending_questions = session.get("pending_questions", set())
-        scorer: SelveScorer = session["scorer"]
-        validator = session.get("validator")
-        
-        # Check minimum coverage (including pending questions)
-        question_engine = QuestionEngine(session["tester"], scorer)
-        is_valid, incomplete_dims = question_engine.check_minimum_coverage(responses, pending_questions)
-        
-        if not is_valid and len(responses) < AssessmentConfig.QUICK_SCREEN_ITEMS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Assessment incomplete. Need more responses for: {', '.join(incomplete_dims)}",
-            )
-        
-        # Score responses
-        profile = scorer.score_responses(responses)
-        
-        # Get validation results
-        validation_result = None
-        if validator:
-            validation_result = validator.validate_responses(responses)
-        
-        # Generate narrative (using async for parallel OpenAI calls - ~3-4x faster)
-        int_scores = {dim: int(score) for dim, score in profile.dimension_scores.items()}
-        
-        # Human-readable section names for progress display
-        SECTION_DISPLAY_NAMES = {
-            'core_identity': 'Core Identity',
-            'motivations': 'Motivations',
-            'conflicts': 'Inner Conflicts',
-            'strengths': 'Strengths',
-            'growth_areas': 'Growth Areas',
-            'relationships': 'Relationships',
-            'work_style': 'Work Style',
-        }
-        section_names = list(SECTION_DISPLAY_NAMES.keys())
-        display_names = list(SECTION_DISPLAY_NAMES.values())
-        
-        # Initialize progress tracking in Redis
-        session_mgr._redis.init_generation_progress(
-            session_id=session_id,
-            total_steps=len(section_names),
-            step_names=display_names
-        )
-        
-        # Create progress callback
-        async def on_section_complete(section_name: str, completed_count: int):
-            """Update progress when a section completes."""
-            display_name = SECTION_DISPLAY_NAMES.get(section_name, section_name)
-            remaining = len(section_names) - completed_count
-            next_step = None
-            if remaining > 0:
-                # Find a section that hasn't completed yet (approximate)
-                next_step = f"Generating section {completed_count + 1} of {len(section_names)}..."
-            session_mgr._redis.update_generation_progress(
-                session_id=session_id,
-                completed_step=display_name,
-                next_step=next_step
-            )
-            logger.debug(f"Progress: {completed_count}/{len(section_names)} - Completed: {display_name}")
-        
-        try:
-            integrated_narrative = await generate_integrated_narrative_async(
-                int_scores, 
-                use_llm=True,
-                on_section_complete=on_section_complete
-            )
-            
-            narrative_dict = {
-                'profile_pattern': integrated_narrative['profile_pattern'],
-                'sections': integrated_narrative['sections'],
-                'scores': integrated_narrative['scores'],
-                'generation_cost': integrated_narrative.get('generation_cost', 0.0),
-                'metadata': integrated_narrative.get('metadata', {}),
-            }
-            
-            logger.info(
-                f"Generated narrative with OpenAI. "
-                f"Cost: ${integrated_narrative.get('generation_cost', 0):.4f}"
-            )
-            
-        except Exception as e:
-            logger.warning(f"OpenAI narrative failed, using fallback: {e}")
-            
-            narrative = generate_narrative(profile.dimension_scores)
-            narrative_dict = build_fallback_narrative(profile, narrative)
-        
-        # Personalize with name
-        narrative_dict = personalize_narrative(narrative_dict, demographics)
-        
-        # Mark session complete
-        session["completed_at"] = datetime.now().isoformat()
-        
-        # Extract archetype info
-        archetype_name = None
-        profile_pattern = None
-        if 'sections' in narrative_dict and 'archetype' in narrative_dict['sections']:
-            archetype_name = narrative_dict['sections']['archetype'].get('name')
-        if 'profile_pattern' in narrative_dict:
-            profile_pattern = narrative_dict['profile_pattern'].get('pattern')
-        
-        # Save to database
-        await service.save_result(
-            session_id=session_id,
-            scores=profile.dimension_scores,
-            narrative=narrative_dict,
-            archetype=archetype_name,
-            profile_pattern=profile_pattern,
-            consistency_score=validation_result.get('consistency_score') if validation_result else None,
-            attention_score=validation_result.get('attention_score') if validation_result else None,
-            validation_flags=validation_result.get('flags', []) if validation_result else None,
-            generation_cost=narrative_dict.get('generation_cost', 0.0),
-            generation_model=narrative_dict.get('metadata', {}).get('model'),
+    Raises:
+        HTTPException: 404 if the session doesn't exist, 400 if it can't be scored yet
+    """
+    session = await get_session_manager().get_session_with_db_fallback(session_id, raise_if_missing=False)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    incomplete_dims = incomplete_dimensions(session)
+    if incomplete_dims:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Assessment incomplete. Need more responses for: {', '.join(incomplete_dims)}",
         )
-        
-        logger.info(f"Results saved to database for session {session_id[:8]}...")
-        
-        # Build validation response
-        validation_data = None
-        if validation_result:
-            back_count = session.get("back_navigation_count", 0)
-            validation_data = ValidationResult(
-                consistency_score=validation_result["consistency_score"],
-                attention_score=validation_result["attention_score"],
-                flags=validation_result["flags"],
-                consistency_report=validator.get_consistency_report(responses) if validator else None,
-                back_navigation_count=back_count,
-                back_navigation_analysis=analyze_back_navigation(back_count),
-            )
-        
-        return GetResultsResponse(
-            session_id=session_id,
-            scores=profile.dimension_scores,
-            narrative=narrative_dict,
-            completed_at=session["completed_at"],
-            demographics=demographics,
-            validation=validation_data,
+
+    return await get_job_runner().enqueue(
+        RESULTS_JOB, {"session_id": session_id}, idempotency_key=results_job_key(session_id)
+    )
+
+
+async def _saved_results_response(session_id: str, result, service: AssessmentService) -> GetResultsResponse:
+    """GetResultsResponse for a result saved in the database."""
+    db_session = await service.get_session(session_id)
+    demographics = db_session.demographics if db_session else {}
+
+    validation_data = None
+    if result.consistencyScore is not None:
+        validation_data = ValidationResult(
+            consistency_score=result.consistencyScore,
+            attention_score=result.attentionScore or 0,
+            flags=result.validationFlags or [],
         )
-        
-    finally:
-        # Clean up progress tracking
-        session_mgr._redis.complete_generation_progress(session_id)
-        if lock_token:
-            session_mgr.release_results_lock(session_id, lock_token)
+
+    scores = {
+        "LUMEN": result.scoreLumen,
+        "AETHER": result.scoreAether,
+        "ORPHEUS": result.scoreOrpheus,
+        "ORIN": result.scoreOrin,
+        "LYRA": result.scoreLyra,
+        "VARA": result.scoreVara,
+        "CHRONOS": result.scoreChronos,
+        "KAEL": result.scoreKael,
+    }
+
+    return GetResultsResponse(
+        session_id=session_id,
+        scores=scores,
+        percentiles=get_norms().percentiles(scores),
+        stratum_percentiles=get_norms().stratum_percentiles(
+            scores, strata_for_demographics(demographics)
+        ),
+        narrative=result.narrative,
+        completed_at=result.createdAt.isoformat(),
+        demographics=demographics,
+        validation=validation_data,
+    )
+
+
+# Longest a results stream stays open (clients reconnect with Last-Event-ID)
+RESULTS_STREAM_MAX_SECONDS = 300
+
+
+@router.get("/assessment/{session_id}/results/stream")
+async def stream_results(
+    session_id: str,
+    request: Request,
+    service: AssessmentService = Depends(get_assessment_service),
+):
+    """
+    Stream results generation as server-sent events.
+
+    Queues generation like /results if needed, then relays the job's events
+    as they happen instead of being polled:
+    - section: {section, title, text, completed, total} for each finished section
+    - delta: {section, text} partial text (when NARRATIVE_STREAM_DELTAS is on)
+    - done: {status: "ready"} - fetch /results
+    - error: {message} - generation failed or was cancelled
+
+    Event ids are replayable: reconnecting with Last-Event-ID resumes after it.
+    """
+    session_id = validate_session_id(session_id)
+
+    job = None
+    if not await service.get_result(session_id):
+        job = await _enqueue_results_job(session_id)
+
+    return StreamingResponse(
+        _results_event_stream(session_id, job, request.headers.get("last-event-id", "0"), request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    """One server-sent event."""
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _results_event_stream(session_id: str, job: Optional[Job], last_event_id: str, request: Request):
+    """SSE body for stream_results: the job's events until done, error or disconnect."""
+    ready = {"status": "ready", "session_id": session_id}
+    if job is None or job.status == JOB_SUCCEEDED:
+        yield _sse("done", ready)
+        return
+
+    deadline = time.monotonic() + RESULTS_STREAM_MAX_SECONDS
+    async with aclosing(get_job_events().subscribe(job.id, after=last_event_id)) as events:
+        async for event in events:
+            if await request.is_disconnected():
+                return
+            if event is not None:
+                yield _sse(event.type, event.data, event.id)
+                if event.type in ("done", "error"):
+                    return
+                continue
+
+            # Idle: the job may have ended without its final event getting through
+            current = await get_job_runner().get_job(job.id)
+            if current is None or current.status in (JOB_FAILED, JOB_CANCELLED):
+                message = current.error if current and current.status == JOB_FAILED else None
+                yield _sse("error", {"message": message or "Results generation stopped"})
+                return
+            if current.status == JOB_SUCCEEDED:
+                yield _sse("done", ready)
+                return
+            if time.monotonic() > deadline:
+                return
+            yield ": keepalive\n\n"
 
 
 @router.get("/assessment/{session_id}/results/status")
@@ -968,13 +972,24 @@ async def get_results_status(
             "progress": 100,
         }
 
-    # Check if generation is in progress (lock exists)
-    lock_name = f"results:{session_id}"
-    is_generating = session_mgr._redis.is_locked(lock_name)
+    # Check the session's results job (the lock covers generations started elsewhere)
+    job = await get_job_runner().find_job(results_job_key(session_id))
+    if job and job.status == JOB_FAILED:
+        return {
+            "status": "error",
+            "session_id": session_id,
+            "job_id": job.id,
+            "error_message": job.error or "Results generation failed",
+        }
+
+    is_generating = (
+        (job is not None and job.status in (JOB_QUEUED, JOB_RUNNING))
+        or await session_mgr.is_generating_results(session_id)
+    )
 
     if is_generating:
         # Get real progress from Redis
-        progress_data = session_mgr._redis.get_generation_progress(session_id)
+        progress_data = await session_mgr._redis.get_generation_progress(session_id)
 
         if progress_data:
             return {
@@ -1001,7 +1016,7 @@ async def get_results_status(
 
     # Check for progress data even without lock (handles TTL window after completion)
     # This prevents race condition where lock released but DB commit not yet visible
-    progress_data = session_mgr._redis.get_generation_progress(session_id)
+    progress_data = await session_mgr._redis.get_generation_progress(session_id)
     if progress_data and progress_data.get("percentage", 0) == 100:
         # Generation complete but might be in TTL window - tell frontend to fetch results
         return {
@@ -1036,29 +1051,41 @@ async def get_results_status(
     }
 
 
+@router.delete("/assessment/{session_id}/results/job")
+async def cancel_results_job(session_id: str):
+    """
+    Cancel a session's queued or running results generation.
+
+    A later /results request queues a new job.
+    """
+    session_id = validate_session_id(session_id)
+    job = await get_job_runner().find_job(results_job_key(session_id))
+    if not job or not await get_job_runner().cancel(job.id):
+        raise HTTPException(status_code=404, detail="No results generation in progress")
+    return {"status": "cancelled", "session_id": session_id, "job_id": job.id}
+
+
 @router.get("/assessment/{session_id}/progress")
 async def get_progress(session_id: str):
-    """Get current assessment progress."""
+    """
+    Get current assessment progress.
+    
+    Read from the session summary (one small lookup): polling this never
+    deserializes the session or rebuilds its score state.
+    """
     session_id = validate_session_id(session_id)
-    session_mgr = get_session_manager()
     
-    session = await session_mgr.get_session_with_db_fallback(session_id, raise_if_missing=False)
-    if not session:
+    summary = await get_session_manager().get_session_summary(session_id)
+    if not summary:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    responses = session["responses"]
-    tester = session["tester"]
-    
-    should_continue, reason = tester.should_continue_testing(responses)
-    dimension_counts = get_dimension_counts(responses, session["scorer"])
-    
     return {
         "session_id": session_id,
-        "questions_answered": len(responses),
-        "is_complete": not should_continue,
-        "completion_reason": reason if not should_continue else None,
-        "dimension_progress": dimension_counts,
-        "started_at": session["started_at"],
+        "questions_answered": summary["answered"],
+        "is_complete": summary["status"] == "complete",
+        "completion_reason": summary["completion_reason"],
+        "dimension_progress": summary["dimension_progress"],
+        "started_at": summary["started_at"],
     }
 
 
@@ -1084,11 +1111,11 @@ async def session_heartbeat(session_id: str):
 
     session_mgr = get_session_manager()
 
-    # Check if session exists in Redis/memory
-    exists = session_mgr.get_session(session_id, raise_if_missing=False) is not None
+    # One small summary read; the session itself isn't loaded
+    exists = await session_mgr.get_session_summary(session_id) is not None
 
     if exists:
-        # Session found - extend TTL (this happens automatically in get_session)
+        # Session found (every write refreshes its TTL)
         return Response(
             status_code=200,
             headers={
@@ -1128,7 +1155,7 @@ async def get_session_state(
     if session:
         pending_set = session.get("pending_questions", set())
         if pending_set:
-            question_engine = QuestionEngine(session["tester"], session["scorer"])
+            question_engine = get_question_engine()
             for q_id in pending_set:
                 q = question_engine.get_question_for_back_navigation(q_id)
                 if q:
@@ -1173,11 +1200,11 @@ async def transfer_session(
         if db_session:
             # Update memory cache
             session_mgr = get_session_manager()
-            session = session_mgr.get_session(session_id, raise_if_missing=False)
+            session = await session_mgr.get_session(session_id, raise_if_missing=False)
             if session:
                 session["user_id"] = clerk_user_id
                 session["clerk_user"] = user
-                session_mgr.save_session(session_id, session)
+                await session_mgr.save_session(session_id, session)
             
             logger.info(f"Session {session_id[:8]}... transferred to user {clerk_user_id}")
             
@@ -1216,7 +1243,12 @@ async def delete_session(
     
     # Remove from memory
     session_mgr = get_session_manager()
-    session_mgr.delete_session(session_id)
+    await session_mgr.delete_session(session_id)
+    
+    # Stop generating results nobody can fetch
+    job = await get_job_runner().find_job(results_job_key(session_id))
+    if job and not job.done:
+        await get_job_runner().cancel(job.id)
     
     if not deleted:
         raise HTTPException(status_code=404, detail="Session not found")
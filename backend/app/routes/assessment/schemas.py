@@ -307,6 +307,15 @@ class GetResultsResponse(BaseModel):
     
     session_id: str = Field(..., description="Session identifier")
     scores: Dict[str, float] = Field(..., description="Dimension scores (0-100)")
+    percentiles: Optional[Dict[str, Optional[float]]] = Field(
+        default=None,
+        description="Population percentile per dimension (null until enough results exist)"
+    )
+    stratum_percentiles: Optional[Dict[str, Dict[str, Optional[float]]]] = Field(
+        default=None,
+        description="Percentile per dimension within each of the respondent's demographic "
+                    "norm groups, keyed by stratum (e.g. 'age:25-34', 'gender:female')"
+    )
     narrative: Dict[str, Any] = Field(..., description="Generated narrative content")
     completed_at: str = Field(..., description="ISO timestamp of completion")
     demographics: Optional[Dict[str, Any]] = Field(
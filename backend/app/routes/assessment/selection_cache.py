@@ -0,0 +1,200 @@
+"""
+Assessment Module - Selection Cache
+
+Memoizes QuestionEngine.select_next_questions across sessions and workers.
+Early in an assessment most users have seen the same quick-screen items
+with a handful of response patterns, so the same selection is recomputed
+over and over.
+
+Keys are a hash of the canonical selection input:
+- item pool fingerprint, engine and batch size
+- answered + pending item codes and the demographic context exclusions
+- the tester's selection_key(): per-dimension state in selection priority
+  order (exact for the heuristic engine, quantized posterior for IRT)
+
+Values are the selected item codes; the engine rebuilds item dicts from the
+shared pool. Two tiers: an in-process LRU with TTL, then Redis (shared by
+all workers, SETEX) through the async store. Synchronous callers
+(speculation in the threadpool, the simulator) only use the memory tier.
+Set SELECTION_CACHE=false to disable.
+
+Usage:
+    cache = get_selection_cache()
+    codes = await cache.get(key)
+    await cache.set(key, [item['item'] for item in items])
+    codes = cache.get_local(key)  # memory tier only, from any thread
+    cache.stats()  # memory/redis hits, misses, evictions
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.redis_service import get_async_redis_session_store
+
+logger = logging.getLogger(__name__)
+
+
+SELECTION_CACHE_ENABLED = os.getenv("SELECTION_CACHE", "true").lower() in ("1", "true", "yes")
+SELECTION_CACHE_MAX_ENTRIES = 10000
+SELECTION_CACHE_TTL_SECONDS = 600
+SELECTION_CACHE_REDIS_TTL_SECONDS = 3600
+SELECTION_CACHE_KEY_PREFIX = "selection:"
+
+
+class SelectionCache:
+    """
+    Two-tier (memory LRU + Redis) cache of selected item codes.
+
+    The memory tier is thread-safe: speculative precomputation selects from
+    the threadpool with get_local()/set_local().
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SELECTION_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = SELECTION_CACHE_TTL_SECONDS,
+        redis_ttl_seconds: int = SELECTION_CACHE_REDIS_TTL_SECONDS,
+        use_redis: bool = True,
+    ):
+        self._entries: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._redis_ttl = redis_ttl_seconds
+        self._use_redis = use_redis
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._redis_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Stable hash of canonical key parts (tuples/lists of str, int, bool, None)."""
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    def _redis_store(self):
+        if not self._use_redis:
+            return None
+        store = get_async_redis_session_store()
+        return store if store.redis_available else None
+
+    # ========================================================================
+    # Lookup
+    # ========================================================================
+
+    async def get(self, key: str) -> Optional[List[str]]:
+        """
+        Cached item codes for a key, or None on a miss.
+
+        A Redis hit is copied into the memory tier.
+        """
+        codes = self._get_from_memory(key)
+        if codes is not None:
+            return codes
+
+        codes = await self._get_from_redis(key)
+        with self._lock:
+            if codes is None:
+                self._misses += 1
+                return None
+            self._redis_hits += 1
+        self.set_local(key, codes)
+        return codes
+
+    def get_local(self, key: str) -> Optional[List[str]]:
+        """Cached item codes from the memory tier only (safe from any thread)."""
+        codes = self._get_from_memory(key)
+        if codes is None:
+            with self._lock:
+                self._misses += 1
+        return codes
+
+    async def set(self, key: str, codes: List[str]) -> None:
+        """Store a selection in both tiers."""
+        self.set_local(key, codes)
+        store = self._redis_store()
+        if store is None:
+            return
+        try:
+            await store.client.setex(SELECTION_CACHE_KEY_PREFIX + key, self._redis_ttl, json.dumps(codes))
+        except Exception as e:
+            logger.debug(f"Selection cache Redis write failed: {e}")
+
+    def set_local(self, key: str, codes: List[str]) -> None:
+        """Store a selection in the memory tier only (safe from any thread)."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, codes)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _get_from_memory(self, key: str) -> Optional[List[str]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, codes = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self._memory_hits += 1
+                return codes
+            del self._entries[key]
+            return None
+
+    async def _get_from_redis(self, key: str) -> Optional[List[str]]:
+        store = self._redis_store()
+        if store is None:
+            return None
+        try:
+            cached = await store.client.get(SELECTION_CACHE_KEY_PREFIX + key)
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            logger.debug(f"Selection cache Redis read failed: {e}")
+            return None
+
+    def clear(self) -> None:
+        """Drop the memory tier (Redis entries expire on their own)."""
+        with self._lock:
+            self._entries.clear()
+
+    # ========================================================================
+    # Diagnostics
+    # ========================================================================
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters: every hit is one selection not recomputed."""
+        with self._lock:
+            hits = self._memory_hits + self._redis_hits
+            total = hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self._max_entries,
+                "memory_hits": self._memory_hits,
+                "redis_hits": self._redis_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate_percent": round(hits / total * 100, 2) if total else 0,
+            }
+
+
+# ============================================================================
+# Shared Instance
+# ============================================================================
+
+_selection_cache: Optional[SelectionCache] = None
+
+
+def get_selection_cache() -> Optional[SelectionCache]:
+    """Get the process-wide SelectionCache (None when SELECTION_CACHE=false)."""
+    global _selection_cache
+    if _selection_cache is None and SELECTION_CACHE_ENABLED:
+        _selection_cache = SelectionCache()
+    return _selection_cache
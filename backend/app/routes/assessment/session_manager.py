@@ -5,26 +5,37 @@ Handles all session storage operations with:
 - Redis as primary store (persistence, race condition safety)
 - In-memory cache for fast access
 - Automatic failover and recovery
-- Memory management with LRU eviction
-- Distributed locking for results generation
+- Memory management with LRU, TTL and byte-size eviction
+- Cross-worker coherence (rev stamps + pub/sub invalidation)
+- Optimistic updates (compare-and-set on the rev, re-applied on conflict)
+- Session summaries for the polling endpoints (one small read, no session)
+- Distributed locking (awaitable, fenced, lease-renewed)
 
 This abstracts away the complexity of dual-write storage from the route handlers.
+Redis calls go through the asyncio store, so they never block the event loop.
 """
 
+import asyncio
+import copy
+import inspect
 import logging
-from typing import Dict, Optional, Any, Tuple
+import time
+from typing import Awaitable, Callable, Dict, Optional, Any, Tuple, TypeVar, Union
+from dataclasses import dataclass
 from datetime import datetime
 from collections import OrderedDict
 import threading
 
-from app.adaptive_testing import AdaptiveTester
-from app.scoring import SelveScorer
-from app.response_validator import ResponseValidator
-from app.services.redis_service import get_redis_session_store
+from app.item_pool import get_item_pool
+from app.services.distributed_lock import LockHandle
+from app.services.redis_service import get_async_redis_session_store
+from app.services.session_layout import pack_session, unpack_session
 from app.services.assessment_service import AssessmentService, session_to_state_dict
 
 from .constants import AssessmentConfig
+from .utils import build_session_summary
 from .exceptions import (
+    SessionConflictError,
     SessionNotFoundError,
     SessionExpiredError,
     StorageError,
@@ -33,48 +44,142 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+# Dict/node/key overhead counted per cached session, on top of its packed bytes
+CACHE_ENTRY_OVERHEAD_BYTES = 200
+
+# Sessions whose newest announced rev is remembered
+MAX_ANNOUNCED_REVS = 10000
+
+# Unknown session ids remembered by the negative cache
+MAX_MISSING_SESSIONS = 10000
+
+
+@dataclass
+class CachedSession:
+    """
+    One memory-tier entry.
+    
+    Attributes:
+        packed: session_layout.pack_session output
+        rev: Redis rev this copy matches (None = not known to be in Redis)
+        expires_at: time.monotonic() deadline
+        verified: Kept coherent by the invalidation listener since cached
+    """
+    packed: bytes
+    rev: Optional[int]
+    expires_at: float
+    verified: bool = False
+
 
 class LRUSessionCache:
     """
-    Thread-safe LRU cache for sessions with size limit.
+    Thread-safe LRU cache for sessions, bounded by approximate byte size.
     
     Prevents unbounded memory growth while keeping hot sessions fast.
+    Values are packed sessions (session_layout.pack_session), a fraction
+    of the size of the live dicts; entries also expire after ttl_seconds.
+    
+    Cross-worker coherence: entries carry the Redis rev they match, and
+    invalidate() drops an entry once another worker announces a newer one.
+    Revs announced while a load was in flight are remembered, so a copy
+    loaded just before the announcement is never marked verified.
     """
     
-    def __init__(self, max_size: int = AssessmentConfig.MAX_MEMORY_SESSIONS):
-        self._cache: OrderedDict[str, Dict] = OrderedDict()
-        self._max_size = max_size
+    def __init__(
+        self,
+        max_bytes: int = AssessmentConfig.MEMORY_CACHE_MAX_BYTES,
+        ttl_seconds: float = AssessmentConfig.MEMORY_CACHE_TTL_SECONDS,
+    ):
+        self._cache: OrderedDict[str, CachedSession] = OrderedDict()
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
         self._lock = threading.RLock()
+        self._bytes = 0
+        # Newest rev other workers announced, per session (bounded)
+        self._announced: OrderedDict[str, int] = OrderedDict()
+        
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+    
+    @staticmethod
+    def _size(entry: CachedSession) -> int:
+        return len(entry.packed) + CACHE_ENTRY_OVERHEAD_BYTES
+    
+    def _remove(self, key: str) -> None:
+        self._bytes -= self._size(self._cache.pop(key))
     
-    def get(self, key: str) -> Optional[Dict]:
+    def get(self, key: str) -> Optional[CachedSession]:
         """Get session, moving it to end (most recently used)."""
         with self._lock:
-            if key in self._cache:
-                self._cache.move_to_end(key)
-                self._hits += 1
-                return self._cache[key]
-            self._misses += 1
-            return None
+            entry = self._cache.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return entry
     
-    def set(self, key: str, value: Dict) -> None:
-        """Set session, evicting oldest if at capacity."""
+    def set(self, key: str, packed: bytes, rev: Optional[int], verified: bool = False) -> None:
+        """Set session, evicting least recently used entries past max_bytes."""
         with self._lock:
+            announced = self._announced.get(key)
+            if announced is not None and (rev is None or rev < announced):
+                verified = False
+            
             if key in self._cache:
-                self._cache.move_to_end(key)
-            else:
-                if len(self._cache) >= self._max_size:
-                    # Evict oldest (first) item
-                    evicted_key, _ = self._cache.popitem(last=False)
-                    logger.debug(f"Evicted session {evicted_key[:8]}... from memory cache")
-            self._cache[key] = value
+                self._remove(key)
+            entry = CachedSession(packed, rev, time.monotonic() + self._ttl, verified)
+            self._cache[key] = entry
+            self._bytes += self._size(entry)
+            
+            while self._bytes > self._max_bytes and len(self._cache) > 1:
+                evicted_key = next(iter(self._cache))
+                self._remove(evicted_key)
+                self._evictions += 1
+                logger.debug(f"Evicted session {evicted_key[:8]}... from memory cache")
+    
+    def invalidate(self, key: str, rev: int) -> None:
+        """Another worker wrote rev (0 = deleted the session): drop older copies."""
+        with self._lock:
+            if rev:
+                self._announced[key] = max(rev, self._announced.get(key, 0))
+                self._announced.move_to_end(key)
+                while len(self._announced) > MAX_ANNOUNCED_REVS:
+                    self._announced.popitem(last=False)
+            
+            entry = self._cache.get(key)
+            if entry is not None and (not rev or entry.rev is None or entry.rev < rev):
+                self._remove(key)
+                self._invalidations += 1
+    
+    def mark_verified(self, key: str, rev: int) -> None:
+        """Confirm an entry still matches Redis."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry.rev == rev:
+                entry.verified = True
+    
+    def unverify_all(self) -> None:
+        """Invalidations may have been missed: check every entry against Redis on its next read."""
+        with self._lock:
+            for entry in self._cache.values():
+                entry.verified = False
     
     def delete(self, key: str) -> bool:
         """Delete session from cache."""
         with self._lock:
             if key in self._cache:
-                del self._cache[key]
+                self._remove(key)
                 return True
             return False
     
@@ -90,10 +195,15 @@ class LRUSessionCache:
             hit_rate = (self._hits / total * 100) if total > 0 else 0
             return {
                 "size": len(self._cache),
-                "max_size": self._max_size,
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl,
                 "hits": self._hits,
                 "misses": self._misses,
                 "hit_rate_percent": round(hit_rate, 2),
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
             }
 
 
@@ -108,18 +218,37 @@ class SessionManager:
     
     Read Path:  Memory -> Redis -> Database
     Write Path: Memory + Redis (dual-write), periodic DB sync
+    
+    Coherence: while subscribed to other workers' write announcements, a
+    memory hit is served without touching Redis. Otherwise (listener not
+    running, or reconnecting) a hit is checked with one HGET of the rev.
+    
+    Concurrent requests on one session (double taps, retries on a flaky
+    connection) don't lock: update_session() applies a change to the
+    session as read and commits it only if nobody wrote since; otherwise it
+    re-reads and applies the change again, so two answers to different
+    items both land.
     """
     
     def __init__(self):
         self._cache = LRUSessionCache()
-        self._redis = get_redis_session_store()
+        self._redis = get_async_redis_session_store()
         self._service = AssessmentService()
+        self._coherent = False
+        self._listener: Optional[asyncio.Task] = None
+        self._update_conflicts = 0
+        
+        # In-flight loads, and ids recently found nowhere (negative cache)
+        self._loads: Dict[str, asyncio.Future] = {}
+        self._missing: OrderedDict[str, float] = OrderedDict()
+        self._shared_loads = 0
+        self._negative_hits = 0
     
     # ========================================================================
     # Core Session Operations
     # ========================================================================
     
-    def get_session(self, session_id: str, raise_if_missing: bool = True) -> Optional[Dict]:
+    async def get_session(self, session_id: str, raise_if_missing: bool = True) -> Optional[Dict]:
         """
         Get session from storage hierarchy.
         
@@ -128,32 +257,36 @@ class SessionManager:
             raise_if_missing: Whether to raise SessionNotFoundError if not found
             
         Returns:
-            Session dict with tester/scorer/validator objects, or None
+            Session dict, or None
             
         Raises:
             SessionNotFoundError: If session not found and raise_if_missing=True
         """
+        session, _ = await self._get_session_and_rev(session_id)
+        if session is None and raise_if_missing:
+            raise SessionNotFoundError(session_id)
+        return session
+    
+    async def _get_session_and_rev(self, session_id: str) -> Tuple[Optional[Dict], Optional[int]]:
+        """Memory -> Redis; the session and the Redis rev of that same copy."""
         # 1. Try memory cache first (fastest)
-        session = self._cache.get(session_id)
-        if session:
-            logger.debug(f"Session {session_id[:8]}... found in memory cache")
-            # Ensure Redis has it too (sync if missing)
-            if not self._redis.session_exists(session_id):
-                self._save_to_redis(session_id, session)
-            return session
+        entry = self._cache.get(session_id)
+        if entry is not None:
+            cached = await self._check_cached(session_id, entry)
+            if cached is not None:
+                logger.debug(f"Session {session_id[:8]}... found in memory cache")
+                return cached
         
         # 2. Try Redis (persistent store)
-        session = self._load_from_redis(session_id)
+        session, rev = await self._load_from_redis(session_id)
         if session:
             logger.debug(f"Session {session_id[:8]}... restored from Redis")
             # Populate memory cache
-            self._cache.set(session_id, session)
-            return session
+            self._cache_set(session_id, session, rev)
+            return session, rev
         
         # 3. Session not in hot storage
-        if raise_if_missing:
-            raise SessionNotFoundError(session_id)
-        return None
+        return None, None
     
     async def get_session_with_db_fallback(
         self, 
@@ -165,6 +298,13 @@ class SessionManager:
         
         Use this when you need to recover sessions after server restart.
         
+        Concurrent calls for one session share a single load (the first
+        caller's, run inline); every caller gets its own copy of the
+        result, so one request's changes never show up in another's
+        session. Ids found nowhere are remembered for
+        MISSING_SESSION_TTL_SECONDS, so repeated lookups of unknown ids
+        don't reach Redis or the database.
+        
         Args:
             session_id: Session identifier
             raise_if_missing: Whether to raise if not found anywhere
@@ -172,10 +312,52 @@ class SessionManager:
         Returns:
             Session dict or None
         """
+        session, _ = await self._get_with_db_fallback(session_id)
+        if session is None and raise_if_missing:
+            raise SessionNotFoundError(session_id)
+        return session
+    
+    async def _get_with_db_fallback(self, session_id: str) -> Tuple[Optional[Dict], Optional[int]]:
+        """get_session_with_db_fallback, with the Redis rev the session was read at."""
+        if self._known_missing(session_id):
+            self._negative_hits += 1
+            return None, None
+        
+        flight = self._loads.get(session_id)
+        if flight is not None:
+            self._shared_loads += 1
+            try:
+                session, rev = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling() or not flight.cancelled():
+                    raise
+                return await self._get_with_db_fallback(session_id)  # the loading caller was cancelled
+            return copy.deepcopy(session), rev
+        
+        # Load inline; the loaded session stays untouched in the flight for the others
+        flight = asyncio.get_running_loop().create_future()
+        self._loads[session_id] = flight
+        try:
+            session, rev = await self._load_with_db_fallback(session_id)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            flight.exception()  # retrieved, in case no other caller was waiting
+            raise
+        else:
+            flight.set_result((session, rev))
+        finally:
+            self._loads.pop(session_id, None)
+        return copy.deepcopy(session), rev
+    
+    async def _load_with_db_fallback(self, session_id: str) -> Tuple[Optional[Dict], Optional[int]]:
+        """Memory -> Redis -> database; remembers ids found nowhere."""
         # Try hot storage first
-        session = self.get_session(session_id, raise_if_missing=False)
+        session, rev = await self._get_session_and_rev(session_id)
         if session:
-            return session
+            return session, rev
         
         # Fallback to database
         try:
@@ -184,17 +366,33 @@ class SessionManager:
                 logger.info(f"Session {session_id[:8]}... recovered from database")
                 session = session_to_state_dict(db_session)
                 # Populate caches
-                self._cache.set(session_id, session)
-                self._save_to_redis(session_id, session)
-                return session
+                rev = await self._save_to_redis(session_id, session)
+                self._cache_set(session_id, session, rev)
+                return session, rev
         except Exception as e:
             logger.error(f"Database fallback failed for session {session_id[:8]}...: {e}")
+            return None, None  # unknown, not missing
         
-        if raise_if_missing:
-            raise SessionNotFoundError(session_id)
-        return None
+        self._remember_missing(session_id)
+        return None, None
+    
+    def _known_missing(self, session_id: str) -> bool:
+        """Whether session_id was recently found nowhere."""
+        deadline = self._missing.get(session_id)
+        if deadline is None:
+            return False
+        if deadline <= time.monotonic():
+            del self._missing[session_id]
+            return False
+        return True
+    
+    def _remember_missing(self, session_id: str) -> None:
+        self._missing[session_id] = time.monotonic() + AssessmentConfig.MISSING_SESSION_TTL_SECONDS
+        self._missing.move_to_end(session_id)
+        while len(self._missing) > MAX_MISSING_SESSIONS:
+            self._missing.popitem(last=False)
     
-    def save_session(self, session_id: str, session: Dict) -> bool:
+    async def save_session(self, session_id: str, session: Dict) -> bool:
         """
         Save session to both memory and Redis (dual-write).
         
@@ -205,18 +403,96 @@ class SessionManager:
         Returns:
             True if saved successfully to both stores
         """
-        # Write to memory (always succeeds)
-        self._cache.set(session_id, session)
+        # Write to Redis, then memory (stamped with the rev just written)
+        rev = await self._save_to_redis(session_id, session)
+        self._cache_set(session_id, session, rev)
         
-        # Write to Redis
-        redis_success = self._save_to_redis(session_id, session)
-        
-        if not redis_success:
+        if rev is None:
             logger.warning(f"Redis write failed for session {session_id[:8]}..., memory-only")
         
-        return redis_success
+        return rev is not None
+    
+    async def update_session(
+        self,
+        session_id: str,
+        mutate: Callable[[Dict], Union[T, Awaitable[T]]],
+        max_attempts: int = AssessmentConfig.SESSION_UPDATE_ATTEMPTS,
+    ) -> T:
+        """
+        Apply mutate to the session and save it, optimistically.
+        
+        The change is committed with a compare-and-set on the rev it was
+        read at. If another request wrote in between, the session is read
+        again and mutate re-runs on the newer state, so mutate must only
+        change the session it's given (exceptions abort without writing).
+        
+        Args:
+            session_id: Session identifier
+            mutate: Changes the session in place (may be async); its return value is passed on
+            max_attempts: Reads/commits before giving up
+            
+        Returns:
+            mutate's return value from the attempt that was committed
+            
+        Raises:
+            SessionNotFoundError: If the session doesn't exist
+            SessionConflictError: If every attempt lost to a concurrent write
+        """
+        for attempt in range(max_attempts):
+            session, rev = await self._read_for_update(session_id, fresh=attempt > 0)
+            result = mutate(session)
+            if inspect.isawaitable(result):
+                result = await result
+            committed = await self._redis.compare_and_set_session(
+                session_id, self._serialize_for_redis(session), rev, summary=self._summarize(session)
+            )
+            if committed is not None:
+                self._cache_set(session_id, session, committed or None)
+                return result
+            self._update_conflicts += 1
+            logger.debug(f"Concurrent write to session {session_id[:8]}..., re-applying update")
+        
+        raise SessionConflictError(session_id, max_attempts)
+    
+    async def _read_for_update(self, session_id: str, fresh: bool) -> Tuple[Dict, Optional[int]]:
+        """Session and the Redis rev of that same copy (fresh: bypass the memory tier)."""
+        if fresh:
+            self._cache.delete(session_id)
+        session, rev = await self._get_with_db_fallback(session_id)
+        if session is None:
+            raise SessionNotFoundError(session_id)
+        if rev is None and self._redis.redis_available and not fresh:
+            # Memory-only copy (written while Redis was down): read Redis's
+            return await self._read_for_update(session_id, fresh=True)
+        return session, rev
     
-    def delete_session(self, session_id: str) -> bool:
+    async def get_session_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Session summary (counts, status) without loading the session.
+        
+        Summaries are written with the session, so this is one small Redis
+        GET (or memory lookup). Sessions without one (written before
+        summaries existed, recovered from the database) are loaded once and
+        get it backfilled.
+        
+        Args:
+            session_id: Session identifier
+            
+        Returns:
+            build_session_summary() dict, or None if the session doesn't exist
+        """
+        summary = await self._redis.get_session_summary(session_id)
+        if summary is not None:
+            return summary
+        
+        session = await self.get_session_with_db_fallback(session_id, raise_if_missing=False)
+        if session is None:
+            return None
+        summary = self._summarize(session)
+        await self._redis.set_session_summary(session_id, summary)
+        return summary
+    
+    async def delete_session(self, session_id: str) -> bool:
         """
         Delete session from all storage layers.
         
@@ -227,7 +503,7 @@ class SessionManager:
             True if deleted from at least one store
         """
         memory_deleted = self._cache.delete(session_id)
-        redis_deleted = self._redis.delete_session(session_id)
+        redis_deleted = await self._redis.delete_session(session_id)
         
         deleted = memory_deleted or redis_deleted
         if deleted:
@@ -235,11 +511,11 @@ class SessionManager:
         
         return deleted
     
-    def session_exists(self, session_id: str) -> bool:
+    async def session_exists(self, session_id: str) -> bool:
         """Check if session exists in any storage layer."""
         return (
             self._cache.contains(session_id) or 
-            self._redis.session_exists(session_id)
+            await self._redis.session_exists(session_id)
         )
     
     # ========================================================================
@@ -266,14 +542,10 @@ class SessionManager:
             Initialized session dict
         """
         return {
-            # Helper objects (recreated on deserialization)
-            "tester": AdaptiveTester(),
-            "scorer": SelveScorer(),
-            "validator": ResponseValidator(),
-            
             # Response data
             "responses": {},
             "demographics": {},
+            "score_state": None,  # ScoreState.to_dict(), built lazily from responses
             
             # Question tracking
             "pending_questions": set(),
@@ -291,97 +563,65 @@ class SessionManager:
             "clerk_user": clerk_user,
             "metadata": metadata or {},
             "db_session_id": session_id,
+            "completion_reason": None,  # set when the assessment completes
         }
     
     # ========================================================================
-    # Distributed Locking (for results generation)
+    # Distributed Locking
     # ========================================================================
     
-    def acquire_results_lock(
+    async def acquire_results_lock(
         self, 
         session_id: str,
-        timeout: int = AssessmentConfig.NARRATIVE_GENERATION_TIMEOUT,
+        lease: int = AssessmentConfig.RESULTS_LOCK_LEASE,
         blocking_timeout: int = AssessmentConfig.LOCK_BLOCKING_TIMEOUT,
-    ) -> Optional[str]:
+    ) -> LockHandle:
         """
         Acquire distributed lock for results generation.
         
         Prevents duplicate OpenAI calls when multiple requests hit simultaneously.
+        The lease is renewed in the background until release, so a long
+        generation keeps the lock while a crashed worker frees it quickly.
         
         Args:
             session_id: Session to lock
-            timeout: Lock expiration (seconds)
+            lease: Lock expiration if renewal stops (seconds)
             blocking_timeout: Max time to wait for lock
             
         Returns:
-            Lock token if acquired, None if failed
+            Held lock (check results_lock_valid() before saving results)
             
         Raises:
             ResultsGenerationInProgressError: If lock unavailable after timeout
         """
-        lock_name = f"results:{session_id}"
-        
-        token = self._redis.acquire_lock(
-            lock_name=lock_name,
-            lock_timeout=timeout,
-            blocking=True,
-            blocking_timeout=blocking_timeout,
+        lock = await self._redis.locks.acquire(
+            f"results:{session_id}",
+            lease_seconds=lease,
+            wait_seconds=blocking_timeout,
+            keepalive=True,
         )
         
-        if token is None:
+        if lock is None:
             raise ResultsGenerationInProgressError(
                 session_id, 
                 wait_time=30
             )
         
         logger.debug(f"Acquired results lock for session {session_id[:8]}...")
-        return token
+        return lock
+    
+    async def results_lock_valid(self, lock: LockHandle) -> bool:
+        """Whether a results lock is still ours (fencing token is the newest)."""
+        return await self._redis.locks.check_fence(lock)
     
-    def release_results_lock(self, session_id: str, token: str) -> None:
+    async def release_results_lock(self, session_id: str, lock: LockHandle) -> None:
         """Release distributed lock for results generation."""
-        lock_name = f"results:{session_id}"
-        self._redis.release_lock(lock_name, token)
+        await self._redis.locks.release(lock)
         logger.debug(f"Released results lock for session {session_id[:8]}...")
     
-    def acquire_back_navigation_lock(
-        self, 
-        session_id: str,
-        timeout: int = 5,  # Back navigation is fast, short timeout
-        blocking_timeout: int = 10,
-    ) -> Optional[str]:
-        """
-        Acquire distributed lock for back navigation operations.
-        
-        Prevents race conditions when user rapidly clicks back button
-        or when concurrent requests attempt to modify answer_history.
-        
-        Args:
-            session_id: Session to lock
-            timeout: Lock expiration (seconds) - short for quick operations
-            blocking_timeout: Max time to wait for lock
-            
-        Returns:
-            Lock token if acquired, None if timeout
-        """
-        lock_name = f"back_nav:{session_id}"
-        
-        token = self._redis.acquire_lock(
-            lock_name=lock_name,
-            lock_timeout=timeout,
-            blocking=True,
-            blocking_timeout=blocking_timeout,
-        )
-        
-        if token:
-            logger.debug(f"Acquired back navigation lock for session {session_id[:8]}...")
-        
-        return token
-    
-    def release_back_navigation_lock(self, session_id: str, token: str) -> None:
-        """Release distributed lock for back navigation."""
-        lock_name = f"back_nav:{session_id}"
-        self._redis.release_lock(lock_name, token)
-        logger.debug(f"Released back navigation lock for session {session_id[:8]}...")
+    async def is_generating_results(self, session_id: str) -> bool:
+        """Whether some request currently holds the session's results lock."""
+        return await self._redis.locks.is_locked(f"results:{session_id}")
     
     # ========================================================================
     # Internal Storage Methods
@@ -391,7 +631,7 @@ class SessionManager:
         """
         Extract serializable data from session dict.
         
-        Excludes non-serializable objects (tester, scorer, validator).
+        Sessions carry only data; scoring engines are process-wide singletons.
         """
         # Convert set to list for JSON
         pending = session.get("pending_questions", set())
@@ -401,6 +641,7 @@ class SessionManager:
         return {
             "responses": session.get("responses", {}),
             "demographics": session.get("demographics", {}),
+            "score_state": session.get("score_state"),
             "pending_questions": pending,
             "current_batch": session.get("current_batch", []),
             "batch_history": session.get("batch_history", []),
@@ -412,13 +653,12 @@ class SessionManager:
             "clerk_user": session.get("clerk_user"),
             "metadata": session.get("metadata", {}),
             "db_session_id": session.get("db_session_id"),
+            "completion_reason": session.get("completion_reason"),
         }
     
     def _deserialize_from_redis(self, redis_data: Dict) -> Dict:
         """
         Reconstruct full session dict from Redis data.
-        
-        Recreates stateless helper objects.
         """
         # Convert list back to set
         pending = redis_data.get("pending_questions", [])
@@ -426,14 +666,10 @@ class SessionManager:
             pending = set(pending)
         
         return {
-            # Recreate stateless helpers
-            "tester": AdaptiveTester(),
-            "scorer": SelveScorer(),
-            "validator": ResponseValidator(),
-            
             # Restore data
             "responses": redis_data.get("responses", {}),
             "demographics": redis_data.get("demographics", {}),
+            "score_state": redis_data.get("score_state"),
             "pending_questions": pending,
             "current_batch": redis_data.get("current_batch", []),
             "batch_history": redis_data.get("batch_history", []),
@@ -445,29 +681,109 @@ class SessionManager:
             "clerk_user": redis_data.get("clerk_user"),
             "metadata": redis_data.get("metadata", {}),
             "db_session_id": redis_data.get("db_session_id"),
+            "completion_reason": redis_data.get("completion_reason"),
         }
     
-    def _load_from_redis(self, session_id: str) -> Optional[Dict]:
-        """Load and deserialize session from Redis."""
+    def _cache_set(self, session_id: str, session: Dict, rev: Optional[int]) -> None:
+        """Pack a session into the memory cache, stamped with the Redis rev it matches."""
+        self._missing.pop(session_id, None)
+        self._cache.set(
+            session_id,
+            pack_session(self._serialize_for_redis(session)),
+            rev,
+            verified=self._coherent and rev is not None,
+        )
+    
+    async def _check_cached(self, session_id: str, entry) -> Optional[Tuple[Dict, Optional[int]]]:
+        """
+        Serve a memory hit if it still matches Redis.
+        
+        Returns:
+            (session dict, its rev), or None if another worker has written a newer one
+        """
+        if not entry.verified and self._redis.redis_available:
+            try:
+                rev = await self._redis.get_session_rev(session_id)
+            except Exception as e:
+                logger.warning(f"Rev check failed for session {session_id[:8]}..., serving memory copy: {e}")
+                rev = entry.rev
+            
+            if rev is None:
+                # Redis lost it (restart, eviction): restore from memory
+                session = self._deserialize_from_redis(unpack_session(entry.packed))
+                rev = await self._save_to_redis(session_id, session)
+                self._cache_set(session_id, session, rev)
+                return session, rev
+            if rev != entry.rev:
+                self._cache.delete(session_id)
+                return None
+            if self._coherent:
+                self._cache.mark_verified(session_id, rev)
+        
+        return self._deserialize_from_redis(unpack_session(entry.packed)), entry.rev
+    
+    # ========================================================================
+    # Cross-Worker Coherence
+    # ========================================================================
+    
+    def start_coherence(self) -> None:
+        """Follow other workers' session writes (application startup)."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(
+                self._redis.listen_for_invalidations(self._on_invalidate, self._on_listener_change)
+            )
+    
+    async def stop_coherence(self) -> None:
+        """Stop following session writes (application shutdown)."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+    
+    def _on_invalidate(self, session_id: str, rev: int) -> None:
+        """Another worker wrote (or deleted) the session."""
+        self._cache.invalidate(session_id, rev)
+        if rev:
+            self._missing.pop(session_id, None)
+    
+    def _on_listener_change(self, subscribed: bool) -> None:
+        """Announcements may have been missed either way: recheck cached sessions."""
+        self._coherent = subscribed
+        self._cache.unverify_all()
+    
+    async def _load_from_redis(self, session_id: str) -> Tuple[Optional[Dict], Optional[int]]:
+        """Load and deserialize session from Redis, with the rev it was read at."""
         try:
-            redis_data = self._redis.get_session(session_id)
+            redis_data, rev = await self._redis.get_session_with_rev(session_id)
             if redis_data:
-                return self._deserialize_from_redis(redis_data)
+                return self._deserialize_from_redis(redis_data), rev
         except Exception as e:
             logger.error(f"Redis read error for session {session_id[:8]}...: {e}")
-        return None
+        return None, None
     
-    def _save_to_redis(self, session_id: str, session: Dict) -> bool:
-        """Serialize and save session to Redis."""
+    async def _save_to_redis(self, session_id: str, session: Dict) -> Optional[int]:
+        """
+        Serialize and save session to Redis (the write also refreshes the TTL).
+        
+        Returns:
+            Rev written, or None if the session is only in memory
+        """
         try:
             serialized = self._serialize_for_redis(session)
-            success = self._redis.set_session(session_id, serialized)
-            if success:
-                self._redis.extend_session_ttl(session_id)
-            return success
+            rev = await self._redis.compare_and_set_session(
+                session_id, serialized, None, summary=self._summarize(session)
+            )
+            return rev or None
         except Exception as e:
             logger.error(f"Redis write error for session {session_id[:8]}...: {e}")
-            return False
+            return None
+    
+    @staticmethod
+    def _summarize(session: Dict) -> Dict[str, Any]:
+        return build_session_summary(session, get_item_pool().compiled)
     
     # ========================================================================
     # Diagnostics
@@ -477,7 +793,12 @@ class SessionManager:
         """Get storage statistics for monitoring."""
         return {
             "memory_cache": self._cache.stats(),
-            "redis_available": self._redis is not None,
+            "redis_available": self._redis.redis_available,
+            "coherent": self._coherent,
+            "update_conflicts": self._update_conflicts,
+            "shared_loads": self._shared_loads,
+            "negative_cache": {"size": len(self._missing), "hits": self._negative_hits},
+            "locks": self._redis.locks.metrics.stats(),
         }
 
 
@@ -0,0 +1,274 @@
+"""
+Assessment Module - Speculative Next-Batch Selection
+
+After /assessment/answer has sent its response, the next request will
+almost always be an answer to one of the pending items, and each item has
+only 5 or 7 possible values. A background task precomputes the stop check
+and next batch for every (pending item, value) branch, so the following
+submit_answer is a dict lookup instead of uncertainty + selection work.
+
+Branches are keyed by the exact state the handler would compute from
+(response digest and count, pending set, demographics), so a stale or
+foreign entry can never match; back navigation drops a session's
+branches outright.
+
+Modes (SPECULATIVE_SELECTION env var), for A/B latency comparison:
+- off: always compute inline (default)
+- on:  speculate for every session
+- ab:  speculate for a stable half of sessions (by session id)
+
+Usage:
+    speculation = get_speculative_cache()
+    step = speculation.lookup(session_id, score_state, demographics, pending)
+    ...
+    background_tasks.add_task(speculation.precompute, session_id, engine, ...)
+"""
+
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+from app.item_pool import scale_range_for_code
+from app.score_state import ScoreState
+
+from .constants import AssessmentConfig
+from .question_engine import QuestionEngine
+
+logger = logging.getLogger(__name__)
+
+
+SPECULATION_MODES = ("off", "on", "ab")
+SPECULATIVE_SELECTION = os.getenv("SPECULATIVE_SELECTION", "off").lower()
+
+# Sessions whose branches are kept in memory (LRU)
+MAX_SPECULATIVE_SESSIONS = 2000
+
+
+@dataclass
+class SpeculativeStep:
+    """Precomputed outcome of one hypothetical answer."""
+    should_continue: bool
+    reason: str
+    items: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class SpeculativeBatchCache:
+    """
+    Per-session precomputed next steps, bounded by session count.
+
+    Thread-safe: precompute() runs in the background threadpool while
+    handlers call lookup() on the event loop.
+    """
+
+    def __init__(self, mode: str = SPECULATIVE_SELECTION, max_sessions: int = MAX_SPECULATIVE_SESSIONS):
+        if mode not in SPECULATION_MODES:
+            logger.warning(f"Unknown SPECULATIVE_SELECTION={mode!r}, speculation disabled")
+            mode = "off"
+        self.mode = mode
+        self._max_sessions = max_sessions
+        # Session id -> (response count the branches start from, branches)
+        self._sessions: "OrderedDict[str, Tuple[int, Dict[Hashable, SpeculativeStep]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._branches = 0
+        self._invalidations = 0
+
+    # ========================================================================
+    # Mode
+    # ========================================================================
+
+    def enabled_for(self, session_id: str) -> bool:
+        """Whether this session is in the speculative arm."""
+        if self.mode == "on":
+            return True
+        if self.mode == "ab":
+            return zlib.crc32(session_id.encode()) % 2 == 0
+        return False
+
+    # ========================================================================
+    # Lookup / Invalidation
+    # ========================================================================
+
+    @staticmethod
+    def state_key(
+        state: ScoreState,
+        demographics: Dict[str, Any],
+        pending_questions: Set[str]
+    ) -> Hashable:
+        """Key for the state a handler selects from (state digest covers the responses)."""
+        return (
+            state.digest,
+            state.n_responses,
+            frozenset(pending_questions),
+            tuple(sorted((key, str(value)) for key, value in demographics.items())),
+        )
+
+    def lookup(
+        self,
+        session_id: str,
+        state: ScoreState,
+        demographics: Dict[str, Any],
+        pending_questions: Set[str]
+    ) -> Optional[SpeculativeStep]:
+        """
+        Precomputed step for the session's current state, if any.
+
+        Args:
+            session_id: Session identifier
+            state: Score state after the current answer was recorded
+            demographics: Session demographics
+            pending_questions: Pending set after the current answer was removed
+
+        Returns:
+            SpeculativeStep, or None on a miss
+        """
+        key = self.state_key(state, demographics, pending_questions)
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            step = entry[1].get(key) if entry else None
+            if step is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return step
+
+    def invalidate(self, session_id: str) -> None:
+        """Drop a session's branches (back navigation rewinds its state)."""
+        with self._lock:
+            if self._sessions.pop(session_id, None) is not None:
+                self._invalidations += 1
+
+    # ========================================================================
+    # Precomputation
+    # ========================================================================
+
+    def precompute(
+        self,
+        session_id: str,
+        question_engine: QuestionEngine,
+        responses: Dict[str, Any],
+        demographics: Dict[str, Any],
+        pending_questions: Set[str],
+        state: ScoreState,
+        sent_order: Optional[List[str]] = None,
+        max_items: int = AssessmentConfig.SPECULATIVE_MAX_ITEMS,
+    ) -> int:
+        """
+        Compute the next step for every possible answer to the pending items.
+
+        Runs as a background task after the answer response was sent. All
+        arguments must be snapshots the handler no longer mutates.
+
+        Args:
+            session_id: Session identifier
+            question_engine: Engine the handler selects with
+            responses: Responses as of the sent response
+            demographics: Session demographics
+            pending_questions: Pending set as of the sent response
+            state: Score state for responses
+            sent_order: Pending item codes in the order they were sent; the
+                client answers its queue front first, so those are speculated
+                first and the cap keeps the likeliest next answers
+            max_items: Pending items to speculate on
+
+        Returns:
+            Number of branches computed
+        """
+        started = time.perf_counter()
+        order = [code for code in (sent_order or []) if code in pending_questions]
+        order += sorted(pending_questions - set(order))
+
+        branches: Dict[Hashable, SpeculativeStep] = {}
+        for code in order[:max_items]:
+            if question_engine.scorer.compiled.dimension_of(code) is None:
+                continue
+            low, high = scale_range_for_code(code)
+            remaining = pending_questions - {code}
+            for value in range(low, high + 1):
+                branch_state = state.copy()
+                branch_state.record(code, None, value)
+                branch_responses = {**responses, code: value}
+                key = self.state_key(branch_state, demographics, remaining)
+                branches[key] = self._compute_step(
+                    question_engine, branch_responses, demographics, remaining, branch_state
+                )
+
+        with self._lock:
+            current = self._sessions.get(session_id)
+            if current is not None and current[0] > state.n_responses:
+                # A later answer's branches already landed; these are stale
+                return 0
+            self._sessions[session_id] = (state.n_responses, branches)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+            self._branches += len(branches)
+
+        logger.debug(
+            f"Speculated {len(branches)} branches for session {session_id[:8]}... "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return len(branches)
+
+    @staticmethod
+    def _compute_step(
+        question_engine: QuestionEngine,
+        responses: Dict[str, Any],
+        demographics: Dict[str, Any],
+        pending_questions: Set[str],
+        state: ScoreState,
+    ) -> SpeculativeStep:
+        """The stop check and selection submit_answer would run for this state."""
+        uncertainties = question_engine.tester.calculate_session_uncertainties(responses, state)
+        should_continue, reason = question_engine.should_continue_testing(
+            responses, pending_questions, uncertainties=uncertainties
+        )
+        if not should_continue:
+            return SpeculativeStep(should_continue, reason)
+        items = question_engine.select_next_questions(
+            responses=responses,
+            demographics=demographics,
+            pending_questions=pending_questions,
+            max_items=AssessmentConfig.DEFAULT_BATCH_SIZE,
+            uncertainties=uncertainties,
+        )
+        return SpeculativeStep(should_continue, reason, items)
+
+    # ========================================================================
+    # Diagnostics
+    # ========================================================================
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the speculative arm."""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "mode": self.mode,
+                "sessions": len(self._sessions),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate_percent": round(self._hits / total * 100, 2) if total else 0,
+                "branches_computed": self._branches,
+                "invalidations": self._invalidations,
+            }
+
+
+# ============================================================================
+# Shared Instance
+# ============================================================================
+
+_speculative_cache: Optional[SpeculativeBatchCache] = None
+
+
+def get_speculative_cache() -> SpeculativeBatchCache:
+    """Get the process-wide SpeculativeBatchCache."""
+    global _speculative_cache
+    if _speculative_cache is None:
+        _speculative_cache = SpeculativeBatchCache()
+    return _speculative_cache
@@ -4,7 +4,8 @@ Assessment Module - Utility Functions
 Common helper functions used across the assessment module.
 
 Includes:
-- Progress calculation
+- Progress calculation and session summaries
+- Incremental score state
 - Score normalization
 - Response validation analysis
 - Narrative generation helpers
@@ -16,6 +17,8 @@ import secrets
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
+from app.score_state import ScoreState, VERIFY_SCORE_STATE
+
 from .constants import (
     DIMENSIONS,
     AssessmentConfig,
@@ -50,30 +53,129 @@ def calculate_progress(
     return min(progress, 0.95)  # Cap at 95% until actually complete
 
 
-def get_dimension_counts(
-    responses: Dict[str, Any],
-    scorer: Any,  # SelveScorer
-) -> Dict[str, int]:
+def get_dimension_counts_from_state(state: ScoreState) -> Dict[str, int]:
     """
-    Count answered items per dimension.
+    Count answered items per dimension from a session's score state (O(1)).
     
     Args:
-        responses: Answered questions
-        scorer: SelveScorer instance
+        state: Session ScoreState
         
     Returns:
         Dict mapping dimension name to count
     """
     counts = {dim: 0 for dim in DIMENSIONS}
+    for dim_id, dim in enumerate(state.compiled.dimensions):
+        if dim in counts:
+            counts[dim] = state.counts[dim_id]
+    return counts
+
+
+def build_session_summary(session: Dict[str, Any], compiled: Any) -> Dict[str, Any]:
+    """
+    Small summary of a session for the polling endpoints (heartbeat, progress).
     
-    for question_id in responses.keys():
-        for dim in DIMENSIONS:
-            dim_items = scorer.get_items_by_dimension(dim)
-            if any(item['item'] == question_id for item in dim_items):
-                counts[dim] += 1
-                break
+    Stored next to the session on every write, so those endpoints read a few
+    hundred bytes instead of deserializing the session and rebuilding its
+    score state. The stored state is checked by answer count, like
+    get_score_state (digest only with SCORE_STATE_VERIFY=true).
     
-    return counts
+    Args:
+        session: Session dict
+        compiled: CompiledItemPool the session's score state was built against
+        
+    Returns:
+        Summary dict (JSON-serializable)
+    """
+    responses = session.get("responses") or {}
+    data = session.get("score_state")
+    state = ScoreState.from_dict(compiled, data) if data else None
+    if state is None or not state.reflects(responses, check_digest=VERIFY_SCORE_STATE):
+        state = ScoreState.from_responses(compiled, responses)
+    
+    completion_reason = session.get("completion_reason")
+    return {
+        "answered": len(responses),
+        "pending": len(session.get("pending_questions") or ()),
+        "demographics": len(session.get("demographics") or {}),
+        "status": "complete" if completion_reason else "in_progress",
+        "completion_reason": completion_reason,
+        "dimension_progress": get_dimension_counts_from_state(state),
+        "started_at": session.get("started_at"),
+        "last_seen": datetime.now().isoformat(),
+    }
+
+
+# ============================================================================
+# Incremental Score State
+# ============================================================================
+
+def get_score_state(
+    session: Dict[str, Any],
+    scorer: Any,  # SelveScorer
+    verify: bool = VERIFY_SCORE_STATE,
+) -> ScoreState:
+    """
+    Load a session's incremental score state.
+    
+    Rebuilds from the full response dict when the session has no state yet
+    (new session, DB restore, pre-existing Redis entry), the state was saved
+    under a different item pool, or it no longer reflects the responses.
+    The state is saved with the responses on every write, so staleness is
+    checked by answer count; the O(n) response digest is only compared
+    with verify=True (SCORE_STATE_VERIFY=true).
+    
+    Call BEFORE mutating session["responses"] for the current request.
+    
+    Args:
+        session: Session dict
+        scorer: SelveScorer instance (supplies the compiled item pool)
+        verify: Also compare the response digest
+        
+    Returns:
+        ScoreState for the session's current responses
+    """
+    responses = session["responses"]
+    data = session.get("score_state")
+    state = ScoreState.from_dict(scorer.compiled, data) if data else None
+    
+    if state is None or not state.reflects(responses, check_digest=verify):
+        if state is not None:
+            logger.warning(
+                f"Stale score state ({state.n_responses} responses recorded, "
+                f"{len(responses)} in session), rebuilding"
+            )
+        elif data:
+            logger.info("Score state saved under a different item pool, rebuilding")
+        state = ScoreState.from_responses(scorer.compiled, responses)
+    
+    return state
+
+
+def store_score_state(
+    session: Dict[str, Any],
+    state: ScoreState,
+    verify: bool = VERIFY_SCORE_STATE,
+) -> ScoreState:
+    """
+    Save a session's score state after its responses were updated.
+    
+    With verify=True (SCORE_STATE_VERIFY=true), the incremental state is
+    cross-checked against a full rescoring of session["responses"] and
+    replaced by the rebuilt state if they disagree.
+    
+    Args:
+        session: Session dict (responses already updated)
+        state: Incrementally updated ScoreState
+        verify: Cross-check against the full rescoring path
+        
+    Returns:
+        The stored ScoreState
+    """
+    if verify and not state.verify(session["responses"]):
+        state = ScoreState.from_responses(state.compiled, session["responses"])
+    
+    session["score_state"] = state.to_dict()
+    return state
 
 
 # ============================================================================
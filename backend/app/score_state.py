@@ -0,0 +1,338 @@
+"""
+SELVE Incremental Score State
+=============================
+Running per-dimension sums for a single assessment session.
+
+Scoring a profile or its uncertainties only needs, per dimension:
+- n: number of answered items
+- the sum of reverse-scored responses (raw scale, for the profile score)
+- the sum and sum of squares of reverse-scored responses normalized to 0-1
+  (for response variance)
+
+ScoreState keeps exactly those sums, so recording an answer, re-answering
+after back navigation or removing an answer is O(1) instead of rescoring the
+whole response dict. SelveScorer.score_from_state() and
+AdaptiveTester.uncertainties_from_state() read profiles and uncertainties
+straight from it.
+
+Normalized values are stored multiplied by UNIT_DENOMINATOR (12, the least
+common multiple of the 5-point and 7-point scale spans), so integer
+responses keep every sum an exact integer. Add/remove cycles never drift,
+and a state updated incrementally is bit-for-bit equal to one rebuilt from
+the full response dict.
+
+Serialized state carries the item pool fingerprint and an order-independent
+digest of the responses it reflects, so state saved under a different pool
+(item or reverse-key change) or left behind by an edit that bypassed
+record()/discard() is detected and rebuilt instead of silently reused.
+
+Usage:
+    state = ScoreState.from_responses(compiled, responses)
+    state.record('E1', None, 4)   # new answer
+    state.record('E1', 4, 2)      # re-answer
+    state.discard('E1', 2)        # back navigation
+"""
+
+import logging
+import os
+import zlib
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+
+from app.item_pool import CompiledItemPool
+
+logger = logging.getLogger(__name__)
+
+
+# Least common multiple of the 5-point (4) and 7-point (6) scale spans
+UNIT_DENOMINATOR = 12
+
+# Cross-check every incremental update against a full rebuild (debug/staging)
+VERIFY_SCORE_STATE = os.getenv("SCORE_STATE_VERIFY", "false").lower() in ("1", "true", "yes")
+
+# Response digests are sums of per-answer CRCs modulo this
+DIGEST_MODULUS = 1 << 32
+
+
+def response_digest(responses: Mapping[str, float]) -> int:
+    """Order-independent digest of a response dict (see ScoreState.digest)."""
+    return sum(_answer_crc(code, value) for code, value in responses.items()) % DIGEST_MODULUS
+
+
+def _answer_crc(item_code: str, value: float) -> int:
+    # float() so 4 and 4.0 (JSON round trips) hash the same
+    return zlib.crc32(f"{item_code}={float(value)!r}".encode())
+
+
+class ScoreState:
+    """
+    Per-dimension running sums over a session's responses.
+
+    All lists are indexed by dimension id (CompiledItemPool.dimensions order).
+
+    Attributes:
+        counts: Number of answered pool items per dimension
+        sums: Sum of reverse-scored responses per dimension
+        unit_sums: Sum of 0-1 normalized scored responses, times UNIT_DENOMINATOR
+        unit_sumsq: Sum of squared 0-1 normalized responses, times UNIT_DENOMINATOR**2
+        n_responses: Size of the response dict the state reflects
+            (including codes outside the pool), used to detect stale state
+        digest: response_digest() of the response dict the state reflects
+    """
+
+    def __init__(
+        self,
+        compiled: CompiledItemPool,
+        counts: Optional[List[int]] = None,
+        sums: Optional[List[float]] = None,
+        unit_sums: Optional[List[float]] = None,
+        unit_sumsq: Optional[List[float]] = None,
+        n_responses: int = 0,
+        digest: int = 0,
+    ):
+        n_dims = compiled.n_dimensions
+        self.compiled = compiled
+        self.counts = list(counts) if counts is not None else [0] * n_dims
+        self.sums = list(sums) if sums is not None else [0] * n_dims
+        self.unit_sums = list(unit_sums) if unit_sums is not None else [0] * n_dims
+        self.unit_sumsq = list(unit_sumsq) if unit_sumsq is not None else [0] * n_dims
+        self.n_responses = n_responses
+        self.digest = digest
+
+    @classmethod
+    def from_responses(cls, compiled: CompiledItemPool, responses: Mapping[str, float]) -> "ScoreState":
+        """
+        Build state from a full response dict (one vectorized pass).
+
+        Args:
+            compiled: Compiled item pool the responses are scored against
+            responses: Dict of item_code -> response value
+
+        Returns:
+            ScoreState
+        """
+        n_dims = compiled.n_dimensions
+        indices, values = compiled.encode_responses(responses)
+        scored = compiled.reverse_score(indices, values)
+        dims = compiled.dimension_ids[indices]
+        units = (scored - 1) * (UNIT_DENOMINATOR / (compiled.scale_max[indices] - 1))
+
+        return cls(
+            compiled,
+            counts=np.bincount(dims, minlength=n_dims).tolist(),
+            sums=_as_numbers(np.bincount(dims, weights=scored, minlength=n_dims)),
+            unit_sums=_as_numbers(np.bincount(dims, weights=units, minlength=n_dims)),
+            unit_sumsq=_as_numbers(np.bincount(dims, weights=units * units, minlength=n_dims)),
+            n_responses=len(responses),
+            digest=response_digest(responses),
+        )
+
+    def copy(self) -> "ScoreState":
+        """Independent copy (e.g. to score a hypothetical answer)."""
+        return ScoreState(
+            self.compiled,
+            counts=self.counts,
+            sums=self.sums,
+            unit_sums=self.unit_sums,
+            unit_sumsq=self.unit_sumsq,
+            n_responses=self.n_responses,
+            digest=self.digest,
+        )
+
+    # ========================================================================
+    # Incremental Updates
+    # ========================================================================
+
+    def record(self, item_code: str, old_value: Optional[float], new_value: float) -> None:
+        """
+        Record an answer.
+
+        Args:
+            item_code: Item answered
+            old_value: Previous answer for the item, or None if it's a new answer
+            new_value: Answer being stored
+
+        Raises:
+            ValueError: If new_value is outside the item's scale
+        """
+        self._check_value(item_code, new_value)
+        if old_value is None:
+            self.n_responses += 1
+        else:
+            self._apply(item_code, old_value, -1)
+        self._apply(item_code, new_value, 1)
+
+    def discard(self, item_code: str, old_value: float) -> None:
+        """
+        Remove an answer (e.g. back navigation).
+
+        Args:
+            item_code: Item being un-answered
+            old_value: The answer being removed
+        """
+        self.n_responses -= 1
+        self._apply(item_code, old_value, -1)
+
+    def _apply(self, item_code: str, value: float, sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) one response from the sums."""
+        self.digest = (self.digest + sign * _answer_crc(item_code, value)) % DIGEST_MODULUS
+
+        compiled = self.compiled
+        index = compiled.code_to_index.get(item_code)
+        if index is None:
+            # Not a pool item - counted in n_responses only
+            return
+
+        scale_max = int(compiled.scale_max[index])
+        scored = (scale_max + 1 - value) if compiled.reversed[index] else value
+        unit = (scored - 1) * (UNIT_DENOMINATOR // (scale_max - 1))
+
+        dim_id = int(compiled.dimension_ids[index])
+        self.counts[dim_id] += sign
+        self.sums[dim_id] += sign * scored
+        self.unit_sums[dim_id] += sign * unit
+        self.unit_sumsq[dim_id] += sign * unit * unit
+
+    def _check_value(self, item_code: str, value: float) -> None:
+        """Validate a single response the same way SelveScorer._validate_responses does."""
+        min_val, max_val = self.compiled.scale_range(item_code)
+
+        if not isinstance(value, (int, float)):
+            raise ValueError(f"Response for {item_code} must be numeric")
+
+        if value < min_val or value > max_val:
+            raise ValueError(
+                f"Response for {item_code} ({value}) must be between {min_val} and {max_val}"
+            )
+
+    # ========================================================================
+    # Reads
+    # ========================================================================
+
+    def dimension_stats(self, dimension: str) -> Dict[str, float]:
+        """
+        Sufficient statistics for one dimension.
+
+        Returns:
+            Dict with n, scored_sum, unit_sum and unit_sumsq (unit values on 0-1)
+        """
+        dim_id = self.compiled.dimension_index[dimension]
+        return {
+            'n': self.counts[dim_id],
+            'scored_sum': self.sums[dim_id],
+            'unit_sum': self.unit_sums[dim_id] / UNIT_DENOMINATOR,
+            'unit_sumsq': self.unit_sumsq[dim_id] / (UNIT_DENOMINATOR * UNIT_DENOMINATOR),
+        }
+
+    def unit_variance(self, dim_id: int) -> float:
+        """Sample variance of 0-1 normalized scored responses for a dimension."""
+        n = self.counts[dim_id]
+        if n < 2:
+            return 0.0
+        u = self.unit_sums[dim_id]
+        # n*Σu² - (Σu)² is exact for integer responses
+        numerator = n * self.unit_sumsq[dim_id] - u * u
+        return max(0.0, numerator / (n * (n - 1) * UNIT_DENOMINATOR * UNIT_DENOMINATOR))
+
+    # ========================================================================
+    # Verification
+    # ========================================================================
+
+    def matches(self, other: "ScoreState", tolerance: float = 1e-9) -> bool:
+        """Whether two states hold the same sums (within tolerance for float responses)."""
+        if (
+            self.counts != other.counts or
+            self.n_responses != other.n_responses or
+            self.digest != other.digest
+        ):
+            return False
+        for mine, theirs in (
+            (self.sums, other.sums),
+            (self.unit_sums, other.unit_sums),
+            (self.unit_sumsq, other.unit_sumsq),
+        ):
+            if any(abs(a - b) > tolerance for a, b in zip(mine, theirs)):
+                return False
+        return True
+
+    def reflects(self, responses: Mapping[str, float], check_digest: bool = True) -> bool:
+        """
+        Whether this state was built from exactly these responses.
+
+        Args:
+            responses: Dict of item_code -> response value
+            check_digest: Also compare the response digest (O(n)); without
+                it only the count is compared (O(1))
+
+        Returns:
+            True if the count (and digest) match
+        """
+        if self.n_responses != len(responses):
+            return False
+        return not check_digest or self.digest == response_digest(responses)
+
+    def verify(self, responses: Mapping[str, float]) -> bool:
+        """
+        Cross-check this state against a full rebuild from responses.
+
+        Returns:
+            True if the incremental state matches the full rescoring path
+        """
+        expected = ScoreState.from_responses(self.compiled, responses)
+        if self.matches(expected):
+            return True
+        logger.error(
+            f"Score state drift: incremental counts={self.counts} sums={self.sums}, "
+            f"full rebuild counts={expected.counts} sums={expected.sums}"
+        )
+        return False
+
+    # ========================================================================
+    # Serialization
+    # ========================================================================
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form, stored in the session under 'score_state'."""
+        return {
+            'counts': self.counts,
+            'sums': self.sums,
+            'unit_sums': self.unit_sums,
+            'unit_sumsq': self.unit_sumsq,
+            'n_responses': self.n_responses,
+            'digest': self.digest,
+            'pool': self.compiled.fingerprint,
+        }
+
+    @classmethod
+    def from_dict(cls, compiled: CompiledItemPool, data: Mapping[str, Any]) -> Optional["ScoreState"]:
+        """
+        Restore state from to_dict() output.
+
+        Returns:
+            ScoreState, or None if data was saved under a different item pool
+        """
+        if data.get('pool') != compiled.fingerprint:
+            return None
+        try:
+            state = cls(
+                compiled,
+                counts=data['counts'],
+                sums=data['sums'],
+                unit_sums=data['unit_sums'],
+                unit_sumsq=data['unit_sumsq'],
+                n_responses=int(data['n_responses']),
+                digest=int(data['digest']),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        n_dims = compiled.n_dimensions
+        if not all(len(values) == n_dims for values in (state.counts, state.sums, state.unit_sums, state.unit_sumsq)):
+            return None
+        return state
+
+
+def _as_numbers(array: np.ndarray) -> List[float]:
+    """Convert a float array to a list, keeping whole numbers as ints (exact, compact JSON)."""
+    return [int(v) if float(v).is_integer() else float(v) for v in array]
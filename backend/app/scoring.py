@@ -10,6 +10,8 @@ Features:
 - Supports multiple scale types (5-point, 7-point)
 - Generates complete personality profile
 - Validates responses and handles missing data
+- Scores all dimensions in one vectorized pass over a compiled item index
+- Batch-scores many respondents into a dense score matrix (score_batch)
 
 Usage:
     scorer = SelveScorer()
@@ -18,11 +20,23 @@ Usage:
 """
 
 import json
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
+
 import numpy as np
 
+from app.item_pool import get_item_pool
+from app.score_state import ScoreState
+
+
+# For mixed scales, assume 7-point scale as reference (most items)
+REFERENCE_SCALE_MAX = 7
+
+
+def normalize_raw_score(raw_score: float) -> float:
+    """Map a mean scored response (1-7 reference scale) onto 0-100."""
+    return ((raw_score - 1) / (REFERENCE_SCALE_MAX - 1)) * 100
+
 
 @dataclass
 class DimensionScore:
@@ -64,6 +78,20 @@ class SelveProfile:
             'KAEL': self.kael.normalized_score
         }
     
+    @property
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        """Get population percentiles for all dimensions (None until norms are applied)."""
+        return {
+            'LUMEN': self.lumen.percentile,
+            'AETHER': self.aether.percentile,
+            'ORPHEUS': self.orpheus.percentile,
+            'ORIN': self.orin.percentile,
+            'LYRA': self.lyra.percentile,
+            'VARA': self.vara.percentile,
+            'CHRONOS': self.chronos.percentile,
+            'KAEL': self.kael.percentile
+        }
+    
     def to_dict(self):
         return {
             'LUMEN': self.lumen.to_dict(),
@@ -91,6 +119,30 @@ class SelveProfile:
         return [dim for dim, score in sorted(scores, key=lambda x: x[1], reverse=True)[:n]]
 
 
+@dataclass
+class BatchScores:
+    """
+    Scores for many respondents, as dense respondents x dimensions arrays.
+    
+    Row i holds respondent i (input order); column j holds dimensions[j].
+    Values match what score_responses() puts in each DimensionScore.
+    """
+    dimensions: Tuple[str, ...]
+    normalized_scores: np.ndarray  # float64 (n_respondents, n_dimensions), 0-100, 2 dp
+    raw_scores: np.ndarray  # float64 (n_respondents, n_dimensions), 3 dp
+    n_items: np.ndarray  # int (n_respondents, n_dimensions)
+    
+    def __len__(self) -> int:
+        return self.normalized_scores.shape[0]
+    
+    def dimension_scores(self, row: int) -> Dict[str, float]:
+        """Normalized scores for one respondent, like SelveProfile.dimension_scores."""
+        return {
+            dim: float(score)
+            for dim, score in zip(self.dimensions, self.normalized_scores[row])
+        }
+
+
 class SelveScorer:
     """
     SELVE personality assessment scorer.
@@ -123,58 +175,26 @@ class SelveScorer:
             item_pool_path: Path to selve_item_pool_expanded.json
             include_scenarios: Whether to include LaHaye-style scenario items
         """
-        if item_pool_path is None:
-            item_pool_path = Path(__file__).parent / "data" / "selve_item_pool_expanded.json"
+        # Item pool is loaded once per process and shared read-only
+        pool = get_item_pool(item_pool_path, include_scenarios)
         
-        self.item_pool_path = Path(item_pool_path)
+        self.item_pool_path = pool.path
         self.include_scenarios = include_scenarios
-        self.item_pool = self._load_item_pool()
-        self.dimension_items = self._organize_items_by_dimension()
-        
-    def _load_item_pool(self) -> Dict:
-        """Load item pool from JSON file and optionally merge scenarios."""
-        with open(self.item_pool_path, 'r') as f:
-            base_pool = json.load(f)
-        
-        # Merge scenario items if enabled
-        if self.include_scenarios:
-            scenarios_path = self.item_pool_path.parent / "selve_scenarios.json"
-            if scenarios_path.exists():
-                with open(scenarios_path, 'r') as f:
-                    scenarios = json.load(f)
-                
-                # Merge scenarios into base pool
-                for dimension, scenario_items in scenarios.items():
-                    if dimension in base_pool:
-                        base_pool[dimension].extend(scenario_items)
-                    else:
-                        base_pool[dimension] = scenario_items
-        
-        return base_pool
-    
-    def _organize_items_by_dimension(self) -> Dict[str, List[Dict]]:
-        """Organize items by dimension for efficient lookup."""
-        return {
-            dimension: items 
-            for dimension, items in self.item_pool.items()
-        }
+        self.item_pool = pool.dimension_items
+        self.dimension_items = pool.dimension_items
+        self.compiled = pool.compiled
     
     def _get_scale_range(self, item_code: str) -> Tuple[int, int]:
         """
         Determine scale range based on item source.
         
+        Pool items are looked up in the compiled index; unknown codes fall
+        back to prefix rules (Big Five / 16PF: 1-5, HEXACO: 1-7).
+        
         Returns:
             (min_value, max_value) tuple
         """
-        # 16PF Dominance items (D): 1-5 scale
-        if item_code.startswith('D') and item_code[1:].isdigit():
-            return (1, 5)
-        # Big Five items (E, N, A, C, O - single letter + digit): 1-5 scale
-        elif len(item_code) >= 2 and item_code[0] in ['E', 'N', 'A', 'C', 'O'] and item_code[1:].isdigit():
-            return (1, 5)
-        # HEXACO items (H, X, AForg, AGent, AFlex, APati): 1-7 scale
-        else:
-            return (1, 7)
+        return self.compiled.scale_range(item_code)
     
     def _apply_reverse_scoring(self, response: float, is_reversed: bool, scale_max: int) -> float:
         """
@@ -207,35 +227,34 @@ class SelveScorer:
         Returns:
             DimensionScore object
         """
-        items = self.dimension_items[dimension]
-        scored_responses = []
+        counts, sums = self.compiled.dimension_sums(responses)
+        dim_id = self.compiled.dimension_index[dimension]
+        return self._build_dimension_score(dimension, int(counts[dim_id]), float(sums[dim_id]))
+    
+    def _build_dimension_score(
+        self,
+        dimension: str,
+        n_items: int,
+        scored_sum: float
+    ) -> DimensionScore:
+        """
+        Build a DimensionScore from the count and sum of reverse-scored responses.
         
-        for item_info in items:
-            item_code = item_info['item']
-            
-            # Skip if user didn't respond to this item
-            if item_code not in responses:
-                continue
-            
-            response = responses[item_code]
-            is_reversed = item_info['reversed']
-            _, scale_max = self._get_scale_range(item_code)
+        Args:
+            dimension: Dimension name (e.g., 'LUMEN')
+            n_items: Number of answered items in the dimension
+            scored_sum: Sum of reverse-scored response values
             
-            # Apply reverse scoring if needed
-            scored_value = self._apply_reverse_scoring(response, is_reversed, scale_max)
-            scored_responses.append(scored_value)
-        
-        # Calculate raw score (mean of scored responses)
-        if not scored_responses:
+        Returns:
+            DimensionScore object
+        """
+        if n_items == 0:
             raw_score = 0.0
             normalized_score = 0.0
         else:
-            raw_score = np.mean(scored_responses)
-            
-            # Normalize to 0-100 scale
-            # For mixed scales, assume 7-point scale as reference (most items)
-            reference_scale_max = 7
-            normalized_score = ((raw_score - 1) / (reference_scale_max - 1)) * 100
+            # Raw score is the mean of scored responses
+            raw_score = scored_sum / n_items
+            normalized_score = normalize_raw_score(raw_score)
         
         # Generate interpretation
         interpretation = self._interpret_score(dimension, normalized_score)
@@ -244,7 +263,7 @@ class SelveScorer:
             dimension=dimension,
             raw_score=round(raw_score, 3),
             normalized_score=round(normalized_score, 2),
-            n_items=len(scored_responses),
+            n_items=n_items,
             interpretation=interpretation
         )
     
@@ -294,25 +313,126 @@ class SelveScorer:
         if validate:
             self._validate_responses(responses)
         
-        # Calculate scores for each dimension
-        lumen_score = self._calculate_dimension_score('LUMEN', responses)
-        aether_score = self._calculate_dimension_score('AETHER', responses)
-        orpheus_score = self._calculate_dimension_score('ORPHEUS', responses)
-        orin_score = self._calculate_dimension_score('ORIN', responses)
-        lyra_score = self._calculate_dimension_score('LYRA', responses)
-        vara_score = self._calculate_dimension_score('VARA', responses)
-        chronos_score = self._calculate_dimension_score('CHRONOS', responses)
-        kael_score = self._calculate_dimension_score('KAEL', responses)
+        # One vectorized pass computes count and scored sum for every dimension
+        counts, sums = self.compiled.dimension_sums(responses)
+        return self._build_profile(counts, sums)
+    
+    def score_from_state(self, state: ScoreState) -> SelveProfile:
+        """
+        Generate a SELVE profile from a session's incremental score state.
+        
+        Equivalent to score_responses() on the responses the state was built
+        from, without touching the response dict. Responses are validated as
+        they are recorded into the state.
+        
+        Args:
+            state: ScoreState built against this scorer's compiled item pool
+            
+        Returns:
+            SelveProfile object with all dimension scores
+        """
+        return self._build_profile(state.counts, state.sums)
+    
+    def score_batch(
+        self,
+        responses: Union[Iterable[Dict[str, float]], Any],
+        validate: bool = True
+    ) -> BatchScores:
+        """
+        Score many respondents at once.
+        
+        Accepts either:
+        - a SciPy sparse matrix of shape (n_respondents, compiled.n_items), with
+          columns in compiled.item_codes order and unanswered items left
+          unstored (0), or
+        - an iterable of response dicts (streamed; consumed once)
+        
+        No per-respondent objects are built: every answer becomes one entry
+        in flat (row, item, value) arrays and all dimension sums come out of a
+        single bincount.
+        
+        Args:
+            responses: Sparse respondents x items matrix, or iterable of dicts
+            validate: Whether to validate responses before scoring
+            
+        Returns:
+            BatchScores with one row per respondent
+            
+        Raises:
+            ValueError: If responses are invalid
+        """
+        compiled = self.compiled
+        
+        if hasattr(responses, 'tocoo'):
+            matrix = responses.tocoo()
+            if matrix.shape[1] != compiled.n_items:
+                raise ValueError(
+                    f"Response matrix has {matrix.shape[1]} columns, item pool has {compiled.n_items} items"
+                )
+            n_rows = matrix.shape[0]
+            answered = matrix.data != 0
+            rows = matrix.row[answered].astype(np.intp)
+            indices = matrix.col[answered].astype(np.intp)
+            values = matrix.data[answered].astype(np.float64)
+            
+            if validate:
+                invalid = (values < 1) | (values > compiled.scale_max[indices])
+                if invalid.any():
+                    i = int(np.argmax(invalid))
+                    code = compiled.item_codes[indices[i]]
+                    raise ValueError(
+                        f"Response for {code} ({values[i]}) in row {rows[i]} must be between "
+                        f"1 and {int(compiled.scale_max[indices[i]])}"
+                    )
+        else:
+            row_parts, index_parts, value_parts = [], [], []
+            n_rows = 0
+            for row_responses in responses:
+                if validate:
+                    self._validate_responses(row_responses)
+                row_indices, row_values = compiled.encode_responses(row_responses)
+                row_parts.append(np.full(len(row_indices), n_rows, dtype=np.intp))
+                index_parts.append(row_indices)
+                value_parts.append(row_values)
+                n_rows += 1
+            
+            rows = np.concatenate(row_parts) if row_parts else np.empty(0, dtype=np.intp)
+            indices = np.concatenate(index_parts) if index_parts else np.empty(0, dtype=np.intp)
+            values = np.concatenate(value_parts) if value_parts else np.empty(0)
+        
+        n_dims = compiled.n_dimensions
+        scored = compiled.reverse_score(indices, values)
+        cells = rows * n_dims + compiled.dimension_ids[indices]
+        counts = np.bincount(cells, minlength=n_rows * n_dims).reshape(n_rows, n_dims)
+        sums = np.bincount(cells, weights=scored, minlength=n_rows * n_dims).reshape(n_rows, n_dims).astype(np.float64)
+        
+        # Unanswered dimensions score 0, as in _build_dimension_score()
+        raw = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+        normalized = np.where(counts > 0, normalize_raw_score(raw), 0.0)
+        
+        return BatchScores(
+            dimensions=compiled.dimensions,
+            normalized_scores=np.round(normalized, 2),
+            raw_scores=np.round(raw, 3),
+            n_items=counts,
+        )
+    
+    def _build_profile(self, counts, sums) -> SelveProfile:
+        """Build a SelveProfile from per-dimension counts and scored sums (dimension-id order)."""
+        scores = {
+            dimension: self._build_dimension_score(dimension, int(counts[dim_id]), float(sums[dim_id]))
+            for dim_id, dimension in enumerate(self.compiled.dimensions)
+        }
         
         return SelveProfile(
-            lumen=lumen_score,
-            aether=aether_score,
-            orpheus=orpheus_score,
-            orin=orin_score,
-            lyra=lyra_score,
-            vara=vara_score,
-            chronos=chronos_score,
-            kael=kael_score
+            lumen=scores['LUMEN'],
+            aether=scores['AETHER'],
+            orpheus=scores['ORPHEUS'],
+            orin=scores['ORIN'],
+            lyra=scores['LYRA'],
+            vara=scores['VARA'],
+            chronos=scores['CHRONOS'],
+            kael=scores['KAEL']
         )
     
     def _validate_responses(self, responses: Dict[str, float]):
@@ -352,8 +472,8 @@ class SelveScorer:
         return all_items
     
     def get_items_by_dimension(self, dimension: str) -> List[Dict]:
-        """Get all items for a specific dimension."""
-        return self.dimension_items.get(dimension, [])
+        """Get all items for a specific dimension (a new list over the shared item dicts)."""
+        return list(self.dimension_items.get(dimension, ()))
     
     def get_quick_screen_items(self, n_per_dimension: int = 2) -> List[Dict]:
         """
@@ -379,6 +499,25 @@ class SelveScorer:
         return quick_items
 
 
+# ============================================================================
+# Shared Instance
+# ============================================================================
+
+_scorer: Optional[SelveScorer] = None
+
+
+def get_scorer() -> SelveScorer:
+    """
+    Get the process-wide SelveScorer for the default item pool.
+
+    The scorer holds no per-user state, so every session shares it.
+    """
+    global _scorer
+    if _scorer is None:
+        _scorer = SelveScorer()
+    return _scorer
+
+
 def example_usage():
     """Example of how to use the SELVE scorer."""
     
@@ -3,6 +3,7 @@ Assessment Service Layer - Prisma Version
 Handles all database operations for the assessment system using Prisma
 """
 
+import json
 import logging
 from typing import Optional, Dict, List, Any
 from datetime import datetime, timezone, timedelta
@@ -11,14 +12,35 @@ from prisma.errors import UniqueViolationError
 
 from app.db import prisma
 from app.utils.db_retry import with_db_retry
-from app.adaptive_testing import AdaptiveTester
-from app.scoring import SelveScorer
-from app.response_validator import ResponseValidator
 
 
 logger = logging.getLogger(__name__)
 
 
+# One statement for any number of in-progress sessions; $1 is a JSON array of
+# rows keyed by column name (see session_persister.session_columns)
+BULK_SESSION_UPDATE_QUERY = """
+UPDATE "AssessmentSession" AS s
+SET "responses" = u."responses",
+    "demographics" = u."demographics",
+    "pendingQuestions" = u."pendingQuestions",
+    "answerHistory" = u."answerHistory",
+    "backNavigationCount" = u."backNavigationCount",
+    "backNavigationLog" = u."backNavigationLog",
+    "updatedAt" = NOW()
+FROM jsonb_to_recordset($1::jsonb) AS u(
+    "id" text,
+    "responses" jsonb,
+    "demographics" jsonb,
+    "pendingQuestions" jsonb,
+    "answerHistory" jsonb,
+    "backNavigationCount" int,
+    "backNavigationLog" jsonb
+)
+WHERE s."id" = u."id"
+"""
+
+
 class AssessmentService:
     """Service for managing assessment sessions and results in database"""
     
@@ -500,6 +522,24 @@ class AssessmentService:
             take=limit
         )
     
+    async def update_sessions_bulk(self, columns_by_session: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Write the in-progress columns of many sessions in one statement
+        
+        Args:
+            columns_by_session: Session ID -> session_columns() output
+            
+        Returns:
+            Number of sessions updated
+        """
+        if not columns_by_session:
+            return 0
+        rows = [{"id": session_id, **columns} for session_id, columns in columns_by_session.items()]
+        return await with_db_retry(
+            lambda: self.db.execute_raw(BULK_SESSION_UPDATE_QUERY, json.dumps(rows)),
+            operation_name="update_sessions_bulk"
+        )
+    
     async def delete_session(self, session_id: str) -> bool:
         """
         Delete session and cascade to results
@@ -527,9 +567,6 @@ def session_to_state_dict(session) -> Dict:
     Convert database session to in-memory state dict
     """
     return {
-        "tester": AdaptiveTester(),
-        "scorer": SelveScorer(),
-        "validator": ResponseValidator(),
         "responses": session.responses or {},
         "demographics": session.demographics or {},
         "pending_questions": set(session.pendingQuestions or []),
@@ -542,6 +579,7 @@ def session_to_state_dict(session) -> Dict:
         "user_id": session.clerkUserId,
         "clerk_user": None,
         "metadata": session.metadata or {},
+        "completion_reason": "Assessment completed" if session.status == "completed" else None,
     }
 
 
@@ -0,0 +1,391 @@
+"""
+Distributed Locks - awaitable, notification-woken, fenced
+
+Locks over the async session store's Redis connection pool (or its
+in-memory fallback), used by the assessment handlers for answer, back
+navigation and results generation.
+
+- Awaitable acquisition: waiting never blocks the event loop
+- Wakeup on release: release pushes to a per-lock list that waiters BLPOP
+  (bounded by the holder's remaining lease, so an expired lock is noticed
+  without a release); the memory fallback resolves waiter futures
+- Fencing tokens: every acquisition increments a per-lock counter; the
+  holder can check it still owns the newest fence before committing work
+- Leases: short expiry renewed by a keepalive task while the holder runs,
+  so a crashed worker frees the lock quickly but long narrative
+  generations keep it
+- Metrics: acquisitions, contention, wait time, timeouts and lost leases
+  per lock kind (the name before the first ':')
+
+Usage:
+    locks = get_async_redis_session_store().locks
+    lock = await locks.acquire("results:abc", lease_seconds=30, wait_seconds=200, keepalive=True)
+    if lock:
+        try:
+            ...
+            if await locks.check_fence(lock):
+                save()
+        finally:
+            await locks.release(lock)
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Longest single BLPOP; stays under the pool's 5s socket timeout
+MAX_WAKE_WAIT_SECONDS = 4.0
+
+# Fence counters outlive any lease; wake lists only need to bridge a release
+FENCE_TTL_MS = 24 * 3600 * 1000
+WAKE_TTL_MS = 60 * 1000
+
+# KEYS: lock, fence. ARGV: token, lease ms, fence ttl ms.
+# Returns the new fence, or 0 if the lock is held.
+ACQUIRE_SCRIPT = """
+if redis.call("set", KEYS[1], ARGV[1], "NX", "PX", ARGV[2]) then
+    local fence = redis.call("incr", KEYS[2])
+    redis.call("pexpire", KEYS[2], ARGV[3])
+    return fence
+end
+return 0
+"""
+
+# KEYS: lock, wake. ARGV: token, wake ttl ms.
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    redis.call("del", KEYS[1])
+    redis.call("rpush", KEYS[2], "1")
+    redis.call("pexpire", KEYS[2], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# KEYS: lock. ARGV: token, lease ms.
+RENEW_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# KEYS: lock, fence. ARGV: token, fence.
+CHECK_FENCE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] and redis.call("get", KEYS[2]) == ARGV[2] then
+    return 1
+end
+return 0
+"""
+
+
+@dataclass
+class LockHandle:
+    """
+    A held lock.
+
+    Attributes:
+        name: Lock name (e.g. "results:<session_id>")
+        token: Owner token, required to renew or release
+        fence: Fencing token; larger than every earlier holder's
+        lease_seconds: Lease length, renewed by the keepalive task if any
+        waited_seconds: Time spent waiting to acquire
+    """
+    name: str
+    token: str
+    fence: int
+    lease_seconds: float
+    waited_seconds: float = 0.0
+    _keepalive: Optional[asyncio.Task] = field(default=None, repr=False)
+
+
+class LockMetrics:
+    """Per-kind lock counters (kind = lock name before the first ':')."""
+
+    def __init__(self):
+        self._kinds: Dict[str, Dict[str, float]] = {}
+
+    def _counters(self, name: str) -> Dict[str, float]:
+        kind = name.split(":", 1)[0]
+        if kind not in self._kinds:
+            self._kinds[kind] = {
+                "acquired": 0,
+                "contended": 0,
+                "timeouts": 0,
+                "released": 0,
+                "lost": 0,
+                "wait_seconds_total": 0.0,
+                "wait_seconds_max": 0.0,
+            }
+        return self._kinds[kind]
+
+    def record_acquired(self, name: str, waited: float, contended: bool) -> None:
+        counters = self._counters(name)
+        counters["acquired"] += 1
+        counters["contended"] += contended
+        counters["wait_seconds_total"] += waited
+        counters["wait_seconds_max"] = max(counters["wait_seconds_max"], waited)
+
+    def record_timeout(self, name: str, waited: float) -> None:
+        counters = self._counters(name)
+        counters["timeouts"] += 1
+        counters["wait_seconds_total"] += waited
+        counters["wait_seconds_max"] = max(counters["wait_seconds_max"], waited)
+
+    def record_released(self, name: str) -> None:
+        self._counters(name)["released"] += 1
+
+    def record_lost(self, name: str) -> None:
+        self._counters(name)["lost"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Counters per lock kind, with mean wait."""
+        stats = {}
+        for kind, counters in self._kinds.items():
+            attempts = counters["acquired"] + counters["timeouts"]
+            stats[kind] = {
+                **counters,
+                "wait_seconds_mean": round(counters["wait_seconds_total"] / attempts, 4) if attempts else 0.0,
+                "contention_rate_percent": round(counters["contended"] / attempts * 100, 2) if attempts else 0,
+            }
+        return stats
+
+
+class AsyncLockManager:
+    """
+    Distributed locks on an AsyncRedisSessionStore.
+
+    Uses the store's client while Redis is available and per-process
+    locks otherwise (same fallback rule as the store's session data).
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self.metrics = LockMetrics()
+
+        # In-memory fallback: name -> (token, expires_at monotonic)
+        self._memory_locks: Dict[str, Tuple[str, float]] = {}
+        self._memory_fences: Dict[str, int] = {}
+        self._memory_waiters: Dict[str, List[asyncio.Future]] = {}
+
+    @property
+    def _redis(self) -> bool:
+        return self._store.redis_available
+
+    # ========================================================================
+    # Acquire / Release
+    # ========================================================================
+
+    async def acquire(
+        self,
+        name: str,
+        lease_seconds: float = 30,
+        wait_seconds: float = 0,
+        keepalive: bool = False,
+    ) -> Optional[LockHandle]:
+        """
+        Acquire a lock, waiting up to wait_seconds for the holder to release.
+
+        Args:
+            name: Lock name (e.g. "results:<session_id>")
+            lease_seconds: Expiry if the holder stops renewing
+            wait_seconds: Max time to wait (0 = try once)
+            keepalive: Renew the lease every lease_seconds / 3 until release
+
+        Returns:
+            LockHandle, or None if the lock stayed held past wait_seconds
+        """
+        token = str(uuid.uuid4())
+        started = time.monotonic()
+        deadline = started + wait_seconds
+        contended = False
+
+        while True:
+            fence = await self._try_acquire(name, token, lease_seconds)
+            if fence:
+                waited = time.monotonic() - started
+                self.metrics.record_acquired(name, waited, contended)
+                lock = LockHandle(name, token, fence, lease_seconds, waited)
+                if keepalive:
+                    lock._keepalive = asyncio.create_task(self._keep_alive(lock))
+                logger.debug(f"🔒 Lock acquired: {name} (fence {fence}, waited {waited:.3f}s)")
+                return lock
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if wait_seconds > 0:
+                    logger.warning(f"⏰ Lock timeout waiting for: {name}")
+                self.metrics.record_timeout(name, time.monotonic() - started)
+                return None
+
+            contended = True
+            await self._wait_for_release(name, remaining)
+
+    async def release(self, lock: LockHandle) -> bool:
+        """
+        Release a lock (only if still the owner) and wake a waiter.
+
+        Returns:
+            True if released, False if the lease had already been lost
+        """
+        if lock._keepalive is not None:
+            lock._keepalive.cancel()
+            lock._keepalive = None
+
+        if self._redis:
+            try:
+                released = bool(await self._store.client.eval(
+                    RELEASE_SCRIPT, 2, _lock_key(lock.name), _wake_key(lock.name), lock.token, WAKE_TTL_MS
+                ))
+            except Exception as e:
+                logger.error(f"❌ Redis unlock error for {lock.name}: {e}")
+                return False
+        else:
+            held = self._memory_locks.get(lock.name)
+            released = held is not None and held[0] == lock.token
+            if released:
+                del self._memory_locks[lock.name]
+                self._wake_memory_waiters(lock.name)
+
+        if released:
+            self.metrics.record_released(lock.name)
+            logger.debug(f"🔓 Lock released: {lock.name}")
+        return released
+
+    async def renew(self, lock: LockHandle) -> bool:
+        """
+        Extend the lease by lease_seconds (only if still the owner).
+
+        Returns:
+            True if renewed, False if the lock was lost
+        """
+        if self._redis:
+            return bool(await self._store.client.eval(
+                RENEW_SCRIPT, 1, _lock_key(lock.name), lock.token, int(lock.lease_seconds * 1000)
+            ))
+
+        held = self._memory_locks.get(lock.name)
+        if held is None or held[0] != lock.token or held[1] <= time.monotonic():
+            return False
+        self._memory_locks[lock.name] = (lock.token, time.monotonic() + lock.lease_seconds)
+        return True
+
+    async def check_fence(self, lock: LockHandle) -> bool:
+        """
+        Whether the lock is still held by this handle and no later holder exists.
+
+        Call before committing work the lock protects.
+        """
+        if self._redis:
+            try:
+                return bool(await self._store.client.eval(
+                    CHECK_FENCE_SCRIPT, 2, _lock_key(lock.name), _fence_key(lock.name), lock.token, lock.fence
+                ))
+            except Exception as e:
+                logger.error(f"❌ Redis fence check error for {lock.name}: {e}")
+                return False
+
+        held = self._memory_locks.get(lock.name)
+        return (
+            held is not None and held[0] == lock.token and held[1] > time.monotonic()
+            and self._memory_fences.get(lock.name) == lock.fence
+        )
+
+    async def is_locked(self, name: str) -> bool:
+        """Check if a lock is currently held."""
+        if self._redis:
+            try:
+                return await self._store.client.exists(_lock_key(name)) > 0
+            except Exception:
+                return False
+        held = self._memory_locks.get(name)
+        return held is not None and held[1] > time.monotonic()
+
+    # ========================================================================
+    # Internals
+    # ========================================================================
+
+    async def _try_acquire(self, name: str, token: str, lease_seconds: float) -> int:
+        """One acquisition attempt; returns the new fence or 0 if held."""
+        if self._redis:
+            try:
+                return int(await self._store.client.eval(
+                    ACQUIRE_SCRIPT, 2, _lock_key(name), _fence_key(name),
+                    token, int(lease_seconds * 1000), FENCE_TTL_MS,
+                ))
+            except Exception as e:
+                logger.error(f"❌ Redis lock error for {name}: {e}")
+                return 0
+
+        held = self._memory_locks.get(name)
+        if held is not None and held[1] > time.monotonic():
+            return 0
+        self._memory_locks[name] = (token, time.monotonic() + lease_seconds)
+        fence = self._memory_fences.get(name, 0) + 1
+        self._memory_fences[name] = fence
+        return fence
+
+    async def _wait_for_release(self, name: str, remaining: float) -> None:
+        """Block until a release notification, the holder's lease ends, or remaining elapses."""
+        if self._redis:
+            try:
+                lease_ms = await self._store.client.pttl(_lock_key(name))
+                if lease_ms == -2:
+                    return  # released or expired in the meantime
+                wait = min(remaining, MAX_WAKE_WAIT_SECONDS)
+                if lease_ms >= 0:
+                    wait = min(wait, lease_ms / 1000)
+                await self._store.client.blpop([_wake_key(name)], timeout=max(wait, 0.01))
+            except Exception as e:
+                logger.error(f"❌ Redis lock wait error for {name}: {e}")
+                await asyncio.sleep(min(remaining, 0.5))
+            return
+
+        held = self._memory_locks.get(name)
+        wait = remaining if held is None else min(remaining, max(held[1] - time.monotonic(), 0))
+        waiter = asyncio.get_running_loop().create_future()
+        self._memory_waiters.setdefault(name, []).append(waiter)
+        try:
+            await asyncio.wait([waiter], timeout=wait)
+        finally:
+            waiters = self._memory_waiters.get(name, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+
+    def _wake_memory_waiters(self, name: str) -> None:
+        for waiter in self._memory_waiters.pop(name, []):
+            if not waiter.done():
+                waiter.set_result(True)
+
+    async def _keep_alive(self, lock: LockHandle) -> None:
+        """Renew the lease every third of its length until released or lost."""
+        try:
+            while True:
+                await asyncio.sleep(lock.lease_seconds / 3)
+                if not await self.renew(lock):
+                    self.metrics.record_lost(lock.name)
+                    logger.warning(f"⚠️ Lock lease lost: {lock.name} (fence {lock.fence})")
+                    return
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.metrics.record_lost(lock.name)
+            logger.error(f"❌ Lock renewal error for {lock.name}: {e}")
+
+
+def _lock_key(name: str) -> str:
+    return f"lock:{name}"
+
+
+def _fence_key(name: str) -> str:
+    return f"lock_fence:{name}"
+
+
+def _wake_key(name: str) -> str:
+    return f"lock_wake:{name}"
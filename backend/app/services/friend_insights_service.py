@@ -214,7 +214,7 @@ class FriendInsightsService:
         now = datetime.utcnow()
         
         # Generate narrative
-        result = generate_friend_insights_narrative(
+        result = await generate_friend_insights_narrative(
             self_scores=self_scores,
             friend_scores=friend_scores,
             blind_spots=blind_spots,
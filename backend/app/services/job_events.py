@@ -0,0 +1,276 @@
+"""
+Job Events - live events of background jobs, for streaming to clients
+
+A job publishes events as it goes (results generation: one per finished
+narrative section, optional text deltas, then "done" or "error"), and
+clients follow them over SSE instead of polling the job's status.
+
+- Every event is appended to the job's Redis stream (job:{id}:events,
+  capped and expiring with the job), so a client that connects late or
+  reconnects with Last-Event-ID replays what it missed.
+- The same call publishes it on JOB_EVENTS_CHANNEL. Each process holds one
+  subscription and hands events to its local subscribers, so waiting
+  clients cost no Redis connections or reads.
+- A subscriber that hears nothing for JOB_EVENTS_IDLE_SECONDS re-reads the
+  stream (catching anything the subscription dropped) and gets None, its
+  cue to send a keepalive or check the job.
+
+If Redis is unavailable, events are kept in memory and only reach
+subscribers in this process.
+
+Usage:
+    events = get_job_events()
+    await events.publish(job.id, "section", {"section": "core_identity", "text": ...})
+    async for event in events.subscribe(job_id, after=last_event_id):
+        if event is None: ...  # idle
+        else: send(event.id, event.type, event.data)
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from app.services.redis_service import get_async_redis_session_store
+
+logger = logging.getLogger(__name__)
+
+
+JOB_EVENTS_CHANNEL = "job_events"
+JOB_EVENTS_TTL_SECONDS = 3600
+JOB_EVENTS_MAX_LEN = 2000  # per job (approximate trim)
+JOB_EVENTS_IDLE_SECONDS = 5.0
+JOB_EVENTS_MEMORY_JOBS = 1000
+
+# KEYS: job's event stream
+# ARGV: max length, type, data json, ttl, channel, job id
+# Returns the new entry's id; "{job id}|{entry id}|{type}|{data}" is published.
+PUBLISH_SCRIPT = """
+local id = redis.call("xadd", KEYS[1], "MAXLEN", "~", ARGV[1], "*", "type", ARGV[2], "data", ARGV[3])
+redis.call("expire", KEYS[1], ARGV[4])
+redis.call("publish", ARGV[5], ARGV[6] .. "|" .. id .. "|" .. ARGV[2] .. "|" .. ARGV[3])
+return id
+"""
+
+
+@dataclass
+class JobEvent:
+    """
+    One job event.
+
+    Attributes:
+        id: Stream entry id ("{ms}-{seq}"), usable as SSE id / Last-Event-ID
+        type: Event type (e.g. "section", "delta", "done", "error")
+        data: Event payload
+    """
+    id: str
+    type: str
+    data: Dict[str, Any]
+
+
+def events_key(job_id: str) -> str:
+    """Key of a job's event stream."""
+    return f"job:{job_id}:events"
+
+
+def _order(event_id: str) -> Tuple[int, int]:
+    ms, _, seq = event_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def _text(value: Any) -> Any:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class JobEvents:
+    """
+    Publishes job events and fans them out to this process's subscribers.
+    """
+
+    def __init__(self, store, idle_seconds: float = JOB_EVENTS_IDLE_SECONDS):
+        self._store = store
+        self._idle_seconds = idle_seconds
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._script = None
+        self._script_client = None
+
+        # Redis unavailable: events per job, newest jobs last
+        self._memory: "OrderedDict[str, List[JobEvent]]" = OrderedDict()
+        self._memory_seq = 0
+
+        self._published = 0
+        self._delivered = 0
+        self._catch_up_reads = 0
+
+    @property
+    def _redis(self) -> bool:
+        return self._store.redis_available
+
+    # ========================================================================
+    # Publishing
+    # ========================================================================
+
+    async def publish(self, job_id: str, event_type: str, data: Dict[str, Any]) -> Optional[str]:
+        """
+        Append an event to a job's stream and announce it.
+
+        Best effort: clients fall back to the job's status if events are lost.
+
+        Returns:
+            Event id, or None if it couldn't be published
+        """
+        payload = json.dumps(data)
+        self._published += 1
+        if not self._redis:
+            return self._publish_memory(job_id, event_type, data)
+
+        if self._script_client is not self._store.client:
+            self._script_client = self._store.client
+            self._script = self._script_client.register_script(PUBLISH_SCRIPT)
+        try:
+            event_id = await self._script(
+                keys=[events_key(job_id)],
+                args=[JOB_EVENTS_MAX_LEN, event_type, payload, JOB_EVENTS_TTL_SECONDS, JOB_EVENTS_CHANNEL, job_id],
+            )
+        except Exception as e:
+            logger.warning(f"Could not publish {event_type} event for job {job_id[:8]}: {e}")
+            return None
+        return _text(event_id)
+
+    def _publish_memory(self, job_id: str, event_type: str, data: Dict[str, Any]) -> str:
+        self._memory_seq += 1
+        event = JobEvent(f"{int(time.time() * 1000)}-{self._memory_seq}", event_type, data)
+        self._memory.setdefault(job_id, []).append(event)
+        self._memory.move_to_end(job_id)
+        while len(self._memory) > JOB_EVENTS_MEMORY_JOBS:
+            self._memory.popitem(last=False)
+        self._deliver(job_id, event)
+        return event.id
+
+    def _deliver(self, job_id: str, event: JobEvent) -> None:
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait(event)
+            self._delivered += 1
+
+    # ========================================================================
+    # Subscribing
+    # ========================================================================
+
+    async def subscribe(self, job_id: str, after: str = "0") -> AsyncIterator[Optional[JobEvent]]:
+        """
+        A job's events after the given id: stored ones first, then live ones.
+
+        Yields None whenever nothing arrived for the idle interval. Runs
+        until the caller stops iterating.
+
+        Args:
+            job_id: Job to follow
+            after: Last event id the client has ("0" = from the start)
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        if self._redis and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+        last = after or "0"
+        try:
+            for event in await self._read(job_id, last):
+                last = event.id
+                yield event
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=self._idle_seconds)
+                except asyncio.TimeoutError:
+                    self._catch_up_reads += 1
+                    for missed in await self._read(job_id, last):
+                        last = missed.id
+                        yield missed
+                    yield None
+                    continue
+                if _order(event.id) <= _order(last):
+                    continue  # already replayed
+                last = event.id
+                yield event
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    async def _read(self, job_id: str, after: str) -> List[JobEvent]:
+        """Stored events after an id."""
+        if not self._redis:
+            return [event for event in self._memory.get(job_id, []) if _order(event.id) > _order(after)]
+        try:
+            entries = await self._store.client.xrange(
+                events_key(job_id), min="-" if after == "0" else f"({after}", max="+"
+            )
+        except Exception as e:
+            logger.debug(f"Job event read failed: {e}")
+            return []
+        return [
+            JobEvent(_text(entry_id), _text(fields[b"type"]), json.loads(fields[b"data"]))
+            for entry_id, fields in entries
+        ]
+
+    async def _listen(self, retry_seconds: float = 1.0) -> None:
+        """Hand announced events to local subscribers until cancelled."""
+        while True:
+            pubsub = self._store.client.pubsub()
+            try:
+                await pubsub.subscribe(JOB_EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    job_id, event_id, event_type, data = _text(message["data"]).split("|", 3)
+                    if job_id in self._subscribers:
+                        self._deliver(job_id, JobEvent(event_id, event_type, json.loads(data)))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Job event subscription lost: {e}")
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(retry_seconds)
+
+    async def stop(self) -> None:
+        """Drop the subscription (application shutdown)."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Event counters for monitoring."""
+        return {
+            "subscribed_jobs": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self._published,
+            "delivered": self._delivered,
+            "catch_up_reads": self._catch_up_reads,
+        }
+
+
+# ============================================================================
+# Global Instance
+# ============================================================================
+
+_job_events: Optional[JobEvents] = None
+
+
+def get_job_events() -> JobEvents:
+    """Get or create the process-wide JobEvents."""
+    global _job_events
+    if _job_events is None:
+        _job_events = JobEvents(get_async_redis_session_store())
+    return _job_events
@@ -0,0 +1,565 @@
+"""
+Job Runner - background jobs with persisted records, idempotency and retries
+
+Work too slow for a request (results narrative generation: several LLM
+calls, then a database write) is enqueued instead and run by a bounded
+pool of asyncio workers in each API process, so requests return at once
+and traffic spikes queue up rather than time out at the proxy.
+
+- Records: every job is a Redis hash (job:{id}) with its kind, payload,
+  status (queued, running, succeeded, failed, cancelled), attempts, last
+  error and result, kept JOB_RECORD_TTL_SECONDS after it was enqueued.
+- Idempotency: enqueue() with a key (e.g. "results:{session_id}") returns
+  the job already queued, running or done for it; only failed or cancelled
+  jobs are replaced.
+- Queue: jobs:due (sorted set, job id -> time it may run). Workers on any
+  process claim the earliest due job atomically and hold a lease on it in
+  jobs:running, renewed while it runs; a worker that dies loses the lease
+  and the job is queued again.
+- Retries: a failed attempt is re-queued after JOB_RETRY_BASE_SECONDS *
+  2^(attempt - 1), up to the kind's max_attempts. Raise JobFailed to fail
+  without retrying.
+- Cancellation: cancel() drops a queued job; a running one is cancelled
+  by the worker holding it at its next lease renewal.
+
+If Redis is unavailable, jobs are kept in memory and run by this process.
+
+Usage:
+    runner = get_job_runner()
+    runner.register("results", run_results_job, max_attempts=3)
+    runner.start()                                     # application startup
+    job = await runner.enqueue("results", {"session_id": sid}, idempotency_key=f"results:{sid}")
+    job = await runner.get_job(job.id)
+    await runner.cancel(job.id)
+    await runner.stop()                                # application shutdown
+"""
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from app.services.redis_service import get_async_redis_session_store
+
+logger = logging.getLogger(__name__)
+
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_BASE_SECONDS = 2.0
+JOB_LEASE_SECONDS = 60
+JOB_POLL_INTERVAL = 0.5
+JOB_RECORD_TTL_SECONDS = 24 * 3600
+
+JOB_KEY_PREFIX = "job:"  # hash per job
+IDEMPOTENCY_KEY_PREFIX = "job_key:"  # idempotency key -> job id
+DUE_KEY = "jobs:due"  # sorted set: job id -> time it may run
+RUNNING_KEY = "jobs:running"  # sorted set: job id -> lease deadline
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# KEYS: idempotency key, job hash, due set
+# ARGV: job id, now, record ttl, then job hash field/value pairs
+# Returns the id of the live job for the key: an existing one unless it
+# failed or was cancelled, else the new one (queued, due now).
+ENQUEUE_SCRIPT = """
+local existing = redis.call("get", KEYS[1])
+if existing then
+    local status = redis.call("hget", "job:" .. existing, "status")
+    if status and status ~= "failed" and status ~= "cancelled" then
+        return existing
+    end
+end
+redis.call("set", KEYS[1], ARGV[1], "EX", ARGV[3])
+redis.call("hset", KEYS[2], unpack(ARGV, 4))
+redis.call("expire", KEYS[2], ARGV[3])
+redis.call("zadd", KEYS[3], ARGV[2], ARGV[1])
+return ARGV[1]
+"""
+
+# KEYS: due set, running set
+# ARGV: now, lease deadline
+# Re-queues jobs whose lease expired (their worker died), then moves the
+# earliest due job to the running set. Returns its id, or false.
+CLAIM_SCRIPT = """
+for _, id in ipairs(redis.call("zrangebyscore", KEYS[2], "-inf", ARGV[1])) do
+    redis.call("zrem", KEYS[2], id)
+    if redis.call("hget", "job:" .. id, "status") == "running" then
+        redis.call("hset", "job:" .. id, "status", "queued")
+        redis.call("zadd", KEYS[1], ARGV[1], id)
+    end
+end
+local due = redis.call("zrangebyscore", KEYS[1], "-inf", ARGV[1], "LIMIT", 0, 1)
+if #due == 0 then return false end
+local id = due[1]
+redis.call("zrem", KEYS[1], id)
+if redis.call("hget", "job:" .. id, "status") ~= "queued" then return false end
+redis.call("zadd", KEYS[2], ARGV[2], id)
+redis.call("hset", "job:" .. id, "status", "running", "updated_at", ARGV[1])
+redis.call("hincrby", "job:" .. id, "attempts", 1)
+return id
+"""
+
+# KEYS: job hash, due set
+# ARGV: job id, now
+# Queued jobs are cancelled at once; running ones are flagged for their
+# worker. Returns the status after the call.
+CANCEL_SCRIPT = """
+local status = redis.call("hget", KEYS[1], "status")
+if status == "queued" then
+    redis.call("zrem", KEYS[2], ARGV[1])
+    redis.call("hset", KEYS[1], "status", "cancelled", "updated_at", ARGV[2])
+    return "cancelled"
+elseif status == "running" then
+    redis.call("hset", KEYS[1], "cancel_requested", "1")
+end
+return status or false
+"""
+
+
+class JobFailed(Exception):
+    """Raised by a handler to fail its job without retrying."""
+
+
+@dataclass
+class Job:
+    """
+    One background job, as recorded.
+
+    Attributes:
+        id: Job ID
+        kind: Registered handler name
+        payload: Handler arguments (JSON-serializable)
+        status: queued | running | succeeded | failed | cancelled
+        attempts: Attempts started so far
+        error: Last attempt's error
+        result: Handler return value, once succeeded
+        idempotency_key: Key the job was enqueued under
+        created_at, updated_at: Unix times
+    """
+    id: str
+    kind: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    status: str = QUEUED
+    attempts: int = 0
+    error: Optional[str] = None
+    result: Any = None
+    idempotency_key: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED, CANCELLED)
+
+    def to_fields(self) -> Dict[str, str]:
+        """Redis hash fields."""
+        return {
+            "kind": self.kind,
+            "payload": json.dumps(self.payload),
+            "status": self.status,
+            "attempts": str(self.attempts),
+            "error": self.error or "",
+            "result": json.dumps(self.result),
+            "idempotency_key": self.idempotency_key or "",
+            "created_at": repr(self.created_at),
+            "updated_at": repr(self.updated_at),
+        }
+
+    @classmethod
+    def from_fields(cls, job_id: str, fields: Dict[Any, Any]) -> "Job":
+        """Inverse of to_fields() (HGETALL reply, bytes or str)."""
+        fields = {_text(name): _text(value) for name, value in fields.items()}
+        return cls(
+            id=job_id,
+            kind=fields["kind"],
+            payload=json.loads(fields["payload"]),
+            status=fields["status"],
+            attempts=int(fields.get("attempts", 0)),
+            error=fields.get("error") or None,
+            result=json.loads(fields.get("result") or "null"),
+            idempotency_key=fields.get("idempotency_key") or None,
+            created_at=float(fields["created_at"]),
+            updated_at=float(fields["updated_at"]),
+        )
+
+
+@dataclass
+class _Handler:
+    run: Callable[[Job], Awaitable[Any]]
+    max_attempts: int
+
+
+class JobRunner:
+    """
+    Bounded asyncio worker pool over a Redis-backed job queue.
+
+    Attributes:
+        workers: Jobs this process runs at once
+        lease_seconds: Lease on a running job (renewed every third of it)
+        retry_base: First retry delay; doubles per attempt
+    """
+
+    def __init__(
+        self,
+        store,
+        workers: int = JOB_WORKERS,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        retry_base: float = JOB_RETRY_BASE_SECONDS,
+        poll_interval: float = JOB_POLL_INTERVAL,
+    ):
+        self._store = store
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.retry_base = retry_base
+        self._poll_interval = poll_interval
+
+        self._handlers: Dict[str, _Handler] = {}
+        self._scripts: Dict[str, Any] = {}
+        self._scripts_client = None
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancel_requested: Set[str] = set()
+        self._wake = asyncio.Event()
+
+        # Redis unavailable: records and queue in memory
+        self._memory_jobs: Dict[str, Job] = {}
+        self._memory_keys: Dict[str, str] = {}
+        self._memory_due: List[str] = []
+
+        self._enqueued = 0
+        self._deduplicated = 0
+        self._succeeded = 0
+        self._failed = 0
+        self._retried = 0
+        self._cancelled = 0
+
+    def register(self, kind: str, handler: Callable[[Job], Awaitable[Any]], max_attempts: int = JOB_MAX_ATTEMPTS) -> None:
+        """
+        Register the handler for a job kind.
+
+        Args:
+            kind: Job kind
+            handler: Coroutine taking the Job; its return value (JSON-serializable) is recorded
+            max_attempts: Attempts before the job fails
+        """
+        self._handlers[kind] = _Handler(handler, max_attempts)
+
+    @property
+    def _redis(self) -> bool:
+        return self._store.redis_available
+
+    def _script(self, name: str, source: str):
+        """Script registered on the store's current client"""
+        if self._scripts_client is not self._store.client:
+            self._scripts_client = self._store.client
+            self._scripts = {}
+        if name not in self._scripts:
+            self._scripts[name] = self._scripts_client.register_script(source)
+        return self._scripts[name]
+
+    # ========================================================================
+    # Jobs
+    # ========================================================================
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any], idempotency_key: Optional[str] = None) -> Job:
+        """
+        Queue a job, or return the live one for its idempotency key.
+
+        Args:
+            kind: Registered job kind
+            payload: Handler arguments
+            idempotency_key: Jobs with the same key run once (until one fails or is cancelled)
+
+        Returns:
+            The job (new or existing)
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind {kind!r}")
+        job = Job(id=secrets.token_hex(12), kind=kind, payload=payload, idempotency_key=idempotency_key)
+
+        if not self._redis:
+            existing = self._memory_jobs.get(self._memory_keys.get(idempotency_key or "", ""))
+            if existing is not None and existing.status not in (FAILED, CANCELLED):
+                self._deduplicated += 1
+                return existing
+            self._memory_jobs[job.id] = job
+            if idempotency_key:
+                self._memory_keys[idempotency_key] = job.id
+            self._memory_due.append(job.id)
+        else:
+            args: List[Any] = [job.id, time.time(), JOB_RECORD_TTL_SECONDS]
+            for name, value in job.to_fields().items():
+                args.extend((name, value))
+            key = IDEMPOTENCY_KEY_PREFIX + (idempotency_key or job.id)
+            job_id = _text(await self._script("enqueue", ENQUEUE_SCRIPT)(
+                keys=[key, JOB_KEY_PREFIX + job.id, DUE_KEY], args=args
+            ))
+            if job_id != job.id:
+                self._deduplicated += 1
+                return await self.get_job(job_id) or job
+
+        self._enqueued += 1
+        self._wake.set()
+        logger.info(f"Queued {kind} job {job.id[:8]}")
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[Job]:
+        """A job's current record, or None if unknown or expired."""
+        if not self._redis:
+            return self._memory_jobs.get(job_id)
+        fields = await self._store.client.hgetall(JOB_KEY_PREFIX + job_id)
+        return Job.from_fields(job_id, fields) if fields else None
+
+    async def find_job(self, idempotency_key: str) -> Optional[Job]:
+        """The latest job enqueued under an idempotency key."""
+        if not self._redis:
+            return self._memory_jobs.get(self._memory_keys.get(idempotency_key, ""))
+        job_id = await self._store.client.get(IDEMPOTENCY_KEY_PREFIX + idempotency_key)
+        return await self.get_job(_text(job_id)) if job_id else None
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job: a queued one at once, a running one at its worker's next lease renewal.
+
+        Returns:
+            True if the job was queued or running
+        """
+        if not self._redis:
+            job = self._memory_jobs.get(job_id)
+            if job is None or job.done:
+                return False
+            if job.status == QUEUED:
+                self._memory_due.remove(job_id)
+                self._set_status(job, CANCELLED)
+                self._cancelled += 1
+            task = self._running.get(job_id)
+            if task is not None:
+                self._cancel_requested.add(job_id)
+                task.cancel()
+            return True
+
+        status = _text(await self._script("cancel", CANCEL_SCRIPT)(
+            keys=[JOB_KEY_PREFIX + job_id, DUE_KEY], args=[job_id, time.time()]
+        ))
+        if status == CANCELLED:
+            self._cancelled += 1
+        task = self._running.get(job_id)
+        if status == RUNNING and task is not None:
+            self._cancel_requested.add(job_id)
+            task.cancel()  # running here: no need to wait for the renewal
+        return status in (CANCELLED, RUNNING)
+
+    # ========================================================================
+    # Workers
+    # ========================================================================
+
+    async def _claim(self) -> Optional[Job]:
+        """Next due job (now running, attempts incremented), or None."""
+        if not self._redis:
+            if not self._memory_due:
+                return None
+            job = self._memory_jobs[self._memory_due.pop(0)]
+            job.attempts += 1
+            self._set_status(job, RUNNING)
+            return job
+
+        now = time.time()
+        job_id = await self._script("claim", CLAIM_SCRIPT)(
+            keys=[DUE_KEY, RUNNING_KEY], args=[now, now + self.lease_seconds]
+        )
+        return await self.get_job(_text(job_id)) if job_id else None
+
+    async def run_next(self) -> Optional[Job]:
+        """
+        Claim and run one due job.
+
+        Returns:
+            The job as finished (succeeded, failed, cancelled or re-queued), or None if none was due
+        """
+        job = await self._claim()
+        if job is None:
+            return None
+
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            await self._finish(job, FAILED, error=f"No handler for job kind {job.kind!r}")
+            return job
+
+        task = asyncio.ensure_future(handler.run(job))
+        self._running[job.id] = task
+        watchdog = asyncio.create_task(self._keep_lease(job, task)) if self._redis else None
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if job.id not in self._cancel_requested:
+                raise  # the worker itself is stopping; the lease lapses and the job is re-queued
+            await self._finish(job, CANCELLED)
+            self._cancelled += 1
+            logger.info(f"Cancelled {job.kind} job {job.id[:8]}")
+            if asyncio.current_task().cancelling():
+                raise  # cancelled while the worker is stopping, too
+        except Exception as e:
+            permanent = isinstance(e, JobFailed) or job.attempts >= handler.max_attempts
+            if permanent:
+                await self._finish(job, FAILED, error=str(e))
+                self._failed += 1
+                logger.error(f"❌ {job.kind} job {job.id[:8]} failed after {job.attempts} attempt(s): {e}")
+            else:
+                delay = self.retry_base * 2 ** (job.attempts - 1)
+                await self._retry(job, str(e), delay)
+                self._retried += 1
+                logger.warning(f"⚠️ {job.kind} job {job.id[:8]} attempt {job.attempts} failed, retrying in {delay:.0f}s: {e}")
+        else:
+            await self._finish(job, SUCCEEDED, result=result)
+            self._succeeded += 1
+        finally:
+            self._running.pop(job.id, None)
+            self._cancel_requested.discard(job.id)
+            if watchdog is not None:
+                watchdog.cancel()
+        return job
+
+    async def _keep_lease(self, job: Job, task: asyncio.Task) -> None:
+        """Renew a running job's lease; cancel it if cancellation was requested."""
+        key = JOB_KEY_PREFIX + job.id
+        while not task.done():
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self._store.client.pipeline(transaction=True) as pipe:
+                    pipe.zadd(RUNNING_KEY, {job.id: time.time() + self.lease_seconds}, xx=True)
+                    pipe.hget(key, "cancel_requested")
+                    _, cancel_requested = await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Lease renewal failed for job {job.id[:8]}: {e}")
+                continue
+            if cancel_requested:
+                self._cancel_requested.add(job.id)
+                task.cancel()
+
+    async def _finish(self, job: Job, status: str, error: Optional[str] = None, result: Any = None) -> None:
+        job.error, job.result = error, result
+        self._set_status(job, status)
+        if not self._redis:
+            return
+        try:
+            async with self._store.client.pipeline(transaction=True) as pipe:
+                pipe.hset(JOB_KEY_PREFIX + job.id, mapping={
+                    "status": status,
+                    "error": error or "",
+                    "result": json.dumps(result),
+                    "updated_at": repr(job.updated_at),
+                })
+                pipe.zrem(RUNNING_KEY, job.id)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ Could not record {status} job {job.id[:8]}: {e}")
+
+    async def _retry(self, job: Job, error: str, delay: float) -> None:
+        job.error = error
+        self._set_status(job, QUEUED)
+        if not self._redis:
+            asyncio.get_running_loop().call_later(delay, self._requeue_memory, job.id)
+            return
+        async with self._store.client.pipeline(transaction=True) as pipe:
+            pipe.hset(JOB_KEY_PREFIX + job.id, mapping={"status": QUEUED, "error": error, "updated_at": repr(job.updated_at)})
+            pipe.zrem(RUNNING_KEY, job.id)
+            pipe.zadd(DUE_KEY, {job.id: time.time() + delay})
+            await pipe.execute()
+
+    def _requeue_memory(self, job_id: str) -> None:
+        job = self._memory_jobs.get(job_id)
+        if job is not None and job.status == QUEUED:
+            self._memory_due.append(job_id)
+            self._wake.set()
+
+    @staticmethod
+    def _set_status(job: Job, status: str) -> None:
+        job.status = status
+        job.updated_at = time.time()
+
+    async def _work(self) -> None:
+        """One worker: run due jobs, waiting for an enqueue or the poll interval in between."""
+        while True:
+            try:
+                job = await self.run_next()
+            except Exception as e:
+                logger.error(f"❌ Job worker error: {e}")
+                job = None
+            if job is None:
+                await self._idle()
+
+    async def _idle(self) -> None:
+        """Wait for an enqueue or the poll interval (asyncio.wait never mistakes a stop for the timeout)."""
+        woken = asyncio.ensure_future(self._wake.wait())
+        try:
+            await asyncio.wait({woken}, timeout=self._poll_interval)
+        finally:
+            woken.cancel()
+        self._wake.clear()
+
+    # ========================================================================
+    # Lifecycle
+    # ========================================================================
+
+    def start(self) -> None:
+        """Start the worker pool (application startup)."""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """
+        Stop the workers (application shutdown).
+
+        Running handlers are cancelled without recording an outcome: in
+        Redis mode their jobs are picked up by another worker once the
+        lease lapses.
+        """
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Job counters for monitoring."""
+        return {
+            "workers": self.workers,
+            "running": len(self._running),
+            "enqueued": self._enqueued,
+            "deduplicated": self._deduplicated,
+            "succeeded": self._succeeded,
+            "failed": self._failed,
+            "retried": self._retried,
+            "cancelled": self._cancelled,
+        }
+
+
+def _text(value: Any) -> Any:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+# ============================================================================
+# Global Runner Instance
+# ============================================================================
+
+_job_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> JobRunner:
+    """Get or create the process-wide JobRunner."""
+    global _job_runner
+    if _job_runner is None:
+        _job_runner = JobRunner(get_async_redis_session_store())
+    return _job_runner
@@ -0,0 +1,240 @@
+"""
+Norms Service - keeps percentile norms in sync with stored results
+
+Loads the compact norms snapshot from Redis at startup, then folds in only
+AssessmentResult rows created since the snapshot's watermark (indexed
+createdAt range query - never a full-table scan after the first build).
+Results saved by this worker are added immediately via record_result().
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Mapping, Optional
+
+from app.db import prisma
+from app.norms import PercentileNorms, get_norms, strata_for_demographics
+from app.services.redis_service import get_async_redis_session_store
+
+logger = logging.getLogger(__name__)
+
+
+NORMS_SNAPSHOT_KEY = "norms:snapshot"
+NORMS_REFRESH_INTERVAL_SECONDS = 300
+NORMS_REFRESH_PAGE_SIZE = 1000
+
+# Re-read this far behind the watermark so rows committed slightly out of
+# createdAt order aren't missed; ids already folded in are skipped
+NORMS_REFRESH_OVERLAP = timedelta(minutes=2)
+
+# AssessmentResult column for each dimension
+SCORE_FIELDS = {
+    "LUMEN": "scoreLumen",
+    "AETHER": "scoreAether",
+    "ORPHEUS": "scoreOrpheus",
+    "ORIN": "scoreOrin",
+    "LYRA": "scoreLyra",
+    "VARA": "scoreVara",
+    "CHRONOS": "scoreChronos",
+    "KAEL": "scoreKael",
+}
+
+# Only the columns norms need: no full session rows (responses, narrative...)
+# are loaded. Keyset pagination on (createdAt, id) matches the ORDER BY.
+NORMS_REFRESH_QUERY = f"""
+SELECT r."id", r."createdAt", {", ".join(f'r."{field}"' for field in SCORE_FIELDS.values())},
+       s."demographics"
+FROM "AssessmentResult" r
+LEFT JOIN "AssessmentSession" s ON s."id" = r."sessionId"
+WHERE r."createdAt" >= $1::timestamp
+  AND (r."createdAt", r."id") > ($2::timestamp, $3)
+ORDER BY r."createdAt" ASC, r."id" ASC
+LIMIT $4
+"""
+
+# Lower bound for the first (full) build
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class NormsService:
+    """Refreshes the process-wide PercentileNorms from Postgres and Redis"""
+
+    def __init__(self, norms: Optional[PercentileNorms] = None):
+        self.db = prisma
+        self.norms = norms if norms is not None else get_norms()
+        self._redis = get_async_redis_session_store()
+        # Result id -> createdAt for rows inside the overlap window
+        self._recent_ids: Dict[str, datetime] = {}
+
+    # ========================================================================
+    # Snapshot
+    # ========================================================================
+
+    async def load_snapshot(self) -> bool:
+        """Replace in-memory norms with the Redis snapshot, if one exists."""
+        if not self._redis.redis_available:
+            return False
+        try:
+            data = await self._redis.client.get(NORMS_SNAPSHOT_KEY)
+            if not data:
+                return False
+            snapshot = json.loads(data)
+            self.norms.replace_with(PercentileNorms.from_dict(snapshot))
+            self._recent_ids = {
+                result_id: _as_utc(created_at)
+                for result_id, created_at in snapshot.get("recent_ids", {}).items()
+            }
+            logger.info(f"Loaded norms snapshot: {len(self.norms)} results, watermark={self.norms.watermark}")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to load norms snapshot: {e}")
+            return False
+
+    async def save_snapshot(self) -> None:
+        """Write the compact norms snapshot to Redis for other workers/restarts."""
+        if not self._redis.redis_available:
+            return
+        try:
+            snapshot = self.norms.to_dict()
+            # Ids in the overlap window, so a worker loading this doesn't double count them
+            snapshot["recent_ids"] = {
+                result_id: created_at.isoformat() for result_id, created_at in self._recent_ids.items()
+            }
+            await self._redis.client.set(NORMS_SNAPSHOT_KEY, json.dumps(snapshot))
+        except Exception as e:
+            logger.warning(f"Failed to save norms snapshot: {e}")
+
+    # ========================================================================
+    # Incremental Updates
+    # ========================================================================
+
+    def record_result(self, result: Any, demographics: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Add a just-saved AssessmentResult to the norms (no DB access).
+
+        Args:
+            result: AssessmentResult row
+            demographics: Session demographics for strata
+        """
+        if result is None:
+            return
+        self._add(result.id, result.createdAt, _result_scores(result), demographics)
+
+    def _add(
+        self,
+        result_id: str,
+        created_at: Any,
+        scores: Mapping[str, float],
+        demographics: Optional[Mapping[str, Any]]
+    ) -> bool:
+        """Fold one result into the norms unless its id was already counted."""
+        if result_id in self._recent_ids:
+            return False
+        self._recent_ids[result_id] = _as_utc(created_at)
+        self.norms.add_scores(scores, strata_for_demographics(demographics))
+        return True
+
+    async def refresh(self) -> int:
+        """
+        Fold in results created since the norms watermark.
+
+        Returns:
+            Number of results added
+        """
+        watermark = self.norms.watermark
+        lower = _as_utc(watermark) - NORMS_REFRESH_OVERLAP if watermark is not None else EPOCH
+
+        added = 0
+        cursor_at, cursor_id = lower, ""
+        while True:
+            page = await self.db.query_raw(
+                NORMS_REFRESH_QUERY,
+                _sql_timestamp(lower),
+                _sql_timestamp(cursor_at),
+                cursor_id,
+                NORMS_REFRESH_PAGE_SIZE,
+            )
+            if not page:
+                break
+
+            for row in page:
+                created_at = _as_utc(row["createdAt"])
+                scores = {dimension: row[field] for dimension, field in SCORE_FIELDS.items()}
+                if self._add(row["id"], created_at, scores, _json_value(row.get("demographics"))):
+                    added += 1
+                if self.norms.watermark is None or created_at > _as_utc(self.norms.watermark):
+                    self.norms.watermark = created_at
+
+            cursor_at, cursor_id = _as_utc(page[-1]["createdAt"]), page[-1]["id"]
+            if len(page) < NORMS_REFRESH_PAGE_SIZE:
+                break
+
+        # Forget ids that can no longer be re-read by the overlap window
+        if self.norms.watermark is not None:
+            horizon = _as_utc(self.norms.watermark) - NORMS_REFRESH_OVERLAP
+            self._recent_ids = {
+                result_id: created_at
+                for result_id, created_at in self._recent_ids.items()
+                if created_at >= horizon
+            }
+
+        if added:
+            logger.info(f"Norms refreshed: +{added} results ({len(self.norms)} total)")
+            await self.save_snapshot()
+        return added
+
+    async def run_periodic_refresh(self, interval: float = NORMS_REFRESH_INTERVAL_SECONDS) -> None:
+        """Background loop: refresh norms every `interval` seconds until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Norms refresh failed: {e}")
+            await asyncio.sleep(interval)
+
+
+def _result_scores(result: Any) -> Dict[str, float]:
+    """Dimension -> score dict from an AssessmentResult row."""
+    return {dimension: getattr(result, field) for dimension, field in SCORE_FIELDS.items()}
+
+
+def _as_utc(value: Any) -> datetime:
+    """Aware UTC datetime from a Prisma datetime or a raw-query ISO string."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _sql_timestamp(value: datetime) -> str:
+    """Query parameter for a `timestamp` (UTC, no zone) column."""
+    return value.astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def _json_value(value: Any) -> Any:
+    """Raw queries may return Json columns as text."""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+# ============================================================================
+# Shared Instance
+# ============================================================================
+
+_norms_service: Optional[NormsService] = None
+
+
+def get_norms_service() -> NormsService:
+    """Get the process-wide NormsService."""
+    global _norms_service
+    if _norms_service is None:
+        _norms_service = NormsService()
+    return _norms_service
@@ -1,79 +1,154 @@
 """
 Redis Service - Session Storage
 Manages assessment session data with TTL and atomic operations
+
+AsyncRedisSessionStore: redis.asyncio on a shared connection pool, for
+request handlers (a slow Redis call never blocks the event loop); stores
+sessions field by field, packed compactly, and writes only what changed.
+
+It keeps the active-session index (ACTIVE_SESSIONS_KEY, scored by expiry)
+up to date, so counting and listing sessions never scans the keyspace.
 """
 import os
 import json
-import redis
-from typing import Dict, Any, Optional, List
+import time
+import asyncio
+import uuid
+import redis.asyncio as aioredis
+from collections import OrderedDict
+from redis.exceptions import ResponseError
+from typing import Dict, Any, Optional, List, Callable, AsyncIterator, Tuple
 from datetime import timedelta
 import logging
 
+from app.services.distributed_lock import AsyncLockManager
+from app.services.session_codec import (
+    CodeTable,
+    current_code_table,
+    get_code_table,
+    register_code_table,
+)
+from app.services.session_layout import (
+    ACTIVE_SESSIONS_KEY,
+    APPLY_DELTA_SCRIPT,
+    INVALIDATION_CHANNEL,
+    REV_FIELD,
+    SessionRecord,
+    decode_session,
+    delta_args,
+    encode_session,
+    is_empty_delta,
+    read_record,
+    script_keys,
+    session_delta,
+    session_keys,
+    summary_key,
+)
+
 logger = logging.getLogger(__name__)
 
+# Keys per SCAN call / UNLINK when walking the keyspace
+SCAN_BATCH_SIZE = 500
+
+
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+
+# Sessions whose last written record is kept for delta writes
+SESSION_RECORD_CACHE_SIZE = 10000
+
+# Code tables of packed sessions (see session_codec.py), kept without TTL
+CODE_TABLE_PREFIX = "session_codes:"
+
 
-class RedisSessionStore:
+class AsyncRedisSessionStore:
     """
-    Redis-based session storage for assessment sessions
+    asyncio-native Redis session storage
 
-    Features:
-    - Atomic operations (no race conditions)
-    - Automatic TTL (24 hour session expiry)
-    - JSON serialization/deserialization
-    - Graceful fallback to in-memory for development
+    Sessions expire after 24 hours; without Redis they live in process
+    memory. Every call is awaitable and shares one connection pool per
+    process. Sessions use
+    the field-level layout with delta writes (see session_layout.py).
+    Distributed locks live on .locks (see distributed_lock.py).
     """
 
-    def __init__(self):
-        """Initialize Redis connection"""
-        redis_host = os.getenv("REDIS_HOST", "localhost")
-        redis_port = int(os.getenv("REDIS_PORT", 6379))
-        redis_db = int(os.getenv("REDIS_DB", 1))  # Use DB 1 for assessment backend
+    def __init__(self, max_connections: int = REDIS_MAX_CONNECTIONS):
+        """Create the connection pool (connections open lazily on first use)"""
+        self._max_connections = max_connections
 
-        # ALWAYS initialize memory store for dual-write pattern (Fix #9)
+        # Always keep the memory store for the dual-write fallback
         self._memory_store: Dict[str, Dict] = {}
+        self._memory_progress: Dict[str, Dict] = {}
+        self._memory_summaries: Dict[str, Dict] = {}
 
-        try:
-            self.client = redis.Redis(
-                host=redis_host,
-                port=redis_port,
-                db=redis_db,
-                decode_responses=True,  # Auto-decode bytes to strings
-                socket_connect_timeout=5,
-                socket_timeout=5
-            )
-            # Test connection
-            self.client.ping()
-            self.redis_available = True
-            logger.info(f"✅ Redis connected: {redis_host}:{redis_port}/{redis_db}")
-        except Exception as e:
-            logger.warning(f"⚠️ Redis unavailable, using in-memory fallback: {e}")
-            self.redis_available = False
+        # Last record written/read per session, the base for delta writes
+        self._records: "OrderedDict[str, SessionRecord]" = OrderedDict()
+        self._max_records = SESSION_RECORD_CACHE_SIZE
+        self._published_tables: set = set()
+
+        # Identifies this process's writes on the invalidation channel
+        self.worker_id = uuid.uuid4().hex[:12]
+
+        self.client = self._create_client()
+        self.locks = AsyncLockManager(self)
+        # Optimistic until the first health check pings
+        self.redis_available = True
 
         # Default TTL for sessions (24 hours)
         self.default_ttl = timedelta(hours=24)
 
-        # Connection monitoring (Fix #9)
-        self._last_health_check = 0
+        # Connection monitoring
+        self._last_health_check = 0.0
         self._health_check_interval = 30  # Check every 30 seconds
         self._consecutive_failures = 0
-        self._max_failures_before_reconnect = 3
 
-    def ping(self) -> bool:
+    def _create_client(self) -> aioredis.Redis:
+        """Client on a fresh connection pool"""
+        pool = aioredis.ConnectionPool(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", 6379)),
+            db=int(os.getenv("REDIS_DB", 1)),  # Use DB 1 for assessment backend
+            decode_responses=False,  # Packed session values are binary
+            socket_connect_timeout=5,
+            socket_timeout=5,
+            retry_on_timeout=True,
+            max_connections=self._max_connections,
+        )
+        client = aioredis.Redis(connection_pool=pool)
+        # EVALSHA after the first call, so the script body isn't resent
+        self._apply_delta = client.register_script(APPLY_DELTA_SCRIPT)
+        return client
+
+    async def connect(self) -> bool:
+        """Ping at startup so the first request doesn't pay for the health check"""
+        self._last_health_check = 0.0
+        available = await self._check_connection_health()
+        if available:
+            logger.info("✅ Async Redis pool connected")
+        else:
+            logger.warning("⚠️ Redis unavailable, async store using in-memory fallback")
+        return available
+
+    async def close(self) -> None:
+        """Close the pool's connections (application shutdown)"""
+        try:
+            await self.client.aclose()
+        except Exception as e:
+            logger.debug(f"Redis pool close error: {e}")
+
+    async def ping(self) -> bool:
         """Check if Redis is connected"""
         if not self.redis_available:
             return False
         try:
-            return self.client.ping()
+            return await self.client.ping()
         except Exception:
             return False
 
-    def _check_connection_health(self) -> bool:
+    async def _check_connection_health(self) -> bool:
         """
         Periodic health check with automatic reconnection.
         Returns True if Redis is healthy/reconnected, False otherwise.
         """
-        import time
-
         current_time = time.time()
 
         # Skip if checked recently
@@ -83,14 +158,11 @@ class RedisSessionStore:
         self._last_health_check = current_time
 
         try:
-            # Quick ping to check connection
-            self.client.ping()
+            await self.client.ping()
 
-            # If we were previously unavailable, log recovery
             if not self.redis_available:
                 logger.info("✅ Redis connection restored after failure")
-                self._consecutive_failures = 0
-
+            self._consecutive_failures = 0
             self.redis_available = True
             return True
 
@@ -101,47 +173,64 @@ class RedisSessionStore:
             if self._consecutive_failures == 1:
                 logger.warning(f"⚠️ Redis health check failed: {e}")
 
-            # Attempt reconnection after multiple failures
-            if self._consecutive_failures >= self._max_failures_before_reconnect:
-                logger.info("🔄 Attempting Redis reconnection...")
-                try:
-                    self._reconnect()
-                    return True
-                except Exception as reconnect_error:
-                    logger.error(f"❌ Redis reconnection failed: {reconnect_error}")
+            # Replace the pool after repeated failures
+            if self._consecutive_failures >= 3:
+                await self.close()
+                self.client = self._create_client()
 
             self.redis_available = False
             return False
 
-    def _reconnect(self):
-        """Attempt to reconnect to Redis"""
-        redis_host = os.getenv("REDIS_HOST", "localhost")
-        redis_port = int(os.getenv("REDIS_PORT", 6379))
-        redis_db = int(os.getenv("REDIS_DB", 1))
-
-        self.client = redis.Redis(
-            host=redis_host,
-            port=redis_port,
-            db=redis_db,
-            decode_responses=True,
-            socket_connect_timeout=5,
-            socket_timeout=5,
-            retry_on_timeout=True,
-        )
+    def _mark_unavailable(self) -> None:
+        """Fall back to memory until the next health check"""
+        self.redis_available = False
+        self._last_health_check = time.time()
 
-        # Verify connection
-        self.client.ping()
-        self.redis_available = True
-        self._consecutive_failures = 0
-        logger.info(f"✅ Redis reconnected: {redis_host}:{redis_port}/{redis_db}")
+    def _ttl_seconds(self, ttl: Optional[timedelta]) -> int:
+        return int((ttl or self.default_ttl).total_seconds())
 
     # ========================================================================
     # Session Operations
     # ========================================================================
 
-    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+    def _remember(self, session_id: str, record: SessionRecord) -> None:
+        """Keep the last written/read record as the base for the next delta"""
+        self._records[session_id] = record
+        self._records.move_to_end(session_id)
+        while len(self._records) > self._max_records:
+            self._records.popitem(last=False)
+
+    async def _read_record(self, session_id: str) -> Optional[SessionRecord]:
+        """Read every key of a session in one MULTI/EXEC round trip"""
+        keys = session_keys(session_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hgetall(keys[0])
+            for key in keys[1:]:
+                pipe.lrange(key, 0, -1)
+            replies = await pipe.execute()
+        return read_record(replies[0], replies[1:])
+
+    async def _code_table(self, table_id: Optional[str]) -> Optional[CodeTable]:
+        """Code table a session was packed against, loaded from Redis if unknown here"""
+        if table_id is None:
+            return None
+        table = get_code_table(table_id)
+        if table is None:
+            codes = await self.client.get(f"{CODE_TABLE_PREFIX}{table_id}")
+            if codes is None:
+                raise ValueError(f"Unknown session code table {table_id}")
+            table = register_code_table(json.loads(codes))
+        return table
+
+    async def _publish_code_table(self, table: CodeTable) -> None:
+        """Store a code table once, so workers on another item pool can decode"""
+        if table.id not in self._published_tables:
+            await self.client.set(f"{CODE_TABLE_PREFIX}{table.id}", json.dumps(table.codes), nx=True)
+            self._published_tables.add(table.id)
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
-        Retrieve session data with connection health check
+        Retrieve session data
 
         Args:
             session_id: Session ID
@@ -149,63 +238,218 @@ class RedisSessionStore:
         Returns:
             Session data dict or None if not found
         """
-        # Check health before operation (Fix #9)
-        if not self._check_connection_health():
-            logger.debug(f"Redis unavailable, using memory fallback for {session_id[:8]}")
-            return self._memory_store.get(session_id)
+        session, _ = await self.get_session_with_rev(session_id)
+        return session
 
-        try:
-            key = f"session:{session_id}"
-            cached = self.client.get(key)
+    async def get_session_with_rev(self, session_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
+        """
+        Retrieve session data and the rev it was read at (one read)
 
-            if cached:
-                return json.loads(cached)
-            return None
+        Pass the rev to compare_and_set_session(); known_rev() may already
+        reflect a later write by another request in this process.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            (session data dict or None, rev or None if not in the field layout)
+        """
+        if not await self._check_connection_health():
+            return self._memory_store.get(session_id), None
+
+        try:
+            record = await self._read_record(session_id)
+            table = await self._code_table(record.codes) if record else None
+        except ResponseError as e:
+            if "WRONGTYPE" not in str(e):
+                raise
+            # Written as a single JSON string before the field-level layout
+            cached = await self.client.get(f"session:{session_id}")
+            return (json.loads(cached) if cached else None), None
         except Exception as e:
             logger.error(f"❌ Redis get error for session {session_id[:8]}: {e}")
-            self.redis_available = False
-            return self._memory_store.get(session_id)
+            self._mark_unavailable()
+            return self._memory_store.get(session_id), None
+
+        if record is None:
+            return None, None
+        self._remember(session_id, record)
+        return decode_session(record, table), record.rev or None
+
+    async def get_sessions(self, session_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Retrieve several sessions
+
+        Returns:
+            Dict of session_id -> session data (None if not found)
+        """
+        results = await asyncio.gather(*(self.get_session(sid) for sid in session_ids))
+        return dict(zip(session_ids, results))
+
+    async def _write_record(
+        self,
+        session_id: str,
+        record: SessionRecord,
+        ttl: Optional[timedelta],
+        summary: Optional[str] = None,
+    ) -> None:
+        """
+        Apply the delta from the last known record (one script call).
+
+        Falls back to a full rewrite if another writer changed the session
+        since, or if there is no known record.
+        """
+        previous = self._records.get(session_id)
 
-    def set_session(
+        rev = -1
+        if previous is not None and previous.rev:
+            rev = await self._apply(session_id, previous.rev, session_delta(previous, record), ttl, summary)
+        if rev == -1:
+            rev = await self._apply(session_id, "", session_delta(None, record), ttl, summary)
+
+        record.rev = int(rev)
+        self._remember(session_id, record)
+
+    async def _apply(
+        self,
+        session_id: str,
+        expected_rev: Any,
+        delta: Dict[str, Any],
+        ttl: Optional[timedelta],
+        summary: Optional[str] = None,
+    ) -> int:
+        """Run APPLY_DELTA_SCRIPT for a delta (returns the new rev, or -1 on a rev mismatch)"""
+        ttl_seconds = self._ttl_seconds(ttl)
+        args = delta_args(
+            expected_rev, ttl_seconds * 1000, delta,
+            session_id, self.worker_id, time.time() + ttl_seconds, summary,
+        )
+        return int(await self._apply_delta(keys=script_keys(session_id), args=args))
+
+    async def set_session(
         self,
         session_id: str,
         session_data: Dict[str, Any],
-        ttl: Optional[timedelta] = None
+        ttl: Optional[timedelta] = None,
+        summary: Optional[Dict[str, Any]] = None
     ) -> bool:
         """
         Store session data with dual-write (Redis + memory fallback)
 
+        Only the fields that changed since this process last wrote or read
+        the session are sent; the TTL refresh happens in the same call.
+
         Args:
             session_id: Session ID
             session_data: Session data dict
             ttl: Time to live (default: 24 hours)
+            summary: Session summary to store with it (see get_session_summary)
 
         Returns:
             True if stored successfully in Redis, False if only in memory
         """
-        # Always write to memory as backup (Fix #9 - dual-write pattern)
         self._memory_store[session_id] = session_data
+        if summary is not None:
+            self._memory_summaries[session_id] = summary
 
-        # Check health before Redis write
-        if not self._check_connection_health():
+        if not await self._check_connection_health():
             logger.warning(f"Redis unavailable, session {session_id[:8]} in memory only")
             return False
 
         try:
-            key = f"session:{session_id}"
-            value = json.dumps(session_data)
-            ttl = ttl or self.default_ttl
-
-            self.client.setex(key, ttl, value)
+            table = current_code_table()
+            await self._publish_code_table(table)
+            await self._write_record(
+                session_id, encode_session(session_data, table), ttl, _summary_json(summary)
+            )
             return True
         except Exception as e:
             logger.error(f"❌ Redis set error for session {session_id[:8]}: {e}")
-            self.redis_available = False
+            self._records.pop(session_id, None)
+            self._mark_unavailable()
             return False
 
-    def delete_session(self, session_id: str) -> bool:
+    async def compare_and_set_session(
+        self,
+        session_id: str,
+        session_data: Dict[str, Any],
+        expected_rev: Optional[int],
+        ttl: Optional[timedelta] = None,
+        summary: Optional[Dict[str, Any]] = None
+    ) -> Optional[int]:
         """
-        Delete session data
+        Store session data only if the stored session is still at expected_rev
+
+        The optimistic-concurrency write: read (get_session_with_rev()),
+        change, then compare-and-set in one script call. A write that changes
+        nothing is skipped.
+
+        Args:
+            session_id: Session ID
+            session_data: Session data dict
+            expected_rev: Rev the data was read at (0 = session must not
+                exist yet, None = write unconditionally)
+            ttl: Time to live (default: 24 hours)
+            summary: Session summary to store with it
+
+        Returns:
+            New rev; None if another writer changed the session since
+            expected_rev; 0 if stored in memory only
+        """
+        if summary is not None:
+            self._memory_summaries[session_id] = summary
+        if not await self._check_connection_health():
+            self._memory_store[session_id] = session_data
+            return 0
+
+        try:
+            table = current_code_table()
+            await self._publish_code_table(table)
+            record = encode_session(session_data, table)
+            if expected_rev is None:
+                await self._write_record(session_id, record, ttl, _summary_json(summary))
+                rev = record.rev
+            else:
+                previous = self._records.get(session_id)
+                base = previous if previous is not None and previous.rev == expected_rev else None
+                delta = session_delta(base, record)
+                if base is not None and is_empty_delta(delta):
+                    return expected_rev
+                rev = await self._apply(session_id, expected_rev, delta, ttl, _summary_json(summary))
+        except Exception as e:
+            logger.error(f"❌ Redis compare-and-set error for session {session_id[:8]}: {e}")
+            self._records.pop(session_id, None)
+            self._mark_unavailable()
+            self._memory_store[session_id] = session_data
+            return 0
+
+        if rev == -1:
+            self._records.pop(session_id, None)  # stale base, re-read before retrying
+            return None
+        record.rev = rev
+        self._remember(session_id, record)
+        self._memory_store[session_id] = session_data
+        return rev
+
+    async def set_sessions(
+        self,
+        sessions: Dict[str, Dict[str, Any]],
+        ttl: Optional[timedelta] = None
+    ) -> bool:
+        """
+        Store several sessions concurrently
+
+        Returns:
+            True if all were stored in Redis
+        """
+        results = await asyncio.gather(
+            *(self.set_session(sid, data, ttl) for sid, data in sessions.items())
+        )
+        return all(results)
+
+    async def delete_session(self, session_id: str) -> bool:
+        """
+        Delete session data and its generation progress (one round trip)
 
         Args:
             session_id: Session ID
@@ -213,27 +457,133 @@ class RedisSessionStore:
         Returns:
             True if deleted successfully
         """
+        self._memory_store.pop(session_id, None)
+        self._memory_progress.pop(session_id, None)
+        self._memory_summaries.pop(session_id, None)
+        self._records.pop(session_id, None)
+
         if not self.redis_available:
-            if session_id in self._memory_store:
-                del self._memory_store[session_id]
             return True
 
         try:
-            key = f"session:{session_id}"
-            self.client.delete(key)
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.delete(*session_keys(session_id), summary_key(session_id), f"progress:{session_id}")
+                pipe.zrem(ACTIVE_SESSIONS_KEY, session_id)
+                pipe.publish(INVALIDATION_CHANNEL, f"{session_id}|{self.worker_id}|0")
+                await pipe.execute()
             return True
         except Exception as e:
             logger.error(f"❌ Redis delete error for session {session_id}: {e}")
             return False
 
-    def update_session_field(
+    async def get_session_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        A session's summary (one small GET; the session itself isn't read)
+
+        Returns:
+            Summary dict, or None if the session has none
+        """
+        if not await self._check_connection_health():
+            return self._memory_summaries.get(session_id)
+
+        try:
+            summary = await self.client.get(summary_key(session_id))
+        except Exception as e:
+            logger.error(f"❌ Redis summary get error for session {session_id[:8]}: {e}")
+            self._mark_unavailable()
+            return self._memory_summaries.get(session_id)
+        return json.loads(summary) if summary else None
+
+    async def set_session_summary(
+        self,
+        session_id: str,
+        summary: Dict[str, Any],
+        ttl: Optional[timedelta] = None
+    ) -> bool:
+        """
+        Store a summary on its own (sessions written before summaries existed)
+
+        Returns:
+            True if stored in Redis
+        """
+        self._memory_summaries[session_id] = summary
+        if not self.redis_available:
+            return False
+        try:
+            await self.client.set(summary_key(session_id), _summary_json(summary), ex=self._ttl_seconds(ttl))
+            return True
+        except Exception as e:
+            logger.error(f"❌ Redis summary set error for session {session_id[:8]}: {e}")
+            return False
+
+    def known_rev(self, session_id: str) -> Optional[int]:
+        """Rev of the session as this process last wrote or read it (None = unknown)"""
+        record = self._records.get(session_id)
+        return record.rev if record is not None else None
+
+    async def get_session_rev(self, session_id: str) -> Optional[int]:
+        """
+        Current rev of a stored session (a single HGET)
+
+        Returns:
+            Rev, or None if Redis doesn't hold the session in the field layout
+        """
+        try:
+            rev = await self.client.hget(f"session:{session_id}", REV_FIELD)
+        except ResponseError:
+            return None  # legacy JSON string
+        return int(rev) if rev is not None else None
+
+    async def listen_for_invalidations(
+        self,
+        on_invalidate: Callable[[str, int], None],
+        on_connection_change: Callable[[bool], None],
+        retry_seconds: float = 1.0,
+    ) -> None:
+        """
+        Follow other workers' session writes until cancelled.
+
+        Args:
+            on_invalidate: Called with (session_id, rev) for every write or
+                delete (rev 0) made by another process
+            on_connection_change: Called with True once subscribed and False
+                when the subscription drops (messages may have been missed)
+            retry_seconds: Pause before resubscribing
+        """
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                on_connection_change(True)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    session_id, origin, rev = message["data"].decode().rsplit("|", 2)
+                    if origin != self.worker_id:
+                        on_invalidate(session_id, int(rev))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Session invalidation subscription lost: {e}")
+            finally:
+                on_connection_change(False)
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(retry_seconds)
+
+    async def update_session_field(
         self,
         session_id: str,
         field_name: str,
         field_value: Any
     ) -> bool:
         """
-        Update a single field in session data (atomic operation)
+        Update a single field in session data
+
+        The read refreshes the session's record, so only that field is
+        written back.
 
         Args:
             session_id: Session ID
@@ -243,15 +593,15 @@ class RedisSessionStore:
         Returns:
             True if updated successfully
         """
-        session = self.get_session(session_id)
+        session = await self.get_session(session_id)
         if session is None:
             logger.warning(f"⚠️ Session {session_id} not found for field update")
             return False
 
-        session[field_name] = field_value
-        return self.set_session(session_id, session)
+        session = {**session, field_name: field_value}
+        return await self.set_session(session_id, session)
 
-    def session_exists(self, session_id: str) -> bool:
+    async def session_exists(self, session_id: str) -> bool:
         """
         Check if session exists
 
@@ -265,18 +615,17 @@ class RedisSessionStore:
             return session_id in self._memory_store
 
         try:
-            key = f"session:{session_id}"
-            return self.client.exists(key) > 0
+            return await self.client.exists(f"session:{session_id}") > 0
         except Exception:
             return False
 
-    def extend_session_ttl(
+    async def extend_session_ttl(
         self,
         session_id: str,
         ttl: Optional[timedelta] = None
     ) -> bool:
         """
-        Extend session TTL (touch session)
+        Extend session TTL (touch session), all keys in one round trip
 
         Args:
             session_id: Session ID
@@ -289,41 +638,42 @@ class RedisSessionStore:
             return True  # In-memory sessions don't expire
 
         try:
-            key = f"session:{session_id}"
-            ttl = ttl or self.default_ttl
-            return self.client.expire(key, ttl)
+            ttl_seconds = self._ttl_seconds(ttl)
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in session_keys(session_id) + [summary_key(session_id)]:
+                    pipe.expire(key, ttl_seconds)
+                pipe.zadd(ACTIVE_SESSIONS_KEY, {session_id: time.time() + ttl_seconds}, xx=True)
+                results = await pipe.execute()
+            return bool(results[0])
         except Exception as e:
             logger.error(f"❌ Redis TTL extend error for session {session_id}: {e}")
             return False
 
     # ========================================================================
-    # Cache Management
+    # Active Session Index
     # ========================================================================
 
-    def clear_all_sessions(self) -> bool:
+    async def prune_expired_sessions(self) -> int:
         """
-        Clear all session data (use with caution!)
+        Drop expired sessions from the active-session index (one ZREMRANGEBYSCORE)
 
         Returns:
-            True if cleared successfully
+            Number of entries removed
         """
         if not self.redis_available:
-            self._memory_store.clear()
-            return True
-
+            return 0
         try:
-            # Find all session keys
-            keys = self.client.keys("session:*")
-            if keys:
-                self.client.delete(*keys)
-            return True
+            return await self.client.zremrangebyscore(ACTIVE_SESSIONS_KEY, "-inf", time.time())
         except Exception as e:
-            logger.error(f"❌ Redis clear all error: {e}")
-            return False
+            logger.error(f"❌ Redis session index prune error: {e}")
+            return 0
 
-    def get_session_count(self) -> int:
+    async def get_session_count(self) -> int:
         """
-        Get count of active sessions
+        Get count of active sessions from the active-session index
+
+        Expired entries are trimmed first, so the count is a ZCARD and
+        never touches the keyspace.
 
         Returns:
             Number of active sessions
@@ -332,167 +682,139 @@ class RedisSessionStore:
             return len(self._memory_store)
 
         try:
-            keys = self.client.keys("session:*")
-            return len(keys)
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.zremrangebyscore(ACTIVE_SESSIONS_KEY, "-inf", time.time())
+                pipe.zcard(ACTIVE_SESSIONS_KEY)
+                _, count = await pipe.execute()
+            return count
         except Exception:
             return 0
 
-    # ========================================================================
-    # Distributed Locking - Prevents Race Conditions
-    # ========================================================================
+    async def list_active_sessions(self, offset: int = 0, limit: int = 100) -> List[str]:
+        """
+        One page of active session IDs, soonest-expiring first
 
-    def acquire_lock(
-        self,
-        lock_name: str,
-        lock_timeout: int = 120,
-        blocking: bool = True,
-        blocking_timeout: int = 130
-    ) -> Optional[str]:
-        """
-        Acquire a distributed lock using Redis SETNX.
-        
-        This prevents race conditions when multiple requests try to perform
-        the same operation (e.g., generating assessment results).
-        
         Args:
-            lock_name: Unique identifier for the lock (e.g., "results:session123")
-            lock_timeout: Seconds before lock auto-expires (prevents deadlocks)
-            blocking: If True, wait for lock; if False, return None immediately if locked
-            blocking_timeout: Max seconds to wait for lock when blocking
-            
+            offset: Sessions to skip
+            limit: Page size
+
         Returns:
-            Lock token (str) if acquired, None if failed/timeout
-        """
-        import uuid
-        import time
-        
-        lock_key = f"lock:{lock_name}"
-        lock_token = str(uuid.uuid4())  # Unique token to ensure only owner can release
-        
+            Session IDs
+        """
         if not self.redis_available:
-            # In-memory fallback: simple dict-based lock
-            if not hasattr(self, '_memory_locks'):
-                self._memory_locks: Dict[str, str] = {}
-            
-            if lock_key in self._memory_locks:
-                if not blocking:
-                    return None
-                # Simple busy-wait for in-memory (dev only)
-                start = time.time()
-                while lock_key in self._memory_locks:
-                    if time.time() - start > blocking_timeout:
-                        return None
-                    time.sleep(0.1)
-            
-            self._memory_locks[lock_key] = lock_token
-            return lock_token
-        
+            return list(self._memory_store)[offset:offset + limit]
+
         try:
-            if blocking:
-                # Blocking: keep trying until timeout
-                start = time.time()
-                while time.time() - start < blocking_timeout:
-                    # Try to acquire with NX (only if not exists) and EX (expiry)
-                    acquired = self.client.set(
-                        lock_key, 
-                        lock_token, 
-                        nx=True,  # Only set if not exists
-                        ex=lock_timeout  # Auto-expire after timeout
-                    )
-                    if acquired:
-                        logger.debug(f"🔒 Lock acquired: {lock_name}")
-                        return lock_token
-                    
-                    # Wait a bit before retrying
-                    time.sleep(0.5)
-                
-                # Timeout waiting for lock
-                logger.warning(f"⏰ Lock timeout waiting for: {lock_name}")
-                return None
-            else:
-                # Non-blocking: try once
-                acquired = self.client.set(
-                    lock_key, 
-                    lock_token, 
-                    nx=True, 
-                    ex=lock_timeout
-                )
-                if acquired:
-                    logger.debug(f"🔒 Lock acquired: {lock_name}")
-                    return lock_token
-                return None
-                
+            ids = await self.client.zrangebyscore(
+                ACTIVE_SESSIONS_KEY, f"({time.time()}", "+inf", start=offset, num=limit
+            )
+            return [_text(session_id) for session_id in ids]
         except Exception as e:
-            logger.error(f"❌ Redis lock error for {lock_name}: {e}")
-            return None
+            logger.error(f"❌ Redis session index read error: {e}")
+            return []
 
-    def release_lock(self, lock_name: str, lock_token: str) -> bool:
+    async def iter_active_sessions(self, page_size: int = SCAN_BATCH_SIZE) -> AsyncIterator[str]:
         """
-        Release a distributed lock (only if we own it).
-        
-        Uses Lua script for atomic check-and-delete to prevent
-        accidentally releasing someone else's lock.
-        
+        Every active session ID, fetched page by page with ZSCAN
+
+        Sessions written or deleted during the walk may or may not be seen.
+
         Args:
-            lock_name: Lock identifier
-            lock_token: Token returned by acquire_lock
-            
+            page_size: ZSCAN COUNT hint
+        """
+        if not self.redis_available:
+            for session_id in list(self._memory_store):
+                yield session_id
+            return
+
+        now = time.time()
+        cursor = 0
+        while True:
+            cursor, entries = await self.client.zscan(ACTIVE_SESSIONS_KEY, cursor, count=page_size)
+            for session_id, expires_at in entries:
+                if expires_at > now:
+                    yield _text(session_id)
+            if cursor == 0:
+                return
+
+    async def rebuild_session_index(self) -> int:
+        """
+        Index sessions the active-session index doesn't know (written before it existed)
+
+        Walks the keyspace with SCAN, a batch at a time, reading each
+        session's TTL in one pipeline per batch.
+
         Returns:
-            True if released, False if not owner or error
+            Number of sessions indexed
         """
-        lock_key = f"lock:{lock_name}"
-        
         if not self.redis_available:
-            # In-memory fallback
-            if hasattr(self, '_memory_locks') and self._memory_locks.get(lock_key) == lock_token:
-                del self._memory_locks[lock_key]
-                return True
-            return False
-        
-        try:
-            # Lua script: atomic check-and-delete
-            # Only delete if the lock value matches our token
-            lua_script = """
-            if redis.call("get", KEYS[1]) == ARGV[1] then
-                return redis.call("del", KEYS[1])
-            else
-                return 0
-            end
-            """
-            result = self.client.eval(lua_script, 1, lock_key, lock_token)
-            if result:
-                logger.debug(f"🔓 Lock released: {lock_name}")
-                return True
-            return False
-        except Exception as e:
-            logger.error(f"❌ Redis unlock error for {lock_name}: {e}")
-            return False
+            return 0
 
-    def is_locked(self, lock_name: str) -> bool:
+        indexed = 0
+        async for batch in self._scan_batches("session:*"):
+            # Only the main key, not the list keys next to it
+            mains = [key for key in batch if key.count(b":") == 1]
+            if not mains:
+                continue
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in mains:
+                    pipe.ttl(key)
+                ttls = await pipe.execute()
+            now = time.time()
+            entries = {
+                _text(key).split(":", 1)[1]: now + ttl
+                for key, ttl in zip(mains, ttls) if ttl > 0
+            }
+            if entries:
+                await self.client.zadd(ACTIVE_SESSIONS_KEY, entries)
+                indexed += len(entries)
+        return indexed
+
+    async def _scan_batches(self, pattern: str) -> AsyncIterator[List[bytes]]:
+        """Keys matching pattern, SCAN_BATCH_SIZE at a time, via SCAN cursors"""
+        batch: List[bytes] = []
+        async for key in self.client.scan_iter(match=pattern, count=SCAN_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= SCAN_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    # ========================================================================
+    # Cache Management
+    # ========================================================================
+
+    async def clear_all_sessions(self) -> bool:
         """
-        Check if a lock is currently held.
-        
-        Args:
-            lock_name: Lock identifier
-            
+        Clear all session data (use with caution!)
+
+        Walks the keyspace with SCAN and unlinks a batch at a time, so
+        Redis keeps serving other clients meanwhile.
+
         Returns:
-            True if locked, False otherwise
+            True if cleared successfully
         """
-        lock_key = f"lock:{lock_name}"
-        
+        self._records.clear()
+        self._memory_summaries.clear()
         if not self.redis_available:
-            return hasattr(self, '_memory_locks') and lock_key in self._memory_locks
-        
+            self._memory_store.clear()
+            return True
+
         try:
-            return self.client.exists(lock_key) > 0
-        except Exception:
+            async for batch in self._scan_batches("session:*"):
+                await self.client.unlink(*batch)
+            await self.client.delete(ACTIVE_SESSIONS_KEY)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Redis clear all error: {e}")
             return False
 
     # ========================================================================
     # Generation Progress Tracking
     # ========================================================================
 
-    def init_generation_progress(
+    async def init_generation_progress(
         self,
         session_id: str,
         total_steps: int,
@@ -501,46 +823,38 @@ class RedisSessionStore:
     ) -> bool:
         """
         Initialize progress tracking for narrative generation.
-        
+
         Args:
             session_id: Session ID
             total_steps: Total number of steps (sections to generate)
             step_names: Names of the steps for display
             ttl_seconds: Time to live for progress data (default 5 minutes)
-            
+
         Returns:
             True if initialized successfully
         """
-        progress_key = f"progress:{session_id}"
         progress_data = {
             "total_steps": total_steps,
             "completed_steps": 0,
             "current_step": step_names[0] if step_names else "Initializing",
             "step_names": step_names,
             "completed_step_names": [],
-            "started_at": __import__('time').time(),
+            "started_at": time.time(),
             "status": "generating"
         }
-        
+
         if not self.redis_available:
-            if not hasattr(self, '_memory_progress'):
-                self._memory_progress: Dict[str, Dict] = {}
             self._memory_progress[session_id] = progress_data
             return True
-        
+
         try:
-            self.client.setex(
-                progress_key,
-                ttl_seconds,
-                json.dumps(progress_data)
-            )
-            logger.debug(f"📊 Progress initialized for {session_id}: {total_steps} steps")
+            await self.client.set(f"progress:{session_id}", json.dumps(progress_data), ex=ttl_seconds)
             return True
         except Exception as e:
             logger.error(f"❌ Redis progress init error: {e}")
             return False
 
-    def update_generation_progress(
+    async def update_generation_progress(
         self,
         session_id: str,
         completed_step: str,
@@ -548,157 +862,139 @@ class RedisSessionStore:
     ) -> bool:
         """
         Update progress when a step completes.
-        
+
+        The read and its remaining TTL come back in one pipelined round trip.
+
         Args:
             session_id: Session ID
             completed_step: Name of the step that completed
             next_step: Name of the next step (optional)
-            
+
         Returns:
             True if updated successfully
         """
         progress_key = f"progress:{session_id}"
-        
+
         if not self.redis_available:
-            if hasattr(self, '_memory_progress') and session_id in self._memory_progress:
-                progress = self._memory_progress[session_id]
-                progress["completed_steps"] += 1
-                progress["completed_step_names"].append(completed_step)
-                if next_step:
-                    progress["current_step"] = next_step
-                elif progress["completed_steps"] >= progress["total_steps"]:
-                    progress["current_step"] = "Finalizing"
-                    progress["status"] = "finalizing"
-                return True
-            return False
-        
+            progress = self._memory_progress.get(session_id)
+            if progress is None:
+                return False
+            _advance_progress(progress, completed_step, next_step)
+            return True
+
         try:
-            cached = self.client.get(progress_key)
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.get(progress_key)
+                pipe.ttl(progress_key)
+                cached, ttl = await pipe.execute()
             if not cached:
                 return False
-            
+
             progress = json.loads(cached)
-            progress["completed_steps"] += 1
-            progress["completed_step_names"].append(completed_step)
-            
-            if next_step:
-                progress["current_step"] = next_step
-            elif progress["completed_steps"] >= progress["total_steps"]:
-                progress["current_step"] = "Finalizing"
-                progress["status"] = "finalizing"
-            
-            # Get remaining TTL and preserve it
-            ttl = self.client.ttl(progress_key)
-            if ttl > 0:
-                self.client.setex(progress_key, ttl, json.dumps(progress))
-            else:
-                self.client.setex(progress_key, 300, json.dumps(progress))
-            
-            logger.debug(f"📊 Progress updated for {session_id}: {progress['completed_steps']}/{progress['total_steps']}")
+            _advance_progress(progress, completed_step, next_step)
+            await self.client.set(progress_key, json.dumps(progress), ex=ttl if ttl > 0 else 300)
             return True
         except Exception as e:
             logger.error(f"❌ Redis progress update error: {e}")
             return False
 
-    def get_generation_progress(self, session_id: str) -> Optional[Dict[str, Any]]:
+    async def get_generation_progress(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
         Get current generation progress.
-        
-        Args:
-            session_id: Session ID
-            
+
         Returns:
             Progress dict with completed_steps, total_steps, current_step, percentage
         """
-        progress_key = f"progress:{session_id}"
-        
         if not self.redis_available:
-            if hasattr(self, '_memory_progress') and session_id in self._memory_progress:
-                progress = self._memory_progress[session_id]
-                percentage = int((progress["completed_steps"] / progress["total_steps"]) * 100) if progress["total_steps"] > 0 else 0
-                return {
-                    **progress,
-                    "percentage": percentage
-                }
-            return None
-        
+            progress = self._memory_progress.get(session_id)
+            return _with_percentage(progress) if progress else None
+
         try:
-            cached = self.client.get(progress_key)
-            if not cached:
-                return None
-            
-            progress = json.loads(cached)
-            percentage = int((progress["completed_steps"] / progress["total_steps"]) * 100) if progress["total_steps"] > 0 else 0
-            
-            return {
-                **progress,
-                "percentage": percentage
-            }
+            cached = await self.client.get(f"progress:{session_id}")
+            return _with_percentage(json.loads(cached)) if cached else None
         except Exception as e:
             logger.error(f"❌ Redis progress get error: {e}")
             return None
 
-    def complete_generation_progress(self, session_id: str) -> bool:
+    async def complete_generation_progress(self, session_id: str) -> bool:
         """
-        Mark generation as complete and set progress to 100% with TTL.
-        Instead of deleting immediately, we keep it for 5 minutes to prevent race conditions.
-
-        Args:
-            session_id: Session ID
+        Mark generation as complete, keeping 100% progress for 5 minutes so a
+        poll that lands after the results were saved still sees completion.
 
         Returns:
             True if completed successfully
         """
-        progress_key = f"progress:{session_id}"
+        final_progress = {
+            "completed_steps": 7,
+            "total_steps": 7,
+            "current_step": "Complete!",
+            "completed_step_names": [],
+        }
 
         if not self.redis_available:
-            if hasattr(self, '_memory_progress') and session_id in self._memory_progress:
-                # Set to 100% instead of deleting for in-memory fallback
-                self._memory_progress[session_id] = {
-                    "completed_steps": 7,
-                    "total_steps": 7,
-                    "current_step": "Complete!",
-                    "completed_step_names": []
-                }
+            if session_id in self._memory_progress:
+                self._memory_progress[session_id] = final_progress
             return True
 
         try:
-            # Set progress to 100% with 5-minute TTL instead of immediate delete
-            # This prevents race condition where frontend polls after results saved but before it sees them
-            final_progress = {
-                "completed_steps": 7,
-                "total_steps": 7,
-                "current_step": "Complete!",
-                "completed_step_names": [],
-                "percentage": 100
-            }
-            self.client.setex(
-                progress_key,
-                300,  # 5 minutes TTL - auto-cleanup
-                json.dumps(final_progress)
+            await self.client.set(
+                f"progress:{session_id}", json.dumps({**final_progress, "percentage": 100}), ex=300
             )
-            logger.debug(f"📊 Progress set to 100% with 5min TTL for {session_id}")
             return True
         except Exception as e:
             logger.error(f"❌ Redis progress complete error: {e}")
             return False
 
 
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _summary_json(summary: Optional[Dict[str, Any]]) -> Optional[str]:
+    return json.dumps(summary, separators=(",", ":")) if summary is not None else None
+
+
+def _advance_progress(progress: Dict[str, Any], completed_step: str, next_step: Optional[str]) -> None:
+    """Record a completed generation step in a progress dict"""
+    progress["completed_steps"] += 1
+    progress["completed_step_names"].append(completed_step)
+    if next_step:
+        progress["current_step"] = next_step
+    elif progress["completed_steps"] >= progress["total_steps"]:
+        progress["current_step"] = "Finalizing"
+        progress["status"] = "finalizing"
+
+
+def _with_percentage(progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Progress dict plus its completion percentage"""
+    total = progress["total_steps"]
+    percentage = int((progress["completed_steps"] / total) * 100) if total > 0 else 0
+    return {**progress, "percentage": percentage}
+
+
 # ============================================================================
 # Global Instance
 # ============================================================================
 
-_redis_session_store: Optional[RedisSessionStore] = None
+_async_redis_session_store: Optional[AsyncRedisSessionStore] = None
 
 
-def get_redis_session_store() -> RedisSessionStore:
+def get_async_redis_session_store() -> AsyncRedisSessionStore:
     """
-    Get singleton Redis session store instance
+    Get singleton async Redis session store instance
 
     Returns:
-        RedisSessionStore instance
+        AsyncRedisSessionStore instance
     """
-    global _redis_session_store
-    if _redis_session_store is None:
-        _redis_session_store = RedisSessionStore()
-    return _redis_session_store
+    global _async_redis_session_store
+    if _async_redis_session_store is None:
+        _async_redis_session_store = AsyncRedisSessionStore()
+    return _async_redis_session_store
+
+
+async def close_async_redis_session_store() -> None:
+    """Close the async store's connection pool (application shutdown)"""
+    global _async_redis_session_store
+    if _async_redis_session_store is not None:
+        await _async_redis_session_store.close()
+        _async_redis_session_store = None
@@ -13,6 +13,7 @@ from datetime import datetime
 from app.scoring import SelveScorer
 from app.narratives.integrated_generator import IntegratedNarrativeGenerator
 from app.narratives.friend_insights_generator import generate_friend_insights_narrative
+from app.narratives.llm_admission import Priority
 from app.services.quality_scoring import QualityScoringService
 from app.services.enhanced_blind_spot_analyzer import EnhancedBlindSpotAnalyzer
 
@@ -143,7 +144,7 @@ class RegenerationService:
         logger.info(f"✅ Legacy blind spots extracted: {len(simple_blind_spots)}")
 
         # Step 5: Generate full profile narrative (includes friend context)
-        full_profile_narrative = self._generate_full_profile(
+        full_profile_narrative = await self._generate_full_profile(
             self_scores=self_scores,
             enhanced_analysis=enhanced_analysis
         )
@@ -151,7 +152,7 @@ class RegenerationService:
         logger.info(f"✅ Full profile narrative generated")
 
         # Step 6: Generate separate friend insights narrative (220-350 words)
-        friend_insights_narrative = self._generate_friend_insights_narrative(
+        friend_insights_narrative = await self._generate_friend_insights_narrative(
             enhanced_analysis=enhanced_analysis,
             friend_count=len(friend_responses)
         )
@@ -350,7 +351,7 @@ class RegenerationService:
         
         return insights
 
-    def _generate_full_profile(
+    async def _generate_full_profile(
         self,
         self_scores: Dict[str, float],
         enhanced_analysis: Dict[str, Any]
@@ -370,14 +371,16 @@ class RegenerationService:
         """
         # Generate base narrative from self scores
         int_scores = {k: int(round(v)) for k, v in self_scores.items()}
-        narrative = self.narrative_generator.generate_narrative(int_scores)
+        narrative = await self.narrative_generator.generate_narrative_async(
+            int_scores, priority=Priority.BACKGROUND
+        )
 
         # TODO: Future enhancement - pass enhanced_analysis to narrative generator
         # so it can subtly weave in friend context throughout the profile
 
         return narrative
 
-    def _generate_friend_insights_narrative(
+    async def _generate_friend_insights_narrative(
         self,
         enhanced_analysis: Dict[str, Any],
         friend_count: int
@@ -420,7 +423,7 @@ class RegenerationService:
             friend_scores[dim] = ebs['friend_score']
 
         # Generate narrative using existing friend insights generator
-        result = generate_friend_insights_narrative(
+        result = await generate_friend_insights_narrative(
             self_scores=self_scores,
             friend_scores=friend_scores,
             blind_spots=simple_blind_spots,
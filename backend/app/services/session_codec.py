@@ -0,0 +1,274 @@
+"""
+Session Codec - compact binary values for stored sessions
+
+Session values are mostly item codes and small integers, which JSON spells
+out as quoted strings. This codec packs them against a code table (the
+shared item pool's codes, in pool order), so an item costs 2 bytes and a
+response 3:
+
+- responses            (item index, value) pairs: u16 indices, then u8 values
+- pending_questions    bitmap over the code table, or a u16 array if smaller
+- current_batch        u16 array
+- answer_history       one u16 per list element
+- batch_history        i64 timestamp (microseconds) + u16 array per element
+- back_navigation_log  i64 timestamp + u16 item + u8 from/to per element
+
+Every packed value starts with a kind byte below 0x20, which JSON text never
+starts with; anything else is JSON. That is the upgrade path: values written
+as JSON still decode, and values the codec can't represent exactly (unknown
+item codes, non-integer answers, odd timestamps) are simply written as JSON.
+
+A code table is identified by a digest of its codes. Sessions record the
+table they were packed against, so a later item pool can still read them
+once the old table is registered (see AsyncRedisSessionStore).
+
+Usage:
+    table = current_code_table()
+    raw = encode_value("responses", {"E1": 4}, table)
+    decode_value(raw, table)  # {"E1": 4}
+"""
+
+import hashlib
+import json
+import struct
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.item_pool import get_item_pool
+
+# Kind bytes (codec version 1); JSON text starts at 0x20 or above
+KIND_CODES = 0x01
+KIND_BITMAP = 0x02
+KIND_RESPONSES = 0x03
+KIND_CODE = 0x04
+KIND_BATCH = 0x05
+KIND_BACK_NAV = 0x06
+
+_EPOCH = datetime(1970, 1, 1)
+_TIMESTAMP = struct.Struct("<q")
+_BACK_NAV = struct.Struct("<qHBB")
+
+
+class CodeTable:
+    """
+    Item code <-> u16 index mapping.
+
+    Attributes:
+        id: Short digest of the codes, stored with every packed session
+        codes: Item codes, in index order
+    """
+
+    def __init__(self, codes: Sequence[str]):
+        if len(codes) > 0xFFFF:
+            raise ValueError(f"Code table too large for u16 indices: {len(codes)}")
+        self.codes = tuple(codes)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.id = hashlib.sha1("\n".join(self.codes).encode()).hexdigest()[:12]
+
+        # answer_history elements, packed once per code
+        self.packed_code = {code: bytes([KIND_CODE]) + struct.pack("<H", i) for code, i in self.index.items()}
+        self.unpacked_code = {packed: code for code, packed in self.packed_code.items()}
+
+
+# ============================================================================
+# Code Table Registry
+# ============================================================================
+
+_tables: Dict[str, CodeTable] = {}
+_current_table: Optional[CodeTable] = None
+_tables_lock = threading.Lock()
+
+
+def register_code_table(codes: Sequence[str]) -> CodeTable:
+    """Register a code table (e.g. one loaded from Redis) and return it."""
+    table = CodeTable(codes)
+    with _tables_lock:
+        return _tables.setdefault(table.id, table)
+
+
+def get_code_table(table_id: str) -> Optional[CodeTable]:
+    """Registered code table by id, or None."""
+    return _tables.get(table_id)
+
+
+def current_code_table() -> CodeTable:
+    """Code table of the shared item pool, which new writes are packed against."""
+    global _current_table
+    if _current_table is None:
+        _current_table = register_code_table(get_item_pool().compiled.item_codes)
+    return _current_table
+
+
+# ============================================================================
+# Encoding
+# ============================================================================
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _indices(codes, table: CodeTable) -> List[int]:
+    return [table.index[code] for code in codes]  # KeyError -> caller falls back to JSON
+
+
+def _u16(indices: List[int]) -> bytes:
+    return struct.pack(f"<{len(indices)}H", *indices)
+
+
+def _micros(timestamp: Any) -> int:
+    """isoformat() timestamp -> microseconds, if it round-trips exactly."""
+    parsed = datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is not None or parsed.isoformat() != timestamp:
+        raise ValueError(timestamp)
+    delta = parsed - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _pack_codes(codes, table: CodeTable) -> bytes:
+    return bytes([KIND_CODES]) + _u16(_indices(codes, table))
+
+
+def _pack_code_set(codes, table: CodeTable) -> bytes:
+    indices = sorted(_indices(codes, table))
+    bitmap_size = (len(table.codes) + 7) // 8
+    if bitmap_size >= 2 * len(indices):
+        return bytes([KIND_CODES]) + _u16(indices)
+    bits = 0
+    for index in indices:
+        bits |= 1 << index
+    return bytes([KIND_BITMAP]) + bits.to_bytes(bitmap_size, "little")
+
+
+def _pack_responses(responses: Dict[str, Any], table: CodeTable) -> bytes:
+    values = list(responses.values())
+    if not all(type(value) is int and 0 <= value <= 0xFF for value in values):
+        raise ValueError("responses are not all small integers")
+    return bytes([KIND_RESPONSES]) + _u16(_indices(responses, table)) + bytes(values)
+
+
+def _pack_history_code(code: Any, table: CodeTable) -> bytes:
+    return table.packed_code[code]
+
+
+def _pack_batch(entry: Any, table: CodeTable) -> bytes:
+    if entry.keys() != {"batch", "timestamp"}:
+        raise ValueError("unexpected batch entry")
+    return (
+        bytes([KIND_BATCH])
+        + _TIMESTAMP.pack(_micros(entry["timestamp"]))
+        + _u16(_indices(entry["batch"], table))
+    )
+
+
+def _pack_back_nav(entry: Any, table: CodeTable) -> bytes:
+    if entry.keys() != {"question_id", "from_value", "to_value", "timestamp"}:
+        raise ValueError("unexpected back navigation entry")
+    return bytes([KIND_BACK_NAV]) + _BACK_NAV.pack(
+        _micros(entry["timestamp"]),
+        table.index[entry["question_id"]],
+        entry["from_value"],
+        entry["to_value"],
+    )
+
+
+# Field (or list field element) -> packer
+_PACKERS = {
+    "responses": _pack_responses,
+    "pending_questions": _pack_code_set,
+    "current_batch": _pack_codes,
+    "answer_history": _pack_history_code,
+    "batch_history": _pack_batch,
+    "back_navigation_log": _pack_back_nav,
+}
+
+
+def encode_value(name: str, value: Any, table: CodeTable) -> bytes:
+    """
+    Encode a session field value (or one element of a list field).
+
+    Args:
+        name: Field name
+        value: Field value, or list element for list fields
+        table: Code table to pack item codes against
+
+    Returns:
+        Packed bytes, or JSON if the codec can't represent the value exactly
+    """
+    packer = _PACKERS.get(name)
+    if packer is not None:
+        try:
+            return packer(value, table)
+        except (KeyError, TypeError, ValueError, AttributeError, struct.error):
+            pass
+    return _dumps(value)
+
+
+def encode_list(name: str, items: List[Any], table: CodeTable) -> List[bytes]:
+    """encode_value() for every element of a list field."""
+    if name == "answer_history":
+        try:
+            return [table.packed_code[code] for code in items]
+        except (KeyError, TypeError):
+            pass
+    return [encode_value(name, item, table) for item in items]
+
+
+# ============================================================================
+# Decoding
+# ============================================================================
+
+def _codes(payload: bytes, table: CodeTable) -> List[str]:
+    return [table.codes[i] for i in struct.unpack(f"<{len(payload) // 2}H", payload)]
+
+
+def _timestamp(micros: int) -> str:
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+def decode_value(raw: bytes, table: Optional[CodeTable]) -> Any:
+    """
+    Inverse of encode_value(); JSON values decode without a table.
+
+    Raises:
+        ValueError: If raw is packed and no code table was given
+    """
+    kind = raw[0] if raw else None
+    if kind is None or kind >= 0x20:
+        return json.loads(raw)
+    if table is None:
+        raise ValueError("Packed session value without its code table")
+
+    payload = raw[1:]
+    if kind == KIND_CODES:
+        return _codes(payload, table)
+    if kind == KIND_BITMAP:
+        bits = int.from_bytes(payload, "little")
+        return [code for i, code in enumerate(table.codes) if bits >> i & 1]
+    if kind == KIND_RESPONSES:
+        n = len(payload) // 3
+        return dict(zip(_codes(payload[:2 * n], table), payload[2 * n:]))
+    if kind == KIND_CODE:
+        return table.codes[struct.unpack("<H", payload)[0]]
+    if kind == KIND_BATCH:
+        (micros,) = _TIMESTAMP.unpack_from(payload)
+        return {"batch": _codes(payload[_TIMESTAMP.size:], table), "timestamp": _timestamp(micros)}
+    if kind == KIND_BACK_NAV:
+        micros, index, from_value, to_value = _BACK_NAV.unpack(payload)
+        return {
+            "question_id": table.codes[index],
+            "from_value": from_value,
+            "to_value": to_value,
+            "timestamp": _timestamp(micros),
+        }
+    raise ValueError(f"Unknown session value kind: {kind}")
+
+
+def decode_list(raw_items: List[bytes], table: Optional[CodeTable]) -> List[Any]:
+    """decode_value() for every element of a list field."""
+    if table is not None:
+        try:
+            return [table.unpacked_code[raw] for raw in raw_items]
+        except KeyError:
+            pass
+    return [decode_value(raw, table) for raw in raw_items]
@@ -0,0 +1,306 @@
+"""
+Session Layout - field-level Redis storage for assessment sessions
+
+A session is stored as several Redis keys instead of one JSON blob:
+- session:{id}                  hash, one value per top-level field, plus
+                                _rev (incremented by every write) and _codes
+                                (the code table packed values refer to)
+- session:{id}:{list field}     list, one value per entry, for the
+                                append-mostly histories (LIST_FIELDS)
+- session:{id}:summary          string, a small JSON summary (counts,
+                                status) the polling endpoints read instead
+                                of the session; written by the caller
+
+Values are encoded with session_codec: item codes and answers are packed
+into a few bytes each, and anything else is JSON.
+
+Writes are deltas against the record last written or read by this
+process: changed fields and list tails (appends, or a trim then appends
+after back navigation). A Lua script applies a delta atomically, refreshes
+every key's TTL and bumps _rev in the same call; it refuses the delta if
+_rev moved (another worker wrote since), which makes it a compare-and-set:
+the store either falls back to a full rewrite or, for optimistic updates,
+reports the conflict so the caller can re-read and retry. _rev never goes
+backwards, not even across full rewrites. An answer therefore sends a few hundred bytes instead of the
+whole session. Every write publishes "{id}|{origin}|{rev}" on
+INVALIDATION_CHANNEL so other workers can drop their in-memory copies, and
+records the session's expiry in ACTIVE_SESSIONS_KEY, the index that counts
+and lists live sessions without scanning the keyspace.
+
+Usage:
+    record = encode_session(data, current_code_table())
+    delta = session_delta(previous_record, record)  # previous None -> full write
+    args = delta_args(expected_rev, ttl_ms, delta, session_id, worker_id, expires_at, summary_json)
+    rev = await script(keys=script_keys(session_id), args=args)
+    data = decode_session(read_record(raw_fields, raw_lists), table)
+
+    blob = pack_session(data)  # one bytes value, for the in-process cache
+"""
+
+import json
+import marshal
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.services.session_codec import (
+    CodeTable,
+    current_code_table,
+    decode_list,
+    decode_value,
+    encode_list,
+    encode_value,
+    get_code_table,
+)
+
+# Append-mostly histories stored as Redis lists
+LIST_FIELDS = ("answer_history", "batch_history", "back_navigation_log")
+
+REV_FIELD = "_rev"
+CODES_FIELD = "_codes"
+
+# Pub/sub channel announcing session writes and deletes
+INVALIDATION_CHANNEL = "session_invalidations"
+
+# Sorted set: session id -> expiry (unix seconds), shared by both stores.
+# Outside the session:* pattern so it's never mistaken for a session key.
+ACTIVE_SESSIONS_KEY = "sessions:active"
+
+
+# KEYS: main hash, one list key per LIST_FIELDS entry, summary key, ACTIVE_SESSIONS_KEY
+# ARGV: expected rev ("" = any, "0" = no session yet), ttl ms, header json,
+#       then values: header.set field/value pairs, then each list's appended items
+# header.full deletes the session's keys first (keeping _rev); header.summary,
+# if given, replaces the summary.
+# "{header.id}|{header.origin}|{new rev}" is published on header.channel;
+# header.expires (unix seconds) is the session's score in the active index.
+# Returns the new rev, or -1 if the expected rev didn't match.
+APPLY_DELTA_SCRIPT = """
+local header = cjson.decode(ARGV[3])
+local n = #KEYS - 2
+local current = "0"
+if redis.call("type", KEYS[1]).ok == "hash" then
+    current = redis.call("hget", KEYS[1], "_rev") or "0"
+end
+if ARGV[1] ~= "" and current ~= ARGV[1] then
+    return -1
+end
+if header.full then
+    redis.call("del", unpack(KEYS, 1, n))
+    redis.call("hset", KEYS[1], "_rev", current)
+end
+local rev = redis.call("hincrby", KEYS[1], "_rev", 1)
+local i = 4
+if header.set > 0 then
+    redis.call("hset", KEYS[1], unpack(ARGV, i, i + 2 * header.set - 1))
+    i = i + 2 * header.set
+end
+if #header.unset > 0 then redis.call("hdel", KEYS[1], unpack(header.unset)) end
+for j, list in ipairs(header.lists) do
+    local key = KEYS[1 + j]
+    local keep, count = list[1], list[2]
+    if keep == 0 then
+        redis.call("del", key)
+    elseif keep > 0 then
+        redis.call("ltrim", key, 0, keep - 1)
+    end
+    if count > 0 then
+        redis.call("rpush", key, unpack(ARGV, i, i + count - 1))
+        i = i + count
+    end
+end
+for k = 1, n do redis.call("pexpire", KEYS[k], ARGV[2]) end
+if header.summary then
+    redis.call("set", KEYS[n + 1], header.summary, "PX", ARGV[2])
+else
+    redis.call("pexpire", KEYS[n + 1], ARGV[2])
+end
+redis.call("zadd", KEYS[n + 2], header.expires, header.id)
+redis.call("publish", header.channel, header.id .. "|" .. header.origin .. "|" .. rev)
+return rev
+"""
+
+
+@dataclass
+class SessionRecord:
+    """
+    Encoded session, as written to (or read from) Redis.
+
+    Attributes:
+        fields: Top-level field -> encoded value (excluding list fields)
+        lists: List field -> encoded elements
+        rev: _rev of the stored session this record matches (0 = unknown)
+        codes: Id of the code table the values were packed against
+    """
+    fields: Dict[str, bytes]
+    lists: Dict[str, List[bytes]] = field(default_factory=dict)
+    rev: int = 0
+    codes: Optional[str] = None
+
+
+def session_keys(session_id: str) -> List[str]:
+    """All Redis keys of a session, in APPLY_DELTA_SCRIPT's KEYS order."""
+    base = f"session:{session_id}"
+    return [base] + [f"{base}:{name}" for name in LIST_FIELDS]
+
+
+def summary_key(session_id: str) -> str:
+    """Key of a session's summary."""
+    return f"session:{session_id}:summary"
+
+
+def script_keys(session_id: str) -> List[str]:
+    """APPLY_DELTA_SCRIPT's KEYS: the session's keys, its summary, then the active index."""
+    return session_keys(session_id) + [summary_key(session_id), ACTIVE_SESSIONS_KEY]
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def encode_session(data: Dict[str, Any], table: CodeTable) -> SessionRecord:
+    """Encode a serialized session dict (SessionManager._serialize_for_redis output)."""
+    fields = {
+        name: encode_value(name, value, table)
+        for name, value in data.items() if name not in LIST_FIELDS
+    }
+    fields[CODES_FIELD] = table.id.encode()
+    lists = {
+        name: encode_list(name, data.get(name) or [], table)
+        for name in LIST_FIELDS
+    }
+    return SessionRecord(fields, lists, codes=table.id)
+
+
+def decode_session(record: SessionRecord, table: Optional[CodeTable]) -> Dict[str, Any]:
+    """Inverse of encode_session(); table is the one named by record.codes."""
+    data = {
+        name: decode_value(value, table)
+        for name, value in record.fields.items() if name != CODES_FIELD
+    }
+    for name in LIST_FIELDS:
+        data[name] = decode_list(record.lists.get(name, []), table)
+    return data
+
+
+def read_record(raw_fields: Dict[Any, bytes], raw_lists: List[List[bytes]]) -> Optional[SessionRecord]:
+    """
+    Build a record from HGETALL/LRANGE replies.
+
+    Returns:
+        SessionRecord, or None if the session doesn't exist
+    """
+    if not raw_fields:
+        return None
+    fields = {_text(name): value for name, value in raw_fields.items()}
+    rev = int(fields.pop(REV_FIELD, 0))
+    codes = _text(fields.get(CODES_FIELD))
+    return SessionRecord(fields, dict(zip(LIST_FIELDS, raw_lists)), rev, codes)
+
+
+def session_delta(previous: Optional[SessionRecord], current: SessionRecord) -> Dict[str, Any]:
+    """
+    Changes that turn previous into current.
+
+    With no previous record the delta writes everything (a full rewrite).
+
+    Returns:
+        {"full": bool, "set": [field, value, ...], "unset": [field, ...], "lists": [[keep, items], ...]}
+    """
+    old_fields = previous.fields if previous else {}
+
+    delta = {
+        "full": previous is None,
+        "set": [],
+        "unset": [name for name in old_fields if name not in current.fields],
+        "lists": [],
+    }
+    for name, value in current.fields.items():
+        if old_fields.get(name) != value:
+            delta["set"].extend((name, value))
+
+    for name in LIST_FIELDS:
+        new_items = current.lists.get(name, [])
+        old_items = previous.lists.get(name, []) if previous else None
+        delta["lists"].append(_list_delta(old_items, new_items))
+    return delta
+
+
+def is_empty_delta(delta: Dict[str, Any]) -> bool:
+    """Whether applying delta would change nothing."""
+    return (
+        not delta["full"] and not delta["set"] and not delta["unset"]
+        and all(keep == -1 and not items for keep, items in delta["lists"])
+    )
+
+
+def delta_args(
+    expected_rev: Any,
+    ttl_ms: int,
+    delta: Dict[str, Any],
+    session_id: str,
+    origin: str,
+    expires_at: float,
+    summary: Optional[str] = None,
+) -> List[Any]:
+    """
+    APPLY_DELTA_SCRIPT's ARGV for a delta.
+
+    Args:
+        expected_rev: Rev the delta must apply to ("" = any)
+        ttl_ms: TTL for every key
+        delta: session_delta() output
+        session_id: Session ID (active index member)
+        origin: Writer id published with the invalidation
+        expires_at: Unix time the keys expire (active index score)
+        summary: New summary JSON (None = keep the stored one)
+    """
+    header = {
+        "channel": INVALIDATION_CHANNEL,
+        "id": session_id,
+        "origin": origin,
+        "expires": expires_at,
+        "full": delta["full"],
+        "set": len(delta["set"]) // 2,
+        "unset": delta["unset"],
+        "lists": [[keep, len(items)] for keep, items in delta["lists"]],
+    }
+    if summary is not None:
+        header["summary"] = summary
+    args = [expected_rev, ttl_ms, json.dumps(header)] + delta["set"]
+    for _, items in delta["lists"]:
+        args.extend(items)
+    return args
+
+
+def _list_delta(old_items: Optional[List[bytes]], new_items: List[bytes]) -> List[Any]:
+    """[keep, items]: keep the first `keep` elements (-1 = all), then append items."""
+    if old_items is None:
+        return [0, new_items]
+    common = 0
+    for old, new in zip(old_items, new_items):
+        if old != new:
+            break
+        common += 1
+    keep = -1 if common == len(old_items) else common
+    return [keep, new_items[common:]]
+
+
+# ============================================================================
+# Single-Blob Form (in-process cache)
+# ============================================================================
+
+def pack_session(data: Dict[str, Any]) -> bytes:
+    """
+    Encode a serialized session into one bytes value.
+
+    Same packed values as the Redis layout; marshal only frames them (the
+    blob never leaves the process).
+    """
+    record = encode_session(data, current_code_table())
+    return marshal.dumps((record.fields, record.lists, record.codes))
+
+
+def unpack_session(blob: bytes) -> Dict[str, Any]:
+    """Inverse of pack_session()."""
+    fields, lists, codes = marshal.loads(blob)
+    return decode_session(SessionRecord(fields, lists, codes=codes), get_code_table(codes))
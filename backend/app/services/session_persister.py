@@ -0,0 +1,304 @@
+"""
+Session Persister - write-behind database persistence for in-progress sessions
+
+submit_answer used to write the session's columns to AssessmentSession on
+every answer. Instead, the persister buffers the latest columns per session
+in Redis (repeated answers overwrite one entry) and writes them in bulk:
+- time:  entries dirty for PERSIST_FLUSH_INTERVAL seconds
+- size:  everything, as soon as PERSIST_MAX_PENDING sessions are waiting
+- at completion (flush_session) and at shutdown (stop)
+
+Redis is the durable buffer. An entry is removed only after its columns
+were written, and only if no newer answer replaced it meanwhile, so a crash
+between buffering and flushing loses nothing: the next flush, on any
+worker, picks it up. A distributed lock serializes flushes across workers,
+so an older snapshot can never overwrite a newer one in the database.
+If Redis is unavailable, columns are written straight to the database.
+
+Usage:
+    persister = get_session_persister()
+    await persister.mark_dirty(session_id, session)     # per answer
+    await persister.flush_session(session_id, session)  # at completion
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.redis_service import get_async_redis_session_store
+
+logger = logging.getLogger(__name__)
+
+
+PERSIST_FLUSH_INTERVAL = float(os.getenv("PERSIST_FLUSH_INTERVAL", 10))
+PERSIST_MAX_PENDING = int(os.getenv("PERSIST_MAX_PENDING", 200))
+
+# Sessions per bulk statement
+PERSIST_BATCH_SIZE = 500
+
+PENDING_KEY = "persist:pending"  # hash: session id -> columns JSON
+DUE_KEY = "persist:due"  # sorted set: session id -> time first buffered
+FLUSH_LOCK = "persist_flush"
+FLUSH_LOCK_LEASE = 30
+
+# KEYS: pending hash, due set
+# ARGV: now, then session id / flushed columns pairs ("" = nothing was pending)
+# Drops entries that still hold what was flushed; re-dates the rest, which a
+# newer answer replaced mid-flush, so they go out with the next flush.
+SETTLE_SCRIPT = """
+for i = 2, #ARGV, 2 do
+    local current = redis.call("hget", KEYS[1], ARGV[i])
+    if not current or current == ARGV[i + 1] then
+        redis.call("hdel", KEYS[1], ARGV[i])
+        redis.call("zrem", KEYS[2], ARGV[i])
+    else
+        redis.call("zadd", KEYS[2], "XX", ARGV[1], ARGV[i])
+    end
+end
+return 1
+"""
+
+
+def session_columns(state: Dict[str, Any]) -> Dict[str, Any]:
+    """In-progress AssessmentSession columns of a session state dict."""
+    return {
+        "responses": state.get("responses") or {},
+        "demographics": state.get("demographics") or {},
+        "pendingQuestions": list(state.get("pending_questions", [])),
+        "answerHistory": state.get("answer_history") or [],
+        "backNavigationCount": state.get("back_navigation_count") or 0,
+        "backNavigationLog": state.get("back_navigation_log") or [],
+    }
+
+
+class SessionPersister:
+    """
+    Coalesces per-answer session writes in Redis and flushes them in bulk.
+
+    Attributes:
+        flush_interval: Seconds an entry may stay buffered
+        max_pending: Buffered sessions that trigger an immediate flush
+    """
+
+    def __init__(
+        self,
+        store,
+        service,
+        flush_interval: float = PERSIST_FLUSH_INTERVAL,
+        max_pending: int = PERSIST_MAX_PENDING,
+        batch_size: int = PERSIST_BATCH_SIZE,
+    ):
+        self._store = store
+        self._service = service
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._batch_size = batch_size
+
+        self._settle = None
+        self._settle_client = None
+        self._wake = asyncio.Event()
+        self._flush_all = False
+        self._task: Optional[asyncio.Task] = None
+
+        self._buffered = 0
+        self._flushed = 0
+        self._flushes = 0
+        self._direct_writes = 0
+
+    # ========================================================================
+    # Writes
+    # ========================================================================
+
+    async def mark_dirty(self, session_id: str, state: Dict[str, Any]) -> None:
+        """
+        Buffer a session's current columns (one round trip).
+
+        Args:
+            session_id: Session ID
+            state: Session state dict
+        """
+        columns = session_columns(state)
+        if not self._store.redis_available:
+            await self._write_direct(session_id, columns)
+            return
+
+        try:
+            async with self._store.client.pipeline(transaction=True) as pipe:
+                pipe.hset(PENDING_KEY, session_id, json.dumps(columns))
+                pipe.zadd(DUE_KEY, {session_id: time.time()}, nx=True)
+                pipe.zcard(DUE_KEY)
+                _, _, pending = await pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ Persist buffer error for session {session_id[:8]}: {e}")
+            await self._write_direct(session_id, columns)
+            return
+
+        self._buffered += 1
+        if pending >= self.max_pending:
+            self._flush_all = True
+            self._wake.set()
+
+    async def flush_session(self, session_id: str, state: Dict[str, Any]) -> None:
+        """
+        Write a session now (assessment completed), then drop its buffer entry.
+
+        Args:
+            session_id: Session ID
+            state: Session state dict
+        """
+        await self.mark_dirty(session_id, state)
+        if not self._store.redis_available:
+            return  # mark_dirty already wrote it
+
+        lock = await self._store.locks.acquire(FLUSH_LOCK, lease_seconds=FLUSH_LOCK_LEASE, wait_seconds=10, keepalive=True)
+        if lock is None:
+            logger.warning(f"⚠️ Flush lock busy, session {session_id[:8]} left for the next flush")
+            return
+        try:
+            await self._flush_batch([session_id])
+        finally:
+            await self._store.locks.release(lock)
+
+    async def _write_direct(self, session_id: str, columns: Dict[str, Any]) -> None:
+        """Write-through when Redis can't buffer."""
+        await self._service.update_sessions_bulk({session_id: columns})
+        self._direct_writes += 1
+
+    # ========================================================================
+    # Flushing
+    # ========================================================================
+
+    async def flush(self, everything: bool = False) -> int:
+        """
+        Write due entries (or all of them) in bulk statements.
+
+        Args:
+            everything: Flush regardless of age (size trigger, shutdown)
+
+        Returns:
+            Number of sessions written (0 if another worker is flushing)
+        """
+        if not self._store.redis_available:
+            return 0
+
+        lock = await self._store.locks.acquire(
+            FLUSH_LOCK,
+            lease_seconds=FLUSH_LOCK_LEASE,
+            wait_seconds=FLUSH_LOCK_LEASE if everything else 0,
+            keepalive=True,
+        )
+        if lock is None:
+            return 0
+
+        # Entries re-dated during this flush score after started, so each
+        # session is written at most once per call
+        started = time.time()
+        cutoff = started if everything else started - self.flush_interval
+        written = 0
+        try:
+            while True:
+                ids = await self._store.client.zrangebyscore(DUE_KEY, "-inf", cutoff, start=0, num=self._batch_size)
+                if not ids:
+                    break
+                written += await self._flush_batch([_text(sid) for sid in ids])
+        finally:
+            await self._store.locks.release(lock)
+
+        if written:
+            self._flushes += 1
+            logger.info(f"💾 Flushed {written} buffered session(s) to the database")
+        return written
+
+    async def _flush_batch(self, session_ids: List[str]) -> int:
+        """Bulk-write the buffered columns of session_ids, then settle the buffer."""
+        client = self._store.client
+        payloads = await client.hmget(PENDING_KEY, session_ids)
+        rows = {
+            session_id: json.loads(payload)
+            for session_id, payload in zip(session_ids, payloads) if payload is not None
+        }
+        await self._service.update_sessions_bulk(rows)
+
+        args: List[Any] = [time.time()]
+        for session_id, payload in zip(session_ids, payloads):
+            args.extend((session_id, payload if payload is not None else ""))
+        await self._settle_script()(keys=[PENDING_KEY, DUE_KEY], args=args)
+
+        self._flushed += len(rows)
+        return len(rows)
+
+    def _settle_script(self):
+        """SETTLE_SCRIPT registered on the store's current client"""
+        if self._settle_client is not self._store.client:
+            self._settle_client = self._store.client
+            self._settle = self._settle_client.register_script(SETTLE_SCRIPT)
+        return self._settle
+
+    # ========================================================================
+    # Lifecycle
+    # ========================================================================
+
+    async def run(self) -> None:
+        """Flush on the time policy, or right away when woken by the size policy."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(self.flush_interval / 2, 0.1))
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            everything, self._flush_all = self._flush_all, False
+            try:
+                await self.flush(everything=everything)
+            except Exception as e:
+                logger.error(f"❌ Session flush failed (entries stay buffered): {e}")
+
+    def start(self) -> None:
+        """Start the background flusher (application startup)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write everything still buffered (application shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush(everything=True)
+        except Exception as e:
+            logger.error(f"❌ Shutdown flush failed (entries stay buffered in Redis): {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Buffer and flush counters for monitoring."""
+        return {
+            "buffered_writes": self._buffered,
+            "sessions_flushed": self._flushed,
+            "flushes": self._flushes,
+            "direct_writes": self._direct_writes,
+        }
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+# ============================================================================
+# Global Persister Instance
+# ============================================================================
+
+_session_persister: Optional[SessionPersister] = None
+
+
+def get_session_persister() -> SessionPersister:
+    """Get or create the process-wide SessionPersister."""
+    global _session_persister
+    if _session_persister is None:
+        from app.services.assessment_service import AssessmentService
+        _session_persister = SessionPersister(get_async_redis_session_store(), AssessmentService())
+    return _session_persister
@@ -0,0 +1,535 @@
+"""
+SELVE Adaptive Testing Simulation
+=================================
+Monte Carlo harness for the adaptive engines.
+
+Generates synthetic respondents from latent profiles, runs each one through
+an adaptive engine until it stops, and reports:
+- items-to-completion distribution
+- per-selection latency percentiles (stop check + next-batch selection)
+- score error of the adaptive profile against scoring the full item pool
+- throughput in selections per second
+
+Respondents:
+    Each respondent gets a true trait value theta ~ N(mean, sd) per
+    dimension and answers every item in the pool up front, drawn from the
+    graded response model (see app.irt_testing.GRMItemBank). A fraction
+    `random_rate` of answers are replaced by uniform noise (inattentive
+    responding). The engine only sees the items it asks for; the full
+    answer sheet is the reference score.
+
+Drivers:
+    "tester"          AdaptiveTester/IRTAdaptiveTester loop, as run_adaptive_assessment
+    "question_engine" QuestionEngine loop, as the submit-answer route
+                      (coverage floor, dedup, consistency checks)
+
+Respondents are split into fixed-size chunks with their own seeds, so
+results are identical for any number of worker processes.
+
+Usage:
+    report = run_simulation(profiles=[LatentProfile('population')], n_respondents=2000, workers=4)
+    print(report.format())
+
+    python scripts/simulate_assessments.py --respondents 5000 --engine irt
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.adaptive_testing import AdaptiveTester, get_adaptive_tester
+from app.irt_testing import GRMItemBank, get_irt_tester
+from app.score_state import ScoreState
+from app.scoring import SelveScorer, get_scorer
+
+
+ENGINES = ("heuristic", "irt")
+DRIVERS = ("tester", "question_engine")
+
+# Respondents per task sent to a worker process (also the seeding unit)
+CHUNK_SIZE = 50
+
+# Selections per respondent before a run is counted as stuck
+MAX_SELECTIONS = 200
+
+# Demographics used by the question_engine driver (no context exclusions)
+SIMULATED_DEMOGRAPHICS = {
+    "demo_drives": "yes",
+    "demo_credit_cards": "yes",
+    "demo_has_yard": "yes",
+}
+
+
+@dataclass(frozen=True)
+class LatentProfile:
+    """
+    Population that synthetic respondents are drawn from.
+
+    Attributes:
+        name: Label used in the report
+        means: Mean theta per dimension (missing dimensions: 0)
+        sd: Standard deviation of theta around the means
+        random_rate: Fraction of answers replaced by uniform noise
+        weight: Share of respondents drawn from this profile
+    """
+    name: str
+    means: Mapping[str, float] = field(default_factory=dict)
+    sd: float = 1.0
+    random_rate: float = 0.0
+    weight: float = 1.0
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "LatentProfile":
+        return cls(
+            name=data["name"],
+            means=dict(data.get("means", {})),
+            sd=float(data.get("sd", 1.0)),
+            random_rate=float(data.get("random_rate", 0.0)),
+            weight=float(data.get("weight", 1.0)),
+        )
+
+
+# Built-in profiles for the CLI
+DEFAULT_PROFILES: Dict[str, LatentProfile] = {
+    "population": LatentProfile("population"),
+    "moderate": LatentProfile("moderate", sd=0.35),
+    "extreme": LatentProfile("extreme", means={
+        "LUMEN": 1.5, "AETHER": -1.5, "ORPHEUS": 1.5, "ORIN": -1.5,
+        "LYRA": 1.5, "VARA": -1.5, "CHRONOS": 1.5, "KAEL": -1.5,
+    }, sd=0.5),
+    "inattentive": LatentProfile("inattentive", random_rate=0.5),
+}
+
+
+@dataclass
+class RespondentResult:
+    """Outcome of one simulated assessment."""
+    profile: str
+    n_items: int
+    stop_reason: str
+    latencies: List[float]
+    abs_errors: List[float]
+
+
+@dataclass
+class SimulationReport:
+    """
+    Aggregated simulation metrics.
+
+    Attributes:
+        engine: Engine name ("heuristic" or "irt")
+        driver: Driver name ("tester" or "question_engine")
+        dimensions: Dimension names, in pool order
+        profiles: Profile name of each respondent
+        n_items: Items asked per respondent
+        abs_errors: (n_respondents, n_dimensions) |adaptive - full pool| normalized score
+        latencies: Seconds per selection step, all respondents
+        stop_reasons: Stop reason -> respondent count
+        wall_seconds: Wall-clock duration of the run
+    """
+    engine: str
+    driver: str
+    dimensions: Tuple[str, ...]
+    profiles: List[str]
+    n_items: np.ndarray
+    abs_errors: np.ndarray
+    latencies: np.ndarray
+    stop_reasons: Dict[str, int]
+    wall_seconds: float
+
+    @property
+    def n_respondents(self) -> int:
+        return len(self.profiles)
+
+    @property
+    def n_selections(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def selections_per_second(self) -> float:
+        """Selection throughput of one worker (selections / time spent selecting)."""
+        busy = float(self.latencies.sum())
+        return self.n_selections / busy if busy > 0 else 0.0
+
+    def items_summary(self, mask: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """Items-to-completion distribution (mean and percentiles)."""
+        items = self.n_items if mask is None else self.n_items[mask]
+        if len(items) == 0:
+            return {}
+        return {
+            "mean": round(float(items.mean()), 2),
+            "min": int(items.min()),
+            "p50": round(float(np.percentile(items, 50)), 1),
+            "p90": round(float(np.percentile(items, 90)), 1),
+            "p99": round(float(np.percentile(items, 99)), 1),
+            "max": int(items.max()),
+        }
+
+    def latency_summary_ms(self) -> Dict[str, float]:
+        """Per-selection latency percentiles in milliseconds."""
+        if self.n_selections == 0:
+            return {}
+        ms = self.latencies * 1000
+        return {
+            "p50": round(float(np.percentile(ms, 50)), 3),
+            "p90": round(float(np.percentile(ms, 90)), 3),
+            "p99": round(float(np.percentile(ms, 99)), 3),
+            "max": round(float(ms.max()), 3),
+        }
+
+    def error_summary(self, mask: Optional[np.ndarray] = None) -> Dict[str, Dict[str, float]]:
+        """MAE, RMSE and max absolute error per dimension (0-100 score points)."""
+        errors = self.abs_errors if mask is None else self.abs_errors[mask]
+        if len(errors) == 0:
+            return {}
+        return {
+            dimension: {
+                "mae": round(float(errors[:, i].mean()), 2),
+                "rmse": round(float(np.sqrt((errors[:, i] ** 2).mean())), 2),
+                "max": round(float(errors[:, i].max()), 2),
+            }
+            for i, dimension in enumerate(self.dimensions)
+        }
+
+    @property
+    def mean_abs_error(self) -> float:
+        """MAE over all respondents and dimensions."""
+        return float(self.abs_errors.mean()) if self.abs_errors.size else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        profiles = np.asarray(self.profiles)
+        return {
+            "engine": self.engine,
+            "driver": self.driver,
+            "respondents": self.n_respondents,
+            "selections": self.n_selections,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "selections_per_second": round(self.selections_per_second, 1),
+            "items_to_completion": self.items_summary(),
+            "selection_latency_ms": self.latency_summary_ms(),
+            "mean_abs_error": round(self.mean_abs_error, 2),
+            "score_error": self.error_summary(),
+            "stop_reasons": dict(self.stop_reasons),
+            "by_profile": {
+                name: {
+                    "respondents": int((profiles == name).sum()),
+                    "items_to_completion": self.items_summary(profiles == name),
+                    "mean_abs_error": round(float(self.abs_errors[profiles == name].mean()), 2),
+                }
+                for name in dict.fromkeys(self.profiles)
+            },
+        }
+
+    def format(self) -> str:
+        """Human-readable report."""
+        data = self.to_dict()
+        lines = [
+            f"Engine: {self.engine} ({self.driver})",
+            f"Respondents: {self.n_respondents}   Selections: {self.n_selections}   "
+            f"Wall: {data['wall_seconds']}s",
+            f"Throughput: {data['selections_per_second']} selections/s per worker",
+            f"Items to completion: {data['items_to_completion']}",
+            f"Selection latency (ms): {data['selection_latency_ms']}",
+            f"Score error vs full pool: MAE {data['mean_abs_error']}",
+        ]
+        for dimension, errors in data["score_error"].items():
+            lines.append(f"  {dimension:<8} mae={errors['mae']:<6} rmse={errors['rmse']:<6} max={errors['max']}")
+        lines.append("By profile:")
+        for name, summary in data["by_profile"].items():
+            lines.append(
+                f"  {name:<12} n={summary['respondents']:<6} "
+                f"items={summary['items_to_completion']} mae={summary['mean_abs_error']}"
+            )
+        lines.append("Stop reasons:")
+        for reason, count in sorted(self.stop_reasons.items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {count:>6}  {reason}")
+        return "\n".join(lines)
+
+
+# ============================================================================
+# Respondents
+# ============================================================================
+
+class RespondentGenerator:
+    """Draws full answer sheets from a latent profile under the GRM."""
+
+    def __init__(self, scorer: SelveScorer):
+        self.scorer = scorer
+        self.compiled = scorer.compiled
+        self.bank = GRMItemBank(scorer)
+
+    def sample(self, profile: LatentProfile, rng: np.random.Generator) -> Dict[str, int]:
+        """
+        One respondent's answers to every item in the pool.
+
+        Returns:
+            Dict of item_code -> response value
+        """
+        compiled = self.compiled
+        means = np.array([profile.means.get(dim, 0.0) for dim in compiled.dimensions])
+        theta = rng.normal(means, profile.sd)
+        values = self.bank.sample_responses(theta, rng)
+
+        if profile.random_rate > 0:
+            noise = rng.random(compiled.n_items) < profile.random_rate
+            uniform = 1 + rng.integers(0, compiled.scale_max.astype(np.intp))
+            values = np.where(noise, uniform, values)
+
+        return {code: int(value) for code, value in zip(compiled.item_codes, values)}
+
+
+# ============================================================================
+# Drivers
+# ============================================================================
+
+def run_tester_session(
+    tester: AdaptiveTester,
+    answer_sheet: Mapping[str, int],
+    batch_size: int = 3
+) -> Tuple[Dict[str, int], List[float], str]:
+    """
+    Run one respondent through a tester, the way run_adaptive_assessment does.
+
+    Returns:
+        (asked responses, seconds per selection step, stop reason)
+    """
+    responses = {item['item']: answer_sheet[item['item']] for item in tester.get_quick_screen()}
+    latencies = []
+    reason = f"Selection limit reached ({MAX_SELECTIONS})"
+
+    for _ in range(MAX_SELECTIONS):
+        start = time.perf_counter()
+        uncertainties = tester.calculate_uncertainties(responses)
+        should_continue, reason = tester.should_continue_testing(responses, uncertainties)
+        items = []
+        if should_continue:
+            items = tester.select_next_items_excluding(
+                responses, set(responses), batch_size, uncertainties
+            )
+        latencies.append(time.perf_counter() - start)
+
+        if not should_continue:
+            break
+        if not items:
+            reason = "No items selected"
+            break
+        for item in items:
+            responses[item['item']] = answer_sheet[item['item']]
+
+    return responses, latencies, reason
+
+
+def run_question_engine_session(
+    engine: Any,
+    answer_sheet: Mapping[str, int],
+    batch_size: int = 3
+) -> Tuple[Dict[str, int], List[float], str]:
+    """
+    Run one respondent through a QuestionEngine, the way submit_answer does.
+
+    Every batch is answered in full before the next selection, so nothing
+    is pending at selection time.
+
+    Returns:
+        (asked responses, seconds per selection step, stop reason)
+    """
+    tester = engine.tester
+    responses: Dict[str, int] = {}
+    state = None
+    latencies = []
+    reason = f"Selection limit reached ({MAX_SELECTIONS})"
+
+    for _ in range(MAX_SELECTIONS):
+        start = time.perf_counter()
+        uncertainties = tester.calculate_session_uncertainties(responses, state)
+        should_continue, reason = engine.should_continue_testing(responses, set(), uncertainties=uncertainties)
+        items = []
+        if should_continue:
+            items = engine.select_next_questions(
+                responses=responses,
+                demographics=SIMULATED_DEMOGRAPHICS,
+                pending_questions=set(),
+                max_items=batch_size,
+                uncertainties=uncertainties,
+            )
+        latencies.append(time.perf_counter() - start)
+
+        if not should_continue:
+            break
+        if not items:
+            reason = "No more questions available"
+            break
+        for item in items:
+            code = item['item']
+            old_value = responses.get(code)
+            responses[code] = answer_sheet[code]
+            state = _record(tester, state, code, old_value, responses)
+
+    return responses, latencies, reason
+
+
+def _record(
+    tester: AdaptiveTester,
+    state: Optional[ScoreState],
+    code: str,
+    old_value: Optional[int],
+    responses: Dict[str, int]
+) -> ScoreState:
+    """Keep a session ScoreState in step, as the submit-answer route does."""
+    if state is None:
+        return ScoreState.from_responses(tester.scorer.compiled, responses)
+    state.record(code, old_value, responses[code])
+    return state
+
+
+# ============================================================================
+# Worker Processes
+# ============================================================================
+
+_worker: Dict[str, Any] = {}
+
+
+def _get_driver(engine: str, driver: str):
+    """Build (once per process) the session runner for an engine/driver pair."""
+    key = (engine, driver)
+    if key not in _worker:
+        tester = get_irt_tester() if engine == "irt" else get_adaptive_tester()
+        if driver == "question_engine":
+            # Imported lazily: the routes package pulls in the web and database stack
+            from app.routes.assessment.question_engine import QuestionEngine
+
+            question_engine = QuestionEngine(tester=tester, scorer=get_scorer())
+            _worker[key] = lambda sheet, batch: run_question_engine_session(question_engine, sheet, batch)
+        else:
+            _worker[key] = lambda sheet, batch: run_tester_session(tester, sheet, batch)
+    if "generator" not in _worker:
+        _worker["generator"] = RespondentGenerator(get_scorer())
+    return _worker[key], _worker["generator"]
+
+
+def _run_chunk(
+    engine: str,
+    driver: str,
+    profiles: Sequence[LatentProfile],
+    profile_indices: Sequence[int],
+    seed: np.random.SeedSequence,
+    batch_size: int
+) -> List[RespondentResult]:
+    """Simulate one chunk of respondents (runs in a worker process)."""
+    run_session, generator = _get_driver(engine, driver)
+    scorer = generator.scorer
+    rng = np.random.default_rng(seed)
+
+    results = []
+    for profile_index in profile_indices:
+        profile = profiles[profile_index]
+        answer_sheet = generator.sample(profile, rng)
+        responses, latencies, reason = run_session(answer_sheet, batch_size)
+
+        adaptive = scorer.score_responses(responses, validate=False).dimension_scores
+        full = scorer.score_responses(answer_sheet, validate=False).dimension_scores
+        results.append(RespondentResult(
+            profile=profile.name,
+            n_items=len(responses),
+            stop_reason=reason,
+            latencies=latencies,
+            abs_errors=[abs(adaptive[dim] - full[dim]) for dim in scorer.compiled.dimensions],
+        ))
+    return results
+
+
+def run_simulation(
+    profiles: Sequence[LatentProfile] = (DEFAULT_PROFILES["population"],),
+    n_respondents: int = 1000,
+    engine: str = "heuristic",
+    driver: str = "tester",
+    workers: int = 1,
+    seed: int = 0,
+    batch_size: int = 3
+) -> SimulationReport:
+    """
+    Simulate adaptive assessments for synthetic respondents.
+
+    Args:
+        profiles: Latent profiles; respondents are split by profile weight
+        n_respondents: Total number of respondents
+        engine: "heuristic" or "irt"
+        driver: "tester" or "question_engine"
+        workers: Worker processes (1 = run in this process)
+        seed: Base seed; same seed gives the same respondents and results
+        batch_size: Items per selection (the API sends 3)
+
+    Returns:
+        SimulationReport
+
+    Raises:
+        ValueError: If engine, driver or profiles are invalid
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}' (expected one of {ENGINES})")
+    if driver not in DRIVERS:
+        raise ValueError(f"Unknown driver '{driver}' (expected one of {DRIVERS})")
+    if not profiles or any(p.weight < 0 for p in profiles) or sum(p.weight for p in profiles) <= 0:
+        raise ValueError("Profiles must have non-negative weights with a positive total")
+
+    profiles = tuple(profiles)
+    assignment = _assign_profiles(profiles, n_respondents)
+    chunks = [assignment[i:i + CHUNK_SIZE] for i in range(0, n_respondents, CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    args = [(engine, driver, profiles, chunk, chunk_seed, batch_size) for chunk, chunk_seed in zip(chunks, seeds)]
+
+    start = time.perf_counter()
+    if workers <= 1:
+        chunk_results = [_run_chunk(*chunk_args) for chunk_args in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunk_results = list(pool.map(_run_chunk, *zip(*args)))
+    wall_seconds = time.perf_counter() - start
+
+    results = [result for chunk in chunk_results for result in chunk]
+    stop_reasons: Dict[str, int] = {}
+    for result in results:
+        stop_reasons[result.stop_reason] = stop_reasons.get(result.stop_reason, 0) + 1
+
+    dimensions = get_scorer().compiled.dimensions
+    return SimulationReport(
+        engine=engine,
+        driver=driver,
+        dimensions=dimensions,
+        profiles=[result.profile for result in results],
+        n_items=np.array([result.n_items for result in results], dtype=np.intp),
+        abs_errors=np.array([result.abs_errors for result in results], dtype=np.float64).reshape(-1, len(dimensions)),
+        latencies=np.array([t for result in results for t in result.latencies], dtype=np.float64),
+        stop_reasons=stop_reasons,
+        wall_seconds=wall_seconds,
+    )
+
+
+def _assign_profiles(profiles: Sequence[LatentProfile], n_respondents: int) -> List[int]:
+    """Profile index per respondent, split by weight (largest remainder), interleaved."""
+    total = sum(p.weight for p in profiles)
+    quotas = [n_respondents * p.weight / total for p in profiles]
+    counts = [math.floor(q) for q in quotas]
+    by_remainder = sorted(range(len(profiles)), key=lambda i: counts[i] - quotas[i])
+    for i in by_remainder[:n_respondents - sum(counts)]:
+        counts[i] += 1
+
+    # Round-robin so every chunk sees a mix of profiles
+    assignment: List[int] = []
+    remaining = list(counts)
+    while len(assignment) < n_respondents:
+        for i, left in enumerate(remaining):
+            if left:
+                assignment.append(i)
+                remaining[i] -= 1
+    return assignment
+
+
+def default_workers() -> int:
+    """Worker processes for the CLI: one per CPU, leaving one free."""
+    return max(1, (os.cpu_count() or 1) - 1)
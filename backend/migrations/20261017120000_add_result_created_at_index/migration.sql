@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "AssessmentResult_createdAt_idx" ON "AssessmentResult"("createdAt");
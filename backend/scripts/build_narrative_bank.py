@@ -0,0 +1,125 @@
+"""
+Precompute narratives for the most common profile patterns.
+
+Streams AssessmentResult scores out of Postgres page by page, finds the
+most frequent level/conflict signatures, generates every narrative section
+for each through OpenAIGenerator.generate_batch_async (bounded by
+--max-concurrent), and stores them in the narrative bank. Results requests
+for those profiles are then served without calling the LLM.
+
+Run it on a schedule (e.g. nightly), and after changing prompts or models.
+
+Usage (from backend/):
+    python scripts/build_narrative_bank.py --top 200 --max-concurrent 5
+    python scripts/build_narrative_bank.py --dry-run   # signatures and coverage only
+    python scripts/build_narrative_bank.py --report    # current bank coverage and freshness
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add the backend directory to Python path so the script can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db import prisma  # noqa: E402
+from app.narratives.narrative_bank import (  # noqa: E402
+    NARRATIVE_BANK_CONCURRENCY,
+    NARRATIVE_BANK_SIZE,
+    NarrativeBank,
+    build_narrative_bank,
+    mine_signatures,
+)
+from app.narratives.openai_generator import get_openai_generator  # noqa: E402
+from app.services.redis_service import close_async_redis_session_store, get_async_redis_session_store  # noqa: E402
+
+# AssessmentResult column for each dimension
+SCORE_FIELDS = {
+    "LUMEN": "scoreLumen",
+    "AETHER": "scoreAether",
+    "ORPHEUS": "scoreOrpheus",
+    "ORIN": "scoreOrin",
+    "LYRA": "scoreLyra",
+    "VARA": "scoreVara",
+    "CHRONOS": "scoreChronos",
+    "KAEL": "scoreKael",
+}
+
+
+async def load_scores(page_size: int) -> List[Dict[str, float]]:
+    """Dimension scores of every current AssessmentResult, keyset-paginated by id."""
+    rows: List[Dict[str, float]] = []
+    cursor = None
+    while True:
+        page = await prisma.assessmentresult.find_many(
+            where={"isCurrent": True},
+            order={"id": "asc"},
+            take=page_size,
+            skip=1 if cursor else 0,
+            cursor={"id": cursor} if cursor else None,
+        )
+        if not page:
+            return rows
+        rows.extend({dim: getattr(result, field) for dim, field in SCORE_FIELDS.items()} for result in page)
+        cursor = page[-1].id
+        print(f"… {len(rows)} results loaded", file=sys.stderr)
+
+
+async def run(args: argparse.Namespace) -> None:
+    store = get_async_redis_session_store()
+    await store.connect()
+    bank = NarrativeBank(store)
+    llm = get_openai_generator()
+
+    try:
+        if args.report:
+            print(json.dumps(await bank.report(llm.config.model), indent=2))
+            return
+
+        await prisma.connect()
+        try:
+            rows = await load_scores(args.page_size)
+        finally:
+            await prisma.disconnect()
+
+        if args.dry_run:
+            mined, total = mine_signatures(rows, args.top, args.min_count)
+            covered = sum(profile["count"] for profile in mined)
+            for profile in mined:
+                print(f"{profile['count']:6d}  {profile['signature']}")
+            print(
+                f"✅ {len(mined)} signatures cover {covered}/{total} results "
+                f"({covered / total * 100 if total else 0:.1f}%)",
+                file=sys.stderr,
+            )
+            return
+
+        summary = await build_narrative_bank(
+            rows, llm, bank, top_n=args.top, min_count=args.min_count, max_concurrent=args.max_concurrent
+        )
+        print(
+            f"✅ Banked {summary['signatures']} signatures ({summary['failed']} failed), covering "
+            f"{summary['results_covered']}/{summary['results_mined']} results, cost ${summary['cost']:.4f}",
+            file=sys.stderr,
+        )
+        print(json.dumps(await bank.report(llm.config.model), indent=2))
+    finally:
+        await close_async_redis_session_store()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Precompute narratives for common profile patterns.")
+    parser.add_argument("--top", type=int, default=NARRATIVE_BANK_SIZE, help="Signatures to generate")
+    parser.add_argument("--min-count", type=int, default=2, help="Results a signature needs to be banked")
+    parser.add_argument("--max-concurrent", type=int, default=NARRATIVE_BANK_CONCURRENCY, help="LLM requests in flight")
+    parser.add_argument("--page-size", type=int, default=1000, help="Results fetched per database page")
+    parser.add_argument("--dry-run", action="store_true", help="List signatures and coverage without generating")
+    parser.add_argument("--report", action="store_true", help="Print the current bank's coverage and freshness")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,134 @@
+"""
+Re-score historical assessments with the current item pool.
+
+Streams AssessmentSession.responses out of Postgres page by page, scores
+each page with SelveScorer.score_batch, and reports (or writes back) the
+dimension scores. Run this after changing the item pool or reverse keys.
+
+Usage (from backend/):
+    python scripts/rescore_results.py --output rescored.csv
+    python scripts/rescore_results.py --apply --page-size 2000
+"""
+
+import argparse
+import asyncio
+import csv
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add the backend directory to Python path so the script can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db import prisma  # noqa: E402
+from app.scoring import SelveScorer  # noqa: E402
+
+# AssessmentResult column for each dimension
+SCORE_FIELDS = {
+    "LUMEN": "scoreLumen",
+    "AETHER": "scoreAether",
+    "ORPHEUS": "scoreOrpheus",
+    "ORIN": "scoreOrin",
+    "LYRA": "scoreLyra",
+    "VARA": "scoreVara",
+    "CHRONOS": "scoreChronos",
+    "KAEL": "scoreKael",
+}
+
+
+async def iter_session_pages(status: Optional[str], page_size: int):
+    """Yield pages of AssessmentSession rows (with results), keyset-paginated by id."""
+    where = {"status": status} if status else {}
+    cursor = None
+
+    while True:
+        page = await prisma.assessmentsession.find_many(
+            where=where,
+            include={"result": True},
+            order={"id": "asc"},
+            take=page_size,
+            skip=1 if cursor else 0,
+            cursor={"id": cursor} if cursor else None,
+        )
+        if not page:
+            return
+        yield page
+        cursor = page[-1].id
+
+
+async def rescore(args: argparse.Namespace) -> None:
+    scorer = SelveScorer(args.item_pool) if args.item_pool else SelveScorer()
+    dimensions = list(scorer.compiled.dimensions)
+
+    output = open(args.output, "w", newline="") if args.output else sys.stdout
+    writer = csv.writer(output)
+    writer.writerow(["session_id", "changed"] + dimensions)
+
+    totals = {"scored": 0, "invalid": 0, "changed": 0, "updated": 0}
+
+    await prisma.connect()
+    try:
+        async for page in iter_session_pages(args.status, args.page_size):
+            sessions = []
+            responses: List[Dict] = []
+            for session in page:
+                session_responses = session.responses or {}
+                try:
+                    scorer._validate_responses(session_responses)
+                except ValueError as e:
+                    totals["invalid"] += 1
+                    print(f"⚠️  Skipping {session.id}: {e}", file=sys.stderr)
+                    continue
+                sessions.append(session)
+                responses.append(session_responses)
+
+            batch = scorer.score_batch(responses, validate=False)
+            totals["scored"] += len(batch)
+
+            updates = []
+            for row, session in enumerate(sessions):
+                scores = batch.dimension_scores(row)
+                changed = session.result is not None and any(
+                    abs(getattr(session.result, SCORE_FIELDS[dim]) - score) > args.tolerance
+                    for dim, score in scores.items()
+                )
+                if changed:
+                    totals["changed"] += 1
+                    updates.append((session.id, scores))
+                writer.writerow([session.id, int(changed)] + [scores[dim] for dim in dimensions])
+
+            if args.apply and updates:
+                async with prisma.batch_() as batcher:
+                    for session_id, scores in updates:
+                        batcher.assessmentresult.update(
+                            where={"sessionId": session_id},
+                            data={SCORE_FIELDS[dim]: score for dim, score in scores.items()},
+                        )
+                totals["updated"] += len(updates)
+
+            print(f"… {totals['scored']} sessions scored", file=sys.stderr)
+    finally:
+        await prisma.disconnect()
+        if output is not sys.stdout:
+            output.close()
+
+    print(
+        f"✅ Scored {totals['scored']} sessions ({totals['invalid']} skipped as invalid), "
+        f"{totals['changed']} with changed scores, {totals['updated']} results updated",
+        file=sys.stderr,
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-score stored assessments with the current item pool.")
+    parser.add_argument("--status", default="completed", help="Session status to re-score ('' for all)")
+    parser.add_argument("--page-size", type=int, default=1000, help="Sessions fetched per database page")
+    parser.add_argument("--item-pool", help="Item pool JSON (default: expanded pool)")
+    parser.add_argument("--output", help="CSV output path (default: stdout)")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Score difference counted as a change")
+    parser.add_argument("--apply", action="store_true", help="Write changed scores to AssessmentResult")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(rescore(parse_args()))
@@ -5,6 +5,8 @@ Tests the intelligent question selection logic that reduces
 assessment time by 40-60% while maintaining accuracy.
 """
 
+import random
+
 import pytest
 from app.adaptive_testing import AdaptiveTester, DimensionUncertainty, simulate_responses
 
@@ -114,6 +116,47 @@ class TestAdaptiveTester:
         assert uncertainty.variance < 0.1
         assert uncertainty.n_items_answered == 5
         # Midpoint score (near 50) might still be uncertain
+
+    def test_uncertainty_vector_covers_all_dimensions(self, tester):
+        """Test single-pass uncertainty vector returns every dimension."""
+        responses = simulate_responses(tester.get_quick_screen())
+    
+        uncertainties = tester.calculate_uncertainties(responses)
+    
+        assert list(uncertainties.keys()) == list(tester.item_pool.keys())
+        assert all(u.n_items_answered == 2 for u in uncertainties.values())
+    
+    def test_uncertainty_vector_matches_reference(self, tester):
+        """Test vectorized uncertainty matches a per-item reference calculation."""
+        import random
+        import statistics
+        rng = random.Random(11)
+        all_items = tester.scorer.get_all_items()
+    
+        for _ in range(20):
+            sample = rng.sample(all_items, rng.randint(8, 60))
+            responses = {
+                item['item']: rng.randint(1, tester.scorer._get_scale_range(item['item'])[1])
+                for item in sample
+            }
+            uncertainties = tester.calculate_uncertainties(responses)
+            profile = tester.scorer.score_responses(responses)
+    
+            for dim, uncertainty in uncertainties.items():
+                normalized = []
+                for item in tester.scorer.dimension_items[dim]:
+                    if item['item'] in responses:
+                        scale_max = tester.scorer._get_scale_range(item['item'])[1]
+                        value = tester.scorer._apply_reverse_scoring(
+                            responses[item['item']], item['reversed'], scale_max
+                        )
+                        normalized.append((value - 1) / (scale_max - 1))
+    
+                expected_variance = statistics.variance(normalized) if len(normalized) > 1 else 0.0
+                assert uncertainty.n_items_answered == len(normalized)
+                assert uncertainty.variance == pytest.approx(expected_variance, abs=1e-9)
+                if normalized:
+                    assert uncertainty.normalized_score == getattr(profile, dim.lower()).normalized_score
     
     def test_select_next_items_prioritizes_uncertain(self, tester):
         """Test next item selection prioritizes uncertain dimensions."""
@@ -147,7 +190,34 @@ class TestAdaptiveTester:
         next_items = tester.select_next_items(responses, max_items=3)
         
         assert len(next_items) <= 3
-    
+
+    def test_selection_key_determines_selection(self, tester):
+        """Test states with equal selection keys select the same items."""
+        random.seed(7)
+        quick_items = tester.get_quick_screen()
+        memo = {}
+        repeats = 0
+
+        for _ in range(40):
+            # Straight-lined quick screens, then random answers
+            value = random.randint(1, 5)
+            responses = {item['item']: value for item in quick_items}
+            for _ in range(4):
+                uncertainties = tester.calculate_uncertainties(responses)
+                exclude = set(responses)
+                items = tester.select_next_items_excluding(responses, exclude, 4, uncertainties)
+                codes = [item['item'] for item in items]
+
+                key = (frozenset(exclude), tester.selection_key(responses, uncertainties))
+                if key in memo:
+                    repeats += 1
+                    assert memo[key] == codes
+                memo[key] = codes
+                responses.update(simulate_responses(items))
+
+        # Quick-screen states collide often, which is what makes memoizing pay
+        assert repeats > 0
+
     def test_should_continue_testing_max_items(self, tester):
         """Test stopping at max items."""
         # Create responses at max items limit
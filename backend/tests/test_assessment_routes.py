@@ -0,0 +1,246 @@
+"""
+Tests for the assessment answer/back-navigation handlers
+
+Drives submit_answer and go_back directly (session storage and database
+writes replaced by in-memory fakes) and checks the session's incremental
+score state always equals a rebuild from its responses.
+"""
+
+import asyncio
+import importlib
+import inspect
+from types import SimpleNamespace
+
+import pytest
+from fastapi import BackgroundTasks, HTTPException
+
+try:
+    routes = importlib.import_module('app.routes.assessment.router')
+except RuntimeError as e:  # Prisma client not generated in this environment
+    pytest.skip(f"Assessment routes unavailable: {e}", allow_module_level=True)
+
+from app.item_pool import scale_range_for_code
+from app.routes.assessment.constants import DEMOGRAPHIC_QUESTION_ORDER
+from app.routes.assessment.dependencies import get_tester
+from app.routes.assessment.question_engine import QuestionEngine
+from app.routes.assessment.schemas import GetPreviousQuestionRequest, SubmitAnswerRequest
+from app.routes.assessment.selection_cache import SelectionCache
+from app.routes.assessment.speculation import SpeculativeBatchCache
+from app.routes.assessment.utils import build_session_summary
+from app.score_state import ScoreState
+from app.scoring import get_scorer
+
+
+SESSION_ID = 'session-test-1'
+
+
+class FakeSessionManager:
+    """Holds a single session dict in memory; updates never conflict."""
+
+    def __init__(self, session):
+        self.session = session
+        self.loads = 0
+
+    async def get_session_with_db_fallback(self, session_id, raise_if_missing=True):
+        self.loads += 1
+        return self.session
+
+    async def get_session_summary(self, session_id):
+        return build_session_summary(self.session, get_scorer().compiled)
+
+    async def save_session(self, session_id, session):
+        self.session = session
+
+    async def update_session(self, session_id, mutate):
+        result = mutate(self.session)
+        return await result if inspect.isawaitable(result) else result
+
+
+class FakePersister:
+    """Drops database writes."""
+
+    async def mark_dirty(self, session_id, state):
+        return None
+
+    async def flush_session(self, session_id, state):
+        return None
+
+
+class TestScoreStateRoutes:
+    """Score state is maintained through the answer and back handlers."""
+
+    @pytest.fixture
+    def session(self, monkeypatch):
+        session = {
+            'responses': {},
+            'demographics': {q_id: 'yes' for q_id in DEMOGRAPHIC_QUESTION_ORDER},
+            'score_state': None,
+            'pending_questions': set(),
+            'current_batch': [],
+            'batch_history': [],
+            'answer_history': list(DEMOGRAPHIC_QUESTION_ORDER),
+            'back_navigation_count': 0,
+            'back_navigation_log': [],
+            'metadata': {},
+        }
+        manager = FakeSessionManager(session)
+
+        monkeypatch.setattr(routes, 'get_session_manager', lambda: manager)
+        monkeypatch.setattr(routes, 'get_session_persister', lambda: FakePersister())
+        return session
+
+    @staticmethod
+    def answer(question_id, value, going_back=False):
+        request = SubmitAnswerRequest(
+            session_id=SESSION_ID, question_id=question_id, response=value, is_going_back=going_back
+        )
+        background_tasks = BackgroundTasks()
+
+        async def run():
+            response = await routes.submit_answer(request, background_tasks, service=None)
+            await background_tasks()  # what Starlette runs after sending the response
+            return response
+
+        return asyncio.run(run())
+
+    @staticmethod
+    def assert_state_matches(session):
+        rebuilt = ScoreState.from_responses(get_scorer().compiled, session['responses'])
+        assert session['score_state'] == rebuilt.to_dict()
+
+    def test_submit_back_and_reanswer(self, session):
+        """Test submit, back navigation and re-answer keep the stored state exact."""
+        for question_id, value in (('E1', 4), ('N1', 2), ('A4', 5)):
+            self.answer(question_id, value)
+            self.assert_state_matches(session)
+
+        asyncio.run(routes.go_back(GetPreviousQuestionRequest(session_id=SESSION_ID)))
+        assert 'A4' not in session['responses']
+        self.assert_state_matches(session)
+
+        self.answer('A4', 3, going_back=True)
+        assert session['responses']['A4'] == 3
+        self.assert_state_matches(session)
+
+    def test_repeated_answer_is_acknowledged(self, session):
+        """Test a double tap of a stored answer succeeds without changes; a different value conflicts."""
+        self.answer('E1', 4)
+        stored = {**session, 'responses': dict(session['responses'])}
+
+        repeat = self.answer('E1', 4)
+        assert repeat.next_questions == [] and not repeat.is_complete
+        assert session['responses'] == stored['responses']
+
+        with pytest.raises(HTTPException) as conflict:
+            self.answer('E1', 2)
+        assert conflict.value.status_code == 409
+
+    def test_progress_reads_the_summary(self, session):
+        """Test progress comes from the session summary without loading the session."""
+        self.answer('E1', 4)
+        self.answer('N1', 2)
+        manager = routes.get_session_manager()
+        manager.loads = 0
+
+        progress = asyncio.run(routes.get_progress(SESSION_ID))
+
+        assert manager.loads == 0
+        assert progress['questions_answered'] == 2
+        assert not progress['is_complete'] and progress['completion_reason'] is None
+        assert sum(progress['dimension_progress'].values()) == 2
+
+    def test_speculative_steps_match_inline(self, session, monkeypatch):
+        """Test speculated next batches equal inline selection, and back navigation drops them."""
+        speculation = SpeculativeBatchCache(mode='on')
+        batches = {}
+        for cache in (SpeculativeBatchCache(mode='off'), speculation):
+            monkeypatch.setattr(routes, 'get_speculative_cache', lambda cache=cache: cache)
+            session.update(responses={}, score_state=None, pending_questions=set(), batch_history=[])
+            session['answer_history'] = list(DEMOGRAPHIC_QUESTION_ORDER)
+
+            batches[cache.mode] = []
+            queue = [q.id for q in self.answer('E1', 4).next_questions]
+            for step in range(15):
+                # Answer the front of the client's queue, like the frontend does
+                code = queue.pop(0)
+                low, high = scale_range_for_code(code)
+                next_questions = self.answer(code, low + step % (high - low + 1)).next_questions or []
+                queue += [q.id for q in next_questions]
+                batches[cache.mode].append([q.id for q in next_questions])
+
+        assert batches['on'] == batches['off']
+        assert speculation.stats()['hits'] >= 10
+
+        asyncio.run(routes.go_back(GetPreviousQuestionRequest(session_id=SESSION_ID)))
+        assert speculation.stats()['invalidations'] == 1
+        assert speculation.stats()['sessions'] == 0
+
+    def test_selection_cache_matches_uncached(self, session, monkeypatch):
+        """Test memoized selection returns the same batches and counts its hits."""
+        cache = SelectionCache(use_redis=False)
+        batches = []
+        for selection_cache in (None, cache, cache):
+            engine = QuestionEngine(get_tester(), get_scorer(), selection_cache=selection_cache)
+            monkeypatch.setattr(routes, 'get_question_engine', lambda engine=engine: engine)
+            session.update(responses={}, score_state=None, pending_questions=set(), batch_history=[])
+            session['answer_history'] = list(DEMOGRAPHIC_QUESTION_ORDER)
+
+            run = []
+            queue = [q.id for q in self.answer('E1', 4).next_questions]
+            for step in range(12):
+                code = queue.pop(0)
+                low, high = scale_range_for_code(code)
+                next_questions = self.answer(code, low + step % (high - low + 1)).next_questions or []
+                queue += [q.id for q in next_questions]
+                run.append([q.id for q in next_questions])
+            batches.append(run)
+
+        assert batches[0] == batches[1] == batches[2]
+        stats = cache.stats()
+        assert stats['memory_hits'] >= 13  # the replayed session hits every time
+        assert stats['misses'] <= 13
+
+    def test_selection_cache_shared_through_redis(self, monkeypatch):
+        """Test a selection stored on one worker is served to another from the async Redis tier."""
+        class FakeAsyncRedis:
+            def __init__(self):
+                self.data = {}
+
+            async def get(self, key):
+                return self.data.get(key)
+
+            async def setex(self, key, ttl, value):
+                self.data[key] = value.encode()
+
+        store = SimpleNamespace(redis_available=True, client=FakeAsyncRedis())
+        monkeypatch.setattr(
+            'app.routes.assessment.selection_cache.get_async_redis_session_store', lambda: store
+        )
+        engines = [QuestionEngine(get_tester(), get_scorer(), selection_cache=SelectionCache()) for _ in range(2)]
+        demographics = {q_id: 'yes' for q_id in DEMOGRAPHIC_QUESTION_ORDER}
+
+        async def run():
+            return [await engine.select_next_questions_async({'E1': 4}, demographics, set()) for engine in engines]
+
+        first, second = asyncio.run(run())
+
+        assert [item['item'] for item in first] == [item['item'] for item in second]
+        assert len(store.client.data) == 1
+        assert engines[1].selection_cache.stats()['redis_hits'] == 1
+
+    def test_out_of_range_answer_rejected(self, session):
+        """Test an out-of-scale value returns 400 and leaves the state untouched."""
+        self.answer('E1', 4)
+        before = session['score_state']
+
+        with pytest.raises(HTTPException) as exc_info:
+            self.answer('E5', 9)
+
+        assert exc_info.value.status_code == 400
+        assert 'E5' not in session['responses']
+        assert session['score_state'] == before
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,188 @@
+"""
+Tests for the async distributed locks
+
+Runs AsyncLockManager on its in-memory fallback and against a small
+stand-in for the Redis scripts, BLPOP wakeup and PTTL it relies on.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from app.services.distributed_lock import (
+    ACQUIRE_SCRIPT,
+    CHECK_FENCE_SCRIPT,
+    RELEASE_SCRIPT,
+    RENEW_SCRIPT,
+    AsyncLockManager,
+)
+
+
+class FakeLockRedis:
+    """Implements the lock scripts, PTTL and BLPOP over dicts."""
+
+    def __init__(self):
+        self.values = {}
+        self.expires = {}
+        self.lists = {}
+        self.blpop_calls = 0
+        self._pushed = None
+
+    def _alive(self, key):
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.values
+
+    async def eval(self, script, numkeys, *args):
+        keys, argv = args[:numkeys], args[numkeys:]
+        if script == ACQUIRE_SCRIPT:
+            if self._alive(keys[0]):
+                return 0
+            self.values[keys[0]] = argv[0]
+            self.expires[keys[0]] = time.monotonic() + argv[1] / 1000
+            self.values[keys[1]] = str(int(self.values.get(keys[1], 0)) + 1)
+            return int(self.values[keys[1]])
+        if script == RELEASE_SCRIPT:
+            if self._alive(keys[0]) and self.values[keys[0]] == argv[0]:
+                del self.values[keys[0]]
+                self.lists.setdefault(keys[1], []).append('1')
+                if self._pushed:
+                    self._pushed.set()
+                return 1
+            return 0
+        if script == RENEW_SCRIPT:
+            if self._alive(keys[0]) and self.values[keys[0]] == argv[0]:
+                self.expires[keys[0]] = time.monotonic() + argv[1] / 1000
+                return 1
+            return 0
+        if script == CHECK_FENCE_SCRIPT:
+            held = self._alive(keys[0]) and self.values[keys[0]] == argv[0]
+            return int(held and self.values.get(keys[1]) == str(argv[1]))
+        raise AssertionError('unknown script')
+
+    async def pttl(self, key):
+        if not self._alive(key):
+            return -2
+        return int((self.expires[key] - time.monotonic()) * 1000)
+
+    async def exists(self, key):
+        return int(self._alive(key))
+
+    async def blpop(self, keys, timeout):
+        self.blpop_calls += 1
+        key = keys[0]
+        if not self.lists.get(key):
+            self._pushed = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._pushed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return (key, self.lists[key].pop(0)) if self.lists.get(key) else None
+
+
+def memory_locks():
+    return AsyncLockManager(SimpleNamespace(redis_available=False))
+
+
+def redis_locks():
+    return AsyncLockManager(SimpleNamespace(redis_available=True, client=FakeLockRedis()))
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def locks(request):
+    """Lock manager on the memory fallback, then on the fake Redis."""
+    return memory_locks() if request.param == 'memory' else redis_locks()
+
+
+class TestAsyncLockManager:
+    """Test suite for AsyncLockManager."""
+
+    def test_exclusive_with_increasing_fences(self, locks):
+        """Test a held lock can't be taken and each holder gets a larger fence."""
+        async def run():
+            first = await locks.acquire('results:abc')
+            assert await locks.acquire('results:abc') is None
+            assert await locks.is_locked('results:abc')
+            assert await locks.release(first)
+            assert not await locks.release(first)  # already released
+            second = await locks.acquire('results:abc')
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert second.fence > first.fence
+
+    def test_release_wakes_waiter(self, locks):
+        """Test a waiter acquires right after release without blocking the loop."""
+        async def run():
+            holder = await locks.acquire('answer:abc', lease_seconds=30)
+            ticks = []
+
+            async def work_then_release():
+                for _ in range(3):
+                    ticks.append(time.monotonic())
+                    await asyncio.sleep(0.02)
+                await locks.release(holder)
+
+            task = asyncio.create_task(work_then_release())
+            started = time.monotonic()
+            waiter = await locks.acquire('answer:abc', wait_seconds=3)
+            waited = time.monotonic() - started
+            await task
+            return waiter, waited, ticks
+
+        waiter, waited, ticks = asyncio.run(run())
+
+        assert waiter is not None
+        assert len(ticks) == 3  # the holder kept running while we waited
+        assert waited < 0.5  # woken by the release, not a polling interval or lease end
+        stats = locks.metrics.stats()['answer']
+        assert stats['contended'] == 1
+        assert stats['acquired'] == 2
+
+    def test_expired_lease_loses_fence(self, locks):
+        """Test an expired holder is superseded and fails its fence check."""
+        async def run():
+            stale = await locks.acquire('results:abc', lease_seconds=0.05)
+            newer = await locks.acquire('results:abc', wait_seconds=2)
+            return stale, newer, await locks.check_fence(stale), await locks.check_fence(newer)
+
+        stale, newer, stale_valid, newer_valid = asyncio.run(run())
+
+        assert newer is not None and newer.fence > stale.fence
+        assert not stale_valid
+        assert newer_valid
+
+    def test_keepalive_renews_lease(self, locks):
+        """Test keepalive holds a short lease past its expiry until release."""
+        async def run():
+            lock = await locks.acquire('results:abc', lease_seconds=0.15, keepalive=True)
+            await asyncio.sleep(0.5)
+            contender = await locks.acquire('results:abc')
+            valid = await locks.check_fence(lock)
+            await locks.release(lock)
+            return contender, valid, await locks.is_locked('results:abc')
+
+        contender, valid, still_locked = asyncio.run(run())
+
+        assert contender is None
+        assert valid
+        assert not still_locked
+
+    def test_timeout_metrics(self, locks):
+        """Test a wait that runs out returns None and is counted."""
+        async def run():
+            await locks.acquire('back_nav:abc', lease_seconds=30)
+            return await locks.acquire('back_nav:abc', wait_seconds=0.1)
+
+        assert asyncio.run(run()) is None
+        stats = locks.metrics.stats()['back_nav']
+        assert stats['timeouts'] == 1
+        assert stats['wait_seconds_max'] >= 0.1
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
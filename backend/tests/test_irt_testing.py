@@ -0,0 +1,149 @@
+"""
+Tests for SELVE IRT Adaptive Testing
+
+Tests the graded response model tables, EAP scoring and
+maximum-information item selection.
+"""
+
+import random
+
+import numpy as np
+import pytest
+from app.irt_testing import IRTAdaptiveTester
+from app.item_pool import scale_range_for_code
+from app.score_state import ScoreState
+
+
+class TestIRTAdaptiveTester:
+    """Test suite for IRTAdaptiveTester class."""
+
+    @pytest.fixture(scope='class')
+    def tester(self):
+        """Create IRT tester instance."""
+        return IRTAdaptiveTester()
+
+    @staticmethod
+    def respond(items, rng, high=True):
+        """Answer items at the keyed top (or bottom) of the scale."""
+        responses = {}
+        for item in items:
+            low, top = scale_range_for_code(item['item'])
+            keyed_high = high != item.get('reversed', False)
+            responses[item['item']] = top if keyed_high else low
+        return responses
+
+    def test_probability_tables(self, tester):
+        """Test category probabilities are valid and information is positive."""
+        bank = tester.bank
+        prob = np.exp(bank.log_prob)
+
+        assert prob.shape[0] == tester.scorer.compiled.n_items
+        assert np.allclose(prob.sum(axis=2), 1.0, atol=1e-6)
+        assert (bank.information > 0).all()
+
+        # Categories beyond a 5-point item's scale carry no probability
+        five_point = bank.n_categories == 5
+        assert prob[five_point][:, :, 5:].max() < 1e-9
+
+    def test_eap_moves_with_responses(self, tester):
+        """Test theta follows keyed responses and SE shrinks with more items."""
+        items = tester.scorer.get_items_by_dimension('LUMEN')
+        rng = random.Random(0)
+
+        prior = tester.calculate_uncertainties({})['LUMEN']
+        high_few = tester.calculate_uncertainties(self.respond(items[:2], rng))['LUMEN']
+        high_many = tester.calculate_uncertainties(self.respond(items[:8], rng))['LUMEN']
+        low_many = tester.calculate_uncertainties(self.respond(items[:8], rng, high=False))['LUMEN']
+
+        assert prior.normalized_score == pytest.approx(50, abs=0.5)
+        assert low_many.normalized_score < 50 < high_few.normalized_score <= high_many.normalized_score
+        assert prior.uncertainty_score > high_few.uncertainty_score > high_many.uncertainty_score
+        assert high_many.n_items_answered == 8
+
+    def test_selection_maximizes_information(self, tester):
+        """Test selection skips excluded items and picks the most informative ones."""
+        responses = {'E1': 4, 'N1': 2}
+        exclude = set(responses) | {'E5'}
+
+        items = tester.select_next_items_excluding(responses, exclude, max_items=8)
+        codes = [item['item'] for item in items]
+
+        assert len(items) == 8
+        assert not exclude & set(codes)
+        assert len(set(codes)) == len(codes)
+        # Dimensions with no answers are least precise, so each gets an item first
+        assert {'ORPHEUS', 'ORIN', 'LYRA', 'VARA', 'CHRONOS', 'KAEL'} <= {item['dimension'] for item in items}
+
+        # Each pick is the most informative remaining item of its dimension
+        compiled = tester.scorer.compiled
+        info = tester.bank.expected_information(tester.bank.posterior(responses))
+        exclude = set(exclude)
+        for item in items:
+            dim_id = compiled.dimension_index[item['dimension']]
+            candidates = [
+                i for i in range(compiled.n_items)
+                if compiled.dimension_ids[i] == dim_id and compiled.item_codes[i] not in exclude
+            ]
+            best = max(candidates, key=lambda i: info[i])
+            assert info[compiled.code_to_index[item['item']]] == pytest.approx(info[best])
+            exclude.add(item['item'])
+
+    def test_selection_reuses_posterior(self, tester, monkeypatch):
+        """Test passing uncertainties skips recomputing the posterior, with the same picks."""
+        responses = {'E1': 4, 'N1': 2, 'A4': 5}
+        uncertainties = tester.calculate_uncertainties(responses)
+        expected = tester.select_next_items_excluding(responses, set(responses), 6)
+
+        def no_posterior(responses):
+            raise AssertionError("posterior recomputed")
+
+        monkeypatch.setattr(tester.bank, 'posterior', no_posterior)
+        items = tester.select_next_items_excluding(responses, set(responses), 6, uncertainties)
+
+        assert items == expected
+
+    def test_stops_on_standard_error(self, tester):
+        """Test testing stops once every dimension reaches the SE target."""
+        rng = random.Random(3)
+        responses = {}
+        while True:
+            uncertainties = tester.calculate_uncertainties(responses)
+            should_continue, reason = tester.should_continue_testing(responses, uncertainties)
+            if not should_continue:
+                break
+            items = tester.select_next_items_excluding(responses, set(responses), 3, uncertainties)
+            responses.update({
+                item['item']: rng.randint(*scale_range_for_code(item['item'])) for item in items
+            })
+
+        assert len(responses) <= tester.MAX_TOTAL_ITEMS
+        assert all(
+            u.uncertainty_score <= tester.SE_TARGET or u.n_items_answered >= tester.MAX_ITEMS_PER_DIMENSION
+            for u in uncertainties.values()
+        )
+        assert all(u.n_items_answered >= tester.MIN_ITEMS_PER_DIMENSION for u in uncertainties.values())
+
+    def test_session_uncertainties_ignore_state(self, tester):
+        """Test the session hook recomputes from responses for the IRT engine."""
+        responses = {'E1': 5, 'E5': 4, 'N1': 2}
+        state = ScoreState.from_responses(tester.scorer.compiled, responses)
+
+        assert tester.calculate_session_uncertainties(responses, state) == tester.calculate_uncertainties(responses)
+
+    def test_run_adaptive_assessment(self, tester):
+        """Test a full simulated IRT assessment produces a profile."""
+        rng = random.Random(11)
+
+        def collector(items):
+            return {item['item']: rng.randint(*scale_range_for_code(item['item'])) for item in items}
+
+        profile = tester.run_adaptive_assessment(collector, verbose=False)
+
+        total_items = sum(getattr(profile, d.lower()).n_items for d in profile.dimension_scores)
+        assert 0 < total_items <= tester.MAX_TOTAL_ITEMS
+        assert all(0 <= score <= 100 for score in profile.dimension_scores.values())
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
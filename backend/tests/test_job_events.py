@@ -0,0 +1,111 @@
+"""
+Tests for job events
+
+Runs JobEvents in its in-memory mode, and against a stand-in for the job's
+Redis stream whose pub/sub never delivers, so subscribers have to catch up
+by re-reading the stream.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from app.services.job_events import JobEvents
+
+
+class SilentPubSub:
+    """A subscription that never receives anything."""
+
+    async def subscribe(self, channel):
+        pass
+
+    async def listen(self):
+        await asyncio.Event().wait()
+        yield
+
+    async def aclose(self):
+        pass
+
+
+class FakeStreamRedis:
+    """Job event streams (XADD via the publish script, XRANGE), as bytes like Redis returns."""
+
+    def __init__(self):
+        self.streams = {}
+        self.reads = 0
+
+    def register_script(self, source):
+        async def publish(keys, args):
+            entries = self.streams.setdefault(keys[0], [])
+            entry_id = f"{len(entries) + 1}-0".encode()
+            entries.append((entry_id, {b'type': args[1].encode(), b'data': args[2].encode()}))
+            return entry_id
+        return publish
+
+    async def xrange(self, key, min='-', max='+'):
+        self.reads += 1
+        after = (0, 0) if min == '-' else tuple(int(part) for part in min[1:].split('-'))
+        return [
+            (entry_id, fields) for entry_id, fields in self.streams.get(key, [])
+            if tuple(int(part) for part in entry_id.decode().split('-')) > after
+        ]
+
+    def pubsub(self):
+        return SilentPubSub()
+
+
+async def take(subscription, n):
+    return [await subscription.__anext__() for _ in range(n)]
+
+
+class TestJobEvents:
+    """Test suite for JobEvents."""
+
+    def test_late_subscribers_replay_then_follow_live(self):
+        """Test a subscriber gets stored events, then live ones, and can resume after an id."""
+        events = JobEvents(SimpleNamespace(redis_available=False, client=None))
+
+        async def run():
+            await events.publish('job1', 'section', {'section': 'core_identity'})
+            subscription = events.subscribe('job1')
+            replayed = await take(subscription, 1)
+            await events.publish('job1', 'section', {'section': 'motivations'})
+            await events.publish('job2', 'section', {'section': 'other job'})
+            live = await take(subscription, 1)
+            await subscription.aclose()
+
+            resumed = events.subscribe('job1', after=replayed[0].id)
+            return replayed, live, await take(resumed, 1), events.get_stats()
+
+        replayed, live, resumed, stats = asyncio.run(run())
+
+        assert [e.data['section'] for e in replayed + live] == ['core_identity', 'motivations']
+        assert resumed[0].id == live[0].id
+        assert stats['subscribers'] == 1  # the closed subscription unregistered
+
+    def test_idle_subscribers_catch_up_from_the_stream(self):
+        """Test events the subscription missed are read from the stream once the subscriber goes idle."""
+        client = FakeStreamRedis()
+        events = JobEvents(SimpleNamespace(redis_available=True, client=client), idle_seconds=0.02)
+
+        async def run():
+            subscription = events.subscribe('job1')
+            first = asyncio.ensure_future(subscription.__anext__())
+            await asyncio.sleep(0)
+            await events.publish('job1', 'section', {'section': 'core_identity'})
+            await events.publish('job1', 'done', {'status': 'ready'})
+            received = [await first] + await take(subscription, 2)
+            await subscription.aclose()
+            await events.stop()
+            return received
+
+        received = asyncio.run(run())
+
+        assert [e.type if e else None for e in received] == ['section', 'done', None]
+        assert received[1].data == {'status': 'ready'}
+        assert events.get_stats()['catch_up_reads'] == 1
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
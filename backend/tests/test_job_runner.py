@@ -0,0 +1,345 @@
+"""
+Tests for the background job runner
+
+Runs JobRunner against a small stand-in for the job hashes, idempotency
+keys and due/running sorted sets (the enqueue, claim and cancel scripts
+reimplemented in Python), and in its in-memory mode for the worker pool.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from app.services.job_runner import (
+    CANCEL_SCRIPT,
+    CANCELLED,
+    CLAIM_SCRIPT,
+    ENQUEUE_SCRIPT,
+    FAILED,
+    QUEUED,
+    SUCCEEDED,
+    JobFailed,
+    JobRunner,
+)
+
+
+class FakePipeline:
+    """Queues commands and runs them together."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        return [getattr(self.client, f'_{name}')(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeJobRedis:
+    """Job hashes, idempotency keys and the due/running sets, as bytes like Redis returns."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.strings = {}
+        self.due = {}
+        self.running = {}
+
+    def register_script(self, source):
+        script = {ENQUEUE_SCRIPT: self._enqueue, CLAIM_SCRIPT: self._claim, CANCEL_SCRIPT: self._cancel}[source]
+
+        async def run(keys, args):
+            return script(keys, args)
+        return run
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def _status(self, job_id):
+        return self.hashes.get(f'job:{job_id}', {}).get(b'status', b'').decode()
+
+    def _enqueue(self, keys, args):
+        key, job_key, _ = keys
+        job_id, now = args[0], args[1]
+        existing = self.strings.get(key)
+        if existing and self._status(existing.decode()) not in ('', FAILED, CANCELLED):
+            return existing
+        self.strings[key] = job_id.encode()
+        fields = args[3:]
+        self.hashes[job_key] = {str(n).encode(): str(v).encode() for n, v in zip(fields[::2], fields[1::2])}
+        self.due[job_id] = now
+        return job_id.encode()
+
+    def _claim(self, keys, args):
+        now, deadline = args
+        for job_id, lease in list(self.running.items()):
+            if lease <= now:
+                del self.running[job_id]
+                if self._status(job_id) == 'running':
+                    self.hashes[f'job:{job_id}'][b'status'] = b'queued'
+                    self.due[job_id] = now
+        due = sorted((score, job_id) for job_id, score in self.due.items() if score <= now)
+        if not due:
+            return None
+        job_id = due[0][1]
+        del self.due[job_id]
+        if self._status(job_id) != 'queued':
+            return None
+        self.running[job_id] = deadline
+        record = self.hashes[f'job:{job_id}']
+        record[b'status'] = b'running'
+        record[b'attempts'] = str(int(record.get(b'attempts', b'0')) + 1).encode()
+        return job_id.encode()
+
+    def _cancel(self, keys, args):
+        job_id = args[0]
+        status = self._status(job_id)
+        if status == 'queued':
+            self.due.pop(job_id, None)
+            self.hashes[keys[0]][b'status'] = b'cancelled'
+            return b'cancelled'
+        if status == 'running':
+            self.hashes[keys[0]][b'cancel_requested'] = b'1'
+        return status.encode() or None
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    def _hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update({n.encode(): str(v).encode() for n, v in mapping.items()})
+
+    def _hget(self, key, field):
+        return self.hashes.get(key, {}).get(field.encode())
+
+    def _zrem(self, key, member):
+        (self.due if key == 'jobs:due' else self.running).pop(member, None)
+
+    def _zadd(self, key, mapping, xx=False):
+        scores = self.due if key == 'jobs:due' else self.running
+        for member, score in mapping.items():
+            if not xx or member in scores:
+                scores[member] = score
+
+
+def redis_runner(client=None, **kwargs):
+    store = SimpleNamespace(redis_available=True, client=client or FakeJobRedis())
+    return JobRunner(store, **kwargs)
+
+
+def memory_runner(**kwargs):
+    return JobRunner(SimpleNamespace(redis_available=False, client=None), **kwargs)
+
+
+async def succeed(job):
+    return {'echo': job.payload['n']}
+
+
+class TestJobRunner:
+    """Test suite for JobRunner."""
+
+    def test_duplicate_enqueues_share_one_job(self):
+        """Test the same idempotency key returns the live job instead of queuing another."""
+        runner = redis_runner()
+        runner.register('echo', succeed)
+
+        async def run():
+            first = await runner.enqueue('echo', {'n': 1}, idempotency_key='results:abc')
+            second = await runner.enqueue('echo', {'n': 1}, idempotency_key='results:abc')
+            finished = await runner.run_next()
+            third = await runner.enqueue('echo', {'n': 1}, idempotency_key='results:abc')
+            return first, second, finished, third, await runner.run_next()
+
+        first, second, finished, third, nothing = asyncio.run(run())
+
+        assert first.id == second.id == finished.id == third.id
+        assert third.status == SUCCEEDED and third.result == {'echo': 1}
+        assert nothing is None
+        assert runner.get_stats()['deduplicated'] == 2
+
+    def test_failed_attempts_retry_with_backoff(self):
+        """Test a failing attempt is re-queued after the backoff and the next one succeeds."""
+        client = FakeJobRedis()
+        runner = redis_runner(client, retry_base=2.0)
+        attempts = []
+
+        async def flaky(job):
+            attempts.append(job.attempts)
+            if len(attempts) == 1:
+                raise RuntimeError('timeout')
+            return 'done'
+
+        runner.register('flaky', flaky)
+
+        async def run():
+            job = await runner.enqueue('flaky', {})
+            before = time.time()
+            retried = await runner.run_next()
+            backoff = client.due[job.id] - before
+            assert await runner.run_next() is None  # not due yet
+            client.due[job.id] = 0
+            return retried, backoff, await runner.run_next(), await runner.get_job(job.id)
+
+        retried, backoff, finished, record = asyncio.run(run())
+
+        assert retried.status == QUEUED and retried.error == 'timeout'
+        assert 1.9 < backoff < 2.5
+        assert attempts == [1, 2]
+        assert record.status == SUCCEEDED and record.result == 'done' and record.attempts == 2
+
+    def test_permanent_failures_and_new_job_after_failure(self):
+        """Test JobFailed (or running out of attempts) fails the job, and the key then queues a new one."""
+        runner = redis_runner(retry_base=0)
+
+        async def missing(job):
+            raise JobFailed('Session not found')
+
+        async def broken(job):
+            raise RuntimeError('boom')
+
+        runner.register('missing', missing)
+        runner.register('broken', broken, max_attempts=2)
+
+        async def run():
+            failed = await runner.enqueue('missing', {}, idempotency_key='k')
+            await runner.run_next()
+            replacement = await runner.enqueue('missing', {}, idempotency_key='k')
+            await runner.cancel(replacement.id)
+
+            await runner.enqueue('broken', {})
+            await runner.run_next()
+            exhausted = await runner.run_next()
+            return await runner.get_job(failed.id), replacement, exhausted
+
+        failed, replacement, exhausted = asyncio.run(run())
+
+        assert failed.status == FAILED and failed.attempts == 1 and failed.error == 'Session not found'
+        assert replacement.id != failed.id
+        assert exhausted.status == FAILED and exhausted.attempts == 2
+        assert runner.get_stats()['retried'] == 1
+
+    def test_cancellation(self):
+        """Test queued jobs never run, and running ones stop: here at once, elsewhere at lease renewal."""
+        client = FakeJobRedis()
+        worker, other = redis_runner(client, lease_seconds=0.06), redis_runner(client)
+        started = asyncio.Event()
+
+        async def slow(job):
+            started.set()
+            await asyncio.sleep(10)
+
+        for runner in (worker, other):
+            runner.register('slow', slow)
+
+        async def run():
+            queued = await worker.enqueue('slow', {})
+            assert await worker.cancel(queued.id)
+            assert await worker.run_next() is None
+
+            statuses = []
+            for canceller in (worker, other):
+                started.clear()
+                job = await worker.enqueue('slow', {})
+                running = asyncio.create_task(worker.run_next())
+                await started.wait()
+                assert await canceller.cancel(job.id)
+                finished = await asyncio.wait_for(running, timeout=1)
+                statuses.append((finished.status, (await worker.get_job(job.id)).status))
+            return (await worker.get_job(queued.id)).status, statuses
+
+        queued_status, statuses = asyncio.run(run())
+
+        assert queued_status == CANCELLED
+        assert statuses == [(CANCELLED, CANCELLED)] * 2
+        assert not client.running
+
+    def test_expired_lease_is_requeued(self):
+        """Test a job whose worker died is claimed again once its lease lapses."""
+        client = FakeJobRedis()
+        runner = redis_runner(client)
+        runner.register('echo', succeed)
+
+        async def run():
+            job = await runner.enqueue('echo', {'n': 2})
+            await runner._claim()  # the worker dies here
+            assert await runner.run_next() is None
+            client.running[job.id] = 0
+            return await runner.run_next()
+
+        finished = asyncio.run(run())
+
+        assert finished.status == SUCCEEDED and finished.attempts == 2
+
+    def test_stop_leaves_running_jobs_to_their_lease(self):
+        """Test stopping the runner mid-job returns promptly and the job runs again elsewhere."""
+        client = FakeJobRedis()
+        runner, other = redis_runner(client, poll_interval=0.01), redis_runner(client)
+        started = asyncio.Event()
+
+        async def slow(job):
+            started.set()
+            await asyncio.sleep(10)
+
+        runner.register('slow', slow)
+        other.register('slow', succeed)
+
+        async def run():
+            job = await runner.enqueue('slow', {'n': 3})
+            runner.start()
+            await started.wait()
+            await asyncio.wait_for(runner.stop(), timeout=1)
+            stopped = await runner.get_job(job.id)
+            client.running[job.id] = 0  # the lease lapses
+            return stopped, await other.run_next()
+
+        stopped, rerun = asyncio.run(run())
+
+        assert stopped.status == 'running'
+        assert rerun.id == stopped.id and rerun.status == SUCCEEDED and rerun.attempts == 2
+        assert runner.get_stats()['cancelled'] == 0
+
+    def test_worker_pool_is_bounded(self):
+        """Test no more than `workers` jobs run at once, and every queued job runs."""
+        runner = memory_runner(workers=2, poll_interval=0.01)
+        active, peak = [0], [0]
+
+        async def tracked(job):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.02)
+            active[0] -= 1
+
+        runner.register('tracked', tracked)
+
+        async def run():
+            jobs = [await runner.enqueue('tracked', {}) for _ in range(6)]
+            runner.start()
+            for _ in range(100):
+                if all(job.done for job in jobs):
+                    break
+                await asyncio.sleep(0.01)
+            await runner.stop()
+            return jobs
+
+        jobs = asyncio.run(run())
+
+        assert all(job.status == SUCCEEDED for job in jobs)
+        assert peak[0] == 2
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
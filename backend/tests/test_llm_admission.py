@@ -0,0 +1,127 @@
+"""
+Tests for LLM admission control
+
+Runs LLMAdmissionController with held admissions to check priority order,
+the background share, AIMD limit changes and token-bucket pacing.
+"""
+
+import asyncio
+
+import pytest
+from app.narratives.llm_admission import LLMAdmissionController, Priority
+
+
+async def hold(controller, priority, order, release, estimated_tokens=0):
+    """Take an admission, note it in `order`, keep it until `release` is set."""
+    async with controller.admit(priority, estimated_tokens):
+        order.append(priority)
+        await release.wait()
+
+
+class TestLLMAdmissionController:
+    """Test suite for LLMAdmissionController."""
+
+    def test_interactive_calls_are_admitted_first(self):
+        """Test a queued interactive call overtakes background calls queued before it."""
+        controller = LLMAdmissionController(max_concurrency=1, initial_concurrency=1)
+
+        async def run():
+            order, release = [], asyncio.Event()
+            tasks = [asyncio.ensure_future(hold(controller, Priority.BACKGROUND, order, release))]
+            await asyncio.sleep(0)
+            tasks += [asyncio.ensure_future(hold(controller, p, order, release))
+                      for p in (Priority.BACKGROUND, Priority.INTERACTIVE)]
+            await asyncio.sleep(0)
+            release.set()
+            await asyncio.gather(*tasks)
+            return order
+
+        assert asyncio.run(run()) == [Priority.BACKGROUND, Priority.INTERACTIVE, Priority.BACKGROUND]
+
+    def test_background_calls_leave_room_for_interactive(self):
+        """Test background calls hold at most their share of the limit."""
+        controller = LLMAdmissionController(max_concurrency=4, initial_concurrency=4, background_share=0.5)
+
+        async def run():
+            order, release = [], asyncio.Event()
+            tasks = [asyncio.ensure_future(hold(controller, Priority.BACKGROUND, order, release)) for _ in range(3)]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.ensure_future(hold(controller, Priority.INTERACTIVE, order, release)))
+            await asyncio.sleep(0)
+            admitted, stats = list(order), controller.stats()
+            release.set()
+            await asyncio.gather(*tasks)
+            return admitted, stats
+
+        admitted, stats = asyncio.run(run())
+
+        assert admitted == [Priority.BACKGROUND, Priority.BACKGROUND, Priority.INTERACTIVE]
+        assert stats['priorities']['background']['waiting'] == 1
+        assert stats['priorities']['background']['in_flight'] == 2
+
+    def test_limit_halves_on_throttling_and_grows_on_success(self):
+        """Test a burst of timeouts halves the limit once; a success adds 1/limit."""
+        controller = LLMAdmissionController(max_concurrency=16, initial_concurrency=8)
+
+        async def call(error=None):
+            async with controller.admit(Priority.INTERACTIVE):
+                if error:
+                    raise error
+
+        async def run():
+            for _ in range(2):
+                with pytest.raises(asyncio.TimeoutError):
+                    await call(asyncio.TimeoutError())
+            throttled = controller.limit
+            with pytest.raises(ValueError):
+                await call(ValueError("bad prompt"))
+            await call()
+            return throttled
+
+        assert asyncio.run(run()) == 4.0
+        assert controller.limit == 4.25
+        stats = controller.stats()
+        assert (stats['throttles'], stats['limit_decreases'], stats['errors']) == (2, 1, 1)
+        assert stats['priorities']['interactive']['in_flight'] == 0
+
+    def test_token_budget_paces_admissions(self):
+        """Test a call waits for the token bucket to refill, and its queue time is recorded."""
+        controller = LLMAdmissionController(tokens_per_minute=600)  # 10 tokens/second
+
+        async def run():
+            async with controller.admit(Priority.INTERACTIVE, estimated_tokens=600) as first:
+                first.record_usage(600)
+            async with controller.admit(Priority.INTERACTIVE, estimated_tokens=3) as second:
+                return first, second
+
+        first, second = asyncio.run(run())
+
+        assert first.queued_seconds < 0.05
+        assert 0.25 <= second.queued_seconds < 1.0
+        queue = controller.stats()['priorities']['interactive']
+        assert queue['admitted'] == 2
+        assert queue['max_queue_ms'] >= 250
+
+    def test_cancelled_waiters_give_up_their_place(self):
+        """Test a call cancelled while queued is never admitted and leaks no slot."""
+        controller = LLMAdmissionController(max_concurrency=1, initial_concurrency=1)
+
+        async def run():
+            order, release = [], asyncio.Event()
+            holder = asyncio.ensure_future(hold(controller, Priority.INTERACTIVE, order, release))
+            await asyncio.sleep(0)
+            cancelled = asyncio.ensure_future(hold(controller, Priority.INTERACTIVE, order, release))
+            waiting = asyncio.ensure_future(hold(controller, Priority.BACKGROUND, order, release))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            release.set()
+            await asyncio.gather(holder, waiting, cancelled, return_exceptions=True)
+            return order
+
+        assert asyncio.run(run()) == [Priority.INTERACTIVE, Priority.BACKGROUND]
+        assert controller.stats()['priorities']['interactive']['in_flight'] == 0
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
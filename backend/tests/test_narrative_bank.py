@@ -0,0 +1,161 @@
+"""
+Tests for the precomputed narrative bank
+
+Builds a bank from synthetic results with a fake LLM and a small stand-in
+for the Redis hash it lives in, then checks lookups, the generator's bank
+path and the coverage report.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from app.narratives.integrated_generator import SECTION_CONFIG, IntegratedNarrativeGenerator
+from app.narratives.narrative_bank import (
+    NarrativeBank,
+    build_narrative_bank,
+    mine_signatures,
+    profile_signature,
+)
+import app.narratives.integrated_generator as integrated_generator
+
+
+COMMON = {'LUMEN': 52, 'AETHER': 37, 'ORPHEUS': 43, 'ORIN': 39, 'LYRA': 63, 'VARA': 58, 'CHRONOS': 50, 'KAEL': 12}
+RARE = {**COMMON, 'LUMEN': 95, 'AETHER': 90}
+
+
+class FakePipeline:
+    """Runs queued commands against the fake client."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeBankRedis:
+    """Strings and hashes; commands are awaitable outside pipelines."""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    async def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    async def hvals(self, key):
+        return list(self.data.get(key, {}).values())
+
+    async def get(self, key):
+        return self.data.get(key)
+
+
+class FakeLLM:
+    """Answers every request with its section name; can fail one section."""
+
+    def __init__(self, fail_prompt_with=None):
+        self.config = SimpleNamespace(model='gpt-5-nano')
+        self.calls = 0
+        self.max_concurrent = None
+        self.fail_prompt_with = fail_prompt_with
+
+    async def generate_batch_async(self, requests, max_concurrent=5, on_complete=None, **callbacks):
+        self.calls += len(requests)
+        self.max_concurrent = max_concurrent
+        return [
+            {'text': '', 'cost': 0.0, 'error': 'failed'}
+            if self.fail_prompt_with and self.fail_prompt_with in req['prompt']
+            else {'text': f"## Heading\n{req['name']} text", 'cost': 0.01}
+            for req in requests
+        ]
+
+
+def rows():
+    return [COMMON] * 5 + [{**COMMON, 'LUMEN': 55}] * 3 + [RARE]
+
+
+@pytest.fixture
+def bank():
+    return NarrativeBank(SimpleNamespace(redis_available=True, client=FakeBankRedis()))
+
+
+class TestNarrativeBank:
+    """Test suite for the narrative bank."""
+
+    def test_mines_frequent_signatures(self):
+        """Test profiles sharing levels and conflicts group together and rare ones are dropped."""
+        mined, total = mine_signatures(rows(), top_n=10, min_count=2)
+
+        assert total == 9
+        assert [profile['count'] for profile in mined] == [8]
+        assert mined[0]['scores'] == COMMON
+        assert profile_signature(mined[0]['scores']) == profile_signature({**COMMON, 'LUMEN': 55})
+
+    def test_build_lookup_and_report(self, bank):
+        """Test a build banks every section, lookups hit by signature and coverage is reported."""
+        llm = FakeLLM()
+        summary = asyncio.run(build_narrative_bank(rows(), llm, bank, min_count=2, max_concurrent=3))
+
+        assert summary['signatures'] == 1 and summary['results_covered'] == 8
+        assert llm.calls == len(SECTION_CONFIG) and llm.max_concurrent == 3
+
+        entry = asyncio.run(bank.lookup({**COMMON, 'LUMEN': 55}, 'gpt-5-nano'))
+        assert entry['sections']['conflicts'] == 'conflicts text'
+        assert asyncio.run(bank.lookup(RARE, 'gpt-5-nano')) is None
+        assert asyncio.run(bank.lookup(COMMON, 'gpt-5-mini')) is None  # another model's bank
+
+        report = asyncio.run(bank.report('gpt-5-nano'))
+        assert report['signatures'] == 1
+        assert report['coverage_percent'] == round(8 / 9 * 100, 2)
+        assert report['age_hours'] == 0.0 and report['hits'] == 1
+
+    def test_failed_sections_are_not_banked(self, bank):
+        """Test a signature with a failed section stays live."""
+        summary = asyncio.run(build_narrative_bank(rows(), FakeLLM('Core Motivations'), bank))
+
+        assert (summary['signatures'], summary['failed']) == (0, 1)
+        assert asyncio.run(bank.lookup(COMMON, 'gpt-5-nano')) is None
+
+    def test_generator_serves_banked_profiles(self, bank, monkeypatch):
+        """Test a banked profile's narrative makes no LLM calls."""
+        asyncio.run(build_narrative_bank(rows(), FakeLLM(), bank))
+        monkeypatch.setattr(integrated_generator, 'get_narrative_bank', lambda: bank)
+        generator = IntegratedNarrativeGenerator(use_llm=False)
+        generator.use_llm, generator.llm = True, FakeLLM()
+
+        narrative = asyncio.run(generator.generate_narrative_async(COMMON))
+
+        assert generator.llm.calls == 0
+        assert narrative['sections']['work_style'] == 'work_style text'
+        assert narrative['scores'] == COMMON
+        assert narrative['metadata']['generation_method'] == 'narrative_bank'
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
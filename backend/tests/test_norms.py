@@ -0,0 +1,132 @@
+"""
+Tests for SELVE Percentile Norms
+
+Checks empirical-CDF percentile lookups, incremental inserts, strata and
+the compact snapshot format.
+"""
+
+import json
+import random
+from datetime import date
+
+import pytest
+from app.norms import (
+    NormTable,
+    PercentileNorms,
+    age_band,
+    strata_for_demographics,
+)
+from app.scoring import SelveScorer
+
+
+DIMENSIONS = ['LUMEN', 'AETHER', 'ORPHEUS', 'ORIN', 'LYRA', 'VARA', 'CHRONOS', 'KAEL']
+
+
+class TestPercentileNorms:
+    """Test suite for percentile norms."""
+
+    @pytest.fixture
+    def norms(self):
+        """Norms built from 1000 random results."""
+        rng = random.Random(5)
+        norms = PercentileNorms()
+        for _ in range(1000):
+            norms.add_scores(
+                {dim: round(rng.uniform(0, 100), 2) for dim in DIMENSIONS},
+                strata=['gender:female'] if rng.random() < 0.3 else [],
+            )
+        return norms
+
+    def test_table_matches_brute_force(self):
+        """Test mid-rank percentile matches a direct count."""
+        rng = random.Random(1)
+        scores = [float(rng.randint(0, 20) * 5) for _ in range(500)]
+        table = NormTable()
+        table.extend(scores[:250])
+        table.percentile(50)  # merge first half, then insert more
+        table.extend(scores[250:])
+
+        for probe in (0, 12.5, 50, 75, 100):
+            below = sum(s < probe for s in scores)
+            equal = sum(s == probe for s in scores)
+            assert table.percentile(probe) == pytest.approx(100 * (below + 0.5 * equal) / 500, abs=1e-6)
+
+        assert list(table.sorted_scores) == sorted(scores)
+
+    def test_percentile_ordering(self, norms):
+        """Test higher scores get higher percentiles."""
+        low = norms.percentile('LUMEN', 10)
+        mid = norms.percentile('LUMEN', 50)
+        high = norms.percentile('LUMEN', 90)
+
+        assert 0 <= low < mid < high <= 100
+        assert mid == pytest.approx(50, abs=5)
+
+    def test_min_sample(self):
+        """Test small norm groups return no percentile."""
+        norms = PercentileNorms(min_sample=10)
+        for i in range(9):
+            norms.add_scores({'LUMEN': i * 10})
+
+        assert norms.percentile('LUMEN', 50) is None
+        norms.add_scores({'LUMEN': 95})
+        assert norms.percentile('LUMEN', 50) is not None
+        assert norms.percentile('LUMEN', 50, stratum='gender:male') is None
+
+    def test_strata(self, norms):
+        """Test strata hold a subset of the population."""
+        population = len(norms._tables['all']['LUMEN'])
+        female = len(norms._tables['gender:female']['LUMEN'])
+
+        assert population == 1000
+        assert 0 < female < population
+        assert norms.percentile('LUMEN', 50, stratum='gender:female') is not None
+
+    def test_stratum_percentiles(self, norms):
+        """Test per-stratum lookups use each stratum's own table."""
+        scores = {'LUMEN': 50.0, 'AETHER': 20.0}
+        result = norms.stratum_percentiles(scores, ['gender:female', 'age:25-34'])
+
+        assert set(result) == {'gender:female', 'age:25-34'}
+        assert result['gender:female']['LUMEN'] == norms.percentile('LUMEN', 50.0, 'gender:female')
+        assert result['age:25-34'] == {'LUMEN': None, 'AETHER': None}  # no results in that stratum
+        assert norms.stratum_percentiles(scores, []) == {}
+
+    def test_strata_for_demographics(self):
+        """Test demographic strata keys."""
+        today = date.today()
+        dob = date(today.year - 30, 1, 1).isoformat()
+
+        assert strata_for_demographics({'demo_dob': dob, 'demo_gender': 'female'}) == [
+            'age:25-34', 'gender:female'
+        ]
+        assert strata_for_demographics({'demo_gender': 'prefer_not_to_say'}) == []
+        assert strata_for_demographics(None) == []
+        assert age_band('not a date') is None
+        assert age_band('2000-06-15', today=date(2018, 6, 14)) == 'under-18'
+        assert age_band('2000-06-15', today=date(2018, 6, 15)) == '18-24'
+
+    def test_apply_to_profile(self, norms):
+        """Test norms fill DimensionScore.percentile during scoring."""
+        scorer = SelveScorer()
+        profile = scorer.score_responses({'E1': 5, 'E5': 4, 'N1': 2, 'A4': 5})
+
+        norms.apply(profile)
+
+        assert profile.lumen.percentile == norms.percentile('LUMEN', profile.lumen.normalized_score)
+        assert set(profile.percentiles) == set(DIMENSIONS)
+        assert all(p is not None for p in profile.percentiles.values())
+
+    def test_snapshot_round_trip(self, norms):
+        """Test compact snapshot restores identical lookups."""
+        snapshot = json.loads(json.dumps(norms.to_dict()))
+        restored = PercentileNorms.from_dict(snapshot)
+
+        for probe in (0, 33.3, 50, 87.5, 100):
+            assert restored.percentile('VARA', probe) == norms.percentile('VARA', probe)
+        assert len(restored) == len(norms)
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
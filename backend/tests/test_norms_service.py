@@ -0,0 +1,152 @@
+"""
+Tests for the Norms Service
+
+Drives NormsService.refresh against an in-memory stand-in for the raw
+results query (and a dict in place of Redis) to check the overlap window,
+id dedup, pruning and the snapshot's recent_ids round trip.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+try:
+    from app.services import norms_service
+except RuntimeError as e:  # Prisma client not generated in this environment
+    pytest.skip(f"Norms service unavailable: {e}", allow_module_level=True)
+
+from app.norms import PercentileNorms
+from app.services.norms_service import (
+    NORMS_REFRESH_OVERLAP,
+    SCORE_FIELDS,
+    NormsService,
+)
+
+
+T0 = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def make_row(result_id, created_at, score=50.0, demographics=None):
+    """Raw-query row: createdAt comes back as an ISO string."""
+    row = {"id": result_id, "createdAt": created_at.isoformat(), "demographics": demographics}
+    row.update({field: score for field in SCORE_FIELDS.values()})
+    return row
+
+
+class FakeResultsDB:
+    """Evaluates NORMS_REFRESH_QUERY's filter, keyset and limit over a row list."""
+
+    def __init__(self):
+        self.rows = []
+        self.queries = 0
+
+    async def query_raw(self, query, lower, cursor_at, cursor_id, limit):
+        self.queries += 1
+        lower, cursor_at = datetime.fromisoformat(lower), datetime.fromisoformat(cursor_at)
+
+        def key(row):
+            created_at = datetime.fromisoformat(row["createdAt"]).replace(tzinfo=None)
+            return created_at, row["id"]
+
+        matching = sorted(
+            (row for row in self.rows if key(row)[0] >= lower and key(row) > (cursor_at, cursor_id)),
+            key=key,
+        )
+        return matching[:limit]
+
+
+class FakeRedisStore:
+    """Just enough of AsyncRedisSessionStore for snapshots."""
+
+    def __init__(self):
+        self.redis_available = True
+        self.data = {}
+        self.client = SimpleNamespace(get=self.get, set=self.set)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value):
+        self.data[key] = value
+
+
+class TestNormsService:
+    """Test suite for NormsService."""
+
+    @pytest.fixture
+    def redis_store(self, monkeypatch):
+        store = FakeRedisStore()
+        monkeypatch.setattr(norms_service, 'get_async_redis_session_store', lambda: store)
+        return store
+
+    @pytest.fixture
+    def db(self):
+        return FakeResultsDB()
+
+    def make_service(self, db):
+        service = NormsService(norms=PercentileNorms(min_sample=1))
+        service.db = db
+        return service
+
+    def test_refresh_pages_and_sets_watermark(self, db, redis_store, monkeypatch):
+        """Test every row is read once across pages and the watermark is the newest createdAt."""
+        monkeypatch.setattr(norms_service, 'NORMS_REFRESH_PAGE_SIZE', 3)
+        # Equal timestamps straddle a page boundary; the (createdAt, id) keyset keeps them
+        db.rows = [make_row(f"r{i}", T0 + timedelta(seconds=i // 2)) for i in range(8)]
+        service = self.make_service(db)
+
+        assert asyncio.run(service.refresh()) == 8
+        assert len(service.norms) == 8
+        assert service.norms.watermark == T0 + timedelta(seconds=3)
+
+    def test_overlap_dedup(self, db, redis_store):
+        """Test the overlap re-read skips counted ids but picks up late-committed rows."""
+        db.rows = [make_row("a", T0), make_row("b", T0 + timedelta(seconds=30))]
+        service = self.make_service(db)
+        asyncio.run(service.refresh())
+
+        # Committed after the last refresh but stamped before its watermark
+        db.rows.append(make_row("late", T0 + timedelta(seconds=10)))
+        assert asyncio.run(service.refresh()) == 1
+        assert asyncio.run(service.refresh()) == 0
+        assert len(service.norms) == 3
+
+    def test_record_then_refresh_not_double_counted(self, db, redis_store):
+        """Test a result added by record_result isn't counted again by the refresh."""
+        service = self.make_service(db)
+        result = SimpleNamespace(id="mine", createdAt=T0, **{field: 70.0 for field in SCORE_FIELDS.values()})
+        service.record_result(result, {"demo_gender": "female"})
+        db.rows = [make_row("mine", T0, 70.0, '{"demo_gender": "female"}'), make_row("other", T0)]
+
+        assert asyncio.run(service.refresh()) == 1
+        assert len(service.norms) == 2
+        assert service.norms.percentile('LUMEN', 70.0, 'gender:female') == 50.0
+
+    def test_recent_ids_pruned(self, db, redis_store):
+        """Test ids older than the overlap window behind the watermark are forgotten."""
+        db.rows = [make_row("old", T0), make_row("new", T0 + NORMS_REFRESH_OVERLAP * 3)]
+        service = self.make_service(db)
+        asyncio.run(service.refresh())
+
+        assert set(service._recent_ids) == {"new"}
+
+    def test_snapshot_round_trip(self, db, redis_store):
+        """Test a worker loading the snapshot doesn't recount rows in the overlap window."""
+        db.rows = [make_row("a", T0), make_row("b", T0 + timedelta(seconds=20))]
+        first = self.make_service(db)
+        asyncio.run(first.refresh())
+        assert redis_store.data
+
+        second = self.make_service(db)
+        assert asyncio.run(second.load_snapshot())
+        assert set(second._recent_ids) == {"a", "b"}
+        assert second.norms.watermark == first.norms.watermark
+        assert asyncio.run(second.refresh()) == 0
+        assert len(second.norms) == 2
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,513 @@
+"""
+Tests for the async Redis session store
+
+Runs AsyncRedisSessionStore against an in-memory stand-in for the
+redis.asyncio client (counting round trips) and against its own memory
+fallback.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+from redis.exceptions import ResponseError
+from app.services.redis_service import AsyncRedisSessionStore
+from app.services import session_codec
+from app.services.session_codec import current_code_table, decode_value
+from app.services.session_layout import INVALIDATION_CHANNEL, LIST_FIELDS, pack_session, unpack_session
+
+
+class FakePipeline:
+    """Queues commands and runs them in one round trip."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        self.client.round_trips += 1
+        return [self.client._run(name, *args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakePubSub:
+    """Delivers queued messages, then drops the connection."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.channels = []
+
+    async def subscribe(self, channel):
+        self.channels.append(channel)
+
+    async def listen(self):
+        yield {'type': 'subscribe', 'data': 1}
+        for message in self.messages:
+            yield {'type': 'message', 'data': message}
+        raise ConnectionError('connection lost')
+
+    async def aclose(self):
+        pass
+
+
+def _b(value):
+    """Bytes, as Redis stores every value."""
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class FakeDeltaScript:
+    """Python version of APPLY_DELTA_SCRIPT; records every delta it applies."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def __call__(self, keys, args):
+        self.client.round_trips += 1
+        expected_rev, ttl_ms, header = args[0], args[1], json.loads(args[2])
+        values = [_b(value) for value in args[3:]]
+        data = self.client.data
+        keys, summary, index = keys[:-2], keys[-2], keys[-1]
+        main = data.get(keys[0])
+        current = main.get(b'_rev', b'0') if isinstance(main, dict) else b'0'
+        if expected_rev != "" and current != _b(expected_rev):
+            return -1
+        if header['full']:
+            self.client._delete(*keys)
+
+        main = data.setdefault(keys[0], {})
+        rev = int(current) + 1
+        main[b'_rev'] = _b(rev)
+        pairs, values = values[:2 * header['set']], values[2 * header['set']:]
+        main.update(zip(pairs[::2], pairs[1::2]))
+        for name in header['unset']:
+            main.pop(_b(name), None)
+        lists = []
+        for key, (keep, count) in zip(keys[1:], header['lists']):
+            items, values = values[:count], values[count:]
+            current = data.pop(key, []) if keep == 0 else data.get(key, [])
+            if keep > 0:
+                del current[keep:]
+            current.extend(items)
+            if current:
+                data[key] = current
+            lists.append([keep, items])
+        if 'summary' in header:
+            data[summary] = _b(header['summary'])
+        for key in keys + [summary]:
+            if key in data:
+                self.client.ttls[key] = ttl_ms // 1000
+        self.client._zadd(index, {header['id']: header['expires']})
+        self.client.deltas.append({'set': pairs, 'unset': header['unset'], 'lists': lists})
+        return rev
+
+
+class FakeAsyncRedis:
+    """Binary strings, hashes and lists with TTLs; every awaited command is one round trip."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.deltas = []
+        self.round_trips = 0
+        self.scans = 0
+        self.published = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        return FakeDeltaScript(self)
+
+    def __getattr__(self, name):
+        async def command(*args, **kwargs):
+            self.round_trips += 1
+            return self._run(name, *args, **kwargs)
+        return command
+
+    def _run(self, name, *args, **kwargs):
+        return getattr(self, f'_{name}')(*args, **kwargs)
+
+    def _typed(self, key, kind):
+        value = self.data.get(key)
+        if value is not None and not isinstance(value, kind):
+            raise ResponseError('WRONGTYPE Operation against a key holding the wrong kind of value')
+        return value
+
+    def _ping(self):
+        return True
+
+    def _get(self, key):
+        return self._typed(key, bytes)
+
+    def _set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = _b(value)
+        if ex is not None:
+            self.ttls[key] = ex
+        return True
+
+    def _hgetall(self, key):
+        return dict(self._typed(key, dict) or {})
+
+    def _lrange(self, key, start, end):
+        return list(self._typed(key, list) or [])
+
+    def _delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += self.data.pop(key, None) is not None
+            self.ttls.pop(key, None)
+        return removed
+
+    def _exists(self, key):
+        return int(key in self.data)
+
+    def _expire(self, key, seconds):
+        if key not in self.data:
+            return False
+        self.ttls[key] = seconds
+        return True
+
+    def _ttl(self, key):
+        key = key.decode() if isinstance(key, bytes) else key  # as SCAN returns it
+        return self.ttls.get(key, -2 if key not in self.data else -1)
+
+    def _unlink(self, *keys):
+        return self._delete(*(key.decode() if isinstance(key, bytes) else key for key in keys))
+
+    def _publish(self, channel, message):
+        self.published.append((channel, message))
+        return 0
+
+    def _keys(self, pattern):
+        raise AssertionError('KEYS blocks Redis; use SCAN')
+
+    async def scan_iter(self, match, count):
+        prefix = match.rstrip('*')
+        for key in list(self.data):
+            if key.startswith(prefix):
+                self.scans += 1
+                yield key.encode()
+
+    def _zadd(self, key, mapping, xx=False):
+        zset = self.data.setdefault(key, {})
+        for member, score in mapping.items():
+            if not xx or _b(member) in zset:
+                zset[_b(member)] = float(score)
+
+    def _zrem(self, key, member):
+        return int(self.data.get(key, {}).pop(_b(member), None) is not None)
+
+    def _zremrangebyscore(self, key, low, high):
+        zset = self.data.get(key, {})
+        expired = [member for member, score in zset.items() if score <= high]
+        for member in expired:
+            del zset[member]
+        return len(expired)
+
+    def _zcard(self, key):
+        return len(self.data.get(key, {}))
+
+    def _zrangebyscore(self, key, low, high, start=0, num=None):
+        low = float(low.lstrip('('))
+        members = sorted((score, member) for member, score in self.data.get(key, {}).items() if score > low)
+        return [member for _, member in members[start:start + num]]
+
+    def _zscan(self, key, cursor, count):
+        entries = sorted(self.data.get(key, {}).items())
+        page = entries[cursor:cursor + count]
+        cursor = cursor + count if cursor + count < len(entries) else 0
+        return cursor, page
+
+
+def redis_store(client=None):
+    """Store wired to a fake client (health check already passed)."""
+    store = AsyncRedisSessionStore()
+    store.client = client or FakeAsyncRedis()
+    store._apply_delta = store.client.register_script(None)
+    store._last_health_check = time.time()
+    return store
+
+
+def sample_session():
+    return {
+        'stage': 'adaptive',
+        'pending_questions': ['E2', 'A1'],
+        'responses': {'E1': 4, 'N1': 2},
+        'answer_history': ['E1', 'N1'],
+        'batch_history': [{'batch': ['E1', 'N1'], 'timestamp': '2026-01-05T09:58:12.731204'}],
+        'back_navigation_log': [],
+    }
+
+
+@pytest.fixture
+def store():
+    """Store wired to the fake client."""
+    return redis_store()
+
+
+@pytest.fixture
+def memory_store():
+    """Store running on its in-memory fallback."""
+    store = AsyncRedisSessionStore()
+    store._mark_unavailable()
+    return store
+
+
+class TestAsyncRedisSessionStore:
+    """Test suite for AsyncRedisSessionStore."""
+
+    def test_set_session_writes_fields_and_ttl_in_one_round_trip(self, store):
+        """Test saving writes the packed field-level layout and every key's TTL."""
+        asyncio.run(store.set_session('abc', sample_session()))
+
+        data = store.client.data
+        table = current_code_table()
+        assert store.client.round_trips == 2  # code table (once per process), then the session
+        assert data[f'session_codes:{table.id}'] == json.dumps(table.codes).encode()
+        assert data['session:abc'][b'stage'] == b'"adaptive"'
+        assert decode_value(data['session:abc'][b'responses'], table) == {'E1': 4, 'N1': 2}
+        assert len(data['session:abc'][b'responses']) == 1 + 3 * 2  # kind byte, 3 bytes per answer
+        assert data['session:abc:answer_history'] == [table.packed_code['E1'], table.packed_code['N1']]
+        assert 'session:abc:back_navigation_log' not in data
+        assert all(store.client.ttls[key] == 24 * 3600 for key in data if key.startswith('session:'))
+        assert asyncio.run(store.get_session('abc')) == sample_session()
+
+    def test_answer_writes_only_the_delta(self, store):
+        """Test an answer sends the changed fields and one appended entry."""
+        session = sample_session()
+        asyncio.run(store.set_session('abc', session))
+
+        session['pending_questions'] = ['A1']
+        session['responses']['E2'] = 5
+        session['answer_history'].append('E2')
+        asyncio.run(store.set_session('abc', session))
+
+        delta = store.client.deltas[-1]
+        assert delta['set'][::2] == [b'pending_questions', b'responses']
+        assert delta['lists'] == [[-1, [current_code_table().packed_code['E2']]], [-1, []], [-1, []]]
+        assert store.client.round_trips == 3
+
+        fresh = redis_store(store.client)
+        assert asyncio.run(fresh.get_session('abc')) == session
+
+    def test_back_navigation_trims_lists(self, store):
+        """Test undoing an answer trims the list and rewrites the responses."""
+        session = sample_session()
+        asyncio.run(store.set_session('abc', session))
+
+        del session['responses']['N1']
+        session['answer_history'].pop()
+        session['back_navigation_log'].append(
+            {'question_id': 'N1', 'from_value': 2, 'to_value': 3, 'timestamp': '2026-01-05T10:00:00.250000'}
+        )
+        asyncio.run(store.set_session('abc', session))
+
+        delta = store.client.deltas[-1]
+        assert delta['set'][::2] == [b'responses']
+        assert delta['lists'][LIST_FIELDS.index('answer_history')] == [1, []]
+        assert asyncio.run(redis_store(store.client).get_session('abc')) == session
+
+    def test_stale_writer_falls_back_to_full_rewrite(self, store):
+        """Test a write based on an outdated revision rewrites the whole session."""
+        other = redis_store(store.client)
+        session = sample_session()
+        asyncio.run(store.set_session('abc', session))
+
+        changed = asyncio.run(other.get_session('abc'))
+        changed['stage'] = 'complete'
+        asyncio.run(other.set_session('abc', changed))
+
+        session['responses']['E2'] = 5
+        asyncio.run(store.set_session('abc', session))
+
+        assert b'stage' in store.client.deltas[-1]['set']  # full rewrite, not just the responses
+        assert asyncio.run(other.get_session('abc')) == session
+
+    def test_compare_and_set(self, store):
+        """Test a write based on an old rev is refused, and a no-op write is skipped."""
+        other = redis_store(store.client)
+        asyncio.run(store.set_session('abc', sample_session()))
+        rev = store.known_rev('abc')
+
+        changed = asyncio.run(other.get_session('abc'))
+        changed['stage'] = 'complete'
+        assert asyncio.run(other.compare_and_set_session('abc', changed, rev)) == rev + 1
+
+        session = sample_session()
+        session['responses']['E2'] = 5
+        assert asyncio.run(store.compare_and_set_session('abc', session, rev)) is None
+
+        fresh = asyncio.run(store.get_session('abc'))
+        round_trips = store.client.round_trips
+        assert asyncio.run(store.compare_and_set_session('abc', fresh, rev + 1)) == rev + 1
+        assert store.client.round_trips == round_trips
+        assert asyncio.run(store.compare_and_set_session('new', session, 0)) == 1
+        assert asyncio.run(store.compare_and_set_session('new', session, 0)) is None
+
+    def test_full_rewrite_keeps_rev_increasing(self, store):
+        """Test a full rewrite continues the rev sequence instead of restarting it."""
+        asyncio.run(store.set_session('abc', sample_session()))
+        asyncio.run(store.set_session('abc', {**sample_session(), 'stage': 'x'}))
+        store._records.clear()  # forces a full rewrite
+        asyncio.run(store.set_session('abc', sample_session()))
+
+        assert store.known_rev('abc') == 3
+
+    def test_reads_legacy_json(self, store):
+        """Test a JSON string session, and JSON field values, are read and then packed."""
+        legacy = sample_session()
+        store.client.data['session:old'] = json.dumps(legacy).encode()
+        session = asyncio.run(store.get_session('old'))
+        asyncio.run(store.set_session('old', session))
+
+        store.client.data['session:old'][b'responses'] = json.dumps({'E1': 4, 'N1': 2}).encode()
+        assert asyncio.run(redis_store(store.client).get_session('old')) == legacy
+        assert session == legacy
+
+    def test_reads_sessions_packed_against_another_item_pool(self, store, monkeypatch):
+        """Test a worker on a newer item pool decodes with the stored code table."""
+        asyncio.run(store.set_session('abc', sample_session()))
+
+        monkeypatch.setattr(session_codec, '_tables', {})
+        monkeypatch.setattr(session_codec, '_current_table', session_codec.CodeTable(['X1', 'E1']))
+        assert asyncio.run(redis_store(store.client).get_session('abc')) == sample_session()
+
+    def test_unencodable_values_fall_back_to_json(self):
+        """Test values outside the codec's range round-trip as JSON."""
+        session = {
+            **sample_session(),
+            'responses': {'E1': 4, 'NOT_AN_ITEM': 3},
+            'answer_history': ['E1', 'NOT_AN_ITEM'],
+            'batch_history': [{'batch': ['E1'], 'timestamp': '2026-01-05 10:00'}],
+        }
+        assert unpack_session(pack_session(session)) == session
+
+    def test_invalidation_listener(self, store):
+        """Test other workers' announcements are delivered and subscription changes reported."""
+        messages = [b'abc|other|7', f'def|{store.worker_id}|3'.encode(), b'ghi|other|0']
+        store.client.pubsub = lambda: FakePubSub(messages)
+        invalidated, changes = [], []
+
+        async def run():
+            listener = asyncio.create_task(store.listen_for_invalidations(
+                lambda session_id, rev: invalidated.append((session_id, rev)),
+                changes.append,
+                retry_seconds=10,
+            ))
+            await asyncio.sleep(0.05)
+            listener.cancel()
+
+        asyncio.run(run())
+
+        assert invalidated == [('abc', 7), ('ghi', 0)]  # not our own write
+        assert changes == [True, False]
+
+    def test_batched_sessions(self, store):
+        """Test set_sessions/get_sessions round trip and sessions are counted once."""
+        sessions = {f's{i}': {**sample_session(), 'n': i} for i in range(5)}
+        asyncio.run(store.set_sessions(sessions))
+        loaded = asyncio.run(store.get_sessions(['s0', 's3', 'missing']))
+
+        assert loaded == {'s0': sessions['s0'], 's3': sessions['s3'], 'missing': None}
+        assert asyncio.run(store.get_session_count()) == 5
+
+    def test_active_session_index(self, store):
+        """Test the index counts, pages and expires sessions without scanning keys."""
+        sessions = {f's{i}': sample_session() for i in range(5)}
+        asyncio.run(store.set_sessions(sessions))
+        index = store.client.data['sessions:active']
+        index[b's0'] = time.time() - 1  # expired, not yet trimmed
+        asyncio.run(store.delete_session('s1'))
+
+        async def run():
+            pages = [await store.list_active_sessions(offset, 2) for offset in (0, 2)]
+            walked = [session_id async for session_id in store.iter_active_sessions(page_size=2)]
+            return pages, walked, await store.get_session_count()
+
+        pages, walked, count = asyncio.run(run())
+
+        assert sorted(pages[0] + pages[1]) == ['s2', 's3', 's4']
+        assert sorted(walked) == ['s2', 's3', 's4']
+        assert count == 3
+        assert store.client.published == [(INVALIDATION_CHANNEL, f's1|{store.worker_id}|0')]
+        assert b's0' not in index  # trimmed by the count
+        assert store.client.scans == 0
+
+    def test_clear_and_rebuild_use_scan(self, store):
+        """Test clearing unlinks every session key and a rebuild indexes pre-index sessions."""
+        asyncio.run(store.set_session('abc', sample_session()))
+        store.client.data['session:old'] = json.dumps(sample_session()).encode()
+        store.client.ttls['session:old'] = 600
+
+        assert asyncio.run(store.rebuild_session_index()) == 2
+        assert asyncio.run(store.get_session_count()) == 2
+        assert asyncio.run(store.clear_all_sessions())
+        assert not [key for key in store.client.data if key.startswith('session:')]
+        assert asyncio.run(store.get_session_count()) == 0
+
+    def test_summary_is_written_with_the_session(self, store):
+        """Test a write stores the summary in the same call and reading it is one GET."""
+        asyncio.run(store.set_session('abc', sample_session(), summary={'answered': 2}))
+        assert store.client.round_trips == 2  # code table, then session and summary together
+        assert store.client.ttls['session:abc:summary'] == 24 * 3600
+
+        session = sample_session()
+        session['responses']['E2'] = 5
+        asyncio.run(store.compare_and_set_session('abc', session, 1, summary={'answered': 3}))
+        store.client.round_trips = 0
+
+        assert asyncio.run(store.get_session_summary('abc')) == {'answered': 3}
+        assert store.client.round_trips == 1
+        asyncio.run(store.delete_session('abc'))
+        assert asyncio.run(store.get_session_summary('abc')) is None
+
+    def test_progress_update_keeps_ttl(self, store):
+        """Test progress updates read value and TTL together and keep the TTL."""
+        async def run():
+            await store.init_generation_progress('abc', 2, ['Intro', 'Outro'], ttl_seconds=120)
+            store.client.ttls['progress:abc'] = 90
+            store.client.round_trips = 0
+            await store.update_generation_progress('abc', 'Intro', 'Outro')
+            return await store.get_generation_progress('abc')
+
+        progress = asyncio.run(run())
+
+        assert progress['completed_steps'] == 1
+        assert progress['current_step'] == 'Outro'
+        assert progress['percentage'] == 50
+        assert store.client.ttls['progress:abc'] == 90
+        assert store.client.round_trips == 3  # pipelined read, write, then the get above
+
+    def test_memory_fallback(self, memory_store):
+        """Test the in-memory fallback serves sessions and progress."""
+        async def run():
+            assert await memory_store.set_session('abc', {'responses': {}}, summary={'answered': 0}) is False
+            assert await memory_store.get_session_summary('abc') == {'answered': 0}
+            await memory_store.update_session_field('abc', 'responses', {'E1': 3})
+            await memory_store.init_generation_progress('abc', 4, ['A', 'B', 'C', 'D'])
+            await memory_store.update_generation_progress('abc', 'A', 'B')
+            return await memory_store.get_session('abc'), await memory_store.get_generation_progress('abc')
+
+        session, progress = asyncio.run(run())
+
+        assert session == {'responses': {'E1': 3}}
+        assert progress['percentage'] == 25
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
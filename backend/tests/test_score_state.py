@@ -0,0 +1,151 @@
+"""
+Tests for SELVE Incremental Score State
+
+Checks that per-session running sums stay identical to full rescoring
+through answers, re-answers and back navigation.
+"""
+
+import json
+import random
+
+import pytest
+from app.adaptive_testing import AdaptiveTester
+from app.item_pool import CompiledItemPool
+from app.score_state import ScoreState
+from app.scoring import SelveScorer
+
+
+class TestScoreState:
+    """Test suite for ScoreState."""
+
+    @pytest.fixture
+    def scorer(self):
+        """Create scorer instance for tests."""
+        return SelveScorer()
+
+    @pytest.fixture
+    def tester(self, scorer):
+        """Create adaptive tester sharing the scorer."""
+        return AdaptiveTester(scorer=scorer)
+
+    def _random_session(self, scorer, seed, n_steps=80):
+        """Replay random answers/re-answers/back navigation, returning (state, responses)."""
+        rng = random.Random(seed)
+        codes = [item['item'] for item in scorer.get_all_items()]
+        state = ScoreState(scorer.compiled)
+        responses = {}
+
+        for _ in range(n_steps):
+            action = rng.random()
+            if responses and action < 0.15:
+                # Back navigation
+                code = rng.choice(list(responses))
+                state.discard(code, responses.pop(code))
+            else:
+                # New answer, or re-answer of an existing one
+                code = rng.choice(list(responses)) if responses and action < 0.3 else rng.choice(codes)
+                value = rng.randint(1, scorer._get_scale_range(code)[1])
+                state.record(code, responses.get(code), value)
+                responses[code] = value
+
+        return state, responses
+
+    def test_incremental_matches_rebuild(self, scorer):
+        """Test incremental updates give exactly the rebuilt sums."""
+        for seed in range(10):
+            state, responses = self._random_session(scorer, seed)
+            rebuilt = ScoreState.from_responses(scorer.compiled, responses)
+
+            assert state.counts == rebuilt.counts
+            assert state.sums == rebuilt.sums
+            assert state.unit_sums == rebuilt.unit_sums
+            assert state.unit_sumsq == rebuilt.unit_sumsq
+            assert state.verify(responses)
+
+    def test_profile_from_state(self, scorer):
+        """Test scorer reads the same profile from state as from responses."""
+        for seed in range(10):
+            state, responses = self._random_session(scorer, seed)
+
+            assert scorer.score_from_state(state).to_dict() == scorer.score_responses(responses).to_dict()
+
+    def test_uncertainties_from_state(self, scorer, tester):
+        """Test tester reads the same uncertainties from state as from responses."""
+        for seed in range(10):
+            state, responses = self._random_session(scorer, seed)
+
+            assert tester.uncertainties_from_state(state) == tester.calculate_uncertainties(responses)
+
+    def test_round_trip_json(self, scorer):
+        """Test state survives JSON serialization (Redis session storage)."""
+        state, responses = self._random_session(scorer, 3)
+
+        restored = ScoreState.from_dict(scorer.compiled, json.loads(json.dumps(state.to_dict())))
+
+        assert restored is not None
+        assert restored.matches(state)
+        assert ScoreState.from_dict(scorer.compiled, {'counts': [1, 2]}) is None
+
+    def test_other_pool_state_rejected(self, scorer):
+        """Test state saved under a different pool (e.g. reverse key change) isn't reused."""
+        state = ScoreState.from_responses(scorer.compiled, {'E1': 4, 'N1': 2})
+        data = json.loads(json.dumps(state.to_dict()))
+
+        changed = {dim: [dict(item) for item in items] for dim, items in scorer.dimension_items.items()}
+        changed['LUMEN'][0]['reversed'] = not changed['LUMEN'][0].get('reversed', False)
+        other = CompiledItemPool.from_dimension_items(changed)
+
+        assert other.fingerprint != scorer.compiled.fingerprint
+        assert ScoreState.from_dict(other, data) is None
+        assert ScoreState.from_dict(scorer.compiled, {k: v for k, v in data.items() if k != 'pool'}) is None
+
+    def test_digest_tracks_responses(self, scorer):
+        """Test same-count edits that bypass record() are detected."""
+        responses = {'E1': 4, 'N1': 2, 'DEMO_X': 1}
+        state = ScoreState.from_responses(scorer.compiled, responses)
+        state.record('A4', None, 5)
+        state.record('E1', 4, 2)
+        state.discard('N1', 2)
+        current = {'E1': 2, 'A4': 5, 'DEMO_X': 1}
+
+        assert state.reflects(current)
+        assert state.matches(ScoreState.from_responses(scorer.compiled, current))
+        assert not state.reflects({'E1': 3, 'A4': 5, 'DEMO_X': 1})
+        assert state.reflects({'E1': 2.0, 'A4': 5, 'DEMO_X': 1})
+        assert state.reflects({'E1': 3, 'A4': 5, 'DEMO_X': 1}, check_digest=False)
+        assert not state.reflects({'E1': 2, 'A4': 5}, check_digest=False)
+
+    def test_record_validates_value(self, scorer):
+        """Test out-of-range answers are rejected before touching the sums."""
+        state = ScoreState(scorer.compiled)
+
+        with pytest.raises(ValueError):
+            state.record('E1', None, 6)
+        with pytest.raises(ValueError):
+            state.record('HMode1', None, 0)
+
+        assert sum(state.counts) == 0
+        assert state.n_responses == 0
+
+    def test_unknown_items_counted_only(self, scorer):
+        """Test non-pool codes track response count without affecting scores."""
+        state = ScoreState(scorer.compiled)
+        state.record('E1', None, 4)
+        state.record('E999', None, 2)
+
+        assert state.n_responses == 2
+        assert sum(state.counts) == 1
+        assert state.verify({'E1': 4, 'E999': 2})
+
+    def test_verify_detects_drift(self, scorer):
+        """Test verification flags a state that diverged from the responses."""
+        state, responses = self._random_session(scorer, 5)
+        code = next(iter(responses))
+        responses[code] = 1 if responses[code] != 1 else 2
+
+        assert not state.verify(responses)
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
@@ -189,6 +189,133 @@ class TestSelveScorer:
         assert 'normalized_score' in profile_dict['LUMEN']
         assert 'interpretation' in profile_dict['LUMEN']
     
+    def test_compiled_item_index(self, scorer):
+        """Test compiled index mirrors the item pool dicts."""
+        compiled = scorer.compiled
+        total_items = sum(len(items) for items in scorer.dimension_items.values())
+        
+        assert compiled.n_items == total_items
+        assert compiled.dimensions[0] == 'LUMEN'
+        
+        for dimension, items in scorer.dimension_items.items():
+            for item in items:
+                index = compiled.code_to_index[item['item']]
+                assert compiled.dimensions[compiled.dimension_ids[index]] == dimension
+                assert bool(compiled.reversed[index]) == item['reversed']
+                assert compiled.scale_max[index] == scorer._get_scale_range(item['item'])[1]
+    
+    def test_vectorized_scores_match_item_walk(self, scorer):
+        """Test vectorized scoring matches a per-item reference calculation."""
+        import random
+        rng = random.Random(7)
+        all_items = scorer.get_all_items()
+        
+        for _ in range(20):
+            sample = rng.sample(all_items, 40)
+            responses = {
+                item['item']: rng.randint(1, scorer._get_scale_range(item['item'])[1])
+                for item in sample
+            }
+            profile = scorer.score_responses(responses)
+            
+            for dimension, items in scorer.dimension_items.items():
+                scored = [
+                    scorer._apply_reverse_scoring(
+                        responses[item['item']],
+                        item['reversed'],
+                        scorer._get_scale_range(item['item'])[1],
+                    )
+                    for item in items if item['item'] in responses
+                ]
+                dim_score = getattr(profile, dimension.lower())
+                assert dim_score.n_items == len(scored)
+                if scored:
+                    expected_raw = sum(scored) / len(scored)
+                    assert dim_score.raw_score == pytest.approx(round(expected_raw, 3))
+                    assert dim_score.normalized_score == pytest.approx(
+                        round((expected_raw - 1) / 6 * 100, 2)
+                    )
+    
+    def test_unknown_items_ignored(self, scorer):
+        """Test responses for codes outside the pool don't affect scores."""
+        base = scorer.score_responses({'E1': 5, 'N6': 2}, validate=False)
+        extra = scorer.score_responses({'E1': 5, 'N6': 2, 'E999': 1}, validate=False)
+        
+        assert base.dimension_scores == extra.dimension_scores
+    
+    def test_score_batch_matches_single(self, scorer):
+        """Test batch scoring matches score_responses for dicts and sparse input."""
+        import random
+        from scipy import sparse
+        rng = random.Random(3)
+        all_codes = [item['item'] for item in scorer.get_all_items()]
+
+        batch_responses = []
+        for _ in range(50):
+            codes = rng.sample(all_codes, rng.randint(0, 40))
+            batch_responses.append({
+                code: rng.randint(1, scorer._get_scale_range(code)[1]) for code in codes
+            })
+
+        batch = scorer.score_batch(iter(batch_responses))
+        assert len(batch) == 50
+
+        for row, responses in enumerate(batch_responses):
+            profile = scorer.score_responses(responses)
+            assert batch.dimension_scores(row) == profile.dimension_scores
+            for col, dimension in enumerate(batch.dimensions):
+                dim_score = getattr(profile, dimension.lower())
+                assert batch.raw_scores[row, col] == dim_score.raw_score
+                assert batch.n_items[row, col] == dim_score.n_items
+
+        # Same respondents as a sparse respondents x items matrix
+        rows, cols, values = [], [], []
+        for row, responses in enumerate(batch_responses):
+            for code, value in responses.items():
+                rows.append(row)
+                cols.append(scorer.compiled.code_to_index[code])
+                values.append(value)
+        matrix = sparse.csr_matrix((values, (rows, cols)), shape=(50, scorer.compiled.n_items))
+
+        sparse_batch = scorer.score_batch(matrix)
+        assert (sparse_batch.normalized_scores == batch.normalized_scores).all()
+        assert (sparse_batch.n_items == batch.n_items).all()
+
+    def test_score_batch_validation(self, scorer):
+        """Test batch scoring rejects out-of-range responses."""
+        from scipy import sparse
+
+        with pytest.raises(ValueError):
+            scorer.score_batch([{'E1': 4}, {'E1': 6}])
+
+        matrix = sparse.lil_matrix((2, scorer.compiled.n_items))
+        matrix[1, scorer.compiled.code_to_index['E1']] = 6
+        with pytest.raises(ValueError):
+            scorer.score_batch(matrix)
+
+        assert len(scorer.score_batch([])) == 0
+
+    def test_item_pool_shared_across_scorers(self, scorer):
+        """Test scorers for the same pool share one loaded item pool."""
+        other = SelveScorer()
+        
+        assert other.dimension_items is scorer.dimension_items
+        assert other.compiled is scorer.compiled
+        
+        # Scenario-free pool is a separate registry entry
+        base_only = SelveScorer(include_scenarios=False)
+        assert base_only.compiled is not scorer.compiled
+        assert base_only.compiled.n_items < scorer.compiled.n_items
+    
+    def test_item_pool_read_only(self, scorer):
+        """Test callers can't mutate the shared pool through the scorer."""
+        items = scorer.get_items_by_dimension('LUMEN')
+        items.reverse()
+        
+        assert scorer.get_items_by_dimension('LUMEN') != items
+        with pytest.raises(TypeError):
+            scorer.dimension_items['LUMEN'] = []
+    
     def test_interpretation_levels(self, scorer):
         """Test score interpretation levels."""
         # Very High (>= 75)
@@ -0,0 +1,134 @@
+"""
+Tests for the narrative section cache
+
+Runs IntegratedNarrativeGenerator against a fake LLM and checks repeated
+profiles are served from the cache, and that score quantization never
+changes what the analyzer concludes.
+"""
+
+import asyncio
+
+import pytest
+from app.narratives.dimensions import DIMENSION_TEMPLATES
+from app.narratives.integrated_generator import SECTION_CONFIG, IntegratedNarrativeGenerator
+from app.narratives.section_cache import NarrativeSectionCache, quantize_scores
+from app.narratives.synthesizer import PersonalityAnalyzer
+import app.narratives.integrated_generator as integrated_generator
+
+
+SCORES = {
+    'LUMEN': 52, 'AETHER': 37, 'ORPHEUS': 43, 'ORIN': 39,
+    'LYRA': 63, 'VARA': 58, 'CHRONOS': 50, 'KAEL': 12,
+}
+
+
+class FakeLLM:
+    """Answers every request with its section name; counts calls."""
+
+    def __init__(self):
+        self.config = type('Config', (), {'model': 'gpt-5-nano'})()
+        self.calls = 0
+
+    async def generate_batch_async(self, requests, max_concurrent=None, on_complete=None, on_result=None, on_delta=None,
+                                   priority=None):
+        results = []
+        for count, req in enumerate(requests, 1):
+            self.calls += 1
+            results.append({'text': f"Text for {req['name']}", 'cost': 0.01})
+            if on_delta:
+                await on_delta(req['name'], 'Text ')
+            if on_result:
+                await on_result(req['name'], results[-1])
+            if on_complete:
+                await on_complete(req['name'], count)
+        return results
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    cache = NarrativeSectionCache(use_redis=False)
+    monkeypatch.setattr(integrated_generator, 'get_section_cache', lambda: cache)
+    monkeypatch.setattr(integrated_generator, 'get_narrative_bank', lambda: None)
+    generator = IntegratedNarrativeGenerator(use_llm=False)
+    generator.use_llm, generator.llm = True, FakeLLM()
+    return generator, cache
+
+
+class TestNarrativeSectionCache:
+    """Test suite for NarrativeSectionCache."""
+
+    def test_repeated_profile_is_served_from_cache(self, generator):
+        """Test the second identical profile makes no LLM calls and reports every section."""
+        generator, cache = generator
+        progress = []
+
+        async def on_section_complete(name, count):
+            progress.append(count)
+
+        first = asyncio.run(generator.generate_narrative_async(SCORES))
+        second = asyncio.run(generator.generate_narrative_async(SCORES, on_section_complete))
+
+        assert generator.llm.calls == len(SECTION_CONFIG)
+        assert second['sections'] == first['sections']
+        assert second['generation_cost'] == 0.0
+        assert second['metadata']['cached_sections'] == list(SECTION_CONFIG)
+        assert progress == list(range(1, len(SECTION_CONFIG) + 1))
+        stats = cache.stats()
+        assert stats['memory_hits'] == len(SECTION_CONFIG)
+        assert stats['misses'] == len(SECTION_CONFIG)
+        assert stats['dollars_saved'] == pytest.approx(0.01 * len(SECTION_CONFIG))
+
+    def test_section_text_is_reported_as_it_completes(self, generator):
+        """Test each section's text (and deltas, when streaming) arrives before its progress, generated or cached."""
+        generator, _ = generator
+
+        def recorder():
+            events = []
+
+            async def on_text(name, text):
+                events.append(('text', name, text))
+
+            async def on_delta(name, delta):
+                events.append(('delta', name))
+
+            async def on_complete(name, count):
+                events.append(('complete', name))
+
+            return events, dict(on_section_complete=on_complete, on_section_text=on_text, on_section_delta=on_delta)
+
+        generated, callbacks = recorder()
+        asyncio.run(generator.generate_narrative_async(SCORES, **callbacks))
+        cached, callbacks = recorder()
+        asyncio.run(generator.generate_narrative_async(SCORES, **callbacks))
+
+        first = list(SECTION_CONFIG)[0]
+        assert generated[:3] == [('delta', first), ('text', first, f'Text for {first}'), ('complete', first)]
+        assert len(generated) == 3 * len(SECTION_CONFIG)
+        assert cached[:2] == [('text', first, f'Text for {first}'), ('complete', first)]
+        assert len(cached) == 2 * len(SECTION_CONFIG)
+
+    def test_key_ignores_whitespace_but_not_model(self):
+        """Test prompts differing only in whitespace share a key; another model doesn't."""
+        key = NarrativeSectionCache.make_key('conflicts', 'a  b\n c', 'sys', 800, 'gpt-5-nano')
+
+        assert key == NarrativeSectionCache.make_key('conflicts', 'a b c ', 'sys', 800, 'gpt-5-nano')
+        assert key != NarrativeSectionCache.make_key('conflicts', 'a b c', 'sys', 800, 'gpt-5-mini')
+
+    def test_quantization_keeps_the_analysis(self):
+        """Test every score from 0 to 100 keeps its level, flags and conflicts when quantized."""
+        for score in range(101):
+            scores = {**SCORES, 'AETHER': score, 'ORPHEUS': 100 - score}
+            exact = PersonalityAnalyzer(scores, DIMENSION_TEMPLATES)
+            rounded = PersonalityAnalyzer(quantize_scores(scores, 5), DIMENSION_TEMPLATES)
+
+            assert [d.level for d in rounded.dimensions] == [d.level for d in exact.dimensions]
+            assert [d.name for d in rounded.get_extreme_traits()] == [d.name for d in exact.get_extreme_traits()]
+            assert [c.impact for c in rounded.detect_conflicts()] == [c.impact for c in exact.detect_conflicts()]
+
+        assert quantize_scores(SCORES, 5)['LUMEN'] == 50
+        assert quantize_scores(SCORES, 1) == SCORES
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,353 @@
+"""
+Tests for the session manager's memory tier
+
+Checks LRUSessionCache's byte-size/TTL eviction and rev-based invalidation,
+and that two SessionManagers sharing one (fake) Redis - two workers - never
+serve each other stale sessions.
+"""
+
+import asyncio
+import copy
+import time
+
+import pytest
+
+try:
+    from app.routes.assessment.session_manager import LRUSessionCache, SessionManager
+except RuntimeError as e:  # Prisma client not generated in this environment
+    pytest.skip(f"Session manager unavailable: {e}", allow_module_level=True)
+
+from app.routes.assessment.exceptions import SessionConflictError, SessionNotFoundError
+from app.routes.assessment.session_manager import CACHE_ENTRY_OVERHEAD_BYTES
+
+
+class SharedRedis:
+    """Sessions with revs, as every worker sees them."""
+
+    def __init__(self):
+        self.sessions = {}
+        self.rev_checks = 0
+        self.conflicts = 0
+        self.reads = 0
+        self.summaries = {}
+
+
+class FakeWorkerStore:
+    """One worker's view of SharedRedis, remembering the revs it wrote or read."""
+
+    redis_available = True
+
+    def __init__(self, shared):
+        self.shared = shared
+        self.known = {}
+
+    async def get_session(self, session_id):
+        return (await self.get_session_with_rev(session_id))[0]
+
+    async def get_session_with_rev(self, session_id):
+        self.shared.reads += 1
+        await asyncio.sleep(0)  # a round trip: other requests run meanwhile
+        if session_id not in self.shared.sessions:
+            return None, None
+        rev, data = self.shared.sessions[session_id]
+        self.known[session_id] = rev
+        return copy.deepcopy(data), rev
+
+    async def set_session(self, session_id, data, summary=None):
+        rev = self.shared.sessions.get(session_id, (0, None))[0] + 1
+        self.shared.sessions[session_id] = (rev, copy.deepcopy(data))
+        self.known[session_id] = rev
+        if summary is not None:
+            self.shared.summaries[session_id] = summary
+        return True
+
+    async def compare_and_set_session(self, session_id, data, expected_rev, summary=None):
+        current = self.shared.sessions.get(session_id, (0, None))[0]
+        if expected_rev is not None and expected_rev != current:
+            self.shared.conflicts += 1
+            return None
+        await self.set_session(session_id, data, summary)
+        return self.known[session_id]
+
+    async def get_session_summary(self, session_id):
+        return self.shared.summaries.get(session_id)
+
+    async def set_session_summary(self, session_id, summary):
+        self.shared.summaries[session_id] = summary
+        return True
+
+    async def get_session_rev(self, session_id):
+        self.shared.rev_checks += 1
+        entry = self.shared.sessions.get(session_id)
+        return entry[0] if entry else None
+
+    def known_rev(self, session_id):
+        return self.known.get(session_id)
+
+
+class FakeService:
+    """Database with no sessions; counts lookups."""
+
+    def __init__(self):
+        self.lookups = 0
+
+    async def get_session(self, session_id):
+        self.lookups += 1
+        return None
+
+
+def worker(shared):
+    manager = SessionManager()
+    manager._redis = FakeWorkerStore(shared)
+    manager._service = FakeService()
+    return manager
+
+
+def session(n_answers):
+    return {
+        **SessionManager().create_session_dict('abc'),
+        'responses': {f'E{i}': 3 for i in range(1, n_answers + 1)},
+    }
+
+
+class TestLRUSessionCache:
+    """Test suite for LRUSessionCache."""
+
+    def test_byte_size_eviction(self):
+        """Test least recently used entries go once the byte budget is exceeded."""
+        cache = LRUSessionCache(max_bytes=3 * (100 + CACHE_ENTRY_OVERHEAD_BYTES))
+        for key in 'abc':
+            cache.set(key, b'x' * 100, rev=1)
+        cache.get('a')
+        cache.set('d', b'x' * 100, rev=1)
+
+        assert not cache.contains('b')
+        assert all(cache.contains(key) for key in 'acd')
+        assert cache.stats()['bytes'] == 3 * (100 + CACHE_ENTRY_OVERHEAD_BYTES)
+        assert cache.stats()['evictions'] == 1
+
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL."""
+        cache = LRUSessionCache(ttl_seconds=0.05)
+        cache.set('a', b'x', rev=1)
+        time.sleep(0.1)
+
+        assert cache.get('a') is None
+        assert cache.stats()['expirations'] == 1
+        assert cache.stats()['bytes'] == 0
+
+    def test_invalidation_by_rev(self):
+        """Test announced revs drop older copies and keep in-flight loads unverified."""
+        cache = LRUSessionCache()
+        cache.set('a', b'x', rev=3, verified=True)
+        cache.invalidate('a', 3)  # our own rev, announced late
+        assert cache.contains('a')
+
+        cache.invalidate('a', 4)
+        assert not cache.contains('a')
+
+        cache.set('a', b'x', rev=3, verified=True)  # load that started before rev 4
+        assert not cache.get('a').verified
+
+
+class TestSessionManagerCoherence:
+    """Two workers sharing Redis."""
+
+    def test_version_check_catches_other_workers_write(self):
+        """Test without the listener every hit checks the rev, and a newer write is reloaded."""
+        shared = SharedRedis()
+        a, b = worker(shared), worker(shared)
+
+        async def run():
+            await a.save_session('abc', session(1))
+            await b.get_session('abc')
+            await b.save_session('abc', session(2))
+            return await a.get_session('abc')
+
+        assert len(asyncio.run(run())['responses']) == 2
+
+    def test_subscribed_hits_skip_redis_until_invalidated(self):
+        """Test a coherent worker serves hits locally and reloads after an announcement."""
+        shared = SharedRedis()
+        a, b = worker(shared), worker(shared)
+        a._on_listener_change(True)
+
+        async def run():
+            await a.save_session('abc', session(1))
+            for _ in range(5):
+                await a.get_session('abc')
+            checks = shared.rev_checks
+
+            await b.get_session('abc')
+            await b.save_session('abc', session(2))
+            a._cache.invalidate('abc', shared.sessions['abc'][0])  # what the listener does
+            return checks, await a.get_session('abc')
+
+        checks, latest = asyncio.run(run())
+
+        assert checks == 0
+        assert len(latest['responses']) == 2
+
+    def test_reconnect_rechecks_cached_sessions(self):
+        """Test losing the subscription makes the next hit verify its rev again."""
+        shared = SharedRedis()
+        a = worker(shared)
+        a._on_listener_change(True)
+
+        async def run():
+            await a.save_session('abc', session(1))
+            a._on_listener_change(False)
+            await a.get_session('abc')
+
+        asyncio.run(run())
+
+        assert shared.rev_checks == 1
+
+
+
+class TestSessionLookups:
+    """get_session_with_db_fallback's shared loads and negative cache."""
+
+    def test_concurrent_misses_share_one_load(self):
+        """Test simultaneous cold lookups make one Redis read and each get their own copy."""
+        shared = SharedRedis()
+        shared.sessions['abc'] = (1, session(2))
+        a = worker(shared)
+
+        async def run():
+            return await asyncio.gather(*(a.get_session_with_db_fallback('abc') for _ in range(3)))
+
+        loaded = asyncio.run(run())
+
+        assert shared.reads == 1
+        assert all(len(copy['responses']) == 2 for copy in loaded)
+        assert len({id(copy) for copy in loaded}) == 3
+        assert a._shared_loads == 2
+
+    def test_shared_loads_are_private_copies(self):
+        """Test changes one caller makes to its session never show up in another's, the loader's included."""
+        shared = SharedRedis()
+        shared.sessions['abc'] = (1, session(1))
+        a = worker(shared)
+
+        async def load_and_answer(code):
+            loaded = await a.get_session_with_db_fallback('abc')
+            loaded['responses'][code] = 3
+            await asyncio.sleep(0)
+            return loaded
+
+        async def run():
+            return await asyncio.gather(*(load_and_answer(code) for code in ('N1', 'N2', 'N3')))
+
+        loaded = asyncio.run(run())
+
+        assert [set(copy['responses']) for copy in loaded] == [{'E1', 'N1'}, {'E1', 'N2'}, {'E1', 'N3'}]
+        assert a._shared_loads == 2
+
+    def test_unknown_ids_are_negatively_cached(self):
+        """Test repeated lookups of an unknown id query the database once, until it's saved."""
+        shared = SharedRedis()
+        a = worker(shared)
+
+        async def run():
+            for _ in range(3):
+                assert await a.get_session_with_db_fallback('nope', raise_if_missing=False) is None
+            with pytest.raises(SessionNotFoundError):
+                await a.get_session_with_db_fallback('nope')
+            await a.save_session('nope', session(1))
+            return await a.get_session_with_db_fallback('nope')
+
+        assert asyncio.run(run()) is not None
+        assert a._service.lookups == 1
+        assert a._negative_hits == 3
+
+    def test_summary_reads_skip_the_session(self):
+        """Test summaries are written with the session, read alone, and backfilled once when missing."""
+        shared = SharedRedis()
+        a, b = worker(shared), worker(shared)
+
+        async def run():
+            await a.save_session('abc', session(2))
+            written = await b.get_session_summary('abc')
+            reads = shared.reads
+            del shared.summaries['abc']  # session stored before summaries existed
+            await b.get_session_summary('abc')
+            await b.get_session_summary('abc')
+            return written, reads
+
+        written, reads = asyncio.run(run())
+
+        assert reads == 0
+        assert shared.reads == 1
+        assert written['answered'] == 2 and written['status'] == 'in_progress'
+        assert sum(written['dimension_progress'].values()) == 2
+
+
+class TestOptimisticUpdates:
+    """update_session's compare-and-set and re-apply."""
+
+    def test_concurrent_answers_both_land(self):
+        """Test two workers answering different items at once: the loser re-applies on the newer session."""
+        shared = SharedRedis()
+        a, b = worker(shared), worker(shared)
+        b._on_listener_change(True)  # a's announcement is still in flight when b reads
+
+        def answer(code):
+            def mutate(session):
+                session['responses'][code] = 3
+                return len(session['responses'])
+            return mutate
+
+        async def run():
+            await a.save_session('abc', session(1))
+            await b.get_session('abc')
+            await a.update_session('abc', answer('N1'))
+            return await b.update_session('abc', answer('A1'))
+
+        assert asyncio.run(run()) == 3
+        assert shared.conflicts == 1
+        assert set(shared.sessions['abc'][1]['responses']) == {'E1', 'N1', 'A1'}
+
+    def test_concurrent_updates_on_one_worker_lose_nothing(self):
+        """Test simultaneous updates to one session in one worker each commit on the rev they read."""
+        shared = SharedRedis()
+        a = worker(shared)
+
+        def answer(code):
+            def mutate(session):
+                session['responses'][code] = 3
+            return mutate
+
+        async def run():
+            await a.save_session('abc', session(1))
+            a._cache.delete('abc')  # cold: the updates share one load
+            codes = [f'N{i}' for i in range(1, 5)]
+            await asyncio.gather(*(a.update_session('abc', answer(code)) for code in codes))
+            return codes, await a.get_session('abc')
+
+        codes, latest = asyncio.run(run())
+
+        assert set(shared.sessions['abc'][1]['responses']) == {'E1', *codes}
+        assert set(latest['responses']) == {'E1', *codes}
+        assert shared.conflicts >= 3  # every update after the first re-applied at least once
+
+    def test_gives_up_after_max_attempts(self):
+        """Test an update that keeps losing raises SessionConflictError without writing."""
+        shared = SharedRedis()
+        a = worker(shared)
+
+        def mutate(session):
+            rev, data = shared.sessions['abc']
+            shared.sessions['abc'] = (rev + 1, data)  # another writer, every time
+
+        async def run():
+            await a.save_session('abc', session(1))
+            await a.update_session('abc', mutate, max_attempts=3)
+
+        with pytest.raises(SessionConflictError):
+            asyncio.run(run())
+        assert shared.conflicts == 3
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
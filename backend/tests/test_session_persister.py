@@ -0,0 +1,230 @@
+"""
+Tests for the write-behind session persister
+
+Runs SessionPersister against a small stand-in for the Redis hash, sorted
+set and settle script it buffers in, and a fake bulk-update service.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from app.services.distributed_lock import AsyncLockManager
+from app.services.session_persister import SessionPersister
+
+
+class FakePipeline:
+    """Queues commands and runs them together."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        return [getattr(self.client, f'_{name}')(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeBufferRedis:
+    """The persist:pending hash and persist:due sorted set, as bytes like Redis returns."""
+
+    def __init__(self):
+        self.pending = {}
+        self.due = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        async def settle(keys, args):
+            now = args[0]
+            for session_id, payload in zip(args[1::2], args[2::2]):
+                current = self.pending.get(session_id)
+                if current is None or current == payload:
+                    self.pending.pop(session_id, None)
+                    self.due.pop(session_id, None)
+                elif session_id in self.due:
+                    self.due[session_id] = now
+        return settle
+
+    def _hset(self, key, field, value):
+        self.pending[field] = value.encode()
+
+    def _zadd(self, key, mapping, nx=False):
+        for member, score in mapping.items():
+            if not (nx and member in self.due):
+                self.due[member] = score
+
+    def _zcard(self, key):
+        return len(self.due)
+
+    async def zrangebyscore(self, key, low, high, start=0, num=None):
+        members = sorted((score, member) for member, score in self.due.items() if score <= high)
+        return [member.encode() for _, member in members[start:start + num]]
+
+    async def hmget(self, key, fields):
+        return [self.pending.get(field) for field in fields]
+
+
+class FakeBulkService:
+    """Records every bulk update; can fail or run a hook mid-write."""
+
+    def __init__(self):
+        self.calls = []
+        self.rows = {}
+        self.fail = False
+        self.during_write = None
+
+    async def update_sessions_bulk(self, columns_by_session):
+        if self.fail:
+            raise RuntimeError('database unavailable')
+        if self.during_write:
+            await self.during_write()
+        self.calls.append(dict(columns_by_session))
+        self.rows.update(columns_by_session)
+        return len(columns_by_session)
+
+
+def state(n_answers):
+    return {
+        'responses': {f'E{i}': 3 for i in range(1, n_answers + 1)},
+        'demographics': {},
+        'pending_questions': {'N1'},
+        'answer_history': [f'E{i}' for i in range(1, n_answers + 1)],
+        'back_navigation_count': 0,
+        'back_navigation_log': [],
+    }
+
+
+def make_persister(redis_available=True, **kwargs):
+    store = SimpleNamespace(
+        redis_available=redis_available,
+        client=FakeBufferRedis(),
+        locks=AsyncLockManager(SimpleNamespace(redis_available=False)),
+    )
+    return SessionPersister(store, FakeBulkService(), **kwargs)
+
+
+class TestSessionPersister:
+    """Test suite for SessionPersister."""
+
+    def test_coalesces_answers_into_one_bulk_write(self):
+        """Test many answers across sessions become one statement with the latest columns."""
+        persister = make_persister()
+
+        async def run():
+            for n in range(1, 6):
+                await persister.mark_dirty('a', state(n))
+                await persister.mark_dirty('b', state(n * 2))
+            return await persister.flush(everything=True)
+
+        assert asyncio.run(run()) == 2
+        service = persister._service
+        assert len(service.calls) == 1
+        assert service.rows['a']['answerHistory'] == [f'E{i}' for i in range(1, 6)]
+        assert service.rows['b']['pendingQuestions'] == ['N1']
+        assert persister._store.client.pending == {}
+        assert persister._store.client.due == {}
+
+    def test_time_policy(self):
+        """Test a regular flush only writes entries older than the interval."""
+        persister = make_persister(flush_interval=60)
+
+        async def run():
+            await persister.mark_dirty('old', state(1))
+            await persister.mark_dirty('new', state(1))
+            persister._store.client.due['old'] -= 120
+            return await persister.flush()
+
+        assert asyncio.run(run()) == 1
+        assert set(persister._service.rows) == {'old'}
+        assert set(persister._store.client.pending) == {'new'}
+
+    def test_size_policy_wakes_flusher(self):
+        """Test reaching max_pending sessions asks the flusher for a full flush."""
+        persister = make_persister(max_pending=3)
+
+        async def run():
+            for session_id in ('a', 'b'):
+                await persister.mark_dirty(session_id, state(1))
+            woke_early = persister._wake.is_set()
+            await persister.mark_dirty('c', state(1))
+            return woke_early
+
+        assert not asyncio.run(run())
+        assert persister._wake.is_set() and persister._flush_all
+
+    def test_failed_write_keeps_entries(self):
+        """Test a database failure leaves the buffer for the next flush."""
+        persister = make_persister()
+
+        async def run():
+            await persister.mark_dirty('a', state(3))
+            persister._service.fail = True
+            with pytest.raises(RuntimeError):
+                await persister.flush(everything=True)
+            persister._service.fail = False
+            return await persister.flush(everything=True)
+
+        assert asyncio.run(run()) == 1
+        assert persister._service.rows['a']['responses'] == state(3)['responses']
+
+    def test_answer_during_flush_is_not_lost(self):
+        """Test an answer buffered while its older snapshot is written stays buffered."""
+        persister = make_persister()
+
+        async def newer_answer():
+            persister._service.during_write = None
+            await persister.mark_dirty('a', state(4))
+
+        async def run():
+            await persister.mark_dirty('a', state(3))
+            persister._service.during_write = newer_answer
+            first = await persister.flush(everything=True)
+            return first, await persister.flush(everything=True)
+
+        first, second = asyncio.run(run())
+
+        assert (first, second) == (1, 1)
+        assert len(persister._service.rows['a']['answerHistory']) == 4
+        assert persister._store.client.pending == {}
+
+    def test_completion_writes_immediately(self):
+        """Test flush_session writes that session now and clears its entry."""
+        persister = make_persister()
+
+        async def run():
+            await persister.mark_dirty('a', state(2))
+            await persister.mark_dirty('b', state(2))
+            await persister.flush_session('a', state(5))
+
+        asyncio.run(run())
+
+        assert [set(call) for call in persister._service.calls] == [{'a'}]
+        assert len(persister._service.rows['a']['answerHistory']) == 5
+        assert set(persister._store.client.pending) == {'b'}
+
+    def test_writes_through_without_redis(self):
+        """Test each answer goes straight to the database when Redis is down."""
+        persister = make_persister(redis_available=False)
+
+        asyncio.run(persister.mark_dirty('a', state(1)))
+
+        assert persister._service.calls == [{'a': persister._service.rows['a']}]
+        assert persister.get_stats()['direct_writes'] == 1
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
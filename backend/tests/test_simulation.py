@@ -0,0 +1,118 @@
+"""
+Tests for SELVE Adaptive Testing Simulation
+
+Runs small Monte Carlo simulations as a benchmark gate: selection
+algorithms must keep completing within item limits and stay close to
+full-pool scores. The selection-latency gate depends on the machine, so it
+only runs with SELVE_BENCHMARK=1 (make benchmark).
+"""
+
+import importlib
+import os
+
+import pytest
+from app.simulation import (
+    DEFAULT_PROFILES,
+    LatentProfile,
+    RespondentGenerator,
+    _assign_profiles,
+    run_simulation,
+)
+from app.scoring import get_scorer
+
+import numpy as np
+
+
+# Benchmark gates (generous - these catch regressions, not tune the engines)
+MAX_MEAN_ABS_ERROR = 12.0  # 0-100 score points vs full-pool scoring
+MAX_P99_SELECTION_MS = 50.0
+
+RUN_BENCHMARK = os.getenv("SELVE_BENCHMARK") == "1"
+
+
+class TestSimulation:
+    """Test suite for the simulation harness."""
+
+    def test_respondents_follow_profile(self):
+        """Test high-theta respondents score higher than low-theta ones."""
+        scorer = get_scorer()
+        generator = RespondentGenerator(scorer)
+        rng = np.random.default_rng(0)
+
+        high = LatentProfile('high', means={'LUMEN': 2.0}, sd=0.1)
+        low = LatentProfile('low', means={'LUMEN': -2.0}, sd=0.1)
+        sheet_high = generator.sample(high, rng)
+        sheet_low = generator.sample(low, rng)
+
+        assert set(sheet_high) == set(scorer.compiled.item_codes)
+        scorer._validate_responses(sheet_high)
+        high_score = scorer.score_responses(sheet_high).lumen.normalized_score
+        low_score = scorer.score_responses(sheet_low).lumen.normalized_score
+        assert high_score > 60 > 40 > low_score
+
+    def test_profile_assignment(self):
+        """Test respondents are split by profile weight."""
+        profiles = [LatentProfile('a', weight=3), LatentProfile('b', weight=1)]
+        assignment = _assign_profiles(profiles, 10)
+
+        assert len(assignment) == 10
+        assert assignment.count(0) == 8 and assignment.count(1) == 2
+
+    def test_deterministic_across_workers(self):
+        """Test results depend on the seed, not on the number of workers."""
+        profiles = list(DEFAULT_PROFILES.values())
+        single = run_simulation(profiles, n_respondents=60, workers=1, seed=7)
+        pooled = run_simulation(profiles, n_respondents=60, workers=2, seed=7)
+
+        assert single.profiles == pooled.profiles
+        assert (single.n_items == pooled.n_items).all()
+        assert np.array_equal(single.abs_errors, pooled.abs_errors)
+
+    @pytest.mark.parametrize('engine', ['heuristic', 'irt'])
+    def test_selection_benchmark(self, engine):
+        """Test each engine completes within item limits and stays accurate."""
+        report = run_simulation(list(DEFAULT_PROFILES.values()), n_respondents=100, engine=engine, seed=1)
+        tester_max = 120 if engine == 'heuristic' else 96
+
+        assert report.n_respondents == 100
+        assert report.n_items.max() <= tester_max
+        assert report.n_items.min() >= 8 * 3
+        assert report.mean_abs_error < MAX_MEAN_ABS_ERROR
+        assert report.selections_per_second > 0
+        assert 'Selection limit reached' not in ' '.join(report.stop_reasons)
+
+        data = report.to_dict()
+        assert set(data['by_profile']) == set(DEFAULT_PROFILES)
+        assert set(data['score_error']) == set(report.dimensions)
+
+    @pytest.mark.skipif(not RUN_BENCHMARK, reason="timing gate: set SELVE_BENCHMARK=1")
+    @pytest.mark.parametrize('engine', ['heuristic', 'irt'])
+    def test_selection_latency(self, engine):
+        """Test p99 selection latency stays under the gate (single worker, opt-in)."""
+        report = run_simulation(list(DEFAULT_PROFILES.values()), n_respondents=200, engine=engine, seed=1)
+
+        assert report.latency_summary_ms()['p99'] < MAX_P99_SELECTION_MS
+
+    def test_question_engine_driver(self):
+        """Test the route-level driver enforces the minimum coverage floor."""
+        try:
+            importlib.import_module('app.routes.assessment.question_engine')
+        except RuntimeError as e:  # Prisma client not generated in this environment
+            pytest.skip(f"Assessment routes unavailable: {e}")
+
+        report = run_simulation([DEFAULT_PROFILES['population']], n_respondents=20, driver='question_engine', seed=2)
+
+        assert report.n_items.min() >= 8 * 5
+        assert report.mean_abs_error < MAX_MEAN_ABS_ERROR
+
+    def test_invalid_arguments(self):
+        """Test unknown engines and empty profile lists are rejected."""
+        with pytest.raises(ValueError):
+            run_simulation(engine='bogus', n_respondents=1)
+        with pytest.raises(ValueError):
+            run_simulation(profiles=[], n_respondents=1)
+
+
+if __name__ == '__main__':
+    """Run tests with pytest."""
+    pytest.main([__file__, '-v'])
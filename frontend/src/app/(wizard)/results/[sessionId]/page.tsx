@@ -63,6 +63,7 @@ export default function ResultsPage() {
   const abortControllerRef = useRef<AbortController | null>(null);
   const isMountedRef = useRef<boolean>(true);
   const generationTriggeredRef = useRef<boolean>(false);
+  const eventSourceRef = useRef<EventSource | null>(null);
 
   const chatbotBaseUrl = (process.env.NEXT_PUBLIC_CHATBOT_URL || "https://chat.selve.me").trim();
   const chatbotRedirect = `/auth/redirect?redirect_to=${encodeURIComponent(chatbotBaseUrl)}`;
@@ -77,6 +78,10 @@ export default function ResultsPage() {
       abortControllerRef.current.abort();
       abortControllerRef.current = null;
     }
+    if (eventSourceRef.current) {
+      eventSourceRef.current.close();
+      eventSourceRef.current = null;
+    }
     isPollingRef.current = false;
   }, []);
 
@@ -95,6 +100,9 @@ export default function ResultsPage() {
 
       if (signal.aborted || !isMountedRef.current) return false;
 
+      // 202: generation was queued in the background; keep polling the status
+      if (response.status === 202) return false;
+
       if (!response.ok) {
         const errorData = await response.json().catch(() => ({}));
         throw new Error(errorData.detail || `Failed to fetch results: ${response.status}`);
@@ -261,6 +269,57 @@ export default function ResultsPage() {
     }, POLLING_INTERVAL_MS);
   }, [checkResultsStatus, cleanup]);
 
+  // Follow generation over server-sent events (starts it if needed); falls back to polling
+  const startStreaming = useCallback(() => {
+    if (typeof EventSource === 'undefined') {
+      startPolling();
+      return;
+    }
+    eventSourceRef.current?.close();
+    setResultsStatus('generating');
+    startTimeRef.current = Date.now();
+
+    const source = new EventSource(`${API_BASE}/api/assessment/${sessionId}/results/stream`);
+    eventSourceRef.current = source;
+
+    source.addEventListener('section', (event) => {
+      if (!isMountedRef.current) return;
+      const data = JSON.parse((event as MessageEvent).data);
+      setCompletedSections(prev => prev.includes(data.title) ? prev : [...prev, data.title]);
+      setGenerationProgress(prev => Math.max(prev, Math.min(95, Math.round((data.completed / data.total) * 100))));
+      setCurrentStep(
+        data.completed < data.total
+          ? `Generating section ${data.completed + 1} of ${data.total}...`
+          : 'Complete! Loading results...'
+      );
+    });
+
+    source.addEventListener('done', async () => {
+      source.close();
+      eventSourceRef.current = null;
+      if (!isMountedRef.current) return;
+      setGenerationProgress(100);
+      setCurrentStep('Complete!');
+      const success = await fetchFullResults();
+      if (!success && isMountedRef.current) startPolling();
+    });
+
+    // Fired both for the server's "error" event (has data) and for connection failures
+    source.addEventListener('error', (event) => {
+      source.close();
+      eventSourceRef.current = null;
+      if (!isMountedRef.current) return;
+      const message = (event as MessageEvent).data;
+      if (message) {
+        setResultsStatus('error');
+        setError(JSON.parse(message).message || 'An error occurred');
+        setIsLoading(false);
+      } else {
+        startPolling();
+      }
+    });
+  }, [sessionId, fetchFullResults, startPolling]);
+
   // Initialize on mount
   useEffect(() => {
     isMountedRef.current = true;
@@ -293,7 +352,7 @@ export default function ResultsPage() {
           }
         }
 
-        startPolling();
+        startStreaming();
       } catch (error) {
         console.error('Initialization error:', error);
         if (isMountedRef.current) {
@@ -309,7 +368,7 @@ export default function ResultsPage() {
       isMountedRef.current = false;
       cleanup();
     };
-  }, [sessionId, userLoaded, user?.id, router, fetchFullResults, startPolling, cleanup]);
+  }, [sessionId, userLoaded, user?.id, router, fetchFullResults, startPolling, startStreaming, cleanup]);
 
   // Share handlers
   const handleShare = async () => {